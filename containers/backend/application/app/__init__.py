@@ -14,6 +14,8 @@ from redis import Redis
 from app.cache import cache
 from app.rate_limit import limiter
 from app.logger_config import logger
+from app.db_routing import RoutingSession
+from app.db_pool import engine_options, init_db_pool
 
 # Orígenes CORS por defecto si ALLOWED_ORIGINS no está configurado.
 # En producción conviene sobreescribir vía variable de entorno.
@@ -36,7 +38,8 @@ def _parse_origins(value: str | None) -> list[str]:
 
 
 # Extensiones
-db = SQLAlchemy()
+# Sesión que puede leer de réplicas en las vistas con @read_replica
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 login = LoginManager()
 login.login_message = "Por favor, inicia sesión para acceder a esta página."
@@ -49,6 +52,8 @@ celery = None
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    # Pool de conexiones (tamaño, timeouts, modo PgBouncer); ver app/db_pool.py
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
 
     # Inicializar extensiones
     db.init_app(app)
@@ -62,6 +67,21 @@ def create_app(config_class=Config):
     from app.db_listeners import _soft_delete_criteria
     # --- Fin registro listeners ---
 
+    # Modo PgBouncer: rechazar sentencias con estado de sesión (app/db_pool.py)
+    init_db_pool(app)
+
+    # Nº de consultas, tiempo en BD y N+1 por petición (cabecera Server-Timing)
+    from app.query_stats import init_query_stats
+    init_query_stats(app)
+
+    # Métricas Prometheus (latencia HTTP, pool, Socket.IO); ver app/metrics.py
+    from app.metrics import init_metrics
+    init_metrics(app)
+
+    # Perfilado muestreado de peticiones (flamegraphs); ver app/profiling.py
+    from app.profiling import init_profiling
+    init_profiling(app)
+
     app.redis = Redis.from_url(app.config['REDIS_URL'])
     app.celery = init_celery(app)
 
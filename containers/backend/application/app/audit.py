@@ -0,0 +1,336 @@
+"""
+Auditoría de cambios fuera del camino de la petición
+
+Antes cada INSERT/UPDATE de un modelo auditado serializaba la fila entera a
+JSON y añadía un `Audit` dentro del propio flush (un INSERT más por
+escritura), y el borrado lógico hacía además su propio commit. Ahora:
+
+1. `after_flush`: por cada objeto nuevo, modificado o borrado se calcula
+   solo el diff (columnas cambiadas, valor anterior y nuevo) con el estado
+   que ya está en memoria, sin lanzar SQL. Se guarda en `session.info`.
+2. `after_commit`: los diffs de la transacción pasan al buffer del proceso
+   (`audit_writer`); con `after_rollback` se descartan, así nunca se audita
+   algo que no llegó a la base de datos.
+3. Un hilo de fondo vacía el buffer cada `AUDIT_FLUSH_SECONDS` (o al llegar
+   a `AUDIT_BATCH_SIZE`) con un único INSERT multi-fila (executemany) sobre
+   la tabla `audit`, cuyas columnas de datos son JSONB.
+
+Las escrituras en lote hechas con Core (`pg_insert(...).returning(...)`) no
+pasan por el flush del ORM: quien las hace pide las columnas de
+`audited_returning` y pasa las filas a `record_core_rows`, que las suma a
+los diffs pendientes de la transacción.
+
+Con `AUDIT_ASYNC = False` (tests) el lote de cada transacción se escribe
+en el propio `after_commit`, con una conexión aparte.
+
+El buffer vive en memoria: si el proceso muere de golpe se pierden como
+mucho los diffs de los últimos `AUDIT_FLUSH_SECONDS`. Al salir de forma
+ordenada se vacía (`atexit`).
+
+Operaciones registradas:
+- INSERT: `new_data` con las columnas con valor.
+- UPDATE: `previous_data`/`new_data` solo con las columnas cambiadas (y la
+  clave primaria en `new_data` para saber qué fila es).
+- DELETE: borrado lógico (`deletedAt` pasa a tener valor) o físico;
+  `previous_data` con la fila tal y como estaba cargada.
+"""
+import atexit
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, date, timezone
+from decimal import Decimal
+from enum import Enum
+
+from flask import current_app
+from sqlalchemy import inspect, literal_column
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app import db
+from app.common.config import config_value
+from app.event_registry import listen_once
+from app.logger_config import logger
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_SECONDS = 2.0
+DEFAULT_MAX_BUFFER = 50000
+
+# Columnas que cambian en cada escritura y no aportan nada al diff
+EXCLUDED_COLUMNS = {'createdAt', 'updatedAt'}
+
+_PENDING_AUDIT_KEY = 'pending_audit'
+
+# En el RETURNING de un upsert, `xmax = 0` indica que la fila es nueva y no
+# una existente actualizada por el ON CONFLICT
+_INSERTED = literal_column('xmax = 0').label('audit_inserted')
+
+# Clases auditadas (ver `setup_audit` en models.py, que también llama a `install`)
+_audited_models = set()
+
+
+def register_models(models):
+    _audited_models.update(models)
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (bytes, memoryview)):
+        return None  # hashes/binarios no se auditan
+    return value
+
+
+def _column_keys(mapper):
+    return [
+        attr.key for attr in mapper.column_attrs
+        if attr.key not in EXCLUDED_COLUMNS
+    ]
+
+
+def _loaded_values(state, keys):
+    """Valores ya cargados en memoria (nunca dispara un SELECT)."""
+    loaded = state.dict
+    return {key: _jsonable(loaded[key]) for key in keys if key in loaded}
+
+
+def _primary_key(state, mapper):
+    return {
+        mapper.get_property_by_column(column).key: _jsonable(value)
+        for column, value in zip(mapper.primary_key, state.identity or ())
+    }
+
+
+def _diff(obj, operation):
+    """(operation, previous_data, new_data) o None si no hay nada que auditar."""
+    state = inspect(obj)
+    mapper = state.mapper
+    keys = _column_keys(mapper)
+
+    if operation == 'INSERT':
+        new_data = {key: value for key, value in _loaded_values(state, keys).items() if value is not None}
+        return operation, None, new_data
+
+    previous_data = {}
+    new_data = {}
+    for key in keys:
+        history = get_history(obj, key)
+        if not history.has_changes():
+            continue
+        # Sin valor anterior en el historial = el atributo no estaba cargado
+        if history.deleted:
+            previous_data[key] = _jsonable(history.deleted[0])
+        new_data[key] = _jsonable(history.added[0]) if history.added else None
+
+    # Borrado lógico: `deletedAt` pasa de null a tener valor
+    if operation == 'UPDATE' and new_data.get('deletedAt') is not None and previous_data.get('deletedAt') is None:
+        operation = 'DELETE'
+
+    if operation == 'DELETE':
+        snapshot = {
+            key: value for key, value in _loaded_values(state, keys).items()
+            if key not in new_data
+        }
+        snapshot.update(previous_data)
+        snapshot.update(_primary_key(state, mapper))
+        return operation, snapshot, None
+
+    if not new_data:
+        return None
+    new_data.update(_primary_key(state, mapper))
+    return operation, previous_data, new_data
+
+
+def _capture_changes(session, flush_context):
+    """Calcula los diffs de este flush mientras el historial sigue en memoria."""
+    if not _audited_models:
+        return
+
+    now = datetime.now(timezone.utc)
+    pending = None
+    for objects, operation in (
+        (session.new, 'INSERT'),
+        (session.dirty, 'UPDATE'),
+        (session.deleted, 'DELETE'),
+    ):
+        for obj in objects:
+            if type(obj) not in _audited_models:
+                continue
+            diff = _diff(obj, operation)
+            if diff is None:
+                continue
+            if pending is None:
+                pending = session.info.setdefault(_PENDING_AUDIT_KEY, [])
+            operation_done, previous_data, new_data = diff
+            pending.append({
+                'affected_table': obj.__tablename__,
+                'operation': operation_done,
+                'previous_data': previous_data,
+                'new_data': new_data,
+                'date': now,
+            })
+
+
+def audited_returning(table):
+    """Columnas del RETURNING de un INSERT/upsert con Core que se pasa a `record_core_rows`"""
+    return [*table.c, _INSERTED]
+
+
+def record_core_rows(session, model, rows):
+    """
+    Auditar filas escritas con Core, que no pasan por `after_flush`
+
+    Como los diffs del ORM, se escriben después del commit y se descartan
+    con el rollback. Del upsert no se conoce la fila anterior: una fila ya
+    existente queda como UPDATE con `new_data` completo y `previous_data`
+    vacío.
+
+    Args:
+        model: Clase auditada a la que pertenecen las filas
+        rows: Filas devueltas por un RETURNING con `audited_returning`
+    """
+    if model not in _audited_models or not rows:
+        return
+
+    keys = [column.name for column in model.__table__.columns if column.name not in EXCLUDED_COLUMNS]
+    now = datetime.now(timezone.utc)
+    pending = session.info.setdefault(_PENDING_AUDIT_KEY, [])
+    for row in rows:
+        values = row._mapping
+        data = {key: _jsonable(values[key]) for key in keys}
+        if values.get('audit_inserted', True):
+            operation, previous_data = 'INSERT', None
+            data = {key: value for key, value in data.items() if value is not None}
+        else:
+            operation, previous_data = 'UPDATE', {}
+        pending.append({
+            'affected_table': model.__tablename__,
+            'operation': operation,
+            'previous_data': previous_data,
+            'new_data': data,
+            'date': now,
+        })
+
+
+def _enqueue_changes(session):
+    pending = session.info.pop(_PENDING_AUDIT_KEY, None)
+    if not pending:
+        return
+    if config_value('AUDIT_ASYNC', True):
+        audit_writer.submit(pending)
+    else:
+        audit_writer.write(pending)
+
+
+def _discard_changes(session):
+    session.info.pop(_PENDING_AUDIT_KEY, None)
+
+
+def install():
+    """Registrar los listeners de sesión (idempotente)."""
+    listen_once(Session, 'after_flush', _capture_changes)
+    listen_once(Session, 'after_commit', _enqueue_changes)
+    listen_once(Session, 'after_rollback', _discard_changes)
+
+
+class AuditWriter:
+    """Buffer del proceso + hilo que escribe los diffs por lotes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffer = deque()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._app = None
+        self._dropped = 0
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def submit(self, entries):
+        max_buffer = config_value('AUDIT_MAX_BUFFER', DEFAULT_MAX_BUFFER)
+        with self._lock:
+            room = max_buffer - len(self._buffer)
+            if room < len(entries):
+                # Base de datos caída o muy lenta: no crecer sin límite
+                self._dropped += len(entries) - max(room, 0)
+                entries = entries[:max(room, 0)]
+            self._buffer.extend(entries)
+            if self._thread is None:
+                self._start()
+        if len(self._buffer) >= config_value('AUDIT_BATCH_SIZE', DEFAULT_BATCH_SIZE):
+            self._wakeup.set()
+
+    def _start(self):
+        self._app = current_app._get_current_object()
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self._flush_at_exit)
+
+    def _flush_at_exit(self):
+        try:
+            with self._app.app_context():
+                self.flush()
+        except Exception as e:
+            logger.getChild('audit').error(f"Error vaciando la auditoría al salir: {str(e)}")
+
+    def _run(self):
+        interval = self._app.config.get('AUDIT_FLUSH_SECONDS', DEFAULT_FLUSH_SECONDS)
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            try:
+                with self._app.app_context():
+                    self.flush()
+            except Exception as e:
+                logger.getChild('audit').error(f"Error escribiendo la auditoría: {str(e)}", exc_info=True)
+                time.sleep(interval)
+
+    def _take(self, limit):
+        with self._lock:
+            count = min(limit, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def _requeue(self, batch):
+        with self._lock:
+            self._buffer.extendleft(reversed(batch))
+
+    def flush(self):
+        """Escribe todo lo que hay en el buffer. Devuelve las filas escritas."""
+        if self._dropped:
+            logger.getChild('audit').warning(f"Buffer de auditoría lleno: {self._dropped} cambios descartados")
+            self._dropped = 0
+
+        batch_size = config_value('AUDIT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        written = 0
+        while True:
+            batch = self._take(batch_size)
+            if not batch:
+                return written
+            try:
+                self.write(batch)
+            except Exception:
+                # Se reintenta en la siguiente vuelta, en el mismo orden
+                self._requeue(batch)
+                raise
+            written += len(batch)
+
+    def write(self, rows):
+        """Un único INSERT multi-fila con su propia conexión y transacción."""
+        from app.models import Audit
+
+        with db.engine.begin() as conn:
+            conn.execute(Audit.__table__.insert(), rows)
+
+
+audit_writer = AuditWriter()
+
+
+def flush_audit():
+    """Vaciar el buffer de auditoría de forma síncrona (CLI/tests)."""
+    return audit_writer.flush()
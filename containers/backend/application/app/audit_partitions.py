@@ -0,0 +1,142 @@
+"""
+Particiones mensuales de la tabla `audit`
+
+`audit` está particionada por rango de `date` (migración 23):
+
+- `audit_pYYYYMM`: un mes, `[día 1 del mes, día 1 del mes siguiente)`.
+- `audit_legacy`: las filas anteriores a la migración, tal cual estaban
+  (se adjuntó la tabla antigua como partición, sin copiar nada).
+- `audit_default`: red de seguridad para fechas sin partición. Debe estar
+  vacía; si tiene filas es que la tarea no se ha ejecutado a tiempo.
+
+`manage_partitions` (tarea `audit_tasks.manage_audit_partitions`, diaria):
+
+1. Crea las particiones del mes actual y de los `AUDIT_PARTITIONS_AHEAD`
+   siguientes.
+2. Las particiones que terminan antes de `AUDIT_RETENTION_MONTHS` meses
+   atrás se desadjuntan (`DETACH PARTITION`, deja de pagarse en vacuum y
+   backups de `audit`). Si hay `AUDIT_ARCHIVE_DIR`, se vuelcan con `COPY` a
+   un CSV comprimido con gzip en ese directorio y se borran; si no, la
+   tabla queda suelta para archivarla a mano.
+"""
+import gzip
+import os
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from app import db
+from app.logger_config import logger
+
+DEFAULT_PARTITIONS_AHEAD = 3
+DEFAULT_RETENTION_MONTHS = 12
+
+PARTITION_PREFIX = 'audit_p'
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{PARTITION_PREFIX}{month:%Y%m}'
+
+
+def create_partition(conn, month):
+    """Crear (si no existe) la partición del mes que empieza en `month`."""
+    conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF audit '
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    ))
+
+
+def list_partitions(conn):
+    """[(nombre, fin del rango o None si es DEFAULT)] de las particiones adjuntas."""
+    rows = conn.execute(text(
+        'SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) '
+        'FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+        "WHERE i.inhparent = 'audit'::regclass"
+    )).all()
+
+    partitions = []
+    for name, bound in rows:
+        match = _UPPER_BOUND.search(bound or '')
+        partitions.append((name, datetime.fromisoformat(match.group(1)) if match else None))
+    return sorted(partitions, key=lambda p: (p[1] is None, p[1] or datetime.max))
+
+
+def _archive(conn, name, archive_dir):
+    """Volcar la tabla a `<archive_dir>/<name>.csv.gz` y borrarla."""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f'{name}.csv.gz')
+    cursor = conn.connection.cursor()
+    try:
+        with gzip.open(path, 'wb') as fh:
+            cursor.copy_expert(f'COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)', fh)
+    finally:
+        cursor.close()
+    conn.execute(text(f'DROP TABLE {name}'))
+    return path
+
+
+def manage_partitions(now=None, ahead=None, retention_months=None, archive_dir=None):
+    """
+    Crear las particiones futuras y retirar las antiguas
+
+    Returns:
+        dict: {'created': [...], 'detached': [...], 'archived': [...], 'default_rows': n}
+    """
+    from flask import current_app
+
+    config = current_app.config
+    ahead = config.get('AUDIT_PARTITIONS_AHEAD', DEFAULT_PARTITIONS_AHEAD) if ahead is None else ahead
+    if retention_months is None:
+        retention_months = config.get('AUDIT_RETENTION_MONTHS', DEFAULT_RETENTION_MONTHS)
+    if archive_dir is None:
+        archive_dir = config.get('AUDIT_ARCHIVE_DIR')
+
+    current = month_start(now or datetime.now(timezone.utc))
+    cutoff = add_months(current, -retention_months)
+    result = {'created': [], 'detached': [], 'archived': [], 'default_rows': 0}
+
+    with db.engine.begin() as conn:
+        # Hasta dónde llegan ya las particiones (la legacy cubre hasta el mes
+        # siguiente a la migración)
+        bounds = [upper for _, upper in list_partitions(conn) if upper is not None]
+        covered_until = max(bounds) if bounds else None
+        for offset in range(ahead + 1):
+            month = add_months(current, offset)
+            if covered_until is not None and month < covered_until:
+                continue
+            create_partition(conn, month)
+            result['created'].append(partition_name(month))
+
+        result['default_rows'] = conn.execute(text('SELECT count(*) FROM audit_default')).scalar()
+
+    with db.engine.connect() as conn:
+        partitions = list_partitions(conn)
+
+    for name, upper in partitions:
+        if upper is None or upper > cutoff:
+            continue
+        # Una transacción por partición: si falla el archivado la tabla
+        # queda desadjuntada pero intacta
+        with db.engine.begin() as conn:
+            conn.execute(text(f'ALTER TABLE audit DETACH PARTITION {name}'))
+        result['detached'].append(name)
+        if archive_dir:
+            with db.engine.begin() as conn:
+                result['archived'].append(_archive(conn, name, archive_dir))
+
+    if result['default_rows']:
+        logger.getChild('audit').warning(
+            f"audit_default tiene {result['default_rows']} filas: faltan particiones para esas fechas"
+        )
+    return result
@@ -0,0 +1,33 @@
+"""
+Tareas de Celery para el mantenimiento de la tabla de auditoría
+"""
+from app import create_app
+from app.audit_partitions import manage_partitions
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Crear contexto de la app para las tareas
+app = create_app()
+celery = app.celery
+
+
+@celery.task(name='audit_tasks.manage_audit_partitions')
+def manage_audit_partitions():
+    """
+    Crear las particiones mensuales de `audit` de los próximos meses y
+    desadjuntar (y archivar, si hay AUDIT_ARCHIVE_DIR) las que han salido
+    del periodo de retención
+    """
+    with app.app_context():
+        try:
+            result = manage_partitions()
+            logger.info(
+                f"Particiones de auditoría: {len(result['created'])} creadas, "
+                f"{len(result['detached'])} retiradas, {len(result['archived'])} archivadas"
+            )
+            return result
+
+        except Exception as e:
+            logger.error(f'Error en manage_audit_partitions: {str(e)}')
+            return f'Error: {str(e)}'
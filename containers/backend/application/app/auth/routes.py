@@ -310,7 +310,7 @@ def recover_password():
         email = data['email']
         
         # Buscar al usuario por su email (excluir eliminados)
-        user = User.query.filter_by(email=email, deletedAt=None).first()
+        user = User.query.filter_by(email=email).first()
 
         if not user:
             # No se encontró un usuario con ese email
@@ -339,7 +339,7 @@ def register():
             logger.getChild('auth').warning("Solicitud de registro sin email válido")
             return jsonify({"msg": "El campo 'email' es obligatorio"}), 400
 
-        user = User.query.filter_by(email=email, deletedAt=None).first()
+        user = User.query.filter_by(email=email).first()
 
         if user:
             if user.is_enabled:
@@ -435,7 +435,7 @@ def register_step1(token):
             username = base_username
             counter = 1
             # Asegurar que el username sea único (excluir usuarios eliminados)
-            while User.query.filter_by(username=username, deletedAt=None).first():
+            while User.query.filter_by(username=username).first():
                 username = f"{base_username}{counter}"
                 counter += 1
             user.username = username
@@ -2,11 +2,15 @@
 
 Envuelve `flask-caching` con backend Redis. Se inicializa en `create_app`
 leyendo `REDIS_URL` de la configuración. Expone helpers específicos de
-dominio para invalidaciones puntuales (ratings por usuario, contadores de
-RSVP por evento) que son los hotspots identificados en el Issue #2.
+dominio para invalidaciones puntuales (ratings por usuario, detalle de
+evento) de los hotspots identificados en el Issue #2. Los contadores de RSVP
+por evento no se cachean: viven en `Event.confirmed_count` (ver
+`app.events.capacity`).
 """
 from flask_caching import Cache
 
+from app.metrics import record_cache_lookup
+
 cache = Cache()
 
 
@@ -16,7 +20,9 @@ def _rating_key(user_id: int) -> str:
 
 def get_user_rating_cached(user_id: int):
     """Devuelve (avg, count) cacheado para el usuario o None si no hay entrada."""
-    return cache.get(_rating_key(user_id))
+    value = cache.get(_rating_key(user_id))
+    record_cache_lookup('rating', value is not None)
+    return value
 
 
 def set_user_rating_cached(user_id: int, avg: float, count: int, timeout: int = 3600):
@@ -27,17 +33,36 @@ def invalidate_user_rating(user_id: int):
     cache.delete(_rating_key(user_id))
 
 
-def _event_attendee_key(event_id: int) -> str:
-    return f"event:{event_id}:confirmed_count"
+# El detalle de un evento se guarda bajo una versión que la invalidación
+# incrementa. Quien lo construye lo guarda con la versión que leyó antes de
+# ir a la base de datos: si entre medias se ha invalidado, el `set` cae en
+# una clave que ya nadie lee en lugar de pisar el dato nuevo con uno viejo.
+def _event_detail_version_key(event_id: int) -> str:
+    return f"event:{event_id}:detail:version"
+
+
+def _event_detail_key(event_id: int, version: int) -> str:
+    return f"event:{event_id}:detail:{version}"
+
 
+def get_event_detail_cached(event_id: int):
+    """Parte anónima del detalle de un evento (sin el RSVP del usuario).
 
-def get_event_confirmed_count_cached(event_id: int):
-    return cache.get(_event_attendee_key(event_id))
+    Returns:
+        tuple: (versión, detalle o None); la versión se pasa tal cual a
+        `set_event_detail_cached`.
+    """
+    version = cache.get(_event_detail_version_key(event_id)) or 0
+    value = cache.get(_event_detail_key(event_id, version))
+    record_cache_lookup('event_detail', value is not None)
+    return version, value
 
 
-def set_event_confirmed_count_cached(event_id: int, count: int, timeout: int = 300):
-    cache.set(_event_attendee_key(event_id), count, timeout=timeout)
+def set_event_detail_cached(event_id: int, version: int, detail: dict, timeout: int = 300):
+    cache.set(_event_detail_key(event_id, version), detail, timeout=timeout)
 
 
-def invalidate_event_confirmed_count(event_id: int):
-    cache.delete(_event_attendee_key(event_id))
+def invalidate_event_detail(event_id: int):
+    # Sin caducidad: si la versión desapareciera volvería a 0 y podría servir
+    # una entrada antigua de esa versión
+    cache.inc(_event_detail_version_key(event_id))
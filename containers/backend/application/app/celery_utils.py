@@ -1,4 +1,5 @@
 from celery import Celery
+from app.metrics import init_celery_metrics
 
 def init_celery(app):
     celery = Celery(app.import_name, broker=app.config['REDIS_URL'])
@@ -12,4 +13,6 @@ def init_celery(app):
                 return self.run(*args, **kwargs)
 
     celery.Task = ContextTask
+    # Duración de las tareas para /metrics
+    init_celery_metrics()
     return celery
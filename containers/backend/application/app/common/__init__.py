@@ -15,16 +15,20 @@ Flask puras. En su lugar optamos por **composición de helpers**:
 cubre el 100% de la duplicación objetivo sin tocar las firmas públicas.
 """
 
-from app.common.serializers import serialize_user_summary
-from app.common.pagination import paginated_response
+from app.common.serializers import serialize_user_summary, serialize_notification
+from app.common.pagination import paginated_response, cursor_paginated_response
 from app.common.geo import haversine_km_sql, haversine_filter
 from app.common.soft_delete import SoftDeleteQueryMixin, active_filter
+from app.common.config import config_value
 
 __all__ = [
     "serialize_user_summary",
+    "serialize_notification",
     "paginated_response",
+    "cursor_paginated_response",
     "haversine_km_sql",
     "haversine_filter",
     "SoftDeleteQueryMixin",
     "active_filter",
+    "config_value",
 ]
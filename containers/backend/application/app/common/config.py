@@ -0,0 +1,15 @@
+"""Lectura de configuración que también funciona fuera de la aplicación."""
+
+from flask import current_app
+
+
+def config_value(key, default):
+    """`current_app.config[key]`, o `default` sin contexto de aplicación.
+
+    Para módulos que también se usan desde scripts, tests unitarios o hilos
+    propios (sin `app_context`).
+    """
+    try:
+        return current_app.config.get(key, default)
+    except RuntimeError:
+        return default
@@ -23,10 +23,15 @@ def haversine_km_sql(lat_col, lon_col, lat_val, lon_val):
     lat2 = func.radians(lat_val)
     lon1 = func.radians(lon_col)
     lon2 = func.radians(lon_val)
+    # `least` acota el redondeo (1.0000000000000002 para puntos idénticos),
+    # que haría fallar `acos` con "input is out of range"
     return (
         func.acos(
-            func.sin(lat1) * func.sin(lat2)
-            + func.cos(lat1) * func.cos(lat2) * func.cos(lon2 - lon1)
+            func.least(
+                func.sin(lat1) * func.sin(lat2)
+                + func.cos(lat1) * func.cos(lat2) * func.cos(lon2 - lon1),
+                1.0,
+            )
         )
         * EARTH_RADIUS_KM
     )
@@ -1,5 +1,7 @@
 """Paginación uniforme para endpoints de listado."""
 
+import base64
+import binascii
 from typing import Any, Callable, Iterable
 
 
@@ -39,3 +41,62 @@ def paginated_response(
     if extra_items_kwargs:
         response.update(extra_items_kwargs)
     return response
+
+
+def encode_cursor(key: int) -> str:
+    """Cursor opaco a partir de la clave del último item devuelto."""
+    return base64.urlsafe_b64encode(str(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> int | None:
+    """Inversa de `encode_cursor`. Lanza `ValueError` si el cursor no es válido."""
+    if not cursor:
+        return None
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+
+def cursor_paginated_response(
+    query: Any,
+    key_column: Any,
+    cursor: str | None,
+    limit: int,
+    serializer: Callable[[Any], dict],
+    *,
+    items_key: str = "items",
+    extra_items_kwargs: dict | None = None,
+) -> dict:
+    """Paginación por cursor (keyset) sobre una columna entera ascendente.
+
+    A diferencia de `paginated_response` no hace `COUNT(*)` ni `OFFSET`:
+    cada página es `WHERE key > :cursor ORDER BY key LIMIT :limit + 1`, con
+    coste constante aunque la lista tenga miles de filas. Pensada para
+    listas largas que se recorren con "cargar más" (asistentes, miembros).
+
+    - `query`: Query con filtros, SIN `order_by` (se ordena por `key_column`).
+    - `key_column`: columna única y monótona (normalmente el `id`).
+    - `cursor`: valor de `next_cursor` de la página anterior o None.
+    - `limit`: tamaño de página, saneado por el caller.
+    Lanza `ValueError` si el cursor no es válido.
+    """
+    after = decode_cursor(cursor)
+    if after is not None:
+        query = query.filter(key_column > after)
+    rows = query.order_by(key_column).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(getattr(rows[-1], key_column.key)) if has_more else None
+
+    response = {
+        items_key: [serializer(row) for row in rows],
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "limit": limit,
+    }
+    if extra_items_kwargs:
+        response.update(extra_items_kwargs)
+    return response
@@ -25,3 +25,19 @@ def serialize_user_summary(user: Optional[Any]) -> Optional[dict]:
         "username": username,
         "image": getattr(user, "profile_image", None),
     }
+
+
+def serialize_notification(notif: Any) -> dict:
+    """Formato de una notificación en el listado y en el evento Socket.IO."""
+    return {
+        "id": notif.id,
+        "type": notif.type,
+        "title": notif.title,
+        "message": notif.message,
+        "link": notif.link,
+        "is_read": notif.is_read,
+        "read_at": notif.read_at.isoformat() if notif.read_at else None,
+        "data": notif.data,
+        "count": notif.actor_count,
+        "created_at": notif.createdAt.isoformat() if notif.createdAt else None,
+    }
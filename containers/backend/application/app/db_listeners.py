@@ -2,12 +2,34 @@ from sqlalchemy import event
 from sqlalchemy.orm import Session, with_loader_criteria
 from app.models import Base
 
+
+def _not_deleted(cls):
+    return cls.deletedAt.is_(None)
+
+
+# Se construye una sola vez. Con una lambda creada dentro del listener cada
+# SELECT llevaba una opción nueva que había que volver a analizar para sacar
+# su clave de caché; con una función de módulo sin variables de cierre la
+# clave es siempre la misma y la sentencia compilada sale de la caché.
+SOFT_DELETE_CRITERIA = with_loader_criteria(
+    Base,
+    _not_deleted,
+    include_aliases=True,
+    track_closure_variables=False,
+)
+
+
 @event.listens_for(Session, "do_orm_execute")
 def _soft_delete_criteria(execute_state):
     """
     Aplica soft-delete automático (deletedAt IS NULL)
     a todas las entidades que hereden de Base, a menos que
     la opción 'include_soft_deleted' esté presente y sea True.
+
+    Cubre todas las SELECT ORM (también joins, subconsultas y cargas de
+    relaciones, a las que se propaga la opción), así que las rutas no
+    necesitan repetir `filter_by(deletedAt=None)`. Sí hace falta en
+    UPDATE/DELETE en bloque y en SQL de Core sobre `Model.__table__`.
     """
     # Comprobar si la opción para incluir soft-deleted está presente y activada
     if execute_state.execution_options.get("include_soft_deleted", False):
@@ -16,10 +38,71 @@ def _soft_delete_criteria(execute_state):
 
     # Aplicar el filtro solo en SELECTs y si la opción no está activada
     if execute_state.is_select and not execute_state.is_column_load and not execute_state.is_relationship_load:
-        execute_state.statement = execute_state.statement.options(
-            with_loader_criteria(
-                Base,
-                lambda cls: cls.deletedAt.is_(None),
-                include_aliases=True
-            )
-        )
+        execute_state.statement = execute_state.statement.options(SOFT_DELETE_CRITERIA)
+
+
+# ========================================
+# NOTIFICACIONES EN TIEMPO REAL
+# ========================================
+#
+# Cualquier `Notification` insertada con el ORM, o agrupada con el upsert de
+# `add_notification` (que la encola con `queue_notification`), se envía por
+# Socket.IO a la sala `user_<id>` cuando la transacción hace commit, junto con
+# el contador de no leídas. Así no hay que tocar cada ruta que crea
+# notificaciones y nunca se emite algo que luego se deshace con un rollback.
+
+_PENDING_NOTIFICATIONS_KEY = 'pending_notifications'
+
+
+def queue_notification(session, notification):
+    """Enviar `notification` (en su estado actual) tras el commit de `session`."""
+    from app.common import serialize_notification
+
+    # Tras el commit los atributos están expirados: se serializa ahora
+    pending = session.info.setdefault(_PENDING_NOTIFICATIONS_KEY, {})
+    pending[notification.id] = (notification.user_id, serialize_notification(notification))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_notifications(session, flush_context):
+    """Encola las notificaciones insertadas en este flush."""
+    from app.models import Notification
+
+    for obj in list(session.new):
+        if isinstance(obj, Notification):
+            queue_notification(session, obj)
+
+
+@event.listens_for(Session, "after_commit")
+def _emit_notifications(session):
+    pending = session.info.pop(_PENDING_NOTIFICATIONS_KEY, None)
+    if not pending:
+        return
+
+    from app import db, socketio
+    from app.logger_config import logger
+    from sqlalchemy import text
+
+    try:
+        user_ids = sorted({user_id for user_id, _ in pending.values()})
+        # La sesión no puede ejecutar SQL dentro de after_commit: conexión aparte
+        with db.engine.connect() as conn:
+            rows = conn.execute(text(
+                'SELECT user_id, count(*) FROM notification '
+                'WHERE user_id = ANY(:ids) AND is_read = false AND "deletedAt" IS NULL '
+                'GROUP BY user_id'
+            ), {'ids': user_ids}).all()
+        unread = dict(rows)
+
+        for user_id, payload in pending.values():
+            socketio.emit('notification', {
+                'notification': payload,
+                'unread_count': unread.get(user_id, 0),
+            }, room=f'user_{user_id}')
+    except Exception as e:
+        logger.getChild('notifications').error(f"Error emitiendo notificaciones: {str(e)}", exc_info=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_notifications(session):
+    session.info.pop(_PENDING_NOTIFICATIONS_KEY, None)
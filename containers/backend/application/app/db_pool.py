@@ -0,0 +1,100 @@
+"""
+Opciones del pool de conexiones a PostgreSQL
+
+`engine_options(config)` construye `SQLALCHEMY_ENGINE_OPTIONS` a partir de
+`DB_POOL_SIZE`, `DB_MAX_OVERFLOW`, `DB_POOL_TIMEOUT`, `DB_POOL_RECYCLE` y
+`DB_POOL_PRE_PING` (si la config no lo define ya, como `TestConfig`).
+
+Bajo eventlet cada greenlet que consulta ocupa una conexión del pool: con el
+pool por defecto (5 + 10) y 30 s de espera, las peticiones se quedaban
+colgadas sin dejar rastro. `DB_POOL_TIMEOUT` acota la espera y las métricas
+`db_pool_*` de /metrics muestran la saturación (ver app/metrics.py).
+
+Modo PgBouncer (`DB_PGBOUNCER=true`, pooling por transacción): cada
+transacción puede ir a una conexión de servidor distinta, así que no puede
+quedar estado en la sesión de PostgreSQL:
+
+- Sin pool propio (`NullPool`): el pool es PgBouncer. Cada checkout abre una
+  conexión a PgBouncer (barata, local) y la cierra al devolverla; el límite
+  real de conexiones a PostgreSQL lo pone `default_pool_size` en PgBouncer y
+  la aplicación no retiene conexiones de cliente ociosas ni las recicla.
+- Sin sentencias preparadas en el servidor. psycopg2 (el driver actual)
+  interpola los parámetros en el cliente y no prepara nada; con psycopg 3 se
+  desactivan (`prepare_threshold=None`).
+- Sin parámetros de arranque: una URL con `?options=-c ...` se rechaza al
+  arrancar (PgBouncer no los propaga a las conexiones de servidor).
+- Sin estado de sesión en tiempo de ejecución: `init_db_pool` registra un
+  hook que rechaza (`SessionStateNotAllowed`) `SET` sin `LOCAL`, `RESET`,
+  `LISTEN`, `PREPARE` y los advisory locks de sesión antes de enviarlos.
+  `SET LOCAL`, `SET TRANSACTION` y `pg_advisory_xact_lock` sí valen.
+
+Lo que ya hace la aplicación es compatible: los cursores de servidor de
+`yield_per` (feeds iCal, índice de skills) viven dentro de la transacción.
+"""
+import re
+
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import NullPool
+
+from app.event_registry import listen_once
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_TIMEOUT = 10
+DEFAULT_POOL_RECYCLE = 1800
+
+# Sentencias que dejan estado en la conexión de servidor
+_SESSION_STATE = re.compile(
+    r'^\s*(?:SET\s+(?!LOCAL\b|TRANSACTION\b)|RESET\b|LISTEN\b|UNLISTEN\b|PREPARE\b|DEALLOCATE\b)'
+    r'|pg_(?:try_)?advisory_lock(?:_shared)?\s*\(',
+    re.IGNORECASE,
+)
+
+
+class SessionStateNotAllowed(RuntimeError):
+    """Sentencia con estado de sesión bajo PgBouncer en modo transacción."""
+
+
+def pool_capacity(config):
+    """Conexiones máximas por proceso (`pool_size + max_overflow`), o None sin pool propio."""
+    options = config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    if options.get('poolclass') is NullPool:
+        return None
+    return (
+        options.get('pool_size', config.get('DB_POOL_SIZE', DEFAULT_POOL_SIZE))
+        + max(options.get('max_overflow', config.get('DB_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW)), 0)
+    )
+
+
+def engine_options(config):
+    if not config.get('DB_PGBOUNCER'):
+        return {
+            'pool_size': config.get('DB_POOL_SIZE', DEFAULT_POOL_SIZE),
+            'max_overflow': config.get('DB_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW),
+            'pool_timeout': config.get('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT),
+            'pool_recycle': config.get('DB_POOL_RECYCLE', DEFAULT_POOL_RECYCLE),
+            'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+        }
+
+    options = {'poolclass': NullPool}
+    uri = config.get('SQLALCHEMY_DATABASE_URI')
+    if uri:
+        url = make_url(uri)
+        if 'options' in url.query:
+            raise ValueError('DB_PGBOUNCER: PgBouncer no propaga los parámetros de arranque (?options=)')
+        if url.get_driver_name() == 'psycopg':
+            options['connect_args'] = {'prepare_threshold': None}
+    return options
+
+
+def _reject_session_state(conn, cursor, statement, parameters, context, executemany):
+    if _SESSION_STATE.search(statement):
+        raise SessionStateNotAllowed(
+            f"DB_PGBOUNCER: sentencia con estado de sesión: {statement[:80]!r}"
+        )
+
+
+def init_db_pool(app):
+    """En modo PgBouncer, rechazar las sentencias con estado de sesión (todos los engines)."""
+    if app.config.get('DB_PGBOUNCER'):
+        listen_once(Engine, 'before_cursor_execute', _reject_session_state)
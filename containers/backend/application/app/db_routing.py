@@ -0,0 +1,99 @@
+"""
+Enrutado de lecturas a réplicas de PostgreSQL
+
+Las réplicas se configuran con `DATABASE_REPLICA_URLS` (separadas por
+comas); cada una es un bind `replica_N` de Flask-SQLAlchemy sin modelos
+propios, así que hereda `SQLALCHEMY_ENGINE_OPTIONS` y el pool de siempre.
+
+`RoutingSession` (la clase de `db.session`) manda una consulta a una
+réplica al azar solo si:
+
+- la vista lleva `@read_replica` (listados GET públicos),
+- no es una escritura (flush, INSERT/UPDATE/DELETE explícitos),
+- en esta petición no se ha escrito ya nada, y
+- el usuario no ha escrito en los últimos `REPLICA_STICKY_SECONDS`
+  segundos (read-your-writes: la réplica puede ir unos instantes por
+  detrás; la marca viaja en la cookie de sesión y vale para todos los
+  workers).
+
+En cualquier otro caso, o sin réplicas configuradas, se usa el primario.
+Las vistas con caché compartida no la rellenan con lo leído de una réplica
+(`reading_from_replica`): tras invalidarla, una réplica atrasada volvería a
+guardar el valor antiguo para todos.
+"""
+import random
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Delete, Insert, Update, event
+
+REPLICA_PREFIX = 'replica_'
+LAST_WRITE_KEY = '_db_last_write'
+
+
+def _replica_keys(engines):
+    return [key for key in engines if isinstance(key, str) and key.startswith(REPLICA_PREFIX)]
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None:
+            return bind
+
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info['db_wrote'] = True
+        elif not self.info.get('db_wrote') and has_request_context() and g.get('db_replica'):
+            engines = self._db.engines
+            replicas = _replica_keys(engines)
+            if replicas:
+                return engines[random.choice(replicas)]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def reading_from_replica():
+    """True si las lecturas de este punto de la petición van a una réplica.
+
+    Lo que se lea puede ir por detrás del primario: no debe guardarse en
+    cachés compartidas (las leería todo el mundo, no solo este usuario).
+    """
+    if not has_request_context() or not g.get('db_replica'):
+        return False
+    from app import db
+    return not db.session.info.get('db_wrote') and bool(_replica_keys(db.engines))
+
+
+def _recently_wrote():
+    last_write = flask_session.get(LAST_WRITE_KEY)
+    return last_write is not None and time.time() - last_write < current_app.config.get('REPLICA_STICKY_SECONDS', 5)
+
+
+def read_replica(view):
+    """Servir la vista (solo lecturas) desde una réplica si es posible."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_replica = not _recently_wrote()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.db_replica = False
+
+    return wrapper
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _remember_write(session):
+    if not session.info.pop('db_wrote', False) or not has_request_context():
+        return
+    # El resto de la petición ya no lee de réplicas
+    g.db_replica = False
+    # `_user_id` de Flask-Login: sin consultas (aquí ya no se puede emitir SQL)
+    if current_app.config.get('DATABASE_REPLICA_URLS') and flask_session.get('_user_id'):
+        flask_session[LAST_WRITE_KEY] = time.time()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_write(session):
+    session.info.pop('db_wrote', None)
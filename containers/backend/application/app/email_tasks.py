@@ -2,12 +2,14 @@
 Tareas de Celery para envío de emails y notificaciones periódicas
 """
 from app import create_app, db
-from app.models import User, Notification, Message, Conversation, Event, EventRSVP, ProfileView
+from app.models import User, Notification, Message, Conversation, Event, EventRSVP, ProfileView, Project
 from app.email_service import (
     send_new_users_in_city_email,
     send_event_reminder_email,
-    send_weekly_digest_email
+    send_weekly_digest_emails,
+    send_rendered_batch
 )
+from app.email_templates import email_templates
 from datetime import datetime, timedelta
 from sqlalchemy import and_, func, or_
 import logging
@@ -18,6 +20,9 @@ logger = logging.getLogger(__name__)
 app = create_app()
 celery = app.celery
 
+# Compilar las plantillas de email una sola vez al arrancar el worker
+email_templates.load_all()
+
 
 @celery.task(name='email_tasks.send_new_users_alerts')
 def send_new_users_alerts():
@@ -138,6 +143,7 @@ def send_weekly_digests():
             ).all()
 
             week_ago = datetime.utcnow() - timedelta(days=7)
+            digests = []
 
             for user in users:
                 # Mensajes no leídos recibidos en la semana
@@ -193,13 +199,15 @@ def send_weekly_digests():
                 }
 
                 if any(stats.values()):
-                    send_weekly_digest_email(
-                        user_email=user.email,
-                        user_name=f"{user.first_name} {user.last_name}",
-                        stats=stats
-                    )
+                    digests.append({
+                        'user_email': user.email,
+                        'user_name': f"{user.first_name} {user.last_name}",
+                        'stats': stats
+                    })
 
-                    logger.info(f'Digest semanal enviado a {user.email}')
+            # Renderizado en lote con la plantilla ya compilada
+            sent = send_weekly_digest_emails(digests)
+            logger.info(f'Digests semanales enviados: {sent}/{len(digests)}')
 
             return 'Digests semanales enviados'
 
@@ -226,3 +234,62 @@ beat_schedule = {
     },
 }
 """
+
+
+@celery.task(name='email_tasks.send_invitation_emails')
+def send_invitation_emails(kind, target_id, inviter_id, user_ids):
+    """
+    Emails de una invitación en lote (ver app.invitations): una query para
+    los destinatarios y una sola compilación de la plantilla
+
+    Args:
+        kind: 'event' o 'project'
+        target_id: ID del evento o proyecto
+        inviter_id: ID de quien invita
+        user_ids: Invitados
+    """
+    with app.app_context():
+        try:
+            model = Event if kind == 'event' else Project
+            target = db.session.get(model, target_id)
+            inviter = db.session.get(User, inviter_id)
+            if target is None or target.deletedAt is not None or inviter is None:
+                return 'Invitación sin destino'
+
+            recipients = [
+                {'user_email': user.email, 'user_name': f"{user.first_name} {user.last_name}"}
+                for user in User.query.filter(
+                    User.id.in_(user_ids),
+                    User.deletedAt.is_(None),
+                    User.email_notifications == True
+                )
+            ]
+            if not recipients:
+                return 'Sin destinatarios'
+
+            frontend_url = app.config.get('FRONTEND_BASE_URL', 'https://localtalent.es')
+            inviter_name = f"{inviter.first_name} {inviter.last_name}"
+            if kind == 'event':
+                sent = send_rendered_batch(
+                    'event_invitation',
+                    recipients,
+                    event_title=target.title,
+                    inviter_name=inviter_name,
+                    event_date=target.start_date.strftime('%d/%m/%Y %H:%M') if target.start_date else '',
+                    event_url=f"{frontend_url}/events/{target.id}"
+                )
+            else:
+                sent = send_rendered_batch(
+                    'project_invitation',
+                    recipients,
+                    project_title=target.title,
+                    inviter_name=inviter_name,
+                    project_description=target.description or '',
+                    project_url=f"{frontend_url}/projects/{target.id}"
+                )
+
+            return f'{sent} emails de invitación enviados'
+
+        except Exception as e:
+            logger.error(f'Error en send_invitation_emails: {str(e)}')
+            return f'Error: {str(e)}'
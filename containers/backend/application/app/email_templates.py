@@ -0,0 +1,122 @@
+"""
+Registro de plantillas de email precompiladas para LocalTalent.
+
+Las plantillas de `email_service` viven en `templates/email/notifications/`
+(una `<tipo>.html` que extiende `base.html` y una `<tipo>.txt`) y el asunto
+de cada tipo se declara en `EMAIL_SUBJECTS`. Cada tipo se compila una sola
+vez por proceso y se guarda como `jinja2.Template`; renderizar sólo evalúa
+el contexto, sin volver a parsear el fuente (antes se hacía en cada envío
+con `render_template_string`).
+
+El entorno Jinja es independiente del de Flask para poder usarse en el
+worker de Celery sin contexto de request y con `auto_reload=False`.
+"""
+import os
+import threading
+from dataclasses import dataclass
+from typing import Iterable
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+TEMPLATES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'templates', 'email', 'notifications'
+)
+
+# Asunto por tipo de email (plantilla inline). El cuerpo se resuelve como
+# `<tipo>.html` y `<tipo>.txt` dentro de TEMPLATES_DIR.
+EMAIL_SUBJECTS = {
+    'profile_viewed': '{{ viewer_name }} ha visto tu perfil en LocalTalent',
+    'new_users_in_city': 'Nuevos talentos en {{ city }} - LocalTalent',
+    'new_message': 'Nuevo mensaje de {{ sender_name }} - LocalTalent',
+    'event_invitation': 'Invitación a {{ event_title }} - LocalTalent',
+    'project_invitation': 'Invitación al proyecto {{ project_title }} - LocalTalent',
+    'new_review': '{{ reviewer_name }} te ha valorado con {{ rating }} estrellas - LocalTalent',
+    'event_reminder': 'Recordatorio: {{ event_title }} - LocalTalent',
+    'weekly_digest': 'Tu resumen semanal en LocalTalent',
+}
+
+
+@dataclass(frozen=True)
+class RenderedEmail:
+    """Resultado de renderizar un tipo de email."""
+    subject: str
+    html_body: str
+    text_body: str
+
+
+class EmailTemplateRegistry:
+    """Caché de plantillas compiladas por tipo de email.
+
+    `get()` compila perezosamente (con lock, por si hay varios greenlets o
+    threads renderizando a la vez) y `load_all()` permite precalentar todas
+    al arrancar el worker.
+    """
+
+    def __init__(self, templates_dir: str = TEMPLATES_DIR, subjects: dict | None = None):
+        self._env = Environment(
+            loader=FileSystemLoader(templates_dir),
+            # Sólo el HTML se escapa; asunto y texto plano van tal cual.
+            autoescape=select_autoescape(enabled_extensions=('html',), default_for_string=False),
+            auto_reload=False,
+        )
+        self._subjects = dict(EMAIL_SUBJECTS if subjects is None else subjects)
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    @property
+    def email_types(self) -> list[str]:
+        return list(self._subjects)
+
+    def _compile(self, email_type: str):
+        if email_type not in self._subjects:
+            raise ValueError(f"Tipo de email desconocido: {email_type}")
+        return (
+            self._env.from_string(self._subjects[email_type]),
+            self._env.get_template(f'{email_type}.html'),
+            self._env.get_template(f'{email_type}.txt'),
+        )
+
+    def get(self, email_type: str):
+        """Devuelve la tupla `(subject, html, text)` de Templates compilados."""
+        compiled = self._compiled.get(email_type)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(email_type)
+                if compiled is None:
+                    compiled = self._compile(email_type)
+                    self._compiled[email_type] = compiled
+        return compiled
+
+    def load_all(self):
+        """Compila todos los tipos registrados (útil al arrancar un worker)."""
+        for email_type in self._subjects:
+            self.get(email_type)
+
+    def render(self, email_type: str, **context) -> RenderedEmail:
+        """Renderiza un email del tipo dado con su contexto."""
+        subject, html, text = self.get(email_type)
+        return RenderedEmail(
+            subject=subject.render(context).strip(),
+            html_body=html.render(context),
+            text_body=text.render(context).strip(),
+        )
+
+    def render_batch(self, email_type: str, contexts: Iterable[dict], **shared) -> list[RenderedEmail]:
+        """Renderiza el mismo tipo para muchos destinatarios (p.ej. digests).
+
+        `shared` se combina con cada contexto (el contexto individual gana),
+        así los valores comunes como `frontend_url` se pasan una sola vez.
+        """
+        subject, html, text = self.get(email_type)
+        rendered = []
+        for context in contexts:
+            merged = {**shared, **context}
+            rendered.append(RenderedEmail(
+                subject=subject.render(merged).strip(),
+                html_body=html.render(merged),
+                text_body=text.render(merged).strip(),
+            ))
+        return rendered
+
+
+email_templates = EmailTemplateRegistry()
@@ -0,0 +1,38 @@
+"""
+Registro idempotente de listeners de SQLAlchemy
+
+`event.listen` no comprueba duplicados: registrar dos veces la misma función
+(o, peor, una lambda nueva en cada llamada) hace que se ejecute dos veces
+por cada INSERT/UPDATE. `setup_base()`/`setup_audit()` se llaman tanto al
+importar `app.models` como desde `httpApp.py`, así que todos los listeners
+de modelos se registran con `listen_once`: la segunda llamada no hace nada.
+
+Las funciones registradas deben ser de módulo (nunca lambdas creadas en la
+llamada), porque la identidad de la función es lo que evita el duplicado.
+"""
+from sqlalchemy import event
+
+# (target, identifier, fn) en orden de registro
+_registered = []
+
+
+def listen_once(target, identifier, fn, **kw):
+    """
+    `event.listen` que no registra dos veces el mismo (target, evento, fn)
+
+    Returns:
+        bool: True si se ha registrado ahora, False si ya lo estaba
+    """
+    if event.contains(target, identifier, fn):
+        return False
+    event.listen(target, identifier, fn, **kw)
+    _registered.append((target, identifier, fn))
+    return True
+
+
+def registered_listeners(identifier=None):
+    """Listeners registrados con `listen_once` (opcionalmente de un evento)."""
+    return [
+        entry for entry in _registered
+        if identifier is None or entry[1] == identifier
+    ]
@@ -0,0 +1,167 @@
+"""Contabilidad atómica de plazas confirmadas por evento.
+
+`Event.confirmed_count` es un contador desnormalizado de RSVPs con estado
+`confirmed`. Se actualiza siempre con un UPDATE condicional en la base de
+datos (nunca leyendo el valor y escribiéndolo desde Python), de modo que dos
+confirmaciones simultáneas no pueden sobrepasar `max_attendees`: la fila del
+evento queda bloqueada por el UPDATE hasta el commit y la segunda petición
+reevalúa la condición con el valor ya incrementado.
+
+Las sesiones de un evento recurrente llevan su propio contador
+(`EventOccurrence.confirmed_count`) con el mismo esquema y el cupo
+`max_attendees` de la serie.
+
+Las funciones no hacen commit: van en la misma transacción que el RSVP, así
+un rollback deshace también el movimiento del contador. Tampoco tocan
+`updatedAt`: un RSVP no es una modificación del evento.
+"""
+from sqlalchemy import update, func, select
+
+from app import db
+from app.models import Event, EventOccurrence, EventRSVP
+
+
+def reserve_seat(event_id):
+    """Ocupa una plaza si queda alguna.
+
+    Returns:
+        int | None: Nuevo `confirmed_count`, o None si el evento está lleno
+        (o no existe).
+    """
+    stmt = (
+        update(Event)
+        .where(
+            Event.id == event_id,
+            Event.deletedAt.is_(None),
+            (Event.max_attendees.is_(None)) | (Event.confirmed_count < Event.max_attendees),
+        )
+        .values(confirmed_count=Event.confirmed_count + 1, updatedAt=Event.updatedAt)
+        .returning(Event.confirmed_count)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).scalar_one_or_none()
+
+
+def release_seat(event_id):
+    """Libera una plaza (nunca baja de 0).
+
+    Returns:
+        int | None: Nuevo `confirmed_count`, o None si el evento no existe.
+    """
+    stmt = (
+        update(Event)
+        .where(Event.id == event_id)
+        .values(confirmed_count=func.greatest(Event.confirmed_count - 1, 0), updatedAt=Event.updatedAt)
+        .returning(Event.confirmed_count)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).scalar_one_or_none()
+
+
+def reserve_occurrence_seat(occurrence_id):
+    """Ocupa una plaza en una sesión si queda alguna (cupo de la serie).
+
+    Returns:
+        int | None: Nuevo `confirmed_count` de la sesión, o None si está llena.
+    """
+    stmt = (
+        update(EventOccurrence)
+        .where(
+            EventOccurrence.id == occurrence_id,
+            EventOccurrence.is_cancelled.is_(False),
+            Event.id == EventOccurrence.event_id,
+            Event.deletedAt.is_(None),
+            (Event.max_attendees.is_(None)) | (EventOccurrence.confirmed_count < Event.max_attendees),
+        )
+        .values(confirmed_count=EventOccurrence.confirmed_count + 1, updatedAt=EventOccurrence.updatedAt)
+        .returning(EventOccurrence.confirmed_count)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).scalar_one_or_none()
+
+
+def release_occurrence_seat(occurrence_id):
+    """Libera una plaza de una sesión (nunca baja de 0)."""
+    stmt = (
+        update(EventOccurrence)
+        .where(EventOccurrence.id == occurrence_id)
+        .values(
+            confirmed_count=func.greatest(EventOccurrence.confirmed_count - 1, 0),
+            updatedAt=EventOccurrence.updatedAt
+        )
+        .returning(EventOccurrence.confirmed_count)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).scalar_one_or_none()
+
+
+def apply_status_change(event_id, old_status, new_status, occurrence_id=None):
+    """Ajusta el contador para una transición de estado de un RSVP.
+
+    `old_status` es None si el RSVP no existía (o estaba cancelado). Con
+    `occurrence_id` se mueve el contador de esa sesión, no el del evento.
+
+    Returns:
+        bool: False si la transición a `confirmed` no cabe en el evento.
+    """
+    was_confirmed = old_status == 'confirmed'
+    is_confirmed = new_status == 'confirmed'
+
+    if occurrence_id is not None:
+        reserve, release, key = reserve_occurrence_seat, release_occurrence_seat, occurrence_id
+    else:
+        reserve, release, key = reserve_seat, release_seat, event_id
+
+    if is_confirmed and not was_confirmed:
+        return reserve(key) is not None
+    if was_confirmed and not is_confirmed:
+        release(key)
+    return True
+
+
+def recount_confirmed(event_ids=None):
+    """Recalcula `confirmed_count` (eventos y sesiones) a partir de `event_rsvp` (reparación).
+
+    Args:
+        event_ids: Eventos a recalcular; None para todos.
+
+    Returns:
+        int: Número de eventos actualizados
+    """
+    confirmed = (
+        select(func.count(EventRSVP.id))
+        .where(
+            EventRSVP.event_id == Event.id,
+            EventRSVP.occurrence_id.is_(None),
+            EventRSVP.status == 'confirmed',
+            EventRSVP.deletedAt.is_(None),
+        )
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Event)
+        .values(confirmed_count=confirmed, updatedAt=Event.updatedAt)
+        .execution_options(synchronize_session=False)
+    )
+    if event_ids is not None:
+        stmt = stmt.where(Event.id.in_(list(event_ids)))
+    updated = db.session.execute(stmt).rowcount
+
+    confirmed_in_occurrence = (
+        select(func.count(EventRSVP.id))
+        .where(
+            EventRSVP.occurrence_id == EventOccurrence.id,
+            EventRSVP.status == 'confirmed',
+            EventRSVP.deletedAt.is_(None),
+        )
+        .scalar_subquery()
+    )
+    stmt = (
+        update(EventOccurrence)
+        .values(confirmed_count=confirmed_in_occurrence, updatedAt=EventOccurrence.updatedAt)
+        .execution_options(synchronize_session=False)
+    )
+    if event_ids is not None:
+        stmt = stmt.where(EventOccurrence.event_id.in_(list(event_ids)))
+    db.session.execute(stmt)
+    return updated
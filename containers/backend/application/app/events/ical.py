@@ -0,0 +1,260 @@
+"""Feeds iCalendar (RFC 5545) de eventos.
+
+Los clientes de calendario (Google Calendar, Apple Calendar, Thunderbird...)
+sondean las suscripciones cada pocos minutos, así que cada feed tiene un
+camino condicional barato: `feed_validators` resume el feed con UNA query
+agregada (número de filas y `max(updatedAt)`) de la que salen el ETag y el
+`Last-Modified`. Si el cliente ya tiene esa versión se responde 304 sin
+cargar ningún evento. Solo cuando cambia algo se genera el `.ics`, línea a
+línea con un generador y con la query en modo `yield_per`, sin construir el
+documento entero en memoria.
+
+Los validadores incluyen filas borradas (soft delete): borrar un evento o
+cancelar un RSVP actualiza `updatedAt` y debe invalidar el feed. Los
+contadores de plazas (`confirmed_count`) no tocan `updatedAt` ni aparecen en
+el feed.
+
+Eventos recurrentes: en el feed de una ciudad la serie es un único VEVENT con
+su `RRULE` y cada sesión modificada o cancelada un VEVENT con el mismo UID y
+`RECURRENCE-ID`. En el feed personal cada RSVP a una sesión es un VEVENT
+independiente con las fechas de esa sesión.
+"""
+import hashlib
+from datetime import timezone
+from itertools import chain
+
+from sqlalchemy import func, select, or_
+
+from app import db
+from app.models import Event, EventOccurrence, EventRSVP
+from app.events.recurrence import Occurrence
+
+# Subir al cambiar el formato del feed para invalidar las copias de los clientes
+ICAL_FEED_VERSION = 2
+ICAL_YIELD_PER = 200
+
+_PRODID = '-//LocalTalent//Eventos//ES'
+
+
+def _last_modified_expr(*models):
+    return func.max(func.greatest(*[func.coalesce(m.updatedAt, m.createdAt) for m in models]))
+
+
+def feed_validators(scope, stmt):
+    """ETag fuerte y Last-Modified de un feed.
+
+    Args:
+        scope: Identifica el feed (p.ej. `user:12`); entra en el ETag.
+        stmt: SELECT de `(count, max_updated_at)` sobre las filas del feed.
+
+    Returns:
+        tuple: (etag sin comillas, last_modified en UTC o None)
+    """
+    count, last_modified = db.session.execute(
+        stmt.execution_options(include_soft_deleted=True)
+    ).one()
+    # El ETag usa la marca completa (dos ediciones en el mismo segundo dan
+    # ETags distintos); Last-Modified es una fecha HTTP, con segundos
+    raw = f"{ICAL_FEED_VERSION}|{scope}|{count}|{last_modified.isoformat() if last_modified else '-'}"
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+    return hashlib.sha256(raw.encode()).hexdigest()[:32], last_modified
+
+
+def user_feed_validators(user_id):
+    # greatest() ignora los NULL de las filas sin sesión
+    stmt = (
+        select(func.count(EventRSVP.id), _last_modified_expr(EventRSVP, Event, EventOccurrence))
+        .join(Event, Event.id == EventRSVP.event_id)
+        .outerjoin(EventOccurrence, EventOccurrence.id == EventRSVP.occurrence_id)
+        .where(EventRSVP.user_id == user_id)
+    )
+    return feed_validators(f'user:{user_id}', stmt)
+
+
+def _city_filter(city, since):
+    """Eventos públicos de la ciudad desde `since`, o series que siguen vivas."""
+    return (
+        func.lower(Event.city) == city.lower(),
+        Event.is_public.is_(True),
+        or_(
+            Event.start_date >= since,
+            Event.recurrence_rule.isnot(None) & (Event.recurrence_end.is_(None) | (Event.recurrence_end >= since)),
+        ),
+    )
+
+
+def city_feed_validators(city, since):
+    stmt = (
+        select(func.count(Event.id), _last_modified_expr(Event, EventOccurrence))
+        .outerjoin(EventOccurrence, EventOccurrence.event_id == Event.id)
+        .where(*_city_filter(city, since))
+    )
+    return feed_validators(f'city:{city.lower()}:{since.date().isoformat()}', stmt)
+
+
+def user_feed_rows(user_id):
+    """Eventos (o sesiones) confirmados o pendientes del usuario."""
+    rows = (
+        db.session.query(Event, EventRSVP.status, EventOccurrence)
+        .join(EventRSVP, EventRSVP.event_id == Event.id)
+        .outerjoin(EventOccurrence, EventOccurrence.id == EventRSVP.occurrence_id)
+        .filter(
+            EventRSVP.user_id == user_id,
+            EventRSVP.status.in_(['confirmed', 'pending']),
+            EventRSVP.deletedAt.is_(None),
+            Event.deletedAt.is_(None),
+        )
+        .order_by(Event.start_date, EventOccurrence.occurrence_start)
+        .yield_per(ICAL_YIELD_PER)
+    )
+    return (
+        (Occurrence(event, row.occurrence_start, row) if row is not None else event, status, False)
+        for event, status, row in rows
+    )
+
+
+def city_feed_rows(city, since):
+    """Eventos de la ciudad y, al final, las sesiones modificadas de sus series."""
+    events = (
+        db.session.query(Event)
+        .filter(*_city_filter(city, since), Event.deletedAt.is_(None))
+        .order_by(Event.start_date)
+        .yield_per(ICAL_YIELD_PER)
+    )
+    exceptions = (
+        db.session.query(Event, EventOccurrence)
+        .join(EventOccurrence, EventOccurrence.event_id == Event.id)
+        .filter(
+            *_city_filter(city, since),
+            Event.deletedAt.is_(None),
+            Event.recurrence_rule.isnot(None),
+            EventOccurrence.occurrence_start >= since,
+            or_(
+                EventOccurrence.is_cancelled.is_(True),
+                EventOccurrence.title.isnot(None),
+                EventOccurrence.description.isnot(None),
+                EventOccurrence.start_date.isnot(None),
+                EventOccurrence.end_date.isnot(None),
+            ),
+        )
+        .order_by(EventOccurrence.occurrence_start)
+        .yield_per(ICAL_YIELD_PER)
+    )
+    return chain(
+        ((event, 'confirmed', False) for event in events),
+        ((Occurrence(event, row.occurrence_start, row), 'confirmed', True) for event, row in exceptions),
+    )
+
+
+def _escape(value):
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Pliega una línea de contenido a 75 octetos (RFC 5545, 3.1)."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+
+    parts = []
+    current = ''
+    size = 0
+    limit = 75
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > limit:
+            parts.append(current)
+            current = ''
+            size = 0
+            limit = 74  # las líneas de continuación empiezan por un espacio
+        current += char
+        size += char_size
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _format_dt(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+
+def _vevent_lines(item, status, is_exception, frontend_url, uid_domain):
+    """Líneas de un VEVENT.
+
+    `item` es un `Event` o una `Occurrence` (sesión de una serie): como
+    excepción de la serie (`RECURRENCE-ID`, mismo UID) o, si no, como evento
+    independiente con UID propio.
+    """
+    occurrence = item if isinstance(item, Occurrence) else None
+    event = occurrence.event if occurrence else item
+    url = f'{frontend_url}/events/{event.id}'
+    source = occurrence.row if occurrence and occurrence.row is not None else event
+    stamp = source.updatedAt or source.createdAt or event.start_date
+
+    uid = f'event-{event.id}'
+    if occurrence and not is_exception:
+        uid += f'-{_format_dt(occurrence.occurrence_start)}'
+
+    yield 'BEGIN:VEVENT'
+    yield f'UID:{uid}@{uid_domain}'
+    if occurrence and is_exception:
+        yield f'RECURRENCE-ID:{_format_dt(occurrence.occurrence_start)}'
+    yield f'DTSTAMP:{_format_dt(stamp)}'
+    yield f'LAST-MODIFIED:{_format_dt(stamp)}'
+    yield f'DTSTART:{_format_dt(item.start_date)}'
+    if item.end_date:
+        yield f'DTEND:{_format_dt(item.end_date)}'
+    if occurrence is None and event.recurrence_rule:
+        yield f'RRULE:{event.recurrence_rule}'
+    yield f'SUMMARY:{_escape(item.title)}'
+    if item.description:
+        yield f'DESCRIPTION:{_escape(item.description)}'
+    if event.is_online:
+        if event.meeting_url:
+            yield f'LOCATION:{_escape(event.meeting_url)}'
+    else:
+        location = ', '.join(p for p in (event.address, event.city, event.country) if p)
+        if location:
+            yield f'LOCATION:{_escape(location)}'
+        if event.latitude is not None and event.longitude is not None:
+            yield f'GEO:{event.latitude};{event.longitude}'
+    if event.category:
+        yield f'CATEGORIES:{_escape(event.category)}'
+    if occurrence and occurrence.is_cancelled:
+        yield 'STATUS:CANCELLED'
+    else:
+        yield f'STATUS:{"CONFIRMED" if status == "confirmed" else "TENTATIVE"}'
+    yield f'URL:{url}'
+    yield 'END:VEVENT'
+
+
+def generate_calendar(rows, name, frontend_url, uid_domain):
+    """Genera el documento `.ics` trozo a trozo.
+
+    Args:
+        rows: Iterable de `(Event u Occurrence, estado_rsvp, es_excepción)`.
+        name: Nombre del calendario (X-WR-CALNAME).
+    """
+    header = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{_PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(name)}',
+    ]
+    yield ''.join(_fold(line) for line in header)
+
+    for item, status, is_exception in rows:
+        yield ''.join(_fold(line) for line in _vevent_lines(item, status, is_exception, frontend_url, uid_domain))
+
+    yield _fold('END:VCALENDAR')
@@ -0,0 +1,390 @@
+"""Eventos recurrentes: subconjunto de RRULE (RFC 5545) y expansión perezosa.
+
+Una serie semanal es UNA fila de `event` con `recurrence_rule`; sus sesiones
+no se materializan. Los listados piden una ventana `[desde, hasta)` y
+`expand_series` genera solo las sesiones que caen dentro, saltando
+directamente al primer periodo de la ventana (aritmética de fechas, sin
+recorrer la serie desde el principio salvo con COUNT, que está acotado).
+
+`event_occurrence` solo tiene filas para las sesiones con cambios (otra
+fecha, otro título, cancelada) o con RSVPs, y se consultan de una vez para
+todas las series de la ventana. Si la regla cambia, las filas de sesiones que
+ya no genera se cancelan (`cancel_orphaned_occurrences`) y la expansión no
+las vuelve a mostrar como sesiones activas.
+
+Regla soportada (claves separadas por `;`):
+
+    FREQ=DAILY|WEEKLY|MONTHLY   obligatoria
+    INTERVAL=n                  por defecto 1
+    BYDAY=MO,WE,...             solo con WEEKLY (por defecto, el día de inicio)
+    COUNT=n | UNTIL=AAAAMMDD[THHMMSSZ]   opcionales y excluyentes
+
+MONTHLY repite el día del mes del inicio y, como en RFC 5545, salta los
+meses que no lo tienen (el 31 solo cae en meses de 31 días).
+
+Las fechas se tratan como UTC naive, igual que `Event.start_date`.
+"""
+import calendar
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import db
+from app.models import EventOccurrence
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+MAX_COUNT = 1000
+MAX_INTERVAL = 365
+
+
+def naive_utc(value):
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse_until(value):
+    try:
+        if 'T' in value:
+            return datetime.strptime(value.rstrip('Z'), '%Y%m%dT%H%M%S')
+        # Solo fecha: incluye las sesiones de ese día
+        return datetime.strptime(value, '%Y%m%d').replace(hour=23, minute=59, second=59)
+    except ValueError:
+        raise ValueError('UNTIL inválido (AAAAMMDD o AAAAMMDDTHHMMSSZ)')
+
+
+class RecurrenceRule:
+    """Regla ya validada. Usar `parse_rule` para construirla."""
+
+    __slots__ = ('freq', 'interval', 'byday', 'count', 'until')
+
+    def __init__(self, freq, interval=1, byday=(), count=None, until=None):
+        self.freq = freq
+        self.interval = interval
+        self.byday = tuple(sorted(set(byday)))
+        self.count = count
+        self.until = until
+
+    def to_string(self):
+        """Forma canónica (la que se guarda en `Event.recurrence_rule`)."""
+        parts = [f'FREQ={self.freq}']
+        if self.interval != 1:
+            parts.append(f'INTERVAL={self.interval}')
+        if self.byday:
+            parts.append('BYDAY=' + ','.join(WEEKDAYS[d] for d in self.byday))
+        if self.count is not None:
+            parts.append(f'COUNT={self.count}')
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%dT%H%M%SZ')}")
+        return ';'.join(parts)
+
+
+def parse_rule(text):
+    """Valida una regla RRULE del subconjunto soportado.
+
+    Raises:
+        ValueError: Regla mal formada o fuera del subconjunto.
+    """
+    text = (text or '').strip()
+    if text.upper().startswith('RRULE:'):
+        text = text[6:]
+    if not text:
+        raise ValueError('Regla de recurrencia vacía')
+
+    fields = {}
+    for part in text.split(';'):
+        if not part:
+            continue
+        key, sep, value = part.partition('=')
+        key = key.strip().upper()
+        if not sep or not value.strip():
+            raise ValueError(f'Parte de la regla mal formada: {part}')
+        if key in fields:
+            raise ValueError(f'{key} repetido')
+        fields[key] = value.strip().upper()
+
+    unknown = set(fields) - {'FREQ', 'INTERVAL', 'BYDAY', 'COUNT', 'UNTIL'}
+    if unknown:
+        raise ValueError(f"No soportado en la regla: {', '.join(sorted(unknown))}")
+
+    freq = fields.get('FREQ')
+    if freq not in FREQUENCIES:
+        raise ValueError(f'FREQ debe ser uno de {list(FREQUENCIES)}')
+
+    try:
+        interval = int(fields.get('INTERVAL', 1))
+        count = int(fields['COUNT']) if 'COUNT' in fields else None
+    except ValueError:
+        raise ValueError('INTERVAL y COUNT deben ser enteros')
+    if not 1 <= interval <= MAX_INTERVAL:
+        raise ValueError(f'INTERVAL debe estar entre 1 y {MAX_INTERVAL}')
+    if count is not None and not 1 <= count <= MAX_COUNT:
+        raise ValueError(f'COUNT debe estar entre 1 y {MAX_COUNT}')
+
+    until = _parse_until(fields['UNTIL']) if 'UNTIL' in fields else None
+    if count is not None and until is not None:
+        raise ValueError('COUNT y UNTIL son excluyentes')
+
+    byday = ()
+    if 'BYDAY' in fields:
+        if freq != 'WEEKLY':
+            raise ValueError('BYDAY solo se admite con FREQ=WEEKLY')
+        days = [d.strip() for d in fields['BYDAY'].split(',')]
+        if any(d not in WEEKDAYS for d in days):
+            raise ValueError(f'BYDAY debe usar {list(WEEKDAYS)}')
+        byday = [WEEKDAYS.index(d) for d in days]
+
+    return RecurrenceRule(freq, interval, byday, count, until)
+
+
+def normalize_rule(text):
+    """Regla canónica, o None si `text` está vacío."""
+    if text is None or not text.strip():
+        return None
+    return parse_rule(text).to_string()
+
+
+def _add_months(value, months):
+    """Mismo día y hora `months` meses después, o None si ese mes no tiene ese día."""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    if value.day > calendar.monthrange(year, month)[1]:
+        return None
+    return value.replace(year=year, month=month)
+
+
+def _periods(dtstart, rule, first_period):
+    """Sesiones candidatas (ordenadas) desde el periodo `first_period`."""
+    period = first_period
+    if rule.freq == 'DAILY':
+        while True:
+            yield dtstart + timedelta(days=period * rule.interval)
+            period += 1
+    elif rule.freq == 'WEEKLY':
+        byday = rule.byday or (dtstart.weekday(),)
+        week_start = dtstart - timedelta(days=dtstart.weekday())
+        while True:
+            base = week_start + timedelta(weeks=period * rule.interval)
+            for weekday in byday:
+                candidate = base + timedelta(days=weekday)
+                if candidate >= dtstart:
+                    yield candidate
+            period += 1
+    else:
+        # Un mes sin ese día no corta la serie: se salta
+        while True:
+            candidate = _add_months(dtstart, period * rule.interval)
+            if candidate is not None:
+                yield candidate
+            period += 1
+
+
+def _first_period(dtstart, rule, window_start):
+    """Primer periodo que puede tener sesiones >= window_start (sin recorrer los anteriores)."""
+    if window_start is None or window_start <= dtstart or rule.count is not None:
+        # Con COUNT hay que contar desde el principio (acotado por MAX_COUNT)
+        return 0
+    if rule.freq == 'DAILY':
+        return max((window_start - dtstart).days // rule.interval - 1, 0)
+    if rule.freq == 'WEEKLY':
+        return max((window_start - dtstart).days // (7 * rule.interval) - 1, 0)
+    months = (window_start.year - dtstart.year) * 12 + window_start.month - dtstart.month
+    return max(months // rule.interval - 1, 0)
+
+
+def iter_occurrences(dtstart, rule, window_start=None, window_end=None, limit=None):
+    """Inicios originales de las sesiones en `[window_start, window_end)`.
+
+    Sin `window_end` ni fin propio de la regla (COUNT/UNTIL) es obligatorio
+    `limit`: una serie infinita no se expande entera.
+    """
+    dtstart = naive_utc(dtstart)
+    window_start = naive_utc(window_start)
+    window_end = naive_utc(window_end)
+    if window_end is None and limit is None and rule.count is None and rule.until is None:
+        raise ValueError('Serie sin fin: hace falta window_end o limit')
+
+    emitted = 0
+    for index, candidate in enumerate(_periods(dtstart, rule, _first_period(dtstart, rule, window_start))):
+        if rule.count is not None and index >= rule.count:
+            return
+        if rule.until is not None and candidate > rule.until:
+            return
+        if window_end is not None and candidate >= window_end:
+            return
+        if window_start is not None and candidate < window_start:
+            continue
+        yield candidate
+        emitted += 1
+        if limit is not None and emitted >= limit:
+            return
+
+
+def is_occurrence(dtstart, rule, when):
+    """True si `when` es el inicio original de una sesión de la serie."""
+    when = naive_utc(when)
+    return any(
+        candidate == when
+        for candidate in iter_occurrences(dtstart, rule, when, when + timedelta(seconds=1))
+    )
+
+
+def series_end(dtstart, rule):
+    """Inicio de la última sesión, o None si la serie no tiene fin."""
+    if rule.count is None and rule.until is None:
+        return None
+    last = None
+    for last in iter_occurrences(dtstart, rule):
+        pass
+    return last if last is not None else naive_utc(dtstart)
+
+
+class Occurrence:
+    """Sesión de una serie con sus cambios (si tiene fila en `event_occurrence`)."""
+
+    __slots__ = ('event', 'occurrence_start', 'row')
+
+    def __init__(self, event, occurrence_start, row=None):
+        self.event = event
+        self.occurrence_start = occurrence_start
+        self.row = row
+
+    @property
+    def start_date(self):
+        return self.row.start_date if self.row and self.row.start_date else self.occurrence_start
+
+    @property
+    def end_date(self):
+        if self.row and self.row.end_date:
+            return self.row.end_date
+        if self.event.end_date is None:
+            return None
+        return self.start_date + (self.event.end_date - self.event.start_date)
+
+    @property
+    def title(self):
+        return self.row.title if self.row and self.row.title else self.event.title
+
+    @property
+    def description(self):
+        return self.row.description if self.row and self.row.description else self.event.description
+
+    @property
+    def is_cancelled(self):
+        return bool(self.row and self.row.is_cancelled)
+
+    @property
+    def confirmed_count(self):
+        return self.row.confirmed_count if self.row else 0
+
+    @property
+    def occurrence_id(self):
+        return self.row.id if self.row else None
+
+
+def load_occurrence_rows(event_ids, window_start, window_end):
+    """Filas de `event_occurrence` de las series cuya sesión original o movida cae en la ventana."""
+    if not event_ids:
+        return []
+
+    def _in_window(column):
+        conditions = [column < window_end]
+        if window_start is not None:
+            conditions.append(column >= window_start)
+        return and_(*conditions)
+
+    return EventOccurrence.query.filter(
+        EventOccurrence.event_id.in_(list(event_ids)),
+        or_(_in_window(EventOccurrence.occurrence_start), _in_window(EventOccurrence.start_date)),
+    ).all()
+
+
+def expand_series(events, window_start, window_end, max_per_series, include_cancelled=False):
+    """Sesiones de varias series en `[window_start, window_end)`, ordenadas por inicio.
+
+    Una sola query a `event_occurrence` para todas las series. Las sesiones
+    movidas cuentan por su fecha nueva: entran en la ventana aunque su inicio
+    original esté fuera y salen si se han movido fuera. Las filas de sesiones
+    que la regla actual ya no genera solo se tienen en cuenta si se movieron
+    explícitamente (y tras el cambio de regla están canceladas).
+
+    Args:
+        events: Eventos con `recurrence_rule`.
+        window_start: Inicio de la ventana (None = desde el inicio de cada serie).
+        window_end: Fin (exclusivo) de la ventana; obligatorio.
+        max_per_series: Máximo de sesiones por serie.
+    """
+    window_start = naive_utc(window_start)
+    window_end = naive_utc(window_end)
+    rows_by_event = {}
+    for row in load_occurrence_rows([e.id for e in events], window_start, window_end):
+        rows_by_event.setdefault(row.event_id, {})[row.occurrence_start] = row
+
+    occurrences = []
+    for event in events:
+        rule = parse_rule(event.recurrence_rule)
+        rows = rows_by_event.get(event.id, {})
+        starts = list(iter_occurrences(event.start_date, rule, window_start, window_end, limit=max_per_series))
+        # Movidas desde fuera de la ventana; no las que dejó atrás un cambio de regla
+        seen = set(starts)
+        starts.extend(
+            start for start, row in rows.items()
+            if start not in seen and (row.start_date is not None or is_occurrence(event.start_date, rule, start))
+        )
+
+        for start in starts:
+            occurrence = Occurrence(event, start, rows.get(start))
+            if occurrence.is_cancelled and not include_cancelled:
+                continue
+            if occurrence.start_date >= window_end or (window_start is not None and occurrence.start_date < window_start):
+                continue
+            occurrences.append(occurrence)
+
+    occurrences.sort(key=lambda o: (o.start_date, o.event.id))
+    return occurrences
+
+
+def cancel_orphaned_occurrences(event):
+    """Cancela las sesiones con fila que la regla (o el inicio) actual ya no genera.
+
+    Sus RSVPs se conservan: los asistentes ven la sesión como cancelada en vez
+    de perderla. Sin regla (deja de ser recurrente) se cancelan todas. No hace
+    commit.
+
+    Returns:
+        list[EventOccurrence]: Filas canceladas
+    """
+    rule = parse_rule(event.recurrence_rule) if event.recurrence_rule else None
+    rows = EventOccurrence.query.filter_by(event_id=event.id, is_cancelled=False).all()
+    orphaned = [
+        row for row in rows
+        if rule is None or not is_occurrence(event.start_date, rule, row.occurrence_start)
+    ]
+    for row in orphaned:
+        row.is_cancelled = True
+    return orphaned
+
+
+def get_or_create_occurrence(event, occurrence_start, lock=False):
+    """Fila de `event_occurrence` de una sesión (la crea si no existe).
+
+    Returns:
+        EventOccurrence | None: None si `occurrence_start` no es una sesión
+        de la serie.
+    """
+    occurrence_start = naive_utc(occurrence_start)
+    if not event.recurrence_rule or not is_occurrence(event.start_date, parse_rule(event.recurrence_rule), occurrence_start):
+        return None
+
+    now = datetime.now(timezone.utc)
+    db.session.execute(
+        pg_insert(EventOccurrence.__table__)
+        .values(event_id=event.id, occurrence_start=occurrence_start, createdAt=now, updatedAt=now)
+        .on_conflict_do_nothing(constraint='unique_occurrence_per_event')
+    )
+    query = EventOccurrence.query.filter_by(event_id=event.id, occurrence_start=occurrence_start)
+    if lock:
+        query = query.with_for_update()
+    return query.one()
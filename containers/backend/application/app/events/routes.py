@@ -1,19 +1,62 @@
-from flask import jsonify, request
+from flask import jsonify, request, current_app, Response, stream_with_context, url_for
 from flask_login import current_user, login_required
 from app.events import bp
 from app.logger_config import logger
 from app import db
 from app.cache import (
-    get_event_confirmed_count_cached,
-    set_event_confirmed_count_cached,
-    invalidate_event_confirmed_count,
+    get_event_detail_cached,
+    set_event_detail_cached,
+    invalidate_event_detail,
+)
+from app.models import (
+    Event,
+    EventOccurrence,
+    EventRSVP,
+    EventInvitation,
+    EventMessage,
+    User,
+    Notification,
+    EventRecommendation,
+    RecommendationState,
+)
+from app.notifications.routes import add_notification
+from app.invitations import resolve_invitees, add_invitation_notifications, enqueue_invitation_emails
+from app.audit import audited_returning, record_core_rows
+from app.push_service import send_event_invitation_pushes
+from app.events.capacity import apply_status_change, release_seat
+from app.db_routing import read_replica
+from app.events.recurrence import (
+    Occurrence,
+    cancel_orphaned_occurrences,
+    expand_series,
+    get_or_create_occurrence,
+    naive_utc,
+    parse_rule,
+    series_end,
+)
+from app.events.ical import (
+    user_feed_validators,
+    user_feed_rows,
+    city_feed_validators,
+    city_feed_rows,
+    generate_calendar,
+)
+from app.waitlist import (
+    join_waitlist,
+    leave_waitlist,
+    waitlist_position,
+    waitlist_size,
+    promote_event_waitlist,
+    notify_promoted,
+    push_promoted,
 )
-from app.models import Event, EventRSVP, EventInvitation, EventMessage, User, Notification
 from app.schemas import (
     EventCreateSchema,
     EventUpdateSchema,
     RSVPSchema,
+    EventOccurrenceSchema,
     EventInvitationSchema,
+    BulkEventInvitationSchema,
     EventInvitationResponseSchema,
     MessageSendSchema,
     validate_body,
@@ -21,28 +64,68 @@ from app.schemas import (
 from app.common import (
     serialize_user_summary,
     paginated_response,
+    cursor_paginated_response,
     haversine_km_sql,
 )
-from datetime import datetime, timezone
-from sqlalchemy import func
+import heapq
+import math
+from datetime import datetime, timezone, timedelta
+from itertools import islice
+from urllib.parse import urlparse
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
+from werkzeug.http import is_resource_modified
+from werkzeug.utils import secure_filename
+
+# Asistentes embebidos en el detalle; el resto se pide a /attendees
+ATTENDEES_PREVIEW_LIMIT = 12
+ATTENDEES_PAGE_SIZE = 50
+ATTENDEES_MAX_PAGE_SIZE = 200
+
+# Eventos recurrentes: ventana por defecto (desde hoy) en la que se expanden
+# las sesiones de los listados, ventana máxima pedible y tope por serie
+OCCURRENCES_WINDOW_DAYS = 90
+OCCURRENCES_MAX_WINDOW_DAYS = 366
+OCCURRENCES_PER_SERIES = 200
+
+
+def _promote_waitlist(event):
+    """Promociona la lista de espera del evento y añade las notificaciones (sin commit)."""
+    promoted = promote_event_waitlist(event.id)
+    if promoted:
+        notify_promoted(
+            promoted,
+            '¡Tienes plaza!',
+            f"Se ha liberado una plaza en '{event.title}' y tu asistencia está confirmada",
+            f'/events/{event.id}',
+            {'event_id': event.id}
+        )
+    return promoted
 
 
-def _confirmed_counts_for_events(event_ids):
-    """Devuelve {event_id: confirmed_count} agregado en UNA sola query."""
-    if not event_ids:
-        return {}
-    rows = (
-        db.session.query(EventRSVP.event_id, func.count(EventRSVP.id))
-        .filter(
-            EventRSVP.event_id.in_(event_ids),
-            EventRSVP.status == 'confirmed',
-            EventRSVP.deletedAt.is_(None),
+def _push_promoted(event, promoted):
+    """Push de promoción en un solo lote (después del commit)."""
+    if promoted:
+        push_promoted(
+            promoted,
+            f'¡Tienes plaza en {event.title}!',
+            'Se ha liberado una plaza y tu asistencia está confirmada',
+            f'/events/{event.id}'
         )
-        .group_by(EventRSVP.event_id)
-        .all()
-    )
-    return {event_id: count for event_id, count in rows}
+
+
+def _waitlisted_response(event_id, user_id):
+    """Apunta al usuario en la lista de espera del evento lleno y hace commit."""
+    position = join_waitlist(user_id, event_id=event_id)
+    db.session.commit()
+    return jsonify({
+        'message': 'El evento está lleno: te hemos añadido a la lista de espera',
+        'waitlist': {
+            'event_id': event_id,
+            'position': position
+        }
+    }), 202
 
 
 def _event_location(event):
@@ -72,13 +155,63 @@ def _serialize_event_listing(event):
         'max_attendees': event.max_attendees,
         'category': event.category,
         'image_url': event.image_url,
+        'is_recurring': event.recurrence_rule is not None,
+        'recurrence_rule': event.recurrence_rule,
         'created_at': event.createdAt.isoformat() if event.createdAt else None,
     }
 
 
+def _serialize_occurrence(occurrence):
+    """Sesión de una serie con el formato de listado (id = el de la serie)."""
+    event = occurrence.event
+    confirmed_count = occurrence.confirmed_count
+    data = _serialize_event_listing(event)
+    data.update({
+        'title': occurrence.title,
+        'description': occurrence.description,
+        'start_date': occurrence.start_date.isoformat(),
+        'end_date': occurrence.end_date.isoformat() if occurrence.end_date else None,
+        'occurrence_start': occurrence.occurrence_start.isoformat(),
+        'is_cancelled': occurrence.is_cancelled,
+        'confirmed_attendees': confirmed_count,
+        'is_full': bool(event.max_attendees and confirmed_count >= event.max_attendees),
+    })
+    return data
+
+
+def _parse_datetime_arg(name):
+    value = request.args.get(name)
+    return naive_utc(datetime.fromisoformat(value)) if value else None
+
+
+def _occurrence_window(default_start):
+    """Ventana `[from, to)` de expansión de series a partir de los query params.
+
+    Raises:
+        ValueError: Fechas mal formadas, invertidas o ventana demasiado larga.
+    """
+    window_start = _parse_datetime_arg('from') or default_start
+    window_end = _parse_datetime_arg('to')
+    base = window_start or naive_utc(datetime.now(timezone.utc))
+    if window_end is None:
+        window_end = base + timedelta(days=OCCURRENCES_WINDOW_DAYS)
+    if window_end <= base or window_end - base > timedelta(days=OCCURRENCES_MAX_WINDOW_DAYS):
+        raise ValueError('Ventana de fechas inválida')
+    return window_start, window_end
+
+
+def _series_in_window(filters, window_start, window_end):
+    """Condiciones de las series que pueden tener sesiones en la ventana."""
+    conditions = list(filters) + [Event.recurrence_rule.isnot(None), Event.start_date < window_end]
+    if window_start is not None:
+        conditions.append(or_(Event.recurrence_end.is_(None), Event.recurrence_end >= window_start))
+    return conditions
+
+
 # ==================== CRUD de Eventos ====================
 
 @bp.route('/api/v1/events', methods=['GET'])
+@read_replica
 def get_events():
     """Obtener lista de eventos públicos con filtros opcionales"""
     try:
@@ -93,37 +226,57 @@ def get_events():
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 20))
 
-        # Query base (precargando creator para evitar N+1)
-        query = Event.query.options(selectinload(Event.creator)).filter_by(
-            is_public=True,
-            deletedAt=None
-        )
+        # Ventana en la que se expanden los eventos recurrentes
+        now = naive_utc(datetime.now(timezone.utc))
+        try:
+            window_start, window_end = _occurrence_window(now if upcoming_only else None)
+        except ValueError:
+            return jsonify({'error': 'Parámetros from/to inválidos'}), 400
+
+        # Filtros comunes a eventos sueltos y series
+        filters = [Event.is_public.is_(True), Event.deletedAt.is_(None)]
 
-        # Aplicar filtros
         if category:
-            query = query.filter_by(category=category)
+            filters.append(Event.category == category)
 
         if event_type:
-            query = query.filter_by(event_type=event_type)
+            filters.append(Event.event_type == event_type)
 
         if is_online is not None:
-            query = query.filter_by(is_online=is_online.lower() == 'true')
+            filters.append(Event.is_online.is_(is_online.lower() == 'true'))
 
         if city:
-            query = query.filter(Event.city.ilike(f'%{city}%'))
+            filters.append(Event.city.ilike(f'%{city}%'))
+
+        # Eventos sueltos: sin `to` explícito, todos los próximos (como siempre)
+        single_filters = filters + [Event.recurrence_rule.is_(None)]
+        if window_start is not None:
+            single_filters.append(Event.start_date >= window_start)
+        if request.args.get('to'):
+            single_filters.append(Event.start_date < window_end)
+
+        # Series: una fila cada una, expandidas en memoria dentro de la ventana
+        series = (
+            Event.query.options(selectinload(Event.creator))
+            .filter(*_series_in_window(filters, window_start, window_end))
+            .all()
+        )
+        occurrences = expand_series(series, window_start, window_end, OCCURRENCES_PER_SERIES)
 
-        if upcoming_only:
-            query = query.filter(Event.start_date >= datetime.now(timezone.utc))
+        if occurrences:
+            return jsonify(_merged_events_page(single_filters, occurrences, page, per_page)), 200
 
-        # Ordenar por fecha de inicio
-        query = query.order_by(Event.start_date.asc())
+        # Query base (precargando creator para evitar N+1), ordenada por fecha de inicio
+        query = (
+            Event.query.options(selectinload(Event.creator))
+            .filter(*single_filters)
+            .order_by(Event.start_date.asc())
+        )
 
         def _decorate(events, serialized):
-            counts_by_event = _confirmed_counts_for_events([e.id for e in events])
             for event, data in zip(events, serialized):
-                confirmed = counts_by_event.get(event.id, 0)
-                data['confirmed_attendees'] = confirmed
-                data['is_full'] = bool(event.max_attendees and confirmed >= event.max_attendees)
+                data['confirmed_attendees'] = event.confirmed_count
+                data['is_full'] = bool(event.max_attendees and event.confirmed_count >= event.max_attendees)
 
         response = paginated_response(
             query,
@@ -140,8 +293,60 @@ def get_events():
         return jsonify({'error': 'Error interno'}), 500
 
 
+def _merged_events_page(single_filters, occurrences, page, per_page):
+    """
+    Página del listado mezclando eventos sueltos (en SQL) y sesiones de
+    series (ya expandidas y ordenadas), por fecha de inicio.
+
+    De los sueltos solo se leen `(id, start_date)` hasta el final de la
+    página pedida y después se cargan completos los que caen en ella.
+    """
+    offset = max(page - 1, 0) * per_page
+    keys = (
+        db.session.query(Event.id, Event.start_date)
+        .filter(*single_filters)
+        .order_by(Event.start_date.asc(), Event.id.asc())
+        .limit(offset + per_page)
+        .all()
+    )
+    total_single = db.session.query(Event.id).filter(*single_filters).count()
+
+    merged = heapq.merge(
+        ((naive_utc(start), 0, event_id) for event_id, start in keys),
+        ((occurrence.start_date, 1, index) for index, occurrence in enumerate(occurrences)),
+    )
+    page_keys = list(islice(merged, offset, offset + per_page))
+
+    single_ids = [key for _, kind, key in page_keys if kind == 0]
+    singles = {
+        event.id: event
+        for event in Event.query.options(selectinload(Event.creator)).filter(Event.id.in_(single_ids))
+    } if single_ids else {}
+
+    items = []
+    for _, kind, key in page_keys:
+        if kind == 1:
+            items.append(_serialize_occurrence(occurrences[key]))
+            continue
+        event = singles[key]
+        data = _serialize_event_listing(event)
+        data['confirmed_attendees'] = event.confirmed_count
+        data['is_full'] = bool(event.max_attendees and event.confirmed_count >= event.max_attendees)
+        items.append(data)
+
+    total = total_single + len(occurrences)
+    return {
+        'events': items,
+        'total': total,
+        'pages': math.ceil(total / per_page) if per_page else 0,
+        'current_page': page,
+        'per_page': per_page,
+    }
+
+
 @bp.route('/api/v1/events/nearby', methods=['GET'])
 @login_required
+@read_replica
 def get_nearby_events():
     """Obtener eventos cercanos basados en la ubicación del usuario"""
     try:
@@ -151,6 +356,12 @@ def get_nearby_events():
         radius = float(request.args.get('radius', 50))  # Radio en km (default 50km)
         upcoming_only = request.args.get('upcoming_only', 'true').lower() == 'true'
 
+        now = naive_utc(datetime.now(timezone.utc))
+        try:
+            window_start, window_end = _occurrence_window(now if upcoming_only else None)
+        except ValueError:
+            return jsonify({'error': 'Parámetros from/to inválidos'}), 400
+
         # Obtener eventos públicos dentro del radio usando Haversine en SQL
         distance_expr = haversine_km_sql(
             Event.latitude,
@@ -159,38 +370,57 @@ def get_nearby_events():
             current_user.longitude,
         ).label('distance')
 
+        filters = [
+            Event.is_public.is_(True),
+            Event.is_online.is_(False),
+            Event.deletedAt.is_(None),
+            Event.latitude.isnot(None),
+            Event.longitude.isnot(None),
+            distance_expr <= radius,
+        ]
+
         query = (
             db.session.query(Event, distance_expr)
             .options(selectinload(Event.creator))
-            .filter(
-                Event.is_public.is_(True),
-                Event.is_online.is_(False),
-                Event.deletedAt.is_(None),
-                Event.latitude.isnot(None),
-                Event.longitude.isnot(None),
-            )
+            .filter(*filters, Event.recurrence_rule.is_(None))
         )
 
-        if upcoming_only:
-            query = query.filter(Event.start_date >= datetime.now(timezone.utc))
+        if window_start is not None:
+            query = query.filter(Event.start_date >= window_start)
+        if request.args.get('to'):
+            query = query.filter(Event.start_date < window_end)
 
-        query = query.filter(distance_expr <= radius).order_by(distance_expr.asc())
+        rows = query.order_by(distance_expr.asc()).all()
 
-        rows = query.all()
-        events = [row[0] for row in rows]
-        distances_by_event = {row[0].id: row[1] for row in rows}
+        # Series dentro del radio: sus sesiones en la ventana, con la misma distancia
+        series_rows = (
+            db.session.query(Event, distance_expr)
+            .options(selectinload(Event.creator))
+            .filter(*_series_in_window(filters, window_start, window_end))
+            .all()
+        )
+        series_distances = {event.id: distance for event, distance in series_rows}
+        occurrences = expand_series(
+            [event for event, _ in series_rows], window_start, window_end, OCCURRENCES_PER_SERIES
+        )
 
-        counts_by_event = _confirmed_counts_for_events([e.id for e in events])
+        items = [(event, distance, None) for event, distance in rows]
+        items.extend((o.event, series_distances[o.event.id], o) for o in occurrences)
+        if occurrences:
+            items.sort(key=lambda item: (item[1] or 0, item[2].start_date if item[2] else naive_utc(item[0].start_date)))
 
         nearby_events = []
-        for event in events:
-            distance = distances_by_event.get(event.id, 0) or 0
-            confirmed_count = counts_by_event.get(event.id, 0)
-
-            data = _serialize_event_listing(event)
+        for event, distance, occurrence in items:
+            distance = distance or 0
+
+            if occurrence is not None:
+                data = _serialize_occurrence(occurrence)
+            else:
+                confirmed_count = event.confirmed_count
+                data = _serialize_event_listing(event)
+                data['confirmed_attendees'] = confirmed_count
+                data['is_full'] = bool(event.max_attendees and confirmed_count >= event.max_attendees)
             data['distance'] = round(float(distance), 2)
-            data['confirmed_attendees'] = confirmed_count
-            data['is_full'] = bool(event.max_attendees and confirmed_count >= event.max_attendees)
             # En este endpoint los eventos son presenciales por definición:
             # conservar `location` siempre (no depender de `is_online`).
             data['location'] = {
@@ -213,45 +443,88 @@ def get_nearby_events():
         return jsonify({'error': 'Error interno'}), 500
 
 
-@bp.route('/api/v1/events/<int:event_id>', methods=['GET'])
-def get_event(event_id):
-    """Obtener detalles de un evento específico"""
+@bp.route('/api/v1/events/recommended', methods=['GET'])
+@login_required
+def get_recommended_events():
+    """
+    Eventos recomendados para el usuario (precalculados por Celery, ver
+    app.recommendations)
+    """
     try:
-        event = Event.query.filter_by(
-            id=event_id,
-            deletedAt=None
-        ).first()
-
-        if not event:
-            return jsonify({'error': 'Evento no encontrado'}), 404
-
-        # Verificar si es privado y el usuario no es el creador
-        if not event.is_public and (not current_user.is_authenticated or current_user.id != event.creator_id):
-            return jsonify({'error': 'Acceso denegado'}), 403
-
-        # Contar asistentes por estado (una sola query) con cache del confirmed_count
-        status_counts = dict(
-            db.session.query(EventRSVP.status, func.count(EventRSVP.id))
+        limit = min(max(int(request.args.get('limit', 10)), 1), current_app.config.get('RECOMMENDATION_TOP_K', 20))
+
+        state = db.session.get(RecommendationState, current_user.id)
+        if state is None:
+            # Primera vez: se calculan en segundo plano y se devuelve vacío
+            try:
+                current_app.celery.send_task(
+                    'recommendation_tasks.refresh_user_recommendations',
+                    args=[current_user.id]
+                )
+            except Exception as e:
+                logger.getChild('events').warning(f"No se pudo encolar el cálculo de recomendaciones: {str(e)}")
+            return jsonify({'events': [], 'total': 0, 'computed_at': None}), 200
+
+        # Descartar al leer lo que ha dejado de ser válido desde el cálculo
+        rows = (
+            db.session.query(Event, EventRecommendation.score, EventRecommendation.reasons)
+            .join(EventRecommendation, EventRecommendation.event_id == Event.id)
+            .options(selectinload(Event.creator))
             .filter(
-                EventRSVP.event_id == event_id,
-                EventRSVP.deletedAt.is_(None),
+                EventRecommendation.user_id == current_user.id,
+                Event.deletedAt.is_(None),
+                Event.start_date >= datetime.now(timezone.utc),
+                ~EventRSVP.query.filter(
+                    EventRSVP.event_id == Event.id,
+                    EventRSVP.user_id == current_user.id,
+                    EventRSVP.deletedAt.is_(None),
+                ).exists(),
             )
-            .group_by(EventRSVP.status)
+            .order_by(EventRecommendation.rank)
+            .limit(limit)
             .all()
         )
-        confirmed_count = status_counts.get('confirmed', 0)
-        pending_count = status_counts.get('pending', 0)
-        set_event_confirmed_count_cached(event_id, confirmed_count)
 
-        # Obtener asistentes confirmados con sus usuarios precargados
-        confirmed_rsvps = (
-            EventRSVP.query
-            .options(selectinload(EventRSVP.user))
-            .filter_by(event_id=event_id, status='confirmed', deletedAt=None)
-            .all()
-        )
+        events_data = []
+        for event, score, reasons in rows:
+            data = _serialize_event_listing(event)
+            data['confirmed_attendees'] = event.confirmed_count
+            data['is_full'] = bool(event.max_attendees and event.confirmed_count >= event.max_attendees)
+            data['recommendation'] = dict(reasons or {}, score=score)
+            events_data.append(data)
+
+        return jsonify({
+            'events': events_data,
+            'total': len(events_data),
+            'computed_at': state.computed_at.isoformat()
+        }), 200
+
+    except Exception as e:
+        logger.getChild('events').error(f"Error obteniendo eventos recomendados: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error interno'}), 500
+
+
+@bp.route('/api/v1/events/<int:event_id>', methods=['GET'])
+def get_event(event_id):
+    """Obtener detalles de un evento específico
 
-        attendees = [serialize_user_summary(rsvp.user) for rsvp in confirmed_rsvps]
+    La parte común a todos los usuarios (campos, stats y asistentes) se
+    cachea en Redis, versionada, y se invalida en cada escritura del evento
+    o de sus RSVPs; por petición sólo se consulta el RSVP del usuario actual.
+    """
+    try:
+        version, detail = get_event_detail_cached(event_id)
+        if detail is None:
+            detail = _build_event_detail(event_id)
+            if detail is None:
+                return jsonify({'error': 'Evento no encontrado'}), 404
+            # Con la versión leída antes de construir: si se ha invalidado
+            # entre medias, esta copia no llega a servirse
+            set_event_detail_cached(event_id, version, detail)
+
+        # Verificar si es privado y el usuario no es el creador
+        if not detail['is_public'] and (not current_user.is_authenticated or current_user.id != detail['creator_id']):
+            return jsonify({'error': 'Acceso denegado'}), 403
 
         # Verificar si el usuario actual tiene RSVP
         user_rsvp = None
@@ -259,7 +532,7 @@ def get_event(event_id):
             rsvp = EventRSVP.query.filter_by(
                 event_id=event_id,
                 user_id=current_user.id,
-                deletedAt=None
+                occurrence_id=None
             ).first()
             if rsvp:
                 user_rsvp = {
@@ -268,19 +541,7 @@ def get_event(event_id):
                     'response_date': rsvp.response_date.isoformat() if rsvp.response_date else None
                 }
 
-        event_data = _serialize_event_listing(event)
-        event_data.update({
-            'is_public': event.is_public,
-            'stats': {
-                'confirmed': confirmed_count,
-                'pending': pending_count,
-                'is_full': bool(event.max_attendees and confirmed_count >= event.max_attendees),
-            },
-            'attendees': attendees,
-            'user_rsvp': user_rsvp,
-            'updated_at': event.updatedAt.isoformat() if event.updatedAt else None,
-        })
-
+        event_data = dict(detail['data'], user_rsvp=user_rsvp)
         return jsonify(event_data), 200
 
     except Exception as e:
@@ -288,6 +549,224 @@ def get_event(event_id):
         return jsonify({'error': 'Error interno'}), 500
 
 
+def _build_event_detail(event_id):
+    """Detalle anónimo cacheable de un evento, o None si no existe."""
+    event = Event.query.filter_by(
+        id=event_id
+    ).first()
+
+    if not event:
+        return None
+
+    # Confirmados: contador desnormalizado; pendientes: una sola query.
+    # Solo RSVPs al evento completo (los de sesiones van en /occurrences)
+    confirmed_count = event.confirmed_count
+    pending_count = EventRSVP.query.filter_by(
+        event_id=event_id,
+        occurrence_id=None,
+        status='pending'
+    ).count()
+
+    # Solo los primeros asistentes (avatares); la lista completa va paginada
+    # en /attendees para no cargar miles de `User` en cada detalle
+    confirmed_rsvps = (
+        EventRSVP.query
+        .options(selectinload(EventRSVP.user))
+        .filter_by(event_id=event_id, occurrence_id=None, status='confirmed')
+        .order_by(EventRSVP.id)
+        .limit(ATTENDEES_PREVIEW_LIMIT)
+        .all()
+    )
+
+    attendees = [serialize_user_summary(rsvp.user) for rsvp in confirmed_rsvps]
+
+    event_data = _serialize_event_listing(event)
+    event_data.update({
+        'is_public': event.is_public,
+        'stats': {
+            'confirmed': confirmed_count,
+            'pending': pending_count,
+            'is_full': bool(event.max_attendees and confirmed_count >= event.max_attendees),
+        },
+        'attendees': attendees,
+        'attendees_has_more': confirmed_count > len(attendees),
+        'updated_at': event.updatedAt.isoformat() if event.updatedAt else None,
+    })
+
+    return {
+        'is_public': event.is_public,
+        'creator_id': event.creator_id,
+        'data': event_data,
+    }
+
+
+@bp.route('/api/v1/events/<int:event_id>/attendees', methods=['GET'])
+def get_event_attendees(event_id):
+    """Listar los asistentes confirmados de un evento o de una sesión (paginado por cursor)"""
+    try:
+        event = Event.query.filter_by(
+            id=event_id
+        ).first()
+
+        if not event:
+            return jsonify({'error': 'Evento no encontrado'}), 404
+
+        # Mismas reglas de acceso que el detalle
+        if not event.is_public and (not current_user.is_authenticated or current_user.id != event.creator_id):
+            return jsonify({'error': 'Acceso denegado'}), 403
+
+        limit = min(max(int(request.args.get('limit', ATTENDEES_PAGE_SIZE)), 1), ATTENDEES_MAX_PAGE_SIZE)
+
+        # `?occurrence_start=`: asistentes de esa sesión de la serie
+        occurrence_id, total = None, event.confirmed_count
+        try:
+            occurrence_start = _parse_datetime_arg('occurrence_start')
+        except ValueError:
+            return jsonify({'error': 'occurrence_start inválido'}), 400
+        if occurrence_start is not None:
+            occurrence = EventOccurrence.query.filter_by(
+                event_id=event_id,
+                occurrence_start=occurrence_start
+            ).first()
+            if not occurrence:
+                return jsonify({'attendees': [], 'next_cursor': None, 'has_more': False,
+                                'limit': limit, 'total': 0}), 200
+            occurrence_id, total = occurrence.id, occurrence.confirmed_count
+
+        query = (
+            EventRSVP.query
+            .options(selectinload(EventRSVP.user))
+            .filter_by(event_id=event_id, occurrence_id=occurrence_id, status='confirmed')
+        )
+
+        def _serialize_attendee(rsvp):
+            return dict(
+                serialize_user_summary(rsvp.user) or {},
+                response_date=rsvp.response_date.isoformat() if rsvp.response_date else None
+            )
+
+        try:
+            response = cursor_paginated_response(
+                query,
+                EventRSVP.id,
+                request.args.get('cursor'),
+                limit,
+                serializer=_serialize_attendee,
+                items_key='attendees',
+                extra_items_kwargs={'total': total},
+            )
+        except ValueError:
+            return jsonify({'error': 'Cursor inválido'}), 400
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        logger.getChild('events').error(f"Error obteniendo asistentes: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error interno'}), 500
+
+
+# ==================== Sesiones de eventos recurrentes ====================
+
+@bp.route('/api/v1/events/<int:event_id>/occurrences', methods=['GET'])
+def get_event_occurrences(event_id):
+    """Sesiones de un evento recurrente en la ventana `from`/`to` (por defecto, próximos 90 días)"""
+    try:
+        event = Event.query.filter_by(
+            id=event_id
+        ).first()
+
+        if not event:
+            return jsonify({'error': 'Evento no encontrado'}), 404
+
+        # Mismas reglas de acceso que el detalle
+        if not event.is_public and (not current_user.is_authenticated or current_user.id != event.creator_id):
+            return jsonify({'error': 'Acceso denegado'}), 403
+
+        if not event.recurrence_rule:
+            return jsonify({'error': 'El evento no es recurrente'}), 400
+
+        try:
+            window_start, window_end = _occurrence_window(naive_utc(datetime.now(timezone.utc)))
+        except ValueError:
+            return jsonify({'error': 'Parámetros from/to inválidos'}), 400
+
+        occurrences = expand_series(
+            [event], window_start, window_end, OCCURRENCES_PER_SERIES, include_cancelled=True
+        )
+
+        # RSVPs del usuario a estas sesiones (una query)
+        user_rsvps = {}
+        occurrence_ids = [o.occurrence_id for o in occurrences if o.occurrence_id]
+        if current_user.is_authenticated and occurrence_ids:
+            user_rsvps = {
+                rsvp.occurrence_id: rsvp.status
+                for rsvp in EventRSVP.query.filter(
+                    EventRSVP.occurrence_id.in_(occurrence_ids),
+                    EventRSVP.user_id == current_user.id,
+                    EventRSVP.deletedAt.is_(None),
+                )
+            }
+
+        items = []
+        for occurrence in occurrences:
+            data = _serialize_occurrence(occurrence)
+            data['user_rsvp_status'] = user_rsvps.get(occurrence.occurrence_id)
+            items.append(data)
+
+        return jsonify({
+            'event_id': event_id,
+            'recurrence_rule': event.recurrence_rule,
+            'from': window_start.isoformat(),
+            'to': window_end.isoformat(),
+            'occurrences': items,
+            'total': len(items)
+        }), 200
+
+    except Exception as e:
+        logger.getChild('events').error(f"Error obteniendo sesiones: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error interno'}), 500
+
+
+@bp.route('/api/v1/events/<int:event_id>/occurrences', methods=['PUT'])
+@login_required
+@validate_body(EventOccurrenceSchema)
+def update_event_occurrence(event_id, payload: EventOccurrenceSchema):
+    """Modificar o cancelar una sesión concreta de una serie (solo el creador)"""
+    try:
+        event = Event.query.filter_by(
+            id=event_id,
+            creator_id=current_user.id
+        ).first()
+
+        if not event:
+            return jsonify({'error': 'Evento no encontrado'}), 404
+
+        if not event.recurrence_rule:
+            return jsonify({'error': 'El evento no es recurrente'}), 400
+
+        occurrence = get_or_create_occurrence(event, payload.occurrence_start, lock=True)
+        if occurrence is None:
+            return jsonify({'error': 'La fecha no corresponde a ninguna sesión de la serie'}), 400
+
+        data = payload.model_dump(exclude_unset=True, exclude={'occurrence_start'})
+        for field, value in data.items():
+            if field in ('start_date', 'end_date'):
+                value = naive_utc(value)
+            setattr(occurrence, field, value)
+
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Sesión actualizada correctamente',
+            'occurrence': _serialize_occurrence(Occurrence(event, occurrence.occurrence_start, occurrence))
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.getChild('events').error(f"Error actualizando sesión: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error al actualizar la sesión'}), 500
+
+
 @bp.route('/api/v1/events', methods=['POST'])
 @login_required
 @validate_body(EventCreateSchema)
@@ -313,7 +792,13 @@ def create_event(payload: EventCreateSchema):
             is_public=payload.is_public,
             category=payload.category,
             image_url=payload.image_url,
+            recurrence_rule=payload.recurrence_rule,
         )
+        if event.recurrence_rule:
+            event.recurrence_end = series_end(event.start_date, parse_rule(event.recurrence_rule))
+
+        # El creador cuenta como primer confirmado
+        event.confirmed_count = 1
 
         db.session.add(event)
         db.session.flush()  # Obtener event.id sin cerrar la transacción
@@ -352,8 +837,7 @@ def update_event(event_id, payload: EventUpdateSchema):
     try:
         event = Event.query.filter_by(
             id=event_id,
-            creator_id=current_user.id,
-            deletedAt=None
+            creator_id=current_user.id
         ).first()
 
         if not event:
@@ -364,7 +848,24 @@ def update_event(event_id, payload: EventUpdateSchema):
         for field, value in data.items():
             setattr(event, field, value)
 
+        # Las sesiones se identifican por su inicio original: al cambiar la
+        # regla o el inicio se cancelan las filas de `event_occurrence` que ya
+        # no coinciden con ninguna sesión (pueden tener RSVPs)
+        if 'recurrence_rule' in data or 'start_date' in data:
+            event.recurrence_end = (
+                series_end(event.start_date, parse_rule(event.recurrence_rule)) if event.recurrence_rule else None
+            )
+            cancel_orphaned_occurrences(event)
+
+        # Si se amplía el cupo, entran los primeros de la lista de espera
+        promoted = []
+        if 'max_attendees' in data:
+            db.session.flush()
+            promoted = _promote_waitlist(event)
+
         db.session.commit()
+        invalidate_event_detail(event_id)
+        _push_promoted(event, promoted)
 
         return jsonify({
             'message': 'Evento actualizado correctamente',
@@ -387,8 +888,7 @@ def delete_event(event_id):
     try:
         event = Event.query.filter_by(
             id=event_id,
-            creator_id=current_user.id,
-            deletedAt=None
+            creator_id=current_user.id
         ).first()
 
         if not event:
@@ -397,6 +897,7 @@ def delete_event(event_id):
         # Soft delete
         event.deletedAt = datetime.now(timezone.utc)
         db.session.commit()
+        invalidate_event_detail(event_id)
 
         return jsonify({'message': 'Evento eliminado correctamente'}), 200
 
@@ -415,8 +916,7 @@ def create_rsvp(event_id, payload: RSVPSchema):
     """Confirmar/declinar asistencia a un evento"""
     try:
         event = Event.query.filter_by(
-            id=event_id,
-            deletedAt=None
+            id=event_id
         ).first()
 
         if not event:
@@ -426,8 +926,7 @@ def create_rsvp(event_id, payload: RSVPSchema):
         if not event.is_public:
             invitation = EventInvitation.query.filter_by(
                 event_id=event_id,
-                invitee_id=current_user.id,
-                deletedAt=None
+                invitee_id=current_user.id
             ).first()
 
             if not invitation and current_user.id != event.creator_id:
@@ -435,34 +934,60 @@ def create_rsvp(event_id, payload: RSVPSchema):
 
         status = payload.status
 
-        # Verificar si hay cupo disponible
-        if status == 'confirmed' and event.max_attendees:
-            confirmed_count = EventRSVP.query.filter_by(
-                event_id=event_id,
-                status='confirmed',
-                deletedAt=None
-            ).count()
-
-            if confirmed_count >= event.max_attendees:
-                return jsonify({'error': 'El evento está lleno'}), 400
-
-        # Verificar si ya existe un RSVP
-        existing_rsvp = EventRSVP.query.filter_by(
-            event_id=event_id,
-            user_id=current_user.id,
-            deletedAt=None
-        ).first()
+        # En una serie se responde a una sesión concreta (plazas por sesión)
+        occurrence = None
+        if event.recurrence_rule:
+            if payload.occurrence_start is None:
+                return jsonify({'error': 'Indica la sesión (occurrence_start) del evento recurrente'}), 400
+            occurrence = get_or_create_occurrence(event, payload.occurrence_start)
+            if occurrence is None or occurrence.is_cancelled:
+                return jsonify({'error': 'La sesión no existe o está cancelada'}), 400
+        elif payload.occurrence_start is not None:
+            return jsonify({'error': 'El evento no es recurrente'}), 400
+        occurrence_id = occurrence.id if occurrence else None
+
+        # Verificar si ya existe un RSVP (también cancelado: la constraint
+        # única incluye los soft-deleted). FOR UPDATE serializa los cambios
+        # de estado de un mismo usuario sobre el mismo evento.
+        existing_rsvp = (
+            EventRSVP.query
+            .filter_by(event_id=event_id, user_id=current_user.id, occurrence_id=occurrence_id)
+            .execution_options(include_soft_deleted=True)
+            .with_for_update()
+            .first()
+        )
+        old_status = existing_rsvp.status if existing_rsvp and existing_rsvp.deletedAt is None else None
+
+        # Reservar/liberar plaza con un UPDATE condicional (sin sobreventa).
+        # Si no cabe, a la lista de espera en vez de devolver error (la lista
+        # de espera es del evento completo: una sesión llena se rechaza).
+        if not apply_status_change(event_id, old_status, status, occurrence_id=occurrence_id):
+            db.session.rollback()
+            if occurrence_id is not None:
+                return jsonify({'error': 'La sesión está completa'}), 400
+            return _waitlisted_response(event_id, current_user.id)
+
+        promoted = []
+        if occurrence_id is None:
+            # Ya no necesita esperar plaza (confirmado o ha cambiado de idea)
+            leave_waitlist(current_user.id, event_id=event_id)
+
+            # Si deja una plaza libre, entra el primero de la lista de espera
+            if old_status == 'confirmed' and status != 'confirmed':
+                promoted = _promote_waitlist(event)
 
         if existing_rsvp:
-            # Actualizar RSVP existente
+            # Actualizar (o reactivar) RSVP existente
             existing_rsvp.status = status
             existing_rsvp.response_date = datetime.now(timezone.utc)
             existing_rsvp.notes = payload.notes
+            existing_rsvp.deletedAt = None
         else:
             # Crear nuevo RSVP
             rsvp = EventRSVP(
                 event_id=event_id,
                 user_id=current_user.id,
+                occurrence_id=occurrence_id,
                 status=status,
                 response_date=datetime.now(timezone.utc),
                 notes=payload.notes,
@@ -470,24 +995,29 @@ def create_rsvp(event_id, payload: RSVPSchema):
             db.session.add(rsvp)
 
         # Crear notificación para el creador del evento en la misma transacción
+        # (agrupada por evento: "N personas han respondido a ...")
         if current_user.id != event.creator_id:
-            notification = Notification(
-                user_id=event.creator_id,
-                type='event_rsvp',
-                title='Nueva respuesta a tu evento',
+            add_notification(
+                event.creator_id,
+                'event_rsvp',
+                'Nueva respuesta a tu evento',
                 message=f"{current_user.first_name} {current_user.last_name} ha {status} asistencia a '{event.title}'",
                 link=f'/events/{event_id}',
-                data={'event_id': event_id, 'user_id': current_user.id, 'status': status}
+                data={'event_id': event_id, 'user_id': current_user.id, 'status': status},
+                subject=f'event:{event_id}',
+                actor_id=current_user.id,
+                rollup=lambda count: f"{count} personas han respondido a '{event.title}'"
             )
-            db.session.add(notification)
 
         db.session.commit()
-        invalidate_event_confirmed_count(event_id)
+        invalidate_event_detail(event_id)
+        _push_promoted(event, promoted)
 
         return jsonify({
             'message': f'Asistencia {status} correctamente',
             'rsvp': {
                 'event_id': event_id,
+                'occurrence_start': occurrence.occurrence_start.isoformat() if occurrence else None,
                 'status': status
             }
         }), 200 if existing_rsvp else 201
@@ -501,21 +1031,52 @@ def create_rsvp(event_id, payload: RSVPSchema):
 @bp.route('/api/v1/events/<int:event_id>/rsvp', methods=['DELETE'])
 @login_required
 def cancel_rsvp(event_id):
-    """Cancelar asistencia a un evento"""
+    """Cancelar asistencia a un evento (o a una sesión con `?occurrence_start=`)"""
     try:
+        occurrence_id = None
+        try:
+            occurrence_start = _parse_datetime_arg('occurrence_start')
+        except ValueError:
+            return jsonify({'error': 'occurrence_start inválido'}), 400
+        if occurrence_start is not None:
+            occurrence = EventOccurrence.query.filter_by(
+                event_id=event_id,
+                occurrence_start=occurrence_start
+            ).first()
+            if not occurrence:
+                return jsonify({'error': 'No tienes confirmación para esta sesión'}), 404
+            occurrence_id = occurrence.id
+
         rsvp = EventRSVP.query.filter_by(
             event_id=event_id,
             user_id=current_user.id,
-            deletedAt=None
-        ).first()
+            occurrence_id=occurrence_id
+        ).with_for_update().first()
 
         if not rsvp:
             return jsonify({'error': 'No tienes confirmación para este evento'}), 404
 
-        # Soft delete
+        # Sesión de una serie: solo su contador (sin lista de espera)
+        if occurrence_id is not None:
+            apply_status_change(event_id, rsvp.status, None, occurrence_id=occurrence_id)
+            rsvp.deletedAt = datetime.now(timezone.utc)
+            db.session.commit()
+            return jsonify({'message': 'Asistencia cancelada correctamente'}), 200
+
+        # Soft delete (liberando la plaza si estaba confirmado y
+        # promocionando la lista de espera en la misma transacción)
+        promoted = []
+        event = None
+        if rsvp.status == 'confirmed':
+            release_seat(event_id)
+            event = db.session.get(Event, event_id)
+            if event:
+                promoted = _promote_waitlist(event)
         rsvp.deletedAt = datetime.now(timezone.utc)
         db.session.commit()
-        invalidate_event_confirmed_count(rsvp.event_id)
+        invalidate_event_detail(event_id)
+        if event:
+            _push_promoted(event, promoted)
 
         return jsonify({'message': 'Asistencia cancelada correctamente'}), 200
 
@@ -525,6 +1086,41 @@ def cancel_rsvp(event_id):
         return jsonify({'error': 'Error al cancelar la asistencia'}), 500
 
 
+# ==================== Lista de espera ====================
+
+@bp.route('/api/v1/events/<int:event_id>/waitlist', methods=['GET'])
+@login_required
+def get_event_waitlist_status(event_id):
+    """Posición del usuario en la lista de espera del evento"""
+    try:
+        return jsonify({
+            'event_id': event_id,
+            'position': waitlist_position(current_user.id, event_id=event_id),
+            'total': waitlist_size(event_id=event_id)
+        }), 200
+
+    except Exception as e:
+        logger.getChild('events').error(f"Error obteniendo lista de espera: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error interno'}), 500
+
+
+@bp.route('/api/v1/events/<int:event_id>/waitlist', methods=['DELETE'])
+@login_required
+def leave_event_waitlist(event_id):
+    """Salir de la lista de espera del evento"""
+    try:
+        if not leave_waitlist(current_user.id, event_id=event_id):
+            return jsonify({'error': 'No estás en la lista de espera de este evento'}), 404
+
+        db.session.commit()
+        return jsonify({'message': 'Has salido de la lista de espera'}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.getChild('events').error(f"Error saliendo de la lista de espera: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error al salir de la lista de espera'}), 500
+
+
 # ==================== Invitaciones ====================
 
 @bp.route('/api/v1/events/<int:event_id>/invitations', methods=['POST'])
@@ -535,8 +1131,7 @@ def send_invitation(event_id, payload: EventInvitationSchema):
     try:
         event = Event.query.filter_by(
             id=event_id,
-            creator_id=current_user.id,
-            deletedAt=None
+            creator_id=current_user.id
         ).first()
 
         if not event:
@@ -547,8 +1142,7 @@ def send_invitation(event_id, payload: EventInvitationSchema):
         # Verificar que el invitado existe
         invitee = User.query.filter_by(
             id=invitee_id,
-            is_enabled=True,
-            deletedAt=None
+            is_enabled=True
         ).first()
 
         if not invitee:
@@ -561,8 +1155,7 @@ def send_invitation(event_id, payload: EventInvitationSchema):
         # Verificar si ya existe una invitación
         existing_invitation = EventInvitation.query.filter_by(
             event_id=event_id,
-            invitee_id=invitee_id,
-            deletedAt=None
+            invitee_id=invitee_id
         ).first()
 
         if existing_invitation:
@@ -607,6 +1200,81 @@ def send_invitation(event_id, payload: EventInvitationSchema):
         return jsonify({'error': 'Error al enviar la invitación'}), 500
 
 
+@bp.route('/api/v1/events/<int:event_id>/invitations/bulk', methods=['POST'])
+@login_required
+@validate_body(BulkEventInvitationSchema)
+def send_bulk_invitations(event_id, payload: BulkEventInvitationSchema):
+    """Invitar a varios usuarios a un evento en una sola petición (ver app.invitations)"""
+    try:
+        event = Event.query.filter_by(
+            id=event_id,
+            creator_id=current_user.id
+        ).first()
+
+        if not event:
+            return jsonify({'error': 'Evento no encontrado o no tienes permisos'}), 404
+
+        # Una sola query para validar a todos (y nunca a uno mismo)
+        invitee_ids, invalid_ids = resolve_invitees(payload.invitee_ids, exclude_ids=[current_user.id])
+
+        created = []
+        if invitee_ids:
+            now = datetime.now(timezone.utc)
+            table = EventInvitation.__table__
+            stmt = (
+                pg_insert(table)
+                .values([{
+                    'event_id': event_id,
+                    'inviter_id': current_user.id,
+                    'invitee_id': invitee_id,
+                    'message': payload.message,
+                    'status': 'pending',
+                    'createdAt': now,
+                    'updatedAt': now,
+                } for invitee_id in invitee_ids])
+                .on_conflict_do_nothing(constraint='unique_invitation_per_event')
+                .returning(*audited_returning(table))
+            )
+            created = db.session.execute(stmt).all()
+            record_core_rows(db.session, EventInvitation, created)
+
+        invitation_by_user = {row.invitee_id: row.id for row in created}
+        add_invitation_notifications(
+            'event_invitation',
+            'Invitación a evento',
+            f"{current_user.first_name} {current_user.last_name} te ha invitado a '{event.title}'",
+            f'/events/{event_id}',
+            {
+                invitee_id: {'event_id': event_id, 'invitation_id': invitation_id}
+                for invitee_id, invitation_id in invitation_by_user.items()
+            }
+        )
+        db.session.commit()
+
+        # Push y emails en un solo lote cada uno, ya fuera de la transacción
+        invited_ids = [invitee_id for invitee_id in invitee_ids if invitee_id in invitation_by_user]
+        if invited_ids:
+            send_event_invitation_pushes(
+                invited_ids, event.title, f"{current_user.first_name} {current_user.last_name}"
+            )
+            enqueue_invitation_emails('event', event_id, current_user.id, invited_ids)
+
+        return jsonify({
+            'message': f'{len(invited_ids)} invitaciones enviadas',
+            'invitations': [
+                {'id': invitation_by_user[invitee_id], 'event_id': event_id, 'invitee_id': invitee_id}
+                for invitee_id in invited_ids
+            ],
+            'already_invited': [invitee_id for invitee_id in invitee_ids if invitee_id not in invitation_by_user],
+            'invalid': invalid_ids,
+        }), 201 if invited_ids else 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.getChild('events').error(f"Error enviando invitaciones en lote: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error al enviar las invitaciones'}), 500
+
+
 @bp.route('/api/v1/events/invitations/<int:invitation_id>/respond', methods=['PUT'])
 @login_required
 @validate_body(EventInvitationResponseSchema)
@@ -615,8 +1283,7 @@ def respond_invitation(invitation_id, payload: EventInvitationResponseSchema):
     try:
         invitation = EventInvitation.query.filter_by(
             id=invitation_id,
-            invitee_id=current_user.id,
-            deletedAt=None
+            invitee_id=current_user.id
         ).first()
 
         if not invitation:
@@ -625,22 +1292,37 @@ def respond_invitation(invitation_id, payload: EventInvitationResponseSchema):
         status = payload.status
         invitation.status = status
 
-        # Si acepta, crear RSVP automáticamente en la misma transacción
+        # Si acepta, confirmar asistencia automáticamente en la misma transacción
         if status == 'accepted':
-            existing_rsvp = EventRSVP.query.filter_by(
-                event_id=invitation.event_id,
-                user_id=current_user.id,
-                deletedAt=None
-            ).first()
-
-            if not existing_rsvp:
-                rsvp = EventRSVP(
-                    event_id=invitation.event_id,
-                    user_id=current_user.id,
-                    status='confirmed',
-                    response_date=datetime.now(timezone.utc)
-                )
-                db.session.add(rsvp)
+            existing_rsvp = (
+                EventRSVP.query
+                .filter_by(event_id=invitation.event_id, user_id=current_user.id, occurrence_id=None)
+                .execution_options(include_soft_deleted=True)
+                .with_for_update()
+                .first()
+            )
+            old_status = existing_rsvp.status if existing_rsvp and existing_rsvp.deletedAt is None else None
+
+            if old_status != 'confirmed':
+                if not apply_status_change(invitation.event_id, old_status, 'confirmed'):
+                    db.session.rollback()
+                    invitation = db.session.get(EventInvitation, invitation_id)
+                    invitation.status = status
+                    return _waitlisted_response(invitation.event_id, current_user.id)
+                leave_waitlist(current_user.id, event_id=invitation.event_id)
+
+                if existing_rsvp:
+                    existing_rsvp.status = 'confirmed'
+                    existing_rsvp.response_date = datetime.now(timezone.utc)
+                    existing_rsvp.deletedAt = None
+                else:
+                    rsvp = EventRSVP(
+                        event_id=invitation.event_id,
+                        user_id=current_user.id,
+                        status='confirmed',
+                        response_date=datetime.now(timezone.utc)
+                    )
+                    db.session.add(rsvp)
 
         # Notificar al creador del evento en la misma transacción
         notification = Notification(
@@ -654,7 +1336,7 @@ def respond_invitation(invitation_id, payload: EventInvitationResponseSchema):
         db.session.add(notification)
         db.session.commit()
         if status == 'accepted':
-            invalidate_event_confirmed_count(invitation.event_id)
+            invalidate_event_detail(invitation.event_id)
 
         return jsonify({
             'message': f'Invitación {status} correctamente'
@@ -677,7 +1359,7 @@ def get_my_invitations():
                 selectinload(EventInvitation.event),
                 selectinload(EventInvitation.inviter),
             )
-            .filter_by(invitee_id=current_user.id, status='pending', deletedAt=None)
+            .filter_by(invitee_id=current_user.id, status='pending')
             .all()
         )
 
@@ -717,8 +1399,7 @@ def get_event_messages(event_id):
     try:
         # Verificar que el usuario tiene acceso al evento
         event = Event.query.filter_by(
-            id=event_id,
-            deletedAt=None
+            id=event_id
         ).first()
 
         if not event:
@@ -728,8 +1409,7 @@ def get_event_messages(event_id):
         rsvp = EventRSVP.query.filter_by(
             event_id=event_id,
             user_id=current_user.id,
-            status='confirmed',
-            deletedAt=None
+            status='confirmed'
         ).first()
 
         if not rsvp and current_user.id != event.creator_id:
@@ -739,7 +1419,7 @@ def get_event_messages(event_id):
         messages = (
             EventMessage.query
             .options(selectinload(EventMessage.sender))
-            .filter_by(event_id=event_id, deletedAt=None)
+            .filter_by(event_id=event_id)
             .order_by(EventMessage.createdAt.asc())
             .all()
         )
@@ -771,8 +1451,7 @@ def send_event_message(event_id, payload: MessageSendSchema):
     try:
         # Verificar que el usuario es asistente confirmado o creador
         event = Event.query.filter_by(
-            id=event_id,
-            deletedAt=None
+            id=event_id
         ).first()
 
         if not event:
@@ -781,8 +1460,7 @@ def send_event_message(event_id, payload: MessageSendSchema):
         rsvp = EventRSVP.query.filter_by(
             event_id=event_id,
             user_id=current_user.id,
-            status='confirmed',
-            deletedAt=None
+            status='confirmed'
         ).first()
 
         if not rsvp and current_user.id != event.creator_id:
@@ -825,15 +1503,12 @@ def get_my_events():
     """Obtener eventos creados por el usuario"""
     try:
         events = Event.query.filter_by(
-            creator_id=current_user.id,
-            deletedAt=None
+            creator_id=current_user.id
         ).order_by(Event.start_date.desc()).all()
 
-        counts_by_event = _confirmed_counts_for_events([e.id for e in events])
-
         events_data = []
         for event in events:
-            confirmed_count = counts_by_event.get(event.id, 0)
+            confirmed_count = event.confirmed_count
 
             events_data.append({
                 'id': event.id,
@@ -867,8 +1542,11 @@ def get_my_rsvps():
     try:
         rsvps = (
             EventRSVP.query
-            .options(selectinload(EventRSVP.event).selectinload(Event.creator))
-            .filter_by(user_id=current_user.id, deletedAt=None)
+            .options(
+                selectinload(EventRSVP.event).selectinload(Event.creator),
+                selectinload(EventRSVP.occurrence),
+            )
+            .filter_by(user_id=current_user.id)
             .all()
         )
 
@@ -884,18 +1562,25 @@ def get_my_rsvps():
                         'name': creator_summary['name'],
                         'username': creator_summary['username'],
                     }
+                # RSVP a una sesión: fechas y título de esa sesión
+                shown = rsvp.event
+                if rsvp.occurrence is not None:
+                    shown = Occurrence(rsvp.event, rsvp.occurrence.occurrence_start, rsvp.occurrence)
                 events_data.append({
                     'rsvp_id': rsvp.id,
                     'status': rsvp.status,
                     'response_date': rsvp.response_date.isoformat() if rsvp.response_date else None,
+                    'occurrence_start': (
+                        rsvp.occurrence.occurrence_start.isoformat() if rsvp.occurrence is not None else None
+                    ),
                     'event': {
                         'id': rsvp.event.id,
-                        'title': rsvp.event.title,
-                        'description': rsvp.event.description,
+                        'title': shown.title,
+                        'description': shown.description,
                         'event_type': rsvp.event.event_type,
                         'creator': creator_summary,
-                        'start_date': rsvp.event.start_date.isoformat() if rsvp.event.start_date else None,
-                        'end_date': rsvp.event.end_date.isoformat() if rsvp.event.end_date else None,
+                        'start_date': shown.start_date.isoformat() if shown.start_date else None,
+                        'end_date': shown.end_date.isoformat() if shown.end_date else None,
                         'is_online': rsvp.event.is_online,
                         'location': {
                             'city': rsvp.event.city,
@@ -913,3 +1598,125 @@ def get_my_rsvps():
     except Exception as e:
         logger.getChild('events').error(f"Error obteniendo mis RSVPs: {str(e)}", exc_info=True)
         return jsonify({'error': 'Error interno'}), 500
+
+
+# ==================== Feeds iCalendar ====================
+
+ICAL_CITY_WINDOW_DAYS = 30
+
+
+def _ics_response(etag, last_modified, rows_factory, name, filename, cache_control):
+    """
+    Respuesta `.ics` condicional: 304 si el cliente ya tiene esta versión
+    (sin cargar eventos) o el calendario generado en streaming.
+    """
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        frontend_url = current_app.config.get('FRONTEND_BASE_URL') or 'https://localtalent.es'
+        uid_domain = urlparse(frontend_url).hostname or 'localtalent.es'
+        response = Response(
+            stream_with_context(generate_calendar(rows_factory(), name, frontend_url, uid_domain)),
+            mimetype='text/calendar'
+        )
+        response.headers['Content-Disposition'] = f'inline; filename="{filename}"'
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
+@bp.route('/api/v1/events/my-rsvps.ics', methods=['GET'])
+def get_my_rsvps_ics():
+    """
+    Calendario de los eventos confirmados o pendientes del usuario.
+    Los clientes de calendario no tienen sesión: se autentican con el
+    `token` de la URL de suscripción (ver `get_my_rsvps_feed_url`).
+    """
+    try:
+        token = request.args.get('token')
+        if token:
+            user = User.verify_calendar_feed_token(token)
+        elif current_user.is_authenticated:
+            user = current_user
+        else:
+            user = None
+
+        if user is None:
+            return jsonify({'error': 'No autorizado'}), 401
+
+        user_id = user.id
+        etag, last_modified = user_feed_validators(user_id)
+        return _ics_response(
+            etag,
+            last_modified,
+            lambda: user_feed_rows(user_id),
+            'LocalTalent - Mis eventos',
+            'my-rsvps.ics',
+            'private, max-age=300'
+        )
+
+    except Exception as e:
+        logger.getChild('events').error(f"Error generando calendario de RSVPs: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error interno'}), 500
+
+
+def _feed_url(user):
+    """URL de suscripción con el token de la versión vigente del usuario."""
+    return url_for('events.get_my_rsvps_ics', token=user.get_calendar_feed_token(), _external=True)
+
+
+@bp.route('/api/v1/events/my-rsvps/feed-url', methods=['GET'])
+@login_required
+def get_my_rsvps_feed_url():
+    """URL de suscripción al calendario personal (.ics)"""
+    try:
+        return jsonify({'url': _feed_url(current_user)}), 200
+
+    except Exception as e:
+        logger.getChild('events').error(f"Error generando URL del calendario: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error interno'}), 500
+
+
+@bp.route('/api/v1/events/my-rsvps/feed-url', methods=['POST'])
+@login_required
+def rotate_my_rsvps_feed_url():
+    """Revocar las URLs del calendario personal emitidas y devolver una nueva"""
+    try:
+        current_user.rotate_calendar_feed()
+        db.session.commit()
+        db.session.refresh(current_user)
+
+        logger.getChild('events').info(f"URL de calendario rotada para usuario {current_user.id}")
+        return jsonify({'url': _feed_url(current_user)}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.getChild('events').error(f"Error rotando URL del calendario: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error interno'}), 500
+
+
+@bp.route('/api/v1/events/city/<string:city>.ics', methods=['GET'])
+def get_city_events_ics(city):
+    """Calendario público con los eventos de una ciudad (últimos 30 días y futuros)"""
+    try:
+        # Ventana con granularidad de día: el contenido (y el ETag) no cambia
+        # en cada petición
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        since = today - timedelta(days=ICAL_CITY_WINDOW_DAYS)
+
+        etag, last_modified = city_feed_validators(city, since)
+        return _ics_response(
+            etag,
+            last_modified,
+            lambda: city_feed_rows(city, since),
+            f'LocalTalent - {city}',
+            f'{secure_filename(city) or "city"}.ics',
+            'public, max-age=300'
+        )
+
+    except Exception as e:
+        logger.getChild('events').error(f"Error generando calendario de la ciudad: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error interno'}), 500
@@ -0,0 +1,103 @@
+"""
+Invitaciones en lote a eventos y proyectos
+
+Invitar a un grupo de N personas eran N peticiones, cada una con su
+comprobación del usuario, su INSERT de notificación y su commit. En lote:
+
+- Los invitados se validan con UNA query `IN`.
+- Las invitaciones (o membresías pendientes) se insertan con un único
+  INSERT ... ON CONFLICT DO NOTHING sobre la constraint única: las que ya
+  existían se saltan sin error y RETURNING dice cuáles se han creado.
+- Las notificaciones en BD se añaden con un solo `add_all`.
+- Tras el commit, un único lote de push (`send_push_to_users`) y una única
+  tarea de Celery para los emails (`email_tasks.send_invitation_emails`).
+
+Las filas se insertan con Core: igual que la promoción de la lista de
+espera, no pasan por los listeners ORM de `Base`, así que `createdAt` y
+`updatedAt` se rellenan a mano, y tampoco por el `after_flush` de la
+auditoría: el RETURNING pide las columnas de `audited_returning` y las filas
+creadas se auditan con `app.audit.record_core_rows`.
+
+Las funciones no hacen commit salvo que se diga lo contrario.
+"""
+from flask import current_app
+
+from app import db
+from app.logger_config import logger
+from app.models import User, Notification
+
+
+def resolve_invitees(user_ids, exclude_ids=()):
+    """
+    Filtrar los usuarios invitables con una sola query
+
+    Args:
+        user_ids: IDs pedidos (sin duplicados, en el orden del cliente)
+        exclude_ids: IDs que nunca se invitan (p.ej. quien invita)
+
+    Returns:
+        tuple: (ids válidos en el orden pedido, ids descartados)
+    """
+    exclude_ids = set(exclude_ids)
+    candidates = [user_id for user_id in user_ids if user_id not in exclude_ids]
+    valid = set()
+    if candidates:
+        valid = {
+            row[0] for row in db.session.query(User.id).filter(
+                User.id.in_(candidates),
+                User.is_enabled.is_(True),
+                User.deletedAt.is_(None),
+            )
+        }
+    return (
+        [user_id for user_id in candidates if user_id in valid],
+        [user_id for user_id in user_ids if user_id not in valid],
+    )
+
+
+def add_invitation_notifications(notification_type, title, message, link, data_by_user):
+    """
+    Añadir en lote las notificaciones de invitación
+
+    Args:
+        data_by_user: {user_id: data} de cada invitado
+    """
+    db.session.add_all([
+        Notification(
+            user_id=user_id,
+            type=notification_type,
+            title=title,
+            message=message,
+            link=link,
+            data=data,
+            is_read=False
+        )
+        for user_id, data in data_by_user.items()
+    ])
+
+
+def enqueue_invitation_emails(kind, target_id, inviter_id, user_ids):
+    """
+    Encolar en UNA tarea de Celery los emails de las invitaciones creadas
+    (llamar después del commit). El push va aparte, en un solo lote, con
+    `send_event_invitation_pushes`/`send_project_invitation_pushes`.
+
+    Args:
+        kind: 'event' o 'project'
+        target_id: ID del evento o proyecto
+        inviter_id: ID de quien invita
+        user_ids: Invitados
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return False
+    try:
+        current_app.celery.send_task(
+            'email_tasks.send_invitation_emails',
+            args=[kind, target_id, inviter_id, user_ids],
+            queue='default'
+        )
+        return True
+    except Exception as e:
+        logger.getChild('invitations').warning(f"No se pudieron encolar los emails de invitación: {str(e)}")
+        return False
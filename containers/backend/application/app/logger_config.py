@@ -1,15 +1,112 @@
+"""
+Logging de la aplicación
+
+Los loggers `cve-sentinel.*` no escriben en disco desde la petición: un
+`QueueHandler` deja el registro en una cola y un único hilo
+(`QueueListener`) lo formatea y lo escribe en el fichero que toca. El
+fichero se vacía (flush) cuando la cola se queda vacía o cada
+`FLUSH_EVERY` registros, no en cada línea.
+
+Cada logger de `loggers` tiene su fichero (`auth.log`, `email.log`...); el
+resto de hijos (`events`, `socketio`, `sql`...) van a `main.log`.
+
+Variables de entorno (se leen al importar, antes que la config de Flask):
+
+- `LOG_FORMAT=json`: una línea JSON por registro en vez del formato de texto.
+- `LOG_SAMPLE_EVERY=N`: de los INFO de `LOG_SAMPLED_LOGGERS` (por defecto
+  `auth,socketio`) se escribe uno de cada N por línea de código. WARNING y
+  superiores nunca se muestrean.
+"""
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+import queue
+
+FLUSH_EVERY = 500
+
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler que no hace flush por registro (lo decide el listener)."""
+
+    def flush(self):
+        pass
+
+    def flush_buffer(self):
+        super().flush()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'pid': record.process,
+            'module': record.module,
+            'line': record.lineno,
+            # El QueueHandler ya ha añadido la traza de la excepción al mensaje
+            'msg': record.getMessage(),
+        }
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Deja pasar uno de cada `every` INFO por línea de código de los loggers indicados."""
+
+    def __init__(self, every, logger_names):
+        super().__init__()
+        self.every = every
+        self.logger_names = logger_names
+        self.counts = {}
+
+    def filter(self, record):
+        if self.every <= 1 or record.levelno != logging.INFO or record.name not in self.logger_names:
+            return True
+        site = (record.pathname, record.lineno)
+        count = self.counts.get(site, 0)
+        self.counts[site] = count + 1
+        return count % self.every == 0
+
+
+class RoutingHandler(logging.Handler):
+    """Escribe cada registro en el fichero de su logger (o en `main.log`)."""
+
+    def __init__(self, handlers, default):
+        super().__init__()
+        self.handlers = handlers
+        self.default = default
+        self.pending = 0
 
-class FlushRotatingFileHandler(RotatingFileHandler):
     def emit(self, record):
-        super().emit(record)
-        self.flush()
+        name = record.name
+        while name not in self.handlers and '.' in name:
+            name = name.rsplit('.', 1)[0]
+        self.handlers.get(name, self.default).handle(record)
+        self.pending += 1
+        if self.pending >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        for handler in set(self.handlers.values()):
+            handler.flush_buffer()
+        self.pending = 0
+
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener que hace flush al quedarse sin registros pendientes."""
+
+    def dequeue(self, block):
+        if block and self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+        return self.queue.get(block)
+
 
 def setup_logger():
     basedir = os.path.abspath(os.path.dirname(__file__))
-    
+
     if os.environ.get('UNIT_TESTS', 'False').lower() == 'true':
         log_subdir = 'unit'
     elif os.environ.get('INTEGRATION_TESTS', 'False').lower() == 'true':
@@ -23,7 +120,10 @@ def setup_logger():
 
     max_bytes = 1024 * 1024 * 1024  # 1GB
     backup_count = 10
-    formatter = logging.Formatter('%(asctime)s - [%(process)d] %(levelname)s: %(message)s [%(module)s:%(lineno)d - %(name)s]')
+    if os.environ.get('LOG_FORMAT', 'text').lower() == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - [%(process)d] %(levelname)s: %(message)s [%(module)s:%(lineno)d - %(name)s]')
 
     main_logger = logging.getLogger('cve-sentinel')
     main_logger.setLevel(logging.INFO)
@@ -44,24 +144,46 @@ def setup_logger():
         'products': 'cve-sentinel.products'
     }
 
-    handlers = {}
-
+    file_handlers = {}
     for log_name, logger_name in loggers.items():
-        logger_obj = logging.getLogger(logger_name)
-        handler = FlushRotatingFileHandler(
+        handler = BufferedRotatingFileHandler(
             os.path.join(log_dir, f'{log_name}.log'),
             maxBytes=max_bytes,
             backupCount=backup_count,
             encoding='utf-8'
         )
         handler.setFormatter(formatter)
-        logger_obj.addHandler(handler)
-        logger_obj.propagate = False
-        handlers[log_name] = handler
+        file_handlers[logger_name] = handler
+
+    sampled = {
+        f'cve-sentinel.{name.strip()}'
+        for name in os.environ.get('LOG_SAMPLED_LOGGERS', 'auth,socketio').split(',') if name.strip()
+    }
+    queue_handler = QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(SamplingFilter(int(os.environ.get('LOG_SAMPLE_EVERY', 1)), sampled))
+
+    # Todos los `cve-sentinel.*` suben hasta aquí: una sola cola
+    for logger_name in loggers.values():
+        logging.getLogger(logger_name).propagate = True
+    main_logger.addHandler(queue_handler)
+
+    router = RoutingHandler(file_handlers, default=file_handlers['cve-sentinel.main'])
+    listener = BatchingQueueListener(queue_handler.queue, router)
+    listener.start()
+    # Al salir se vacía la cola antes de cerrar
+    atexit.register(lambda: listener.stop())
+
+    def _restart_in_child():
+        # Tras un fork (hijos de Celery) el hilo escritor no existe en el hijo
+        nonlocal listener
+        queue_handler.queue = queue.SimpleQueue()
+        listener = BatchingQueueListener(queue_handler.queue, router)
+        listener.start()
 
-    for handler in handlers.values():
-        main_logger.addHandler(handler)
+    if hasattr(os, 'register_at_fork'):
+        # Vaciar antes para que el hijo no herede (y repita) líneas en buffer
+        os.register_at_fork(before=router.flush, after_in_child=_restart_in_child)
 
     return main_logger
 
-logger = setup_logger()
\ No newline at end of file
+logger = setup_logger()
@@ -1,10 +1,12 @@
-from flask import jsonify, request
+from flask import current_app, jsonify, request
 from flask_login import login_required, current_user
 
 from app.main import bp
 from app import db
 from app.models import Feedback
 from app.logger_config import logger
+from app.metrics import metrics_response
+from app.rate_limit import limiter
 
 
 @bp.route('/healthcheck', methods=['GET'])
@@ -13,6 +15,17 @@ def healthcheck():
     return jsonify({"status": "OK"}), 200
 
 
+@bp.route('/metrics', methods=['GET'])
+@limiter.exempt
+def metrics():
+    """Métricas Prometheus de todos los procesos (ver app/metrics.py)."""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'error': 'No autorizado'}), 401
+    body, content_type = metrics_response(current_app)
+    return body, 200, {'Content-Type': content_type}
+
+
 @bp.route('/api/v1/submit-feedback', methods=['POST'])
 @login_required
 def submit_feedback():
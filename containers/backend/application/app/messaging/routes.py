@@ -170,8 +170,7 @@ def get_messages(conversation_id):
     try:
         # Verificar que el usuario es participante de la conversación
         conversation = Conversation.query.filter_by(
-            id=conversation_id,
-            deletedAt=None
+            id=conversation_id
         ).filter(
             or_(
                 Conversation.participant1_id == current_user.id,
@@ -190,7 +189,7 @@ def get_messages(conversation_id):
         messages = (
             Message.query
             .options(selectinload(Message.sender))
-            .filter_by(conversation_id=conversation_id, deletedAt=None)
+            .filter_by(conversation_id=conversation_id)
             .order_by(Message.createdAt.desc())
             .limit(limit)
             .offset(offset)
@@ -214,7 +213,7 @@ def get_messages(conversation_id):
 
         return jsonify({
             'messages': messages_data,
-            'total': Message.query.filter_by(conversation_id=conversation_id, deletedAt=None).count()
+            'total': Message.query.filter_by(conversation_id=conversation_id).count()
         }), 200
     except Exception as e:
         logger.getChild('messaging').error(f"Error obteniendo mensajes: {str(e)}", exc_info=True)
@@ -229,8 +228,7 @@ def send_message(conversation_id, payload: MessageSendSchema):
     try:
         # Verificar que el usuario es participante de la conversación
         conversation = Conversation.query.filter_by(
-            id=conversation_id,
-            deletedAt=None
+            id=conversation_id
         ).filter(
             or_(
                 Conversation.participant1_id == current_user.id,
@@ -287,8 +285,7 @@ def mark_messages_as_read(conversation_id):
     try:
         # Verificar que el usuario es participante de la conversación
         conversation = Conversation.query.filter_by(
-            id=conversation_id,
-            deletedAt=None
+            id=conversation_id
         ).filter(
             or_(
                 Conversation.participant1_id == current_user.id,
@@ -4,6 +4,8 @@ from flask_socketio import emit, join_room, leave_room, disconnect
 from app import socketio, db
 from app.models import User, Conversation, Message
 from app.logger_config import logger
+from app.metrics import socket_connected, socket_disconnected
+from app.profiling import profile_socket_event
 from app.notifications.routes import create_notification
 from datetime import datetime, timezone
 from sqlalchemy import or_
@@ -19,6 +21,7 @@ def handle_connect():
     logger.getChild('socketio').info(f'Usuario {current_user.id} conectado via WebSocket')
     # Unirse a una sala personal para notificaciones
     join_room(f'user_{current_user.id}')
+    socket_connected()
     emit('connected', {'user_id': current_user.id})
 
 
@@ -28,9 +31,11 @@ def handle_disconnect():
     if current_user.is_authenticated:
         logger.getChild('socketio').info(f'Usuario {current_user.id} desconectado')
         leave_room(f'user_{current_user.id}')
+        socket_disconnected()
 
 
 @socketio.on('join_conversation')
+@profile_socket_event
 def handle_join_conversation(data):
     """Unirse a una sala de conversación específica"""
     if not current_user.is_authenticated:
@@ -44,8 +49,7 @@ def handle_join_conversation(data):
 
     # Verificar que el usuario es participante de la conversación
     conversation = Conversation.query.filter_by(
-        id=conversation_id,
-        deletedAt=None
+        id=conversation_id
     ).filter(
         or_(
             Conversation.participant1_id == current_user.id,
@@ -64,6 +68,7 @@ def handle_join_conversation(data):
 
 
 @socketio.on('leave_conversation')
+@profile_socket_event
 def handle_leave_conversation(data):
     """Salir de una sala de conversación"""
     if not current_user.is_authenticated:
@@ -81,6 +86,7 @@ def handle_leave_conversation(data):
 
 
 @socketio.on('send_message')
+@profile_socket_event
 def handle_send_message(data):
     """Enviar un mensaje en tiempo real"""
     if not current_user.is_authenticated:
@@ -97,8 +103,7 @@ def handle_send_message(data):
     try:
         # Verificar que el usuario es participante de la conversación
         conversation = Conversation.query.filter_by(
-            id=conversation_id,
-            deletedAt=None
+            id=conversation_id
         ).filter(
             or_(
                 Conversation.participant1_id == current_user.id,
@@ -152,7 +157,11 @@ def handle_send_message(data):
             title=f'Nuevo mensaje de {current_user.first_name} {current_user.last_name}',
             message=content[:100] + ('...' if len(content) > 100 else ''),
             link=f'/messages?conversation={conversation_id}',
-            data={'conversation_id': conversation_id, 'sender_id': current_user.id}
+            data={'conversation_id': conversation_id, 'sender_id': current_user.id},
+            subject=f'conversation:{conversation_id}',
+            actor_id=current_user.id,
+            rollup=lambda count: f'{count} mensajes nuevos',
+            distinct_actors=False
         )
 
         # Enviar notificación WebSocket al otro usuario
@@ -178,6 +187,7 @@ def handle_send_message(data):
 
 
 @socketio.on('mark_as_read')
+@profile_socket_event
 def handle_mark_as_read(data):
     """Marcar mensaje como leído"""
     if not current_user.is_authenticated:
@@ -197,8 +207,7 @@ def handle_mark_as_read(data):
 
         # Verificar que el usuario es participante de la conversación
         conversation = Conversation.query.filter_by(
-            id=message.conversation_id,
-            deletedAt=None
+            id=message.conversation_id
         ).filter(
             or_(
                 Conversation.participant1_id == current_user.id,
@@ -227,6 +236,7 @@ def handle_mark_as_read(data):
 
 
 @socketio.on('typing')
+@profile_socket_event
 def handle_typing(data):
     """Notificar que el usuario está escribiendo"""
     if not current_user.is_authenticated:
@@ -241,8 +251,7 @@ def handle_typing(data):
     try:
         # Verificar que el usuario es participante
         conversation = Conversation.query.filter_by(
-            id=conversation_id,
-            deletedAt=None
+            id=conversation_id
         ).filter(
             or_(
                 Conversation.participant1_id == current_user.id,
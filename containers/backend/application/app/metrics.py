@@ -0,0 +1,238 @@
+"""
+Métricas Prometheus del backend (`GET /metrics`)
+
+- `http_request_duration_seconds{endpoint, method, status}`: latencia por
+  endpoint de blueprint (`events.get_events`...). Las rutas inexistentes se
+  agrupan en `unmatched` para no disparar la cardinalidad.
+- `db_pool_connections_in_use{service}`: conexiones prestadas por el pool
+  de SQLAlchemy, sumando los procesos web o los hijos del worker de Celery.
+  `db_pool_connections_open` son las abiertas contra PostgreSQL/PgBouncer y
+  `db_pool_capacity` el máximo (`pool_size + max_overflow` por engine); si
+  `in_use` se acerca a `capacity` las peticiones esperan hasta
+  `DB_POOL_TIMEOUT` (ver app/db_pool.py). En modo PgBouncer no hay pool
+  propio y no se publica `db_pool_capacity`.
+- `cache_requests_total{family, result}`: aciertos/fallos de `app.cache`
+  por familia de clave (`rating`, `event_detail`).
+- `celery_task_duration_seconds{task, state}`: duración de las tareas
+  (`email_tasks.*` y el resto).
+- `socketio_connected_clients` y `socketio_emits_total{event}` (las
+  emisiones por segundo salen de `rate()` en Prometheus).
+
+Varios procesos (workers de gunicorn, hijos de Celery): con la variable de
+entorno `PROMETHEUS_MULTIPROC_DIR` cada proceso escribe sus valores en
+ficheros de ese directorio y `/metrics` los agrega al leerlos. Los
+directorios de `METRICS_EXTRA_DIRS` (el de Celery, montado como volumen
+compartido) se suman al agregado. Sin la variable se usa el registro en
+memoria del proceso (desarrollo). La limpieza del directorio al arrancar y
+`mark_process_dead` al morir un worker están en `gunicorn.conf.py`.
+"""
+import glob
+import os
+import time
+
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client.multiprocess import MultiProcessCollector, mark_process_dead
+from sqlalchemy.pool import Pool
+
+from app.event_registry import listen_once
+
+# Las métricas sin etiquetas crean su fichero al definirse
+if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+TASK_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 300, 900)
+
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Latencia de las peticiones HTTP',
+    ['endpoint', 'method', 'status'], buckets=HTTP_BUCKETS
+)
+DB_POOL_IN_USE = Gauge(
+    'db_pool_connections_in_use', 'Conexiones prestadas por el pool de SQLAlchemy',
+    ['service'], multiprocess_mode='livesum'
+)
+DB_POOL_OPEN = Gauge(
+    'db_pool_connections_open', 'Conexiones abiertas por el pool de SQLAlchemy',
+    ['service'], multiprocess_mode='livesum'
+)
+DB_POOL_CAPACITY = Gauge(
+    'db_pool_capacity', 'Conexiones máximas de los pools (pool_size + max_overflow)',
+    ['service'], multiprocess_mode='livesum'
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Lecturas de la caché por familia de clave',
+    ['family', 'result']
+)
+CELERY_TASK_DURATION = Histogram(
+    'celery_task_duration_seconds', 'Duración de las tareas de Celery',
+    ['task', 'state'], buckets=TASK_BUCKETS
+)
+SOCKETIO_CONNECTED = Gauge(
+    'socketio_connected_clients', 'Clientes Socket.IO conectados',
+    multiprocess_mode='livesum'
+)
+SOCKETIO_EMITS = Counter(
+    'socketio_emits_total', 'Eventos emitidos por Socket.IO',
+    ['event']
+)
+
+# 'web' en gunicorn; los hijos del worker de Celery pasan a 'celery'
+_service = 'web'
+_task_started = {}
+# Se publica en el primer checkout, cuando ya se sabe si es web o Celery
+_pool_capacity = None
+_capacity_reported = False
+
+
+def record_cache_lookup(family, hit):
+    CACHE_REQUESTS.labels(family=family, result='hit' if hit else 'miss').inc()
+
+
+def socket_connected():
+    SOCKETIO_CONNECTED.inc()
+
+
+def socket_disconnected():
+    SOCKETIO_CONNECTED.dec()
+
+
+class _MultiDirCollector:
+    """Agrega los ficheros de varios directorios multiproceso."""
+
+    def __init__(self, paths):
+        self.paths = paths
+
+    def collect(self):
+        files = []
+        for path in self.paths:
+            files.extend(glob.glob(os.path.join(path, '*.db')))
+        return MultiProcessCollector.merge(files, accumulate=True)
+
+
+def metrics_response(app):
+    """(cuerpo, content-type) con las métricas de todos los procesos."""
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not multiproc_dir:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+    registry = CollectorRegistry()
+    registry.register(_MultiDirCollector([multiproc_dir] + app.config.get('METRICS_EXTRA_DIRS', [])))
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+
+
+def _finish_request(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        HTTP_REQUEST_DURATION.labels(
+            endpoint=request.endpoint or 'unmatched',
+            method=request.method,
+            status=response.status_code
+        ).observe(time.perf_counter() - started)
+    return response
+
+
+def _pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    global _capacity_reported
+    if not _capacity_reported and _pool_capacity is not None:
+        DB_POOL_CAPACITY.labels(service=_service).set(_pool_capacity)
+        _capacity_reported = True
+    DB_POOL_IN_USE.labels(service=_service).inc()
+
+
+def _pool_checkin(dbapi_connection, connection_record):
+    DB_POOL_IN_USE.labels(service=_service).dec()
+
+
+def _pool_connect(dbapi_connection, connection_record):
+    DB_POOL_OPEN.labels(service=_service).inc()
+
+
+def _pool_close(dbapi_connection, connection_record):
+    DB_POOL_OPEN.labels(service=_service).dec()
+
+
+def _instrument_socketio(socketio):
+    # `flask_socketio.emit` dentro de los handlers también acaba en
+    # `socketio.emit`, así que basta con envolver el de la instancia
+    if getattr(socketio.emit, 'metrics_wrapped', False):
+        return
+    emit = socketio.emit
+
+    def counted_emit(event, *args, **kwargs):
+        SOCKETIO_EMITS.labels(event=event).inc()
+        return emit(event, *args, **kwargs)
+
+    counted_emit.metrics_wrapped = True
+    socketio.emit = counted_emit
+
+
+def init_metrics(app):
+    """Registrar los hooks de Flask, del pool y de Socket.IO."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    global _pool_capacity
+    from app import socketio
+    from app.db_pool import pool_capacity
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    # Primario + un engine por réplica, todos con las mismas opciones (sin
+    # pool propio, modo PgBouncer, no hay capacidad que publicar)
+    capacity = pool_capacity(app.config)
+    if capacity is not None:
+        _pool_capacity = capacity * (1 + len(app.config.get('DATABASE_REPLICA_URLS', [])))
+    listen_once(Pool, 'checkout', _pool_checkout)
+    listen_once(Pool, 'checkin', _pool_checkin)
+    listen_once(Pool, 'connect', _pool_connect)
+    listen_once(Pool, 'close', _pool_close)
+    _instrument_socketio(socketio)
+
+
+def _task_prerun(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_DURATION.labels(task=task.name, state=state or 'UNKNOWN').observe(
+            time.perf_counter() - started
+        )
+
+
+def _worker_init(**kwargs):
+    # Proceso principal del worker, antes de crear los hijos: los ficheros
+    # de una ejecución anterior ya no corresponden a ningún proceso vivo
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        for path in glob.glob(os.path.join(multiproc_dir, '*.db')):
+            os.remove(path)
+
+
+def _worker_process_init(**kwargs):
+    global _service, _capacity_reported
+    _service = 'celery'
+    _capacity_reported = False
+
+
+def _worker_process_shutdown(pid=None, **kwargs):
+    # Sin esto los gauges `livesum` de un hijo muerto se seguirían sumando
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        mark_process_dead(pid or os.getpid())
+
+
+def init_celery_metrics():
+    from celery import signals
+
+    signals.task_prerun.connect(_task_prerun, weak=False)
+    signals.task_postrun.connect(_task_postrun, weak=False)
+    signals.worker_init.connect(_worker_init, weak=False)
+    signals.worker_process_init.connect(_worker_process_init, weak=False)
+    signals.worker_process_shutdown.connect(_worker_process_shutdown, weak=False)
@@ -2,10 +2,7 @@ from flask_sqlalchemy import SQLAlchemy
 from alembic import op
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import event
-import uuid
-import json
 from app import db, login
-from sqlalchemy.orm.attributes import get_history
 from datetime import datetime, timezone
 import sqlalchemy.orm as so
 from typing import Optional
@@ -109,131 +106,65 @@ def record_base(mapper, connection, target, operation):
         # Solo en el caso de UPDATE se establece el campo updatedAt
         target.updatedAt = datetime.now(timezone.utc)
 
-# Conectar los eventos de SQLAlchemy (asegurar que esto se ejecute)
-@event.listens_for(Base, 'before_insert', propagate=True)
 def receive_before_insert(mapper, connection, target):
     record_base(mapper, connection, target, "INSERT")
 
-@event.listens_for(Base, 'before_update', propagate=True)
 def receive_before_update(mapper, connection, target):
     record_base(mapper, connection, target, "UPDATE")
 
 # Función para inicializar los oyentes de los eventos
 def setup_base():
-    # Modelos activos (sin organizaciones)
-    for model in [User, JWTToken, Feedback, Portfolio, Message, Conversation, Notification, Review, SavedSearch,
-                  Event, Project, EventRSVP, ProjectMember, EventInvitation, EventMessage,
-                  BlockedUser, Report, VerificationRequest, ProfileView]:
-        event.listen(model, 'after_insert', lambda m, c, t: record_base(m, c, t, "INSERT"))
-        event.listen(model, 'after_update', lambda m, c, t: record_base(m, c, t, "UPDATE"))
+    # Los listeners de `Base` se propagan a todos los modelos (también a los
+    # definidos después). `listen_once` hace que llamar a esto varias veces
+    # no duplique los listeners (ver app/event_registry.py)
+    from app.event_registry import listen_once
+
+    listen_once(Base, 'before_insert', receive_before_insert, propagate=True)
+    listen_once(Base, 'before_update', receive_before_update, propagate=True)
 
         #En vez de llamar a db.session.delete , hacemos     user.deletedAt = datetime.now(timezone.utc)()
 
-# Auditoría de cambios
+# Auditoría de cambios (la escribe en lotes app.audit, fuera de la petición)
+# Particionada por mes de `date` (ver app/audit_partitions.py)
 class Audit(db.Model):
     __tablename__ = 'audit'
+    __table_args__ = (
+        db.Index('idx_audit_table_date', 'affected_table', 'date'),
+        {'postgresql_partition_by': 'RANGE (date)'},
+    )
 
-    id = db.Column(db.Integer, primary_key=True)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     affected_table = db.Column(db.String(255), nullable=False)
     operation = db.Column(db.String(50), nullable=False)
-    previous_data = db.Column(db.Text, nullable=True)  # Almacenado como JSON
-    new_data = db.Column(db.Text, nullable=True)  # Almacenado como JSON
-    date = db.Column(db.DateTime, default=db.func.now(), nullable=False)
-
-#Para registrar cuando se haga un delete
-def record_delete_audit(target):
-    # Verificar que el objeto tiene el atributo __tablename__
-    if not hasattr(target, '__tablename__'):
-        raise ValueError("El objeto no tiene el atributo '__tablename__'")
-
-    affected_table = target.__tablename__
-    operation = "DELETE"
-
-    # Filtrar las columnas que no deseas incluir en el registro de auditoría
-    excluded_columns = {'createdAt', 'updatedAt', 'deletedAt'}
-
-    # Obtener los valores actuales de los atributos excluyendo createdAt, updatedAt y deletedAt
-    current_data = {
-        attr.key: str(getattr(target, attr.key)) if isinstance(getattr(target, attr.key), uuid.UUID) else getattr(target, attr.key)
-        for attr in target.__table__.columns
-        if attr.key not in excluded_columns  # Excluir estas columnas
-    }
-
-    # Crear un registro de auditoría para el evento DELETE
-    audit = Audit(
-        affected_table=affected_table,
-        operation=operation,
-        previous_data=json.dumps(current_data),  # Los datos que se están eliminando
-        new_data=None  # No hay nuevos datos en una operación DELETE
-    )
-
-    # Agregar a la sesión para ser persistido en la base de datos
-    db.session.add(audit)
-    db.session.commit()  # Confirmamos la transacción
-
-from sqlalchemy.orm.properties import ColumnProperty
-import json
-from sqlalchemy.orm.attributes import get_history
-
-# Función para registrar eventos de auditoría
-def record_audit(mapper, connection, target):
-    # Evitar doble registro al hacer soft‐delete (solo changed deletedAt)
-    if hasattr(target, 'deletedAt') and get_history(target, 'deletedAt')[2]:
-        return
-
-    affected_table = target.__tablename__
-    operation = "INSERT" if not db.inspect(target).persistent else "UPDATE"
-
-    # Columnas a excluir de la auditoría
-    excluded_columns = {'createdAt', 'updatedAt', 'deletedAt'}
-
-    # Función auxiliar para serializar valores
-    def serialize(val):
-        if isinstance(val, datetime):
-            return val.isoformat()
-        elif isinstance(val, uuid.UUID):
-            return str(val)
-        return val
-
-    # Serializamos los valores de las columnas (solo ColumnProperty)
-    new_data = {
-        attr.key: serialize(getattr(target, attr.key))
-        for attr in mapper.attrs
-        if isinstance(attr, ColumnProperty) and attr.key not in excluded_columns
-    }
-
-    previous_data = None
-    if operation == "UPDATE":
-        previous_data = {
-            attr.key: serialize(get_history(target, attr.key)[2][0]) if get_history(target, attr.key)[2] else None
-            for attr in mapper.attrs
-            if isinstance(attr, ColumnProperty) and attr.key not in excluded_columns
-        }
-
-    audit = Audit(
-        affected_table=affected_table,
-        operation=operation,
-        previous_data=json.dumps(previous_data) if previous_data else None,
-        new_data=json.dumps(new_data)
-    )
-
-    db.session.add(audit)
-
-# # Configuración de los oyentes para los modelos (auditoría)
+    previous_data = db.Column(JSONB, nullable=True)  # Solo columnas cambiadas (fila cargada en DELETE)
+    new_data = db.Column(JSONB, nullable=True)
+    # La clave de partición tiene que formar parte de la PK
+    date = db.Column(db.DateTime, primary_key=True, default=db.func.now(), nullable=False)
+
+# Con `db.create_all()` (tests) la tabla se crea sin particiones: la DEFAULT
+# acepta cualquier fecha
+event.listen(
+    Audit.__table__, 'after_create',
+    sa.DDL('CREATE TABLE IF NOT EXISTS audit_default PARTITION OF audit DEFAULT')
+)
+
+# # Configuración de los modelos auditados: los diffs se capturan en
+# `after_flush` y se escriben en segundo plano (ver app/audit.py)
 def setup_audit():
-    for model in [User, Feedback, Portfolio, Message, Conversation, Notification, Review, SavedSearch,
-                  Event, Project, EventRSVP, ProjectMember, EventInvitation, EventMessage,
-                  BlockedUser, Report, VerificationRequest, ProfileView]:
-        event.listen(model, 'after_insert', record_audit)
-        event.listen(model, 'after_update', record_audit)
+    from app.audit import install, register_models
+
+    install()
+    register_models([User, Feedback, Portfolio, Message, Conversation, Notification, Review, SavedSearch,
+                     Event, EventOccurrence, Project, EventRSVP, ProjectMember, EventInvitation, EventMessage,
+                     BlockedUser, Report, VerificationRequest, ProfileView])
 
 
 #IMPORTANTE
 #Para que la eliminacion de un registro quede registrada en la tabla de auditoria
 def delete(target):
 
+    # El pipeline de auditoría lo registra como DELETE al ver `deletedAt`
     target.deletedAt = datetime.now(timezone.utc)
-    record_delete_audit(target)
 
     db.session.commit()  # Confirmar la eliminación en la base de datos
         
@@ -254,7 +185,7 @@ class User(Base, UserMixin):
         db.Index('idx_user_city_country', 'city', 'country'),
         db.Index('idx_user_skills', 'skills', postgresql_using='gin'),
         # Búsqueda por categoría filtrando sólo perfiles públicos (Issue #2)
-        db.Index('idx_user_category_public', 'category', 'is_profile_public'),
+        db.Index('idx_user_category_public', 'category', 'is_profile_public', postgresql_where=db.text('"deletedAt" IS NULL')),
         # Búsqueda por nombre completo case-insensitive
         db.Index(
             'idx_user_full_name_lower',
@@ -267,6 +198,8 @@ class User(Base, UserMixin):
             sa.func.to_tsvector('english', sa.func.coalesce(sa.text('bio'), '')),
             postgresql_using='gin',
         ),
+        # Cambios recientes de perfil (sincronización del índice de habilidades)
+        db.Index('idx_user_updated_at', 'updatedAt'),
     )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -300,7 +233,10 @@ class User(Base, UserMixin):
     # Campos de notificaciones
     email_notifications = db.Column(db.Boolean, default=True, nullable=False)  # Notificaciones por email habilitadas
     notify_profile_views = db.Column(db.Boolean, default=False, nullable=False)  # Opt-in notificación al ver perfil
-    push_subscription = db.Column(JSONB, nullable=True)  # Suscripción para web push notifications
+    push_subscription = db.Column(JSONB, nullable=True)  # LEGACY: sustituido por la tabla push_subscription
+
+    # Versión de la URL del calendario personal (.ics): subirla revoca las anteriores
+    calendar_feed_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
 
     # Último cambio de username (para rate-limit de 30 días)
     username_changed_at = db.Column(db.DateTime, nullable=True)
@@ -419,6 +355,43 @@ class User(Base, UserMixin):
         except Exception:
             return None
         return db.session.get(User, id)
+
+    def get_calendar_feed_token(self):
+        """
+        Genera el token de la URL de suscripción al calendario (`.ics`).
+        No expira: los clientes de calendario guardan la URL indefinidamente.
+        Lleva `calendar_feed_version`, así que `rotate_calendar_feed` invalida
+        todas las URLs emitidas antes.
+        """
+        return jwt.encode(
+            {'calendar_feed': self.id, 'v': self.calendar_feed_version or 0},
+            current_app.config['SECRET_KEY'],
+            algorithm='HS256'
+        )
+
+    def rotate_calendar_feed(self):
+        """Revoca las URLs de calendario emitidas (sin commit)."""
+        self.calendar_feed_version = User.calendar_feed_version + 1
+
+    @staticmethod
+    def verify_calendar_feed_token(token):
+        """
+        Devuelve el usuario del token de calendario o None si no es válido
+        (o si su versión ya se ha revocado).
+        """
+        try:
+            payload = jwt.decode(token, current_app.config['SECRET_KEY'],
+                                 algorithms=['HS256'])
+            id = payload['calendar_feed']
+        except Exception:
+            return None
+        user = db.session.get(User, id)
+        if user is None or user.deletedAt is not None or not user.is_enabled:
+            return None
+        # Los tokens anteriores a la versión no la llevan: equivalen a la 0
+        if payload.get('v', 0) != user.calendar_feed_version:
+            return None
+        return user
     
     # Métodos relacionados con organizaciones eliminados
 
@@ -509,6 +482,44 @@ class JWTToken(db.Model):
 # Definir el modelo de la base de datos
 ## MODELO LEGACY ELIMINADO: Match
 
+# PushSubscription Model - Suscripciones web push por dispositivo
+#No hereda de Base porque se actualiza en cada envío (last_success_at/failure_count)
+#y no queremos registrar cada operacion en la auditoría
+class PushSubscription(db.Model):
+    __tablename__ = 'push_subscription'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    # SHA256 del endpoint: el endpoint puede superar los límites de un índice btree
+    endpoint_hash = db.Column(db.String(64), nullable=False)
+    endpoint = db.Column(db.Text, nullable=False)
+    keys = db.Column(JSONB, nullable=False)  # {p256dh, auth}
+    createdAt = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_success_at = db.Column(db.DateTime, nullable=True)
+    failure_count = db.Column(db.Integer, default=0, nullable=False)
+
+    user = db.relationship('User', backref=db.backref('push_subscriptions', lazy='dynamic', passive_deletes=True))
+
+    __table_args__ = (
+        db.UniqueConstraint('endpoint_hash', name='uq_push_subscription_endpoint_hash'),
+        db.Index('idx_push_subscription_user', 'user_id'),
+    )
+
+    @staticmethod
+    def hash_endpoint(endpoint: str) -> str:
+        """
+        Calcula el hash SHA256 del endpoint dado.
+        """
+        return hashlib.sha256(endpoint.encode('utf-8')).hexdigest()
+
+    def to_subscription_info(self) -> dict:
+        """Formato que espera pywebpush."""
+        return {'endpoint': self.endpoint, 'keys': self.keys}
+
+    def __repr__(self):
+        return f'<PushSubscription {self.id} - User {self.user_id}>'
+
+
 class Feedback(db.Model):
     __tablename__ = 'feedback'
 
@@ -580,7 +591,7 @@ class Message(Base):
 
     # Índices para list/last-message/unread-count (Issue #2)
     __table_args__ = (
-        db.Index('idx_message_conv_created', 'conversation_id', 'createdAt'),
+        db.Index('idx_message_conv_created', 'conversation_id', 'createdAt', postgresql_where=db.text('"deletedAt" IS NULL')),
         db.Index('idx_message_conv_unread', 'conversation_id', 'is_read', 'sender_id'),
     )
 
@@ -588,6 +599,10 @@ class Message(Base):
         return f'<Message {self.id} from {self.sender_id}>'
 
 
+# Notificación agrupada abierta (admite más eventos del grupo)
+NOTIFICATION_OPEN_GROUP = 'is_read = false AND "deletedAt" IS NULL AND group_key IS NOT NULL'
+
+
 # Notification Model
 class Notification(Base):
     __tablename__ = 'notification'
@@ -604,8 +619,27 @@ class Notification(Base):
     # Datos adicionales en JSON (flexible)
     data = db.Column(JSONB, nullable=True)
 
+    # Agrupación: eventos del mismo (tipo, sujeto) dentro de una ventana se
+    # acumulan en una sola notificación no leída ("12 personas han respondido a X")
+    group_key = db.Column(db.String(255), nullable=True)  # '<tipo>:<sujeto>', p.ej. 'event_rsvp:event:12'
+    actor_count = db.Column(db.Integer, default=1, nullable=False)  # actores distintos del grupo
+    actor_ids = db.Column(ARRAY(db.Integer), default=list, server_default='{}', nullable=False)
+    last_actor_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'), nullable=True)
+
     # Relationship
-    user = db.relationship('User', backref=db.backref('notifications', lazy='dynamic'))
+    user = db.relationship('User', foreign_keys=[user_id], backref=db.backref('notifications', lazy='dynamic'))
+
+    __table_args__ = (
+        # Una sola notificación abierta por grupo: árbitro del ON CONFLICT al coalescer
+        db.Index(
+            'idx_notification_user_group_unread',
+            'user_id', 'group_key',
+            unique=True,
+            postgresql_where=db.text(NOTIFICATION_OPEN_GROUP)
+        ),
+        # Listado de notificaciones del usuario (más recientes primero)
+        db.Index('idx_notification_user_created', 'user_id', 'createdAt', postgresql_where=db.text('"deletedAt" IS NULL')),
+    )
 
     def __repr__(self):
         return f'<Notification {self.id} for user {self.user_id}>'
@@ -630,7 +664,7 @@ class Review(Base):
         db.UniqueConstraint('reviewer_id', 'reviewee_id', name='unique_review_per_user'),
         db.CheckConstraint('rating >= 1 AND rating <= 5', name='valid_rating_range'),
         db.CheckConstraint('reviewer_id != reviewee_id', name='no_self_review'),
-        db.Index('idx_review_reviewee', 'reviewee_id'),
+        db.Index('idx_review_reviewee', 'reviewee_id', postgresql_where=db.text('"deletedAt" IS NULL')),
     )
 
     def __repr__(self):
@@ -683,6 +717,17 @@ class Event(Base):
     is_public = db.Column(db.Boolean, default=True, nullable=False)
     category = db.Column(db.String(50), nullable=True)  # Categoría relacionada con TalentCategory
 
+    # RSVPs confirmados (desnormalizado). Sólo se modifica con UPDATE atómicos
+    # desde app.events.capacity para no sobrepasar max_attendees.
+    confirmed_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+
+    # Recurrencia (subconjunto de RRULE, ver app.events.recurrence). Una serie
+    # es UNA fila: las sesiones se expanden al consultar; solo las que tienen
+    # cambios o RSVPs tienen fila en `event_occurrence`.
+    recurrence_rule = db.Column(db.String(255), nullable=True)
+    # Inicio de la última sesión (null = sin fin o no recurrente)
+    recurrence_end = db.Column(db.DateTime, nullable=True)
+
     # Imagen del evento
     image_url = db.Column(db.String(500), nullable=True)
 
@@ -691,9 +736,12 @@ class Event(Base):
 
     # Índices para filtros frecuentes (Issue #2)
     __table_args__ = (
-        db.Index('idx_event_public_start', 'is_public', 'start_date'),
+        db.Index('idx_event_public_start', 'is_public', 'start_date', postgresql_where=db.text('"deletedAt" IS NULL')),
         db.Index('idx_event_creator', 'creator_id'),
         db.Index('idx_event_location', 'latitude', 'longitude'),
+        db.Index('idx_event_series', 'is_public', 'recurrence_end',
+                 postgresql_where=db.text('recurrence_rule IS NOT NULL')),
+        db.CheckConstraint('confirmed_count >= 0', name='event_confirmed_count_non_negative'),
     )
 
     def __repr__(self):
@@ -719,6 +767,9 @@ class Project(Base):
 
     # Configuración
     max_members = db.Column(db.Integer, nullable=True)  # null = ilimitado
+    # Miembros activos (desnormalizado). Sólo se modifica con UPDATE atómicos
+    # desde app.projects.membership para no sobrepasar max_members.
+    active_member_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     is_public = db.Column(db.Boolean, default=True, nullable=False)
     category = db.Column(db.String(50), nullable=True)
 
@@ -730,15 +781,48 @@ class Project(Base):
 
     # Índices para filtros frecuentes (Issue #2)
     __table_args__ = (
-        db.Index('idx_project_public_status', 'is_public', 'status'),
+        db.Index('idx_project_public_status', 'is_public', 'status', postgresql_where=db.text('"deletedAt" IS NULL')),
         db.Index('idx_project_creator', 'creator_id'),
         db.Index('idx_project_required_skills', 'required_skills', postgresql_using='gin'),
+        db.CheckConstraint('active_member_count >= 0', name='project_active_member_count_non_negative'),
     )
 
     def __repr__(self):
         return f'<Project {self.id} - {self.title}>'
 
 
+# EventOccurrence Model - Sesión concreta de un evento recurrente
+class EventOccurrence(Base):
+    __tablename__ = 'event_occurrence'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id', ondelete='CASCADE'), nullable=False)
+    # Inicio original según la regla: identifica la sesión aunque se mueva
+    occurrence_start = db.Column(db.DateTime, nullable=False)
+
+    # Cambios sobre la serie (null = el valor de la serie)
+    is_cancelled = db.Column(db.Boolean, default=False, server_default='false', nullable=False)
+    title = db.Column(db.String(255), nullable=True)
+    description = db.Column(db.Text, nullable=True)
+    start_date = db.Column(db.DateTime, nullable=True)
+    end_date = db.Column(db.DateTime, nullable=True)
+
+    # RSVPs confirmados de esta sesión (mismo esquema que Event.confirmed_count)
+    confirmed_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+
+    # Relationships
+    event = db.relationship('Event', backref=db.backref('occurrences', lazy='dynamic'))
+
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'occurrence_start', name='unique_occurrence_per_event'),
+        db.Index('idx_occurrence_event_start', 'event_id', 'start_date'),
+        db.CheckConstraint('confirmed_count >= 0', name='event_occurrence_confirmed_count_non_negative'),
+    )
+
+    def __repr__(self):
+        return f'<EventOccurrence {self.id} - Event {self.event_id} @ {self.occurrence_start}>'
+
+
 # EventRSVP Model - Sistema de confirmaciones de asistencia
 class EventRSVP(Base):
     __tablename__ = 'event_rsvp'
@@ -746,6 +830,8 @@ class EventRSVP(Base):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     event_id = db.Column(db.Integer, db.ForeignKey('event.id', ondelete='CASCADE'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    # Sesión de un evento recurrente (null = el evento completo)
+    occurrence_id = db.Column(db.Integer, db.ForeignKey('event_occurrence.id', ondelete='CASCADE'), nullable=True)
 
     # Estado de confirmación
     status = db.Column(db.String(50), nullable=False, default='pending')  # pending, confirmed, declined, cancelled
@@ -757,11 +843,16 @@ class EventRSVP(Base):
     # Relationships
     event = db.relationship('Event', backref=db.backref('rsvps', lazy='dynamic'))
     user = db.relationship('User', backref=db.backref('event_rsvps', lazy='dynamic'))
+    occurrence = db.relationship('EventOccurrence', backref=db.backref('rsvps', lazy='dynamic'))
 
-    # Constraint + índices (Issue #2)
+    # Constraint + índices (Issue #2). NULLS NOT DISTINCT: un único RSVP por
+    # usuario al evento completo (occurrence_id null) y uno por sesión.
     __table_args__ = (
-        db.UniqueConstraint('event_id', 'user_id', name='unique_rsvp_per_event'),
-        db.Index('idx_rsvp_event_status', 'event_id', 'status'),
+        db.UniqueConstraint('event_id', 'user_id', 'occurrence_id', name='unique_rsvp_per_event',
+                            postgresql_nulls_not_distinct=True),
+        db.Index('idx_rsvp_event_status', 'event_id', 'status', postgresql_where=db.text('"deletedAt" IS NULL')),
+        db.Index('idx_rsvp_occurrence_status', 'occurrence_id', 'status',
+                 postgresql_where=db.text('occurrence_id IS NOT NULL')),
     )
 
     def __repr__(self):
@@ -794,13 +885,86 @@ class ProjectMember(Base):
     # Constraint + índices (Issue #2)
     __table_args__ = (
         db.UniqueConstraint('project_id', 'user_id', name='unique_member_per_project'),
-        db.Index('idx_project_member_project_status', 'project_id', 'status'),
+        db.Index('idx_project_member_project_status', 'project_id', 'status', postgresql_where=db.text('"deletedAt" IS NULL')),
     )
 
     def __repr__(self):
         return f'<ProjectMember {self.id} - Project {self.project_id}, User {self.user_id}, Role: {self.role}>'
 
 
+# WaitlistEntry Model - Lista de espera de eventos y proyectos llenos
+#No hereda de Base: es una cola (se consume con UPDATE ... RETURNING al promocionar)
+#y no queremos registrar cada operacion en la auditoría
+class WaitlistEntry(db.Model):
+    __tablename__ = 'waitlist_entry'
+
+    # El orden de la cola es el del id (FIFO)
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id', ondelete='CASCADE'), nullable=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+
+    status = db.Column(db.String(20), nullable=False, default='waiting')  # waiting, promoted, left
+    createdAt = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    promoted_at = db.Column(db.DateTime, nullable=True)
+
+    user = db.relationship('User', backref=db.backref('waitlist_entries', lazy='dynamic', passive_deletes=True))
+
+    __table_args__ = (
+        db.CheckConstraint('(event_id IS NULL) <> (project_id IS NULL)', name='waitlist_single_target'),
+        # Una sola entrada en espera por usuario y evento/proyecto
+        db.Index('uq_waitlist_event_user_waiting', 'event_id', 'user_id', unique=True,
+                 postgresql_where=db.text("status = 'waiting' AND event_id IS NOT NULL")),
+        db.Index('uq_waitlist_project_user_waiting', 'project_id', 'user_id', unique=True,
+                 postgresql_where=db.text("status = 'waiting' AND project_id IS NOT NULL")),
+        # Cabeza de la cola
+        db.Index('idx_waitlist_event_queue', 'event_id', 'id',
+                 postgresql_where=db.text("status = 'waiting' AND event_id IS NOT NULL")),
+        db.Index('idx_waitlist_project_queue', 'project_id', 'id',
+                 postgresql_where=db.text("status = 'waiting' AND project_id IS NOT NULL")),
+    )
+
+    def __repr__(self):
+        target = f'Event {self.event_id}' if self.event_id else f'Project {self.project_id}'
+        return f'<WaitlistEntry {self.id} - {target}, User {self.user_id}, Status: {self.status}>'
+
+
+#No hereda de Base porque es un dato derivado que se recalcula periódicamente (ver app.recommendations)
+class EventRecommendation(db.Model):
+    __tablename__ = 'event_recommendation'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.SmallInteger, nullable=False)  # 1 = mejor recomendación
+    score = db.Column(db.Float, nullable=False)
+    reasons = db.Column(JSONB, nullable=True)  # distance_km, category_match, contacts
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    event = db.relationship('Event', backref=db.backref('recommendations', lazy='dynamic', passive_deletes=True))
+
+    __table_args__ = (
+        db.Index('idx_event_recommendation_user_rank', 'user_id', 'rank'),
+    )
+
+    def __repr__(self):
+        return f'<EventRecommendation User {self.user_id} - Event {self.event_id} (#{self.rank})>'
+
+
+#No hereda de Base porque solo marca cuándo se recalcularon las recomendaciones de cada usuario
+class RecommendationState(db.Model):
+    __tablename__ = 'recommendation_state'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    computed_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_recommendation_state_computed', 'computed_at'),
+    )
+
+    def __repr__(self):
+        return f'<RecommendationState User {self.user_id} at {self.computed_at}>'
+
+
 # EventInvitation Model - Invitaciones a eventos
 class EventInvitation(Base):
     __tablename__ = 'event_invitation'
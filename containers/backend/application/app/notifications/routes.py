@@ -1,10 +1,14 @@
-from flask import jsonify, request
+from flask import jsonify, request, current_app
 from flask_login import current_user, login_required
 from app.notifications import bp
 from app.logger_config import logger
 from app import db
-from app.models import Notification, User
-from datetime import datetime, timezone
+from app.models import Notification, User, PushSubscription, NOTIFICATION_OPEN_GROUP
+from app.common import serialize_notification
+from app.db_listeners import queue_notification
+from sqlalchemy import or_, case, func, literal, text, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert, JSONB
+from datetime import datetime, timezone, timedelta
 import os
 
 
@@ -20,8 +24,7 @@ def get_notifications():
 
         # Query base
         query = Notification.query.filter_by(
-            user_id=current_user.id,
-            deletedAt=None
+            user_id=current_user.id
         )
 
         # Filtrar solo no leídas si se solicita
@@ -35,27 +38,14 @@ def get_notifications():
         total = query.count()
         notifications = query.limit(limit).offset(offset).all()
 
-        notifications_data = []
-        for notif in notifications:
-            notifications_data.append({
-                'id': notif.id,
-                'type': notif.type,
-                'title': notif.title,
-                'message': notif.message,
-                'link': notif.link,
-                'is_read': notif.is_read,
-                'read_at': notif.read_at.isoformat() if notif.read_at else None,
-                'data': notif.data,
-                'created_at': notif.createdAt.isoformat() if notif.createdAt else None
-            })
+        notifications_data = [serialize_notification(notif) for notif in notifications]
 
         return jsonify({
             'notifications': notifications_data,
             'total': total,
             'unread_count': Notification.query.filter_by(
                 user_id=current_user.id,
-                is_read=False,
-                deletedAt=None
+                is_read=False
             ).count()
         }), 200
     except Exception as e:
@@ -70,8 +60,7 @@ def get_unread_count():
     try:
         count = Notification.query.filter_by(
             user_id=current_user.id,
-            is_read=False,
-            deletedAt=None
+            is_read=False
         ).count()
 
         return jsonify({'unread_count': count}), 200
@@ -87,8 +76,7 @@ def mark_notification_as_read(notification_id):
     try:
         notification = Notification.query.filter_by(
             id=notification_id,
-            user_id=current_user.id,
-            deletedAt=None
+            user_id=current_user.id
         ).first()
 
         if not notification:
@@ -135,8 +123,7 @@ def delete_notification(notification_id):
     try:
         notification = Notification.query.filter_by(
             id=notification_id,
-            user_id=current_user.id,
-            deletedAt=None
+            user_id=current_user.id
         ).first()
 
         if not notification:
@@ -188,8 +175,31 @@ def subscribe_to_push():
         if not all(key in subscription for key in ['endpoint', 'keys']):
             return jsonify({'error': 'Suscripción inválida'}), 400
 
-        # Guardar suscripción en el usuario
-        current_user.push_subscription = subscription
+        # Upsert por hash del endpoint: una fila por dispositivo. Si el
+        # endpoint ya es de este usuario con las mismas keys no se escribe
+        # nada (el frontend re-suscribe en cada carga de página).
+        endpoint = subscription['endpoint']
+        keys = subscription['keys']
+        table = PushSubscription.__table__
+        stmt = pg_insert(table).values(
+            user_id=current_user.id,
+            endpoint_hash=PushSubscription.hash_endpoint(endpoint),
+            endpoint=endpoint,
+            keys=keys,
+            createdAt=datetime.utcnow(),
+            failure_count=0
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.endpoint_hash],
+            set_={
+                'user_id': stmt.excluded.user_id,
+                # `keys` choca con ColumnCollection.keys(): acceso por clave
+                'keys': stmt.excluded['keys'],
+                'failure_count': 0,
+            },
+            where=or_(table.c.user_id != stmt.excluded.user_id, table.c['keys'] != stmt.excluded['keys'])
+        )
+        db.session.execute(stmt)
         db.session.commit()
 
         logger.getChild('notifications').info(f"Usuario {current_user.id} suscrito a push notifications")
@@ -204,9 +214,19 @@ def subscribe_to_push():
 @bp.route('/api/v1/notifications/push/unsubscribe', methods=['POST'])
 @login_required
 def unsubscribe_from_push():
-    """Cancelar suscripción a web push notifications"""
+    """Cancelar suscripción a web push notifications
+
+    Con `endpoint` en el body sólo se elimina ese dispositivo; sin él se
+    eliminan todas las suscripciones del usuario.
+    """
     try:
-        current_user.push_subscription = None
+        data = request.get_json(silent=True) or {}
+        endpoint = data.get('endpoint')
+
+        query = PushSubscription.query.filter_by(user_id=current_user.id)
+        if endpoint:
+            query = query.filter_by(endpoint_hash=PushSubscription.hash_endpoint(endpoint))
+        query.delete(synchronize_session=False)
         db.session.commit()
 
         logger.getChild('notifications').info(f"Usuario {current_user.id} canceló suscripción a push notifications")
@@ -223,11 +243,11 @@ def unsubscribe_from_push():
 def get_push_subscription_status():
     """Obtener estado de suscripción a push notifications"""
     try:
-        is_subscribed = current_user.push_subscription is not None
+        devices = PushSubscription.query.filter_by(user_id=current_user.id).count()
 
         return jsonify({
-            'is_subscribed': is_subscribed,
-            'subscription': current_user.push_subscription if is_subscribed else None
+            'is_subscribed': devices > 0,
+            'devices': devices
         }), 200
     except Exception as e:
         logger.getChild('notifications').error(f"Error obteniendo estado de push: {str(e)}", exc_info=True)
@@ -246,7 +266,9 @@ def get_notification_preferences():
         return jsonify({
             'email_notifications': current_user.email_notifications,
             'notify_profile_views': bool(getattr(current_user, 'notify_profile_views', False)),
-            'push_notifications': current_user.push_subscription is not None
+            'push_notifications': db.session.query(
+                PushSubscription.query.filter_by(user_id=current_user.id).exists()
+            ).scalar()
         }), 200
     except Exception as e:
         logger.getChild('notifications').error(f"Error obteniendo preferencias: {str(e)}", exc_info=True)
@@ -280,23 +302,53 @@ def update_notification_preferences():
 
 
 # ========================================
-# FUNCIÓN AUXILIAR
+# FUNCIONES AUXILIARES
 # ========================================
 
-# Función auxiliar para crear notificaciones (usar en otras partes del código)
-def create_notification(user_id, notification_type, title, message=None, link=None, data=None):
+def add_notification(user_id, notification_type, title, message=None, link=None, data=None,
+                     subject=None, actor_id=None, rollup=None, distinct_actors=True):
     """
-    Crear una nueva notificación para un usuario
+    Añadir una notificación a la sesión actual (sin commit), agrupándola si procede
+
+    Sin `subject` se inserta siempre una fila nueva. Con `subject` hay como
+    mucho una notificación no leída por (usuario, tipo, sujeto) (índice único
+    parcial `idx_notification_user_group_unread`) y se escribe con un único
+    `INSERT ... ON CONFLICT DO UPDATE`, así dos eventos simultáneos no pueden
+    crear dos filas del mismo grupo:
+
+    - Si la notificación abierta se creó dentro de
+      `NOTIFICATION_COALESCE_WINDOW_MINUTES`, se acumula en ella: el contador
+      es de actores distintos (`actor_ids`) o, con `distinct_actors=False`,
+      de eventos (p.ej. mensajes de una conversación).
+    - Si es más antigua, se cierra tal cual (`group_key` a NULL, sigue sin
+      leer con su contador) y el evento abre un grupo nuevo. El cierre es un
+      UPDATE previo al upsert: no se pierden los actores que el usuario aún
+      no ha visto.
+
+    `data` (con `count`) se calcula en el propio upsert, pero el mensaje
+    agrupado (`rollup`) es una función de Python: cuando el contador crece
+    por encima de 1 se asigna `message` a la fila devuelta y el siguiente
+    flush de la sesión lo escribe con un segundo UPDATE de la misma fila,
+    dentro de la misma transacción. Si el contador no cambia (actor
+    repetido) el upsert conserva el mensaje anterior, coincide con el
+    asignado y el ORM no emite ese UPDATE.
 
     Args:
         user_id: ID del usuario que recibirá la notificación
-        notification_type: Tipo de notificación ('message', 'profile_view', 'new_user', etc.)
+        notification_type: Tipo de notificación
         title: Título de la notificación
-        message: Mensaje descriptivo (opcional)
+        message: Mensaje para un único actor (opcional)
         link: URL para navegar al contenido (opcional)
-        data: Datos adicionales en formato dict (opcional)
+        data: Datos adicionales del último evento (opcional)
+        subject: Sujeto de agrupación, p.ej. 'event:12' (opcional)
+        actor_id: Usuario que origina el evento (opcional)
+        rollup: Función `count -> mensaje` para la notificación agrupada (opcional)
+        distinct_actors: Contar actores distintos (True) o eventos (False)
+
+    Returns:
+        Notification: La notificación creada o actualizada
     """
-    try:
+    if subject is None:
         notification = Notification(
             user_id=user_id,
             type=notification_type,
@@ -304,10 +356,107 @@ def create_notification(user_id, notification_type, title, message=None, link=No
             message=message,
             link=link,
             data=data,
-            is_read=False
+            is_read=False,
+            actor_count=1,
+            actor_ids=[actor_id] if actor_id is not None else [],
+            last_actor_id=actor_id
         )
-
         db.session.add(notification)
+        return notification
+
+    now = datetime.now(timezone.utc)
+    window = current_app.config.get('NOTIFICATION_COALESCE_WINDOW_MINUTES', 60)
+    group_key = f'{notification_type}:{subject}'
+
+    # Fuera de la ventana: cerrar el grupo abierto para que el upsert abra otro
+    db.session.execute(
+        update(Notification)
+        .where(
+            Notification.user_id == user_id,
+            Notification.group_key == group_key,
+            text(NOTIFICATION_OPEN_GROUP),
+            Notification.createdAt < now - timedelta(minutes=window),
+        )
+        .values(group_key=None)
+        .execution_options(synchronize_session=False)
+    )
+
+    insert = pg_insert(Notification).values(
+        user_id=user_id,
+        type=notification_type,
+        title=title,
+        message=message,
+        link=link,
+        data=data,
+        is_read=False,
+        group_key=group_key,
+        actor_count=1,
+        actor_ids=[actor_id] if actor_id is not None else [],
+        last_actor_id=actor_id,
+        createdAt=now,
+        updatedAt=now
+    )
+    excluded = insert.excluded
+    new_actor = ~excluded.actor_ids.contained_by(Notification.actor_ids)
+    counted = new_actor if distinct_actors else true()
+    actor_count = case((counted, Notification.actor_count + 1), else_=Notification.actor_count)
+    stmt = insert.on_conflict_do_update(
+        index_elements=['user_id', 'group_key'],
+        index_where=text(NOTIFICATION_OPEN_GROUP),
+        set_={
+            'actor_ids': case(
+                (new_actor, func.array_cat(Notification.actor_ids, excluded.actor_ids)),
+                else_=Notification.actor_ids
+            ),
+            'actor_count': actor_count,
+            'last_actor_id': excluded.last_actor_id,
+            'title': excluded.title,
+            # Agrupada: se conserva el mensaje de `rollup` (ver abajo)
+            'message': case((actor_count > 1, Notification.message), else_=excluded.message),
+            'link': excluded.link,
+            'data': case(
+                (actor_count > 1, literal(data or {}, JSONB).op('||', return_type=JSONB)(
+                    func.jsonb_build_object('count', actor_count)
+                )),
+                else_=excluded.data
+            ),
+            'updatedAt': excluded.updatedAt,
+        }
+    ).returning(Notification)
+
+    notification = db.session.execute(
+        stmt, execution_options={'populate_existing': True}
+    ).scalar_one()
+    if notification.actor_count > 1:
+        notification.message = rollup(notification.actor_count) if rollup else message
+
+    # El upsert no pasa por el flush del ORM: se encola aquí para Socket.IO
+    queue_notification(db.session, notification)
+    return notification
+
+
+# Función auxiliar para crear notificaciones (usar en otras partes del código)
+def create_notification(user_id, notification_type, title, message=None, link=None, data=None,
+                        subject=None, actor_id=None, rollup=None, distinct_actors=True):
+    """
+    Crear una nueva notificación para un usuario (con commit)
+
+    Args:
+        user_id: ID del usuario que recibirá la notificación
+        notification_type: Tipo de notificación ('message', 'profile_view', 'new_user', etc.)
+        title: Título de la notificación
+        message: Mensaje descriptivo (opcional)
+        link: URL para navegar al contenido (opcional)
+        data: Datos adicionales en formato dict (opcional)
+        subject, actor_id, rollup, distinct_actors: Agrupación, ver `add_notification` (opcional)
+    """
+    try:
+        notification = add_notification(
+            user_id, notification_type, title,
+            message=message, link=link, data=data,
+            subject=subject, actor_id=actor_id, rollup=rollup,
+            distinct_actors=distinct_actors
+        )
         db.session.commit()
 
         logger.getChild('notifications').info(f"Notificación creada para usuario {user_id}: {title}")
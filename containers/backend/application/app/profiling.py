@@ -0,0 +1,176 @@
+"""
+Perfilado estadístico bajo demanda (flamegraphs)
+
+Mientras dura una petición o un evento de Socket.IO perfilado, un hilo del
+sistema toma cada `PROFILING_INTERVAL_MS` la pila del greenlet (o hilo) que
+la atiende. Si el greenlet está suspendido esperando E/S (PostgreSQL,
+Redis...) se muestrea su pila igualmente, así que el perfil es de tiempo
+real transcurrido, no solo de CPU.
+
+Qué se perfila:
+
+- Con `PROFILING_ENABLED`, una fracción `PROFILING_SAMPLE_RATE` de las
+  peticiones y de los eventos de socket decorados con `profile_socket_event`
+  (limitado a `PROFILING_ENDPOINTS` si no está vacío).
+- Siempre, las peticiones de un superadmin con la cabecera `X-Profile: 1`.
+
+Las pilas se acumulan en formato "collapsed" (`marco;marco;marco N`) en
+`PROFILING_DIR/<endpoint>.<pid>.folded`, un fichero por endpoint y proceso.
+Se pueden juntar y dibujar con `flamegraph.pl`, speedscope o similar:
+
+    cat logs/profiles/user.advanced_search.*.folded | flamegraph.pl > search.svg
+"""
+import os
+import random
+import sys
+import time
+from collections import Counter
+from functools import wraps
+
+from flask import current_app, g, request
+from flask_login import current_user
+
+from app.logger_config import logger
+
+try:
+    # Con eventlet `threading` está parcheado: el muestreador tiene que ser
+    # un hilo real para poder interrumpir al greenlet que perfila
+    from eventlet.patcher import original
+    _threading = original('threading')
+    _sleep = original('time').sleep
+except ImportError:
+    import threading as _threading
+    _sleep = time.sleep
+
+try:
+    from greenlet import getcurrent as _current_greenlet
+except ImportError:
+    _current_greenlet = None
+
+PROFILE_HEADER = 'X-Profile'
+MAX_SAMPLES = 20000
+
+_labels = {}
+
+
+def _label(code):
+    label = _labels.get(code)
+    if label is None:
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        label = f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+        _labels[code] = label
+    return label
+
+
+def _collapse(frame):
+    stack = []
+    while frame is not None:
+        stack.append(_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+class Sampler:
+    """Muestrea la pila del greenlet/hilo actual desde un hilo aparte."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = _threading.Event()
+        self._thread_id = _threading.get_ident()
+        self._greenlet = _current_greenlet() if _current_greenlet else None
+
+    def _target_frame(self):
+        # Suspendido: su pila está en `gr_frame`; en ejecución, es la del hilo
+        if self._greenlet is not None and self._greenlet.gr_frame is not None:
+            return self._greenlet.gr_frame
+        return sys._current_frames().get(self._thread_id)
+
+    def _run(self):
+        while not self._stop.is_set() and self.samples < MAX_SAMPLES:
+            frame = self._target_frame()
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+                self.samples += 1
+            _sleep(self.interval)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = _threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        return self.stacks
+
+
+def _sampled(name):
+    config = current_app.config
+    if not config.get('PROFILING_ENABLED'):
+        return False
+    endpoints = config.get('PROFILING_ENDPOINTS')
+    if endpoints and name not in endpoints:
+        return False
+    return random.random() < config.get('PROFILING_SAMPLE_RATE', 0.0)
+
+
+def _requested_by_admin():
+    if request.headers.get(PROFILE_HEADER) != '1':
+        return False
+    return current_user.is_authenticated and 'ROLE_SUPERADMIN' in (current_user.special_roles or [])
+
+
+def _start():
+    return Sampler(current_app.config.get('PROFILING_INTERVAL_MS', 5) / 1000).start()
+
+
+def _write(name, sampler):
+    stacks = sampler.stop()
+    if not stacks:
+        return
+    directory = current_app.config.get('PROFILING_DIR')
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{name}.{os.getpid()}.folded')
+    with open(path, 'a', encoding='utf-8') as fh:
+        fh.write(''.join(f'{stack} {count}\n' for stack, count in stacks.items()))
+    logger.getChild('profiling').info(
+        f"perfil name={name} samples={sampler.samples} ms={sampler.elapsed * 1000:.1f} file={path}"
+    )
+
+
+def _start_request():
+    name = request.endpoint or 'unmatched'
+    if _sampled(name) or _requested_by_admin():
+        g.profiler = _start()
+
+
+def _finish_request(exc=None):
+    sampler = g.pop('profiler', None)
+    if sampler is not None:
+        _write(request.endpoint or 'unmatched', sampler)
+
+
+def profile_socket_event(fn):
+    """Perfilar una fracción de las llamadas a un handler de Socket.IO."""
+    name = f'socketio.{fn.__name__}'
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _sampled(name):
+            return fn(*args, **kwargs)
+        sampler = _start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _write(name, sampler)
+
+    return wrapper
+
+
+def init_profiling(app):
+    app.before_request(_start_request)
+    app.teardown_request(_finish_request)
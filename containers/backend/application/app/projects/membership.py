@@ -0,0 +1,98 @@
+"""Contabilidad atómica de miembros activos por proyecto.
+
+`Project.active_member_count` es un contador desnormalizado de miembros con
+estado `active`, análogo a `Event.confirmed_count` (ver
+`app.events.capacity`). Se actualiza con un UPDATE condicional en la base de
+datos: dos altas simultáneas no pueden sobrepasar `max_members` porque la
+fila del proyecto queda bloqueada por el UPDATE hasta el commit y la segunda
+reevalúa la condición con el valor ya incrementado.
+
+Las funciones no hacen commit ni tocan `updatedAt`.
+"""
+from sqlalchemy import update, func, select
+
+from app import db
+from app.models import Project, ProjectMember
+
+
+def reserve_member_slot(project_id):
+    """Ocupa un hueco si queda alguno.
+
+    Returns:
+        int | None: Nuevo `active_member_count`, o None si el proyecto está
+        lleno (o no existe).
+    """
+    stmt = (
+        update(Project)
+        .where(
+            Project.id == project_id,
+            Project.deletedAt.is_(None),
+            (Project.max_members.is_(None)) | (Project.active_member_count < Project.max_members),
+        )
+        .values(active_member_count=Project.active_member_count + 1, updatedAt=Project.updatedAt)
+        .returning(Project.active_member_count)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).scalar_one_or_none()
+
+
+def release_member_slot(project_id):
+    """Libera un hueco (nunca baja de 0).
+
+    Returns:
+        int | None: Nuevo `active_member_count`, o None si el proyecto no existe.
+    """
+    stmt = (
+        update(Project)
+        .where(Project.id == project_id)
+        .values(active_member_count=func.greatest(Project.active_member_count - 1, 0), updatedAt=Project.updatedAt)
+        .returning(Project.active_member_count)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).scalar_one_or_none()
+
+
+def apply_member_status_change(project_id, old_status, new_status):
+    """Ajusta el contador para una transición de estado de una membresía.
+
+    `old_status` es None si la membresía no existía (o estaba borrada).
+
+    Returns:
+        bool: False si la transición a `active` no cabe en el proyecto.
+    """
+    was_active = old_status == 'active'
+    is_active = new_status == 'active'
+
+    if is_active and not was_active:
+        return reserve_member_slot(project_id) is not None
+    if was_active and not is_active:
+        release_member_slot(project_id)
+    return True
+
+
+def recount_active_members(project_ids=None):
+    """Recalcula `active_member_count` a partir de `project_member` (reparación).
+
+    Args:
+        project_ids: Proyectos a recalcular; None para todos.
+
+    Returns:
+        int: Número de proyectos actualizados
+    """
+    active = (
+        select(func.count(ProjectMember.id))
+        .where(
+            ProjectMember.project_id == Project.id,
+            ProjectMember.status == 'active',
+            ProjectMember.deletedAt.is_(None),
+        )
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Project)
+        .values(active_member_count=active, updatedAt=Project.updatedAt)
+        .execution_options(synchronize_session=False)
+    )
+    if project_ids is not None:
+        stmt = stmt.where(Project.id.in_(list(project_ids)))
+    return db.session.execute(stmt).rowcount
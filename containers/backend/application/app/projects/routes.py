@@ -3,36 +3,100 @@ from flask_login import current_user, login_required
 from app.projects import bp
 from app.logger_config import logger
 from app import db
-from app.models import Project, ProjectMember, User, Notification
+from app.models import Project, ProjectMember, User, Notification, Review, WaitlistEntry
+from app.notifications.routes import add_notification
+from app.waitlist import (
+    join_waitlist,
+    leave_waitlist,
+    waitlist_position,
+    waitlist_size,
+    promote_project_waitlist,
+    notify_promoted,
+    push_promoted,
+)
 from app.schemas import (
     ProjectCreateSchema,
     ProjectUpdateSchema,
     ProjectMemberSchema,
+    BulkProjectInvitationSchema,
     ProjectMemberRoleSchema,
     ProjectMemberResponseSchema,
     validate_body,
 )
-from app.common import serialize_user_summary, paginated_response
+from app.common import serialize_user_summary, paginated_response, cursor_paginated_response, haversine_km_sql
+from app.projects.skill_index import skill_index, normalize_skill
+from app.projects.membership import reserve_member_slot, apply_member_status_change
+from app.invitations import resolve_invitees, add_invitation_notifications, enqueue_invitation_emails
+from app.audit import audited_returning, record_core_rows
+from app.push_service import send_project_invitation_pushes
+from app.db_routing import read_replica
 from datetime import datetime, timezone
 from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 
+# Miembros embebidos en el detalle; el resto se pide a GET /members
+MEMBERS_PREVIEW_LIMIT = 12
+MEMBERS_PAGE_SIZE = 50
+MEMBERS_MAX_PAGE_SIZE = 200
+
+# Sugerencia de candidatos: se preseleccionan por habilidades en el índice en
+# memoria y solo esos se completan con distancia y valoración en SQL
+CANDIDATES_PAGE_SIZE = 20
+CANDIDATES_MAX_PAGE_SIZE = 50
+CANDIDATES_PRESELECT_FACTOR = 5
+CANDIDATES_RADIUS_KM = 100
+CANDIDATE_WEIGHT_SKILLS = 0.6
+CANDIDATE_WEIGHT_DISTANCE = 0.25
+CANDIDATE_WEIGHT_RATING = 0.15
+
+
+def _can_view_project(project):
+    """Los proyectos privados solo los ven el creador y sus miembros."""
+    if project.is_public:
+        return True
+    if not current_user.is_authenticated:
+        return False
+    if current_user.id == project.creator_id:
+        return True
+    return ProjectMember.query.filter_by(
+        project_id=project.id,
+        user_id=current_user.id
+    ).first() is not None
+
+
+def _serialize_member(member):
+    summary = serialize_user_summary(member.user) or {}
+    return {
+        **summary,
+        'role': member.role,
+        'joined_at': member.joined_at.isoformat() if member.joined_at else None,
+    }
 
-def _active_member_counts(project_ids):
-    """Devuelve {project_id: active_count} agregado en una sola query."""
-    if not project_ids:
-        return {}
-    rows = (
-        db.session.query(ProjectMember.project_id, func.count(ProjectMember.id))
-        .filter(
-            ProjectMember.project_id.in_(project_ids),
-            ProjectMember.status == 'active',
-            ProjectMember.deletedAt.is_(None),
+
+def _promote_waitlist(project):
+    """Promociona la lista de espera del proyecto y añade las notificaciones (sin commit)."""
+    promoted = promote_project_waitlist(project.id)
+    if promoted:
+        notify_promoted(
+            promoted,
+            '¡Ya formas parte del proyecto!',
+            f"Se ha liberado un hueco en '{project.title}' y ya eres miembro",
+            f'/projects/{project.id}',
+            {'project_id': project.id}
+        )
+    return promoted
+
+
+def _push_promoted(project, promoted):
+    """Push de promoción en un solo lote (después del commit)."""
+    if promoted:
+        push_promoted(
+            promoted,
+            f'¡Ya formas parte de {project.title}!',
+            'Se ha liberado un hueco y ya eres miembro del proyecto',
+            f'/projects/{project.id}'
         )
-        .group_by(ProjectMember.project_id)
-        .all()
-    )
-    return {pid: count for pid, count in rows}
 
 
 def _serialize_project_listing(project):
@@ -55,6 +119,7 @@ def _serialize_project_listing(project):
 # ==================== CRUD de Proyectos ====================
 
 @bp.route('/api/v1/projects', methods=['GET'])
+@read_replica
 def get_projects():
     """Obtener lista de proyectos públicos con filtros opcionales"""
     try:
@@ -69,8 +134,7 @@ def get_projects():
 
         # Query base (con creator precargado)
         query = Project.query.options(selectinload(Project.creator)).filter_by(
-            is_public=True,
-            deletedAt=None
+            is_public=True
         )
 
         # Aplicar filtros
@@ -87,11 +151,9 @@ def get_projects():
         query = query.order_by(Project.createdAt.desc())
 
         def _decorate(projects, serialized):
-            counts_by_project = _active_member_counts([p.id for p in projects])
             for project, data in zip(projects, serialized):
-                active = counts_by_project.get(project.id, 0)
-                data['active_members'] = active
-                data['is_full'] = bool(project.max_members and active >= project.max_members)
+                data['active_members'] = project.active_member_count
+                data['is_full'] = bool(project.max_members and project.active_member_count >= project.max_members)
 
         response = paginated_response(
             query,
@@ -113,50 +175,34 @@ def get_project(project_id):
     """Obtener detalles de un proyecto específico"""
     try:
         project = Project.query.filter_by(
-            id=project_id,
-            deletedAt=None
+            id=project_id
         ).first()
 
         if not project:
             return jsonify({'error': 'Proyecto no encontrado'}), 404
 
-        # Verificar si es privado y el usuario no es miembro
-        if not project.is_public and current_user.is_authenticated:
-            member = ProjectMember.query.filter_by(
-                project_id=project_id,
-                user_id=current_user.id,
-                deletedAt=None
-            ).first()
-
-            if not member and current_user.id != project.creator_id:
-                return jsonify({'error': 'Acceso denegado'}), 403
-        elif not project.is_public:
+        if not _can_view_project(project):
             return jsonify({'error': 'Acceso denegado'}), 403
 
-        # Obtener miembros activos con usuarios precargados
-        active_members = (
+        # Solo los primeros miembros (avatares); la lista completa va paginada
+        # en GET /members para no cargar todos los `User` en cada detalle
+        active_count = project.active_member_count
+        preview = (
             ProjectMember.query
+            .filter_by(project_id=project_id, status='active')
             .options(selectinload(ProjectMember.user))
-            .filter_by(project_id=project_id, status='active', deletedAt=None)
+            .order_by(ProjectMember.id)
+            .limit(MEMBERS_PREVIEW_LIMIT)
             .all()
         )
-
-        members_data = []
-        for member in active_members:
-            summary = serialize_user_summary(member.user) or {}
-            members_data.append({
-                **summary,
-                'role': member.role,
-                'joined_at': member.joined_at.isoformat() if member.joined_at else None,
-            })
+        members_data = [_serialize_member(member) for member in preview]
 
         # Verificar si el usuario actual es miembro
         user_membership = None
         if current_user.is_authenticated:
             membership = ProjectMember.query.filter_by(
                 project_id=project_id,
-                user_id=current_user.id,
-                deletedAt=None
+                user_id=current_user.id
             ).first()
             if membership:
                 user_membership = {
@@ -170,9 +216,10 @@ def get_project(project_id):
         project_data.update({
             'is_public': project.is_public,
             'members': members_data,
+            'members_has_more': active_count > len(members_data),
             'stats': {
-                'active_members': len(members_data),
-                'is_full': bool(project.max_members and len(members_data) >= project.max_members),
+                'active_members': active_count,
+                'is_full': bool(project.max_members and active_count >= project.max_members),
             },
             'user_membership': user_membership,
             'updated_at': project.updatedAt.isoformat() if project.updatedAt else None,
@@ -185,6 +232,158 @@ def get_project(project_id):
         return jsonify({'error': 'Error interno'}), 500
 
 
+@bp.route('/api/v1/projects/<int:project_id>/members', methods=['GET'])
+def get_project_members(project_id):
+    """Listar los miembros activos de un proyecto (paginado por cursor)"""
+    try:
+        project = Project.query.filter_by(
+            id=project_id
+        ).first()
+
+        if not project:
+            return jsonify({'error': 'Proyecto no encontrado'}), 404
+
+        if not _can_view_project(project):
+            return jsonify({'error': 'Acceso denegado'}), 403
+
+        limit = min(max(int(request.args.get('limit', MEMBERS_PAGE_SIZE)), 1), MEMBERS_MAX_PAGE_SIZE)
+
+        query = (
+            ProjectMember.query
+            .options(selectinload(ProjectMember.user))
+            .filter_by(project_id=project_id, status='active')
+        )
+
+        try:
+            response = cursor_paginated_response(
+                query,
+                ProjectMember.id,
+                request.args.get('cursor'),
+                limit,
+                serializer=_serialize_member,
+                items_key='members',
+            )
+        except ValueError:
+            return jsonify({'error': 'Cursor inválido'}), 400
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        logger.getChild('projects').error(f"Error obteniendo miembros: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error interno'}), 500
+
+
+@bp.route('/api/v1/projects/<int:project_id>/candidates', methods=['GET'])
+@login_required
+def get_project_candidates(project_id):
+    """
+    Sugerir usuarios para un proyecto (solo el creador o owners) por
+    solapamiento ponderado de habilidades, distancia y valoración
+    """
+    try:
+        project = Project.query.filter_by(
+            id=project_id
+        ).first()
+
+        if not project:
+            return jsonify({'error': 'Proyecto no encontrado'}), 404
+
+        owner = ProjectMember.query.filter_by(
+            project_id=project_id,
+            user_id=current_user.id,
+            role='owner'
+        ).first()
+
+        if current_user.id != project.creator_id and not owner:
+            return jsonify({'error': 'No tienes permisos para ver candidatos de este proyecto'}), 403
+
+        try:
+            limit = min(max(int(request.args.get('limit', CANDIDATES_PAGE_SIZE)), 1), CANDIDATES_MAX_PAGE_SIZE)
+        except ValueError:
+            return jsonify({'error': 'Parámetro limit inválido'}), 400
+
+        if not project.required_skills:
+            return jsonify({'candidates': [], 'total': 0}), 200
+
+        # Quienes ya están (o esperan) en el proyecto no son candidatos
+        excluded = {project.creator_id}
+        excluded.update(user_id for (user_id,) in db.session.query(ProjectMember.user_id).filter(
+            ProjectMember.project_id == project_id,
+            ProjectMember.status.in_(['active', 'pending']),
+            ProjectMember.deletedAt.is_(None),
+        ))
+        excluded.update(user_id for (user_id,) in db.session.query(WaitlistEntry.user_id).filter(
+            WaitlistEntry.project_id == project_id,
+            WaitlistEntry.status == 'waiting',
+        ))
+
+        skill_index.sync()
+        user_ids, skill_scores = skill_index.top(
+            project.required_skills,
+            limit * CANDIDATES_PRESELECT_FACTOR,
+            exclude_ids=excluded
+        )
+        if not len(user_ids):
+            return jsonify({'candidates': [], 'total': 0}), 200
+        skill_by_user = dict(zip(user_ids.tolist(), skill_scores.tolist()))
+
+        # La ubicación del proyecto es la de su creador
+        origin = project.creator
+        columns = [User, func.avg(Review.rating), func.count(Review.id)]
+        if origin.latitude is not None and origin.longitude is not None:
+            columns.append(haversine_km_sql(User.latitude, User.longitude, origin.latitude, origin.longitude))
+
+        rows = (
+            db.session.query(*columns)
+            .outerjoin(Review, (Review.reviewee_id == User.id) & Review.deletedAt.is_(None))
+            # El índice puede ir por detrás de un cambio de privacidad o de
+            # una baja hecha en otro proceso: se vuelve a comprobar aquí
+            .filter(
+                User.id.in_(list(skill_by_user)),
+                User.is_enabled.is_(True),
+                User.is_profile_public.is_(True),
+                User.deletedAt.is_(None),
+            )
+            .group_by(User.id)
+            .all()
+        )
+
+        required = {normalize_skill(skill) for skill in project.required_skills}
+        candidates = []
+        for row in rows:
+            user, avg_rating, review_count = row[0], row[1], row[2]
+            distance = row[3] if len(row) > 3 else None
+
+            skill_score = skill_by_user[user.id]
+            distance_score = max(0.0, 1.0 - distance / CANDIDATES_RADIUS_KM) if distance is not None else 0.0
+            rating = float(avg_rating) if avg_rating else 0.0
+
+            score = (
+                CANDIDATE_WEIGHT_SKILLS * skill_score
+                + CANDIDATE_WEIGHT_DISTANCE * distance_score
+                + CANDIDATE_WEIGHT_RATING * rating / 5
+            )
+            candidates.append({
+                **(serialize_user_summary(user) or {}),
+                'city': user.city,
+                'matched_skills': sorted(s for s in (user.skills or []) if normalize_skill(s) in required),
+                'skill_score': round(skill_score, 3),
+                'distance_km': round(float(distance), 1) if distance is not None else None,
+                'average_rating': round(rating, 2),
+                'total_reviews': review_count,
+                'score': round(score, 3),
+            })
+
+        candidates.sort(key=lambda c: (-c['score'], c['id']))
+        candidates = candidates[:limit]
+
+        return jsonify({'candidates': candidates, 'total': len(candidates)}), 200
+
+    except Exception as e:
+        logger.getChild('projects').error(f"Error obteniendo candidatos: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error interno'}), 500
+
+
 @bp.route('/api/v1/projects', methods=['POST'])
 @login_required
 @validate_body(ProjectCreateSchema)
@@ -206,6 +405,9 @@ def create_project(payload: ProjectCreateSchema):
             end_date=payload.end_date,
         )
 
+        # El creador cuenta como primer miembro activo
+        project.active_member_count = 1
+
         db.session.add(project)
         db.session.flush()  # Obtener project.id sin cerrar la transacción
 
@@ -242,8 +444,7 @@ def update_project(project_id, payload: ProjectUpdateSchema):
     """Actualizar un proyecto (solo el creador o owners)"""
     try:
         project = Project.query.filter_by(
-            id=project_id,
-            deletedAt=None
+            id=project_id
         ).first()
 
         if not project:
@@ -253,8 +454,7 @@ def update_project(project_id, payload: ProjectUpdateSchema):
         member = ProjectMember.query.filter_by(
             project_id=project_id,
             user_id=current_user.id,
-            role='owner',
-            deletedAt=None
+            role='owner'
         ).first()
 
         if current_user.id != project.creator_id and not member:
@@ -264,7 +464,14 @@ def update_project(project_id, payload: ProjectUpdateSchema):
         for field, value in data.items():
             setattr(project, field, value)
 
+        # Si se amplía el cupo, entran los primeros de la lista de espera
+        promoted = []
+        if 'max_members' in data:
+            db.session.flush()
+            promoted = _promote_waitlist(project)
+
         db.session.commit()
+        _push_promoted(project, promoted)
 
         return jsonify({
             'message': 'Proyecto actualizado correctamente',
@@ -288,8 +495,7 @@ def delete_project(project_id):
     try:
         project = Project.query.filter_by(
             id=project_id,
-            creator_id=current_user.id,
-            deletedAt=None
+            creator_id=current_user.id
         ).first()
 
         if not project:
@@ -316,8 +522,7 @@ def add_member(project_id, payload: ProjectMemberSchema):
     """Agregar un miembro al proyecto o solicitar unirse"""
     try:
         project = Project.query.filter_by(
-            id=project_id,
-            deletedAt=None
+            id=project_id
         ).first()
 
         if not project:
@@ -329,8 +534,7 @@ def add_member(project_id, payload: ProjectMemberSchema):
             member = ProjectMember.query.filter_by(
                 project_id=project_id,
                 user_id=current_user.id,
-                role='owner',
-                deletedAt=None
+                role='owner'
             ).first()
 
             if current_user.id != project.creator_id and not member:
@@ -341,8 +545,7 @@ def add_member(project_id, payload: ProjectMemberSchema):
             # Verificar que el usuario existe
             user = User.query.filter_by(
                 id=user_id,
-                is_enabled=True,
-                deletedAt=None
+                is_enabled=True
             ).first()
 
             if not user:
@@ -351,8 +554,7 @@ def add_member(project_id, payload: ProjectMemberSchema):
             # Verificar si ya es miembro
             existing_member = ProjectMember.query.filter_by(
                 project_id=project_id,
-                user_id=user_id,
-                deletedAt=None
+                user_id=user_id
             ).first()
 
             if existing_member:
@@ -396,48 +598,68 @@ def add_member(project_id, payload: ProjectMemberSchema):
             if not project.is_public:
                 return jsonify({'error': 'Este proyecto es privado'}), 403
 
-            # Verificar si hay cupo
-            if project.max_members:
-                active_count = ProjectMember.query.filter_by(
-                    project_id=project_id,
-                    status='active',
-                    deletedAt=None
-                ).count()
-
-                if active_count >= project.max_members:
-                    return jsonify({'error': 'El proyecto está lleno'}), 400
-
-            # Verificar si ya es miembro
-            existing_member = ProjectMember.query.filter_by(
-                project_id=project_id,
-                user_id=current_user.id,
-                deletedAt=None
-            ).first()
+            # Verificar si ya es miembro (también si salió: la constraint
+            # única incluye los soft-deleted y esa membresía se reactiva)
+            existing_member = (
+                ProjectMember.query
+                .filter_by(project_id=project_id, user_id=current_user.id)
+                .execution_options(include_soft_deleted=True)
+                .with_for_update()
+                .first()
+            )
 
-            if existing_member:
+            if existing_member and existing_member.deletedAt is None:
                 return jsonify({'error': 'Ya eres miembro de este proyecto'}), 400
 
-            # Crear membresía activa
-            new_member = ProjectMember(
-                project_id=project_id,
-                user_id=current_user.id,
-                role='contributor',
-                status='active',
-                joined_at=datetime.now(timezone.utc)
-            )
+            # Ocupar un hueco con un UPDATE condicional del contador (dos
+            # altas simultáneas no pueden ocupar el mismo). Si está lleno, a
+            # la lista de espera en vez de devolver error.
+            if reserve_member_slot(project_id) is None:
+                db.session.rollback()
+                position = join_waitlist(current_user.id, project_id=project_id)
+                db.session.commit()
+                return jsonify({
+                    'message': 'El proyecto está lleno: te hemos añadido a la lista de espera',
+                    'waitlist': {
+                        'project_id': project_id,
+                        'position': position
+                    }
+                }), 202
 
-            db.session.add(new_member)
+            # Ya no necesita esperar hueco
+            leave_waitlist(current_user.id, project_id=project_id)
 
-            # Notificar al creador en la misma transacción
-            notification = Notification(
-                user_id=project.creator_id,
-                type='project_member_joined',
-                title='Nuevo miembro en proyecto',
+            if existing_member:
+                # Reactivar la membresía anterior
+                new_member = existing_member
+                new_member.role = 'contributor'
+                new_member.status = 'active'
+                new_member.joined_at = datetime.now(timezone.utc)
+                new_member.left_at = None
+                new_member.deletedAt = None
+            else:
+                # Crear membresía activa
+                new_member = ProjectMember(
+                    project_id=project_id,
+                    user_id=current_user.id,
+                    role='contributor',
+                    status='active',
+                    joined_at=datetime.now(timezone.utc)
+                )
+                db.session.add(new_member)
+
+            # Notificar al creador en la misma transacción (agrupada por proyecto)
+            add_notification(
+                project.creator_id,
+                'project_member_joined',
+                'Nuevo miembro en proyecto',
                 message=f"{current_user.first_name} {current_user.last_name} se ha unido a '{project.title}'",
                 link=f'/projects/{project_id}',
-                data={'project_id': project_id, 'user_id': current_user.id}
+                data={'project_id': project_id, 'user_id': current_user.id},
+                subject=f'project:{project_id}',
+                actor_id=current_user.id,
+                rollup=lambda count: f"{count} personas se han unido a '{project.title}'"
             )
-            db.session.add(notification)
             db.session.commit()
 
             return jsonify({
@@ -455,6 +677,97 @@ def add_member(project_id, payload: ProjectMemberSchema):
         return jsonify({'error': 'Error al agregar miembro'}), 500
 
 
+@bp.route('/api/v1/projects/<int:project_id>/members/bulk', methods=['POST'])
+@login_required
+@validate_body(BulkProjectInvitationSchema)
+def invite_members_bulk(project_id, payload: BulkProjectInvitationSchema):
+    """Invitar a varios usuarios al proyecto en una sola petición (ver app.invitations)"""
+    try:
+        project = Project.query.filter_by(
+            id=project_id
+        ).first()
+
+        if not project:
+            return jsonify({'error': 'Proyecto no encontrado'}), 404
+
+        owner = ProjectMember.query.filter_by(
+            project_id=project_id,
+            user_id=current_user.id,
+            role='owner'
+        ).first()
+
+        if current_user.id != project.creator_id and not owner:
+            return jsonify({'error': 'Solo los owners pueden invitar miembros'}), 403
+
+        user_ids, invalid_ids = resolve_invitees(payload.user_ids, exclude_ids=[current_user.id])
+
+        created = []
+        if user_ids:
+            now = datetime.now(timezone.utc)
+            role = payload.role or 'contributor'
+            table = ProjectMember.__table__
+            stmt = pg_insert(table).values([{
+                'project_id': project_id,
+                'user_id': user_id,
+                'role': role,
+                'status': 'pending',
+                'createdAt': now,
+                'updatedAt': now,
+            } for user_id in user_ids])
+            # Los miembros vigentes se saltan; los antiguos (soft-deleted)
+            # ocupan la misma fila por la constraint, así que se reactivan
+            # como invitación pendiente en vez de perderse
+            stmt = stmt.on_conflict_do_update(
+                constraint='unique_member_per_project',
+                set_={
+                    'role': role,
+                    'status': 'pending',
+                    'joined_at': None,
+                    'left_at': None,
+                    'deletedAt': None,
+                    'updatedAt': now,
+                },
+                where=table.c.deletedAt.isnot(None)
+            ).returning(*audited_returning(table))
+            created = db.session.execute(stmt).all()
+            record_core_rows(db.session, ProjectMember, created)
+
+        member_by_user = {row.user_id: row.id for row in created}
+        add_invitation_notifications(
+            'project_invitation',
+            'Invitación a proyecto',
+            f"{current_user.first_name} {current_user.last_name} te ha invitado a '{project.title}'",
+            f'/projects/{project_id}',
+            {
+                user_id: {'project_id': project_id, 'member_id': member_id}
+                for user_id, member_id in member_by_user.items()
+            }
+        )
+        db.session.commit()
+
+        invited_ids = [user_id for user_id in user_ids if user_id in member_by_user]
+        if invited_ids:
+            send_project_invitation_pushes(
+                invited_ids, project.title, f"{current_user.first_name} {current_user.last_name}"
+            )
+            enqueue_invitation_emails('project', project_id, current_user.id, invited_ids)
+
+        return jsonify({
+            'message': f'{len(invited_ids)} invitaciones enviadas',
+            'members': [
+                {'id': member_by_user[user_id], 'user_id': user_id, 'role': payload.role or 'contributor', 'status': 'pending'}
+                for user_id in invited_ids
+            ],
+            'already_members': [user_id for user_id in user_ids if user_id not in member_by_user],
+            'invalid': invalid_ids,
+        }), 201 if invited_ids else 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.getChild('projects').error(f"Error invitando miembros en lote: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error al enviar las invitaciones'}), 500
+
+
 @bp.route('/api/v1/projects/members/<int:member_id>/respond', methods=['PUT'])
 @login_required
 @validate_body(ProjectMemberResponseSchema)
@@ -464,9 +777,8 @@ def respond_membership(member_id, payload: ProjectMemberResponseSchema):
         member = ProjectMember.query.filter_by(
             id=member_id,
             user_id=current_user.id,
-            status='pending',
-            deletedAt=None
-        ).first()
+            status='pending'
+        ).with_for_update().first()
 
         if not member:
             return jsonify({'error': 'Invitación no encontrada'}), 404
@@ -474,6 +786,12 @@ def respond_membership(member_id, payload: ProjectMemberResponseSchema):
         action = payload.action  # 'accept' o 'decline'
 
         if action == 'accept':
+            # Ocupar un hueco con el UPDATE condicional del contador; si está
+            # lleno la invitación sigue pendiente
+            if not apply_member_status_change(member.project_id, member.status, 'active'):
+                db.session.rollback()
+                return jsonify({'error': 'El proyecto está lleno'}), 400
+            leave_waitlist(current_user.id, project_id=member.project_id)
             member.status = 'active'
             member.joined_at = datetime.now(timezone.utc)
             message = 'Te has unido al proyecto correctamente'
@@ -512,7 +830,6 @@ def update_member_role(project_id, user_id, payload: ProjectMemberRoleSchema):
     try:
         project = Project.query.filter_by(
             id=project_id,
-            deletedAt=None,
         ).first()
 
         if not project:
@@ -522,8 +839,7 @@ def update_member_role(project_id, user_id, payload: ProjectMemberRoleSchema):
         owner_member = ProjectMember.query.filter_by(
             project_id=project_id,
             user_id=current_user.id,
-            role='owner',
-            deletedAt=None
+            role='owner'
         ).first()
 
         if current_user.id != project.creator_id and not owner_member:
@@ -532,8 +848,7 @@ def update_member_role(project_id, user_id, payload: ProjectMemberRoleSchema):
         # Obtener miembro a actualizar
         member = ProjectMember.query.filter_by(
             project_id=project_id,
-            user_id=user_id,
-            deletedAt=None
+            user_id=user_id
         ).first()
 
         if not member:
@@ -569,7 +884,6 @@ def remove_member(project_id, user_id):
         if not is_self:
             project = Project.query.filter_by(
                 id=project_id,
-                deletedAt=None,
             ).first()
 
             if not project:
@@ -578,27 +892,40 @@ def remove_member(project_id, user_id):
             owner_member = ProjectMember.query.filter_by(
                 project_id=project_id,
                 user_id=current_user.id,
-                role='owner',
-                deletedAt=None
+                role='owner'
             ).first()
 
             if current_user.id != project.creator_id and not owner_member:
                 return jsonify({'error': 'Solo los owners pueden remover miembros'}), 403
 
+        # FOR UPDATE: dos bajas simultáneas no liberan dos huecos
         member = ProjectMember.query.filter_by(
             project_id=project_id,
-            user_id=user_id,
-            deletedAt=None
-        ).first()
+            user_id=user_id
+        ).with_for_update().first()
 
         if not member:
             return jsonify({'error': 'Miembro no encontrado'}), 404
 
         # Soft delete
+        was_active = member.status == 'active'
+        apply_member_status_change(project_id, member.status, 'left')
         member.status = 'left'
         member.left_at = datetime.now(timezone.utc)
         member.deletedAt = datetime.now(timezone.utc)
+
+        # Si deja un hueco libre, entra el primero de la lista de espera
+        promoted = []
+        project = None
+        if was_active:
+            db.session.flush()
+            project = db.session.get(Project, project_id)
+            if project:
+                promoted = _promote_waitlist(project)
+
         db.session.commit()
+        if project:
+            _push_promoted(project, promoted)
 
         message = 'Has salido del proyecto' if is_self else 'Miembro removido correctamente'
 
@@ -610,6 +937,41 @@ def remove_member(project_id, user_id):
         return jsonify({'error': 'Error al remover miembro'}), 500
 
 
+# ==================== Lista de espera ====================
+
+@bp.route('/api/v1/projects/<int:project_id>/waitlist', methods=['GET'])
+@login_required
+def get_project_waitlist_status(project_id):
+    """Posición del usuario en la lista de espera del proyecto"""
+    try:
+        return jsonify({
+            'project_id': project_id,
+            'position': waitlist_position(current_user.id, project_id=project_id),
+            'total': waitlist_size(project_id=project_id)
+        }), 200
+
+    except Exception as e:
+        logger.getChild('projects').error(f"Error obteniendo lista de espera: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error interno'}), 500
+
+
+@bp.route('/api/v1/projects/<int:project_id>/waitlist', methods=['DELETE'])
+@login_required
+def leave_project_waitlist(project_id):
+    """Salir de la lista de espera del proyecto"""
+    try:
+        if not leave_waitlist(current_user.id, project_id=project_id):
+            return jsonify({'error': 'No estás en la lista de espera de este proyecto'}), 404
+
+        db.session.commit()
+        return jsonify({'message': 'Has salido de la lista de espera'}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.getChild('projects').error(f"Error saliendo de la lista de espera: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error al salir de la lista de espera'}), 500
+
+
 # ==================== Mis Proyectos ====================
 
 @bp.route('/api/v1/projects/my-projects', methods=['GET'])
@@ -618,16 +980,11 @@ def get_my_projects():
     """Obtener proyectos creados por el usuario"""
     try:
         projects = Project.query.filter_by(
-            creator_id=current_user.id,
-            deletedAt=None
+            creator_id=current_user.id
         ).order_by(Project.createdAt.desc()).all()
 
-        counts_by_project = _active_member_counts([p.id for p in projects])
-
         projects_data = []
         for project in projects:
-            active_members = counts_by_project.get(project.id, 0)
-
             projects_data.append({
                 'id': project.id,
                 'title': project.title,
@@ -636,7 +993,7 @@ def get_my_projects():
                 'start_date': project.start_date.isoformat() if project.start_date else None,
                 'end_date': project.end_date.isoformat() if project.end_date else None,
                 'required_skills': project.required_skills,
-                'active_members': active_members,
+                'active_members': project.active_member_count,
                 'max_members': project.max_members,
                 'is_public': project.is_public,
                 'image_url': project.image_url,
@@ -661,7 +1018,7 @@ def get_my_memberships():
         memberships = (
             ProjectMember.query
             .options(selectinload(ProjectMember.project).selectinload(Project.creator))
-            .filter_by(user_id=current_user.id, status='active', deletedAt=None)
+            .filter_by(user_id=current_user.id, status='active')
             .all()
         )
 
@@ -710,7 +1067,7 @@ def get_my_project_invitations():
         invitations = (
             ProjectMember.query
             .options(selectinload(ProjectMember.project).selectinload(Project.creator))
-            .filter_by(user_id=current_user.id, status='pending', deletedAt=None)
+            .filter_by(user_id=current_user.id, status='pending')
             .all()
         )
 
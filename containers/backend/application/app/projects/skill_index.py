@@ -0,0 +1,255 @@
+"""Índice invertido en memoria de habilidades → usuarios.
+
+`/api/v1/projects/<id>/candidates` ordena usuarios por solapamiento
+ponderado entre sus `skills` y los `required_skills` del proyecto. Hacerlo
+en SQL con `skills && :required` recorre toda la tabla de usuarios en cada
+búsqueda; en su lugar el proceso web mantiene un índice invertido:
+
+    habilidad normalizada → np.ndarray(int32) ordenado de user ids
+
+y la puntuación es aritmética vectorizada de numpy: se concatenan las
+listas de las habilidades pedidas y un único `np.bincount` (con el peso de
+cada habilidad) acumula el solapamiento de todos los usuarios a la vez, sin
+bucles Python por usuario.
+
+Peso de una habilidad: `log(1 + N / df)`, así coincidir en una habilidad
+rara puntúa más que en una que tiene medio censo.
+
+Sincronización incremental: `update_user` aplica el cambio en cuanto el
+propio usuario edita su perfil, y `sync` (llamado antes de cada búsqueda)
+trae como mucho cada `SKILL_INDEX_SYNC_SECONDS` los usuarios con `updatedAt`
+posterior a la última marca vista, para recoger los cambios hechos desde
+otros procesos. Cada `SKILL_INDEX_REBUILD_SECONDS` se reconstruye entero
+(borrados físicos, deriva).
+
+La reconstrucción completa recorre toda la tabla de usuarios, así que no se
+hace dentro de una petición: `start` (hook `post_worker_init` de
+gunicorn.conf.py) la lanza en un hilo de fondo al arrancar el worker y la
+repite periódicamente; mientras tanto las búsquedas usan el índice anterior.
+Sin ese hilo (tests, CLI) la primera búsqueda lo construye en línea.
+"""
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from sqlalchemy import select, func
+
+from app import db
+from app.common.config import config_value
+from app.logger_config import logger
+from app.models import User
+
+DEFAULT_SYNC_SECONDS = 30
+DEFAULT_REBUILD_SECONDS = 60 * 60
+# Margen hacia atrás al traer cambios: una transacción puede hacer commit
+# después de otra con un `updatedAt` más reciente
+SYNC_OVERLAP = timedelta(seconds=60)
+BUILD_YIELD_PER = 5000
+# Espera máxima de una búsqueda a la primera construcción en segundo plano
+FIRST_BUILD_WAIT_SECONDS = 30
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+def normalize_skill(skill):
+    return (skill or '').strip().lower()
+
+
+def _normalize_skills(skills):
+    return frozenset(s for s in (normalize_skill(skill) for skill in (skills or [])) if s)
+
+
+def _eligible_filter():
+    """Solo usuarios que se pueden sugerir: activos y con perfil público."""
+    return (
+        User.is_enabled.is_(True),
+        User.is_profile_public.is_(True),
+        User.deletedAt.is_(None),
+    )
+
+
+class SkillIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}         # habilidad -> np.ndarray(int32) ordenado
+        self._user_skills = {}      # user_id -> frozenset de habilidades
+        self._watermark = None      # mayor `updatedAt` visto
+        self._built_at = None       # time.monotonic() de la última reconstrucción
+        self._synced_at = None
+        self._thread = None
+        self._app = None
+        self._first_build = threading.Event()
+
+    def __len__(self):
+        return len(self._user_skills)
+
+    # ---------------------------------------------------------------- carga
+
+    def load(self, rows):
+        """Reconstruye el índice desde `(user_id, skills)`."""
+        lists = defaultdict(list)
+        user_skills = {}
+        for user_id, skills in rows:
+            normalized = _normalize_skills(skills)
+            if not normalized:
+                continue
+            user_skills[user_id] = normalized
+            for skill in normalized:
+                lists[skill].append(user_id)
+
+        postings = {skill: np.unique(np.asarray(ids, dtype=np.int32)) for skill, ids in lists.items()}
+        with self._lock:
+            self._postings = postings
+            self._user_skills = user_skills
+
+    def build(self):
+        """Reconstrucción completa desde la base de datos."""
+        now = time.monotonic()
+        watermark = db.session.execute(select(func.max(User.updatedAt))).scalar()
+        rows = db.session.execute(
+            select(User.id, User.skills)
+            .where(*_eligible_filter(), func.cardinality(User.skills) > 0)
+            .execution_options(yield_per=BUILD_YIELD_PER)
+        )
+        self.load(rows)
+        self._watermark = watermark
+        self._built_at = self._synced_at = now
+
+    def start(self, app):
+        """Construir el índice en un hilo de fondo y reconstruirlo cada
+        `SKILL_INDEX_REBUILD_SECONDS` (idempotente)."""
+        if self._thread is not None:
+            return
+        self._app = app
+        self._thread = threading.Thread(target=self._run, name='skill-index', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        interval = self._app.config.get('SKILL_INDEX_REBUILD_SECONDS', DEFAULT_REBUILD_SECONDS)
+        while True:
+            try:
+                with self._app.app_context():
+                    self.build()
+                    db.session.remove()
+                logger.getChild('skill_index').info(f"Índice de habilidades construido: {len(self)} usuarios")
+            except Exception as e:
+                logger.getChild('skill_index').error(f"Error construyendo el índice de habilidades: {str(e)}", exc_info=True)
+            finally:
+                self._first_build.set()
+            time.sleep(interval)
+
+    # ---------------------------------------------------------- incremental
+
+    def update_user(self, user_id, skills):
+        """Aplica las habilidades actuales de un usuario (vacío = quitarlo)."""
+        new = _normalize_skills(skills)
+        with self._lock:
+            old = self._user_skills.get(user_id, frozenset())
+            if new == old:
+                return
+
+            for skill in old - new:
+                ids = self._postings.get(skill)
+                if ids is None:
+                    continue
+                pos = np.searchsorted(ids, user_id)
+                if pos < len(ids) and ids[pos] == user_id:
+                    ids = np.delete(ids, pos)
+                if len(ids):
+                    self._postings[skill] = ids
+                else:
+                    del self._postings[skill]
+
+            for skill in new - old:
+                ids = self._postings.get(skill, _EMPTY)
+                pos = np.searchsorted(ids, user_id)
+                if pos == len(ids) or ids[pos] != user_id:
+                    self._postings[skill] = np.insert(ids, pos, user_id).astype(np.int32, copy=False)
+
+            if new:
+                self._user_skills[user_id] = new
+            else:
+                self._user_skills.pop(user_id, None)
+
+    def sync(self):
+        """Trae los cambios pendientes si toca (o construye el índice si aún no existe)."""
+        if self._thread is not None and self._built_at is None:
+            self._first_build.wait(FIRST_BUILD_WAIT_SECONDS)
+
+        now = time.monotonic()
+        if self._built_at is None or (
+            # Sin hilo de fondo la reconstrucción periódica se hace aquí
+            self._thread is None
+            and now - self._built_at >= config_value('SKILL_INDEX_REBUILD_SECONDS', DEFAULT_REBUILD_SECONDS)
+        ):
+            self.build()
+            return
+        if now - self._synced_at < config_value('SKILL_INDEX_SYNC_SECONDS', DEFAULT_SYNC_SECONDS):
+            return
+
+        self._synced_at = now
+        stmt = select(
+            User.id, User.skills, User.is_enabled, User.is_profile_public, User.deletedAt, User.updatedAt
+        )
+        if self._watermark is not None:
+            stmt = stmt.where(User.updatedAt > self._watermark - SYNC_OVERLAP)
+        rows = db.session.execute(stmt.execution_options(include_soft_deleted=True)).all()
+
+        for user_id, skills, is_enabled, is_public, deleted_at, updated_at in rows:
+            eligible = is_enabled and is_public and deleted_at is None
+            self.update_user(user_id, skills if eligible else None)
+            if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+
+    # -------------------------------------------------------------- búsqueda
+
+    def match(self, required_skills, exclude_ids=()):
+        """Solapamiento ponderado de todos los usuarios con `required_skills`.
+
+        Returns:
+            tuple: (user_ids, puntuación en [0, 1]) como arrays de numpy, solo
+            usuarios con al menos una habilidad en común.
+        """
+        required = sorted(_normalize_skills(required_skills))
+        if not required:
+            return _EMPTY, np.empty(0)
+
+        with self._lock:
+            arrays = [self._postings.get(skill, _EMPTY) for skill in required]
+            total_users = max(len(self._user_skills), 1)
+
+        weights = np.array([math.log(1 + total_users / max(len(ids), 1)) for ids in arrays])
+        total_weight = weights.sum()
+
+        ids = np.concatenate(arrays)
+        if not len(ids):
+            return _EMPTY, np.empty(0)
+
+        # Un solo pase: acumulador denso indexado por user id
+        acc = np.bincount(ids, weights=np.repeat(weights, [len(a) for a in arrays]))
+        if len(exclude_ids):
+            exclude = np.asarray(list(exclude_ids), dtype=np.int64)
+            exclude = exclude[exclude < len(acc)]
+            acc[exclude] = 0
+
+        user_ids = np.flatnonzero(acc)
+        return user_ids, acc[user_ids] / total_weight
+
+    def top(self, required_skills, limit, exclude_ids=()):
+        """Los `limit` mejores por solapamiento, ordenados de mayor a menor."""
+        user_ids, scores = self.match(required_skills, exclude_ids)
+        if len(user_ids) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            user_ids, scores = user_ids[best], scores[best]
+        order = np.lexsort((user_ids, -scores))
+        return user_ids[order], scores[order]
+
+    def skills_of(self, user_id):
+        return self._user_skills.get(user_id, frozenset())
+
+
+# Índice del proceso (un worker de gunicorn, ver Dockerfile)
+skill_index = SkillIndex()
@@ -1,13 +1,34 @@
 """
 Servicio de Web Push Notifications para LocalTalent
 Permite enviar notificaciones push a navegadores
+
+El envío real se hace en el worker de Celery (`push_tasks.deliver_push_batch`):
+las funciones `send_*_push` sólo encolan. En el worker se reutiliza una
+`requests.Session` por origen del push service (FCM, Mozilla autopush, ...),
+las cabeceras VAPID se firman una vez por audiencia mientras sigan vigentes y
+los envíos van en paralelo con un máximo de conexiones simultáneas por host.
+
+Cada usuario puede tener varias suscripciones (una por dispositivo, tabla
+`push_subscription`) y los pushes se envían a todas. Tras cada lote se
+registra el resultado por dispositivo: las que devuelven 404/410 se borran y
+las que fallan `PUSH_MAX_FAILURES` veces seguidas también.
 """
-from pywebpush import webpush, WebPushException
+from pywebpush import WebPusher, WebPushException
+from py_vapid import Vapid
 from flask import current_app
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from requests import Session
+from requests.adapters import HTTPAdapter
+from datetime import datetime
+import threading
+import time
 import json
 import logging
 import os
 
+from app.common.config import config_value
+
 logger = logging.getLogger(__name__)
 
 # Claves VAPID (Voluntary Application Server Identification)
@@ -20,71 +41,303 @@ VAPID_CLAIMS = {
     "sub": "mailto:notifications@localtalent.es"
 }
 
+# Códigos con los que el push service indica que la suscripción ya no existe
+DEAD_SUBSCRIPTION_STATUSES = (404, 410)
+
+# Valores por defecto (sobreescribibles desde Config)
+DEFAULT_PUSH_TTL = 24 * 60 * 60            # segundos que el push service guarda el mensaje
+DEFAULT_VAPID_EXPIRY = 12 * 60 * 60        # validez del JWT VAPID (máximo permitido: 24h)
+VAPID_RENEW_MARGIN = 5 * 60                # renovar la firma 5 min antes de expirar
+DEFAULT_MAX_CONCURRENCY_PER_HOST = 4
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_MAX_FAILURES = 5
+
+
+# ========================================
+# CONEXIONES Y FIRMAS VAPID REUTILIZABLES
+# ========================================
 
-def send_push_notification(subscription_info, notification_data):
+_state_lock = threading.Lock()
+_sessions = {}          # origen -> requests.Session
+_host_semaphores = {}   # host -> BoundedSemaphore
+_vapid_headers = {}     # audiencia -> (headers, exp)
+_vapid_signer = None
+
+
+def _origin(endpoint):
+    parsed = urlparse(endpoint)
+    return f'{parsed.scheme}://{parsed.netloc}'
+
+
+def _push_settings():
+    """Configuración de envío, leída una vez en el contexto de la aplicación.
+
+    Los hilos de `deliver_push_batch` no tienen `app_context`: reciben estos
+    valores en vez de consultar `current_app`.
     """
-    Enviar notificación push a un suscriptor
+    return {
+        'ttl': config_value('PUSH_TTL', DEFAULT_PUSH_TTL),
+        'vapid_expiry': config_value('PUSH_VAPID_EXPIRY', DEFAULT_VAPID_EXPIRY),
+        'max_concurrency_per_host': config_value('PUSH_MAX_CONCURRENCY_PER_HOST', DEFAULT_MAX_CONCURRENCY_PER_HOST),
+    }
+
+
+def _session_for(origin, pool_size):
+    """Session HTTP (keep-alive) compartida para todos los envíos a `origin`."""
+    session = _sessions.get(origin)
+    if session is None:
+        with _state_lock:
+            session = _sessions.get(origin)
+            if session is None:
+                session = Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                session.mount(origin, adapter)
+                _sessions[origin] = session
+    return session
+
+
+def _semaphore_for(host, limit):
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        with _state_lock:
+            semaphore = _host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(limit)
+                _host_semaphores[host] = semaphore
+    return semaphore
+
+
+def _vapid_headers_for(audience, expiry):
+    """Cabeceras VAPID firmadas para `audience`, cacheadas mientras sean válidas."""
+    global _vapid_signer
+
+    now = int(time.time())
+    cached = _vapid_headers.get(audience)
+    if cached and cached[1] - VAPID_RENEW_MARGIN > now:
+        return cached[0]
+
+    with _state_lock:
+        cached = _vapid_headers.get(audience)
+        if cached and cached[1] - VAPID_RENEW_MARGIN > now:
+            return cached[0]
+
+        if _vapid_signer is None:
+            _vapid_signer = Vapid.from_string(private_key=VAPID_PRIVATE_KEY)
+
+        exp = now + expiry
+        claims = dict(VAPID_CLAIMS, aud=audience, exp=exp)
+        headers = _vapid_signer.sign(claims)
+        _vapid_headers[audience] = (headers, exp)
+        return headers
+
+
+def send_push_notification(subscription_info, notification_data, settings=None):
+    """
+    Enviar notificación push a un suscriptor (síncrono)
 
     Args:
         subscription_info: Objeto de suscripción con endpoint, keys, etc.
         notification_data: Datos de la notificación (title, body, icon, data)
+        settings: Resultado de `_push_settings()`; obligatorio fuera del
+            contexto de la aplicación (hilos de `deliver_push_batch`)
 
     Returns:
-        bool: True si se envió correctamente, False en caso contrario
+        int | None: Código HTTP devuelto por el push service, o None si no
+        se llegó a enviar (configuración o suscripción inválida, error de red)
     """
     if not VAPID_PUBLIC_KEY or not VAPID_PRIVATE_KEY:
         logger.error('VAPID keys not configured')
-        return False
+        return None
 
-    if not subscription_info:
+    if not subscription_info or not subscription_info.get('endpoint'):
         logger.warning('No subscription info provided')
-        return False
+        return None
+
+    if settings is None:
+        settings = _push_settings()
+    concurrency = settings['max_concurrency_per_host']
+    endpoint = subscription_info['endpoint']
+    origin = _origin(endpoint)
 
     try:
         # Preparar el payload de la notificación
         payload = json.dumps(notification_data)
 
-        # Enviar notificación push
-        response = webpush(
-            subscription_info=subscription_info,
-            data=payload,
-            vapid_private_key=VAPID_PRIVATE_KEY,
-            vapid_claims=VAPID_CLAIMS
-        )
-
-        logger.info(f'Push notification sent successfully: {response.status_code}')
-        return True
+        with _semaphore_for(urlparse(endpoint).netloc, concurrency):
+            response = WebPusher(
+                subscription_info,
+                requests_session=_session_for(origin, concurrency)
+            ).send(
+                payload,
+                dict(_vapid_headers_for(origin, settings['vapid_expiry'])),
+                ttl=settings['ttl'],
+                content_encoding='aes128gcm',
+                timeout=10
+            )
+
+        if response.status_code > 202:
+            logger.warning(f'Push notification rejected: {response.status_code} {response.reason}')
+        else:
+            logger.info(f'Push notification sent successfully: {response.status_code}')
+        return response.status_code
 
     except WebPushException as e:
         logger.error(f'WebPushException: {e}')
+        return e.response.status_code if e.response is not None else None
 
-        # Si la suscripción expiró (410 Gone), debería eliminarse de la BD
-        if e.response and e.response.status_code == 410:
-            logger.warning('Subscription expired, should be removed from database')
+    except Exception as e:
+        logger.error(f'Error sending push notification: {str(e)}')
+        return None
 
-        return False
 
+def deliver_push_batch(deliveries):
+    """
+    Enviar un lote de pushes en paralelo (lo usa el worker de Celery)
+
+    Args:
+        deliveries: Lista de dicts con subscription_id, user_id, subscription
+            y notification_data
+
+    Returns:
+        list: Lista de dicts con subscription_id, user_id y status (código
+        HTTP o None)
+    """
+    if not deliveries:
+        return []
+
+    max_workers = min(len(deliveries), config_value('PUSH_MAX_WORKERS', DEFAULT_MAX_WORKERS))
+    settings = _push_settings()
+
+    def _deliver(delivery):
+        status = send_push_notification(delivery['subscription'], delivery['notification_data'], settings)
+        return {
+            'subscription_id': delivery['subscription_id'],
+            'user_id': delivery['user_id'],
+            'status': status,
+        }
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_deliver, deliveries))
+
+
+def record_push_results(results):
+    """
+    Registrar el resultado de un lote por dispositivo
+
+    - 2xx: `last_success_at = ahora` y se reinicia `failure_count`
+    - 404/410: el push service ya no conoce la suscripción, se borra
+    - Otros fallos: se incrementa `failure_count` y se borra al llegar a
+      `PUSH_MAX_FAILURES` (endpoints que nunca responden)
+
+    Returns:
+        int: Número de suscripciones eliminadas
+    """
+    from app import db
+    from app.models import PushSubscription
+
+    succeeded, dead, failed = [], [], []
+    for r in results:
+        status = r['status']
+        if status is not None and status <= 202:
+            succeeded.append(r['subscription_id'])
+        elif status in DEAD_SUBSCRIPTION_STATUSES:
+            dead.append(r['subscription_id'])
+        else:
+            failed.append(r['subscription_id'])
+
+    removed = 0
+    if succeeded:
+        PushSubscription.query.filter(PushSubscription.id.in_(succeeded)).update(
+            {'last_success_at': datetime.utcnow(), 'failure_count': 0},
+            synchronize_session=False
+        )
+    if failed:
+        PushSubscription.query.filter(PushSubscription.id.in_(failed)).update(
+            {'failure_count': PushSubscription.failure_count + 1},
+            synchronize_session=False
+        )
+        max_failures = config_value('PUSH_MAX_FAILURES', DEFAULT_MAX_FAILURES)
+        removed += PushSubscription.query.filter(
+            PushSubscription.id.in_(failed),
+            PushSubscription.failure_count >= max_failures
+        ).delete(synchronize_session=False)
+    if dead:
+        removed += PushSubscription.query.filter(
+            PushSubscription.id.in_(dead)
+        ).delete(synchronize_session=False)
+    db.session.commit()
+
+    if removed:
+        logger.info(f'Removed {removed} expired push subscription(s)')
+    return removed
+
+
+def enqueue_push(deliveries):
+    """
+    Encolar un lote de pushes en Celery (cola `default`)
+
+    Returns:
+        bool: True si se encoló
+    """
+    if not deliveries:
+        return False
+    try:
+        current_app.celery.send_task(
+            'push_tasks.deliver_push_batch',
+            args=[deliveries],
+            queue='default'
+        )
+        return True
     except Exception as e:
-        logger.error(f'Error sending push notification: {str(e)}')
+        logger.error(f'Error enqueuing push notifications: {str(e)}')
         return False
 
 
-def send_push_to_user(user, notification_data):
+def send_push_to_users(user_ids, notification_data):
     """
-    Enviar notificación push a un usuario específico
+    Encolar la misma notificación push para todos los dispositivos de
+    varios usuarios (una sola consulta y un solo lote)
 
     Args:
-        user: Objeto User con push_subscription
+        user_ids: IDs de los usuarios destinatarios
         notification_data: Datos de la notificación
 
     Returns:
-        bool: True si se envió correctamente
+        bool: True si se encoló algún envío
     """
-    if not user.push_subscription:
-        logger.debug(f'User {user.id} has no push subscription')
+    from app.models import PushSubscription
+
+    user_ids = list(user_ids)
+    if not user_ids:
         return False
 
-    return send_push_notification(user.push_subscription, notification_data)
+    subscriptions = PushSubscription.query.filter(
+        PushSubscription.user_id.in_(user_ids)
+    ).all()
+    if not subscriptions:
+        logger.debug(f'No push subscriptions for users {user_ids}')
+        return False
+
+    return enqueue_push([{
+        'subscription_id': sub.id,
+        'user_id': sub.user_id,
+        'subscription': sub.to_subscription_info(),
+        'notification_data': notification_data,
+    } for sub in subscriptions])
+
+
+def send_push_to_user(user, notification_data):
+    """
+    Encolar una notificación push para todos los dispositivos de un usuario
+
+    Args:
+        user: Objeto User destinatario
+        notification_data: Datos de la notificación
+
+    Returns:
+        bool: True si se encoló correctamente
+    """
+    return send_push_to_users([user.id], notification_data)
 
 
 # ========================================
@@ -142,16 +395,8 @@ def send_profile_viewed_push(user, viewer_name):
     return send_push_to_user(user, notification_data)
 
 
-def send_event_invitation_push(user, event_title, inviter_name):
-    """
-    Enviar push de invitación a evento
-
-    Args:
-        user: Usuario invitado
-        event_title: Título del evento
-        inviter_name: Nombre de quien invita
-    """
-    notification_data = {
+def _event_invitation_data(event_title, inviter_name):
+    return {
         'title': f'Invitación a evento: {event_title}',
         'body': f'{inviter_name} te ha invitado a un evento',
         'icon': '/static/icons/event-icon.png',
@@ -168,19 +413,33 @@ def send_event_invitation_push(user, event_title, inviter_name):
         ]
     }
 
-    return send_push_to_user(user, notification_data)
-
 
-def send_project_invitation_push(user, project_title, inviter_name):
+def send_event_invitation_push(user, event_title, inviter_name):
     """
-    Enviar push de invitación a proyecto
+    Enviar push de invitación a evento
 
     Args:
         user: Usuario invitado
-        project_title: Título del proyecto
+        event_title: Título del evento
         inviter_name: Nombre de quien invita
     """
-    notification_data = {
+    return send_event_invitation_pushes([user.id], event_title, inviter_name)
+
+
+def send_event_invitation_pushes(user_ids, event_title, inviter_name):
+    """
+    Push de invitación a evento para varios invitados (un solo lote)
+
+    Args:
+        user_ids: IDs de los invitados
+        event_title: Título del evento
+        inviter_name: Nombre de quien invita
+    """
+    return send_push_to_users(user_ids, _event_invitation_data(event_title, inviter_name))
+
+
+def _project_invitation_data(project_title, inviter_name):
+    return {
         'title': f'Invitación a proyecto: {project_title}',
         'body': f'{inviter_name} te ha invitado a colaborar',
         'icon': '/static/icons/project-icon.png',
@@ -191,7 +450,29 @@ def send_project_invitation_push(user, project_title, inviter_name):
         }
     }
 
-    return send_push_to_user(user, notification_data)
+
+def send_project_invitation_push(user, project_title, inviter_name):
+    """
+    Enviar push de invitación a proyecto
+
+    Args:
+        user: Usuario invitado
+        project_title: Título del proyecto
+        inviter_name: Nombre de quien invita
+    """
+    return send_project_invitation_pushes([user.id], project_title, inviter_name)
+
+
+def send_project_invitation_pushes(user_ids, project_title, inviter_name):
+    """
+    Push de invitación a proyecto para varios invitados (un solo lote)
+
+    Args:
+        user_ids: IDs de los invitados
+        project_title: Título del proyecto
+        inviter_name: Nombre de quien invita
+    """
+    return send_push_to_users(user_ids, _project_invitation_data(project_title, inviter_name))
 
 
 def send_new_review_push(user, reviewer_name, rating):
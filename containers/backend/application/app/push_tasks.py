@@ -0,0 +1,36 @@
+"""
+Tareas de Celery para la entrega de Web Push Notifications
+"""
+from app import create_app
+from app.push_service import deliver_push_batch as _deliver_push_batch, record_push_results
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Crear contexto de la app para las tareas
+app = create_app()
+celery = app.celery
+
+
+@celery.task(name='push_tasks.deliver_push_batch')
+def deliver_push_batch(deliveries):
+    """
+    Entregar un lote de pushes en paralelo y registrar el resultado por
+    dispositivo (limpiando las suscripciones caducadas)
+
+    Args:
+        deliveries: Lista de dicts con subscription_id, user_id, subscription
+            y notification_data
+    """
+    with app.app_context():
+        try:
+            results = _deliver_push_batch(deliveries)
+            removed = record_push_results(results)
+
+            sent = sum(1 for r in results if r['status'] is not None and r['status'] <= 202)
+            logger.info(f'Push batch: {sent}/{len(results)} enviados, {removed} suscripciones eliminadas')
+            return {'sent': sent, 'total': len(results), 'removed': removed}
+
+        except Exception as e:
+            logger.error(f'Error en deliver_push_batch: {str(e)}')
+            return f'Error: {str(e)}'
@@ -0,0 +1,159 @@
+"""
+Contador de SQL por petición y detector de N+1
+
+Cada sentencia que pasa por un engine de SQLAlchemy dentro de una petición
+HTTP se anota en `g.sql_stats` (hooks `before_cursor_execute` /
+`after_cursor_execute`): número de consultas, tiempo total en base de datos
+y cuántas veces se repite cada sentencia normalizada (huella).
+
+Al terminar la petición:
+
+- Cabecera `Server-Timing` con `db` (tiempo y nº de consultas) y `app`
+  (tiempo total), visible en la pestaña de red del navegador.
+- Línea `sql endpoint=... queries=... db_ms=...` en el log (DEBUG).
+- WARNING si una misma sentencia se repite `SQL_NPLUS1_THRESHOLD` veces o
+  más (el patrón típico de un N+1: una consulta por fila al recorrer una
+  relación) o si se supera `SQL_QUERY_BUDGET` consultas.
+- Con `SQL_QUERY_BUDGET_STRICT` pasarse del presupuesto lanza
+  `QueryBudgetExceeded` (pensado para los tests).
+
+En tests también se puede acotar un bloque concreto:
+
+    with query_budget(3):
+        self.client.get('/api/v1/security/blocked-users')
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy.engine import Engine
+
+from app.event_registry import listen_once
+from app.logger_config import logger
+
+DEFAULT_NPLUS1_THRESHOLD = 5
+
+# Listas de parámetros (IN expandido) y literales numéricos -> `?`
+_PARAM_LIST = re.compile(r'\(\s*(?:%\(\w+\)s|\?)(?:\s*,\s*(?:%\(\w+\)s|\?))*\s*\)')
+_PARAM = re.compile(r'%\(\w+\)s')
+_NUMBER = re.compile(r'\b\d+\b')
+
+# Presupuestos activos de `query_budget` (tests, un solo hilo)
+_budgets = []
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.fingerprints = Counter()
+        self.started = time.perf_counter()
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.total += elapsed
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold):
+        """[(huella, veces)] de las sentencias repetidas `threshold` veces o más."""
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+
+def fingerprint(statement):
+    normalized = _PARAM_LIST.sub('(?)', statement)
+    normalized = _NUMBER.sub('?', _PARAM.sub('?', normalized))
+    return ' '.join(normalized.split())
+
+
+def _current_stats():
+    if not has_request_context():
+        return None
+    return g.get('sql_stats')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and (_budgets or _current_stats() is not None):
+        context._sql_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_sql_stats_started', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = _current_stats()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    for budget in _budgets:
+        budget.record(statement, elapsed)
+
+
+def _start_request():
+    g.sql_stats = QueryStats()
+
+
+def _finish_request(response):
+    stats = g.pop('sql_stats', None)
+    if stats is None:
+        return response
+
+    config = current_app.config
+    elapsed_ms = (time.perf_counter() - stats.started) * 1000
+    db_ms = stats.total * 1000
+    endpoint = request.endpoint or request.path
+
+    response.headers.add(
+        'Server-Timing',
+        f'db;dur={db_ms:.1f};desc="{stats.count} queries", app;dur={elapsed_ms:.1f}'
+    )
+
+    sql_logger = logger.getChild('sql')
+    repeated = stats.repeated(config.get('SQL_NPLUS1_THRESHOLD', DEFAULT_NPLUS1_THRESHOLD))
+    sql_logger.debug(
+        f"sql endpoint={endpoint} method={request.method} status={response.status_code} "
+        f"queries={stats.count} db_ms={db_ms:.1f} total_ms={elapsed_ms:.1f} repeated={len(repeated)}"
+    )
+    for statement, times in repeated:
+        sql_logger.warning(f"posible N+1 endpoint={endpoint} repeticiones={times} sql={statement[:300]}")
+
+    budget = config.get('SQL_QUERY_BUDGET')
+    if budget is not None and stats.count > budget:
+        message = f"presupuesto de consultas superado endpoint={endpoint} queries={stats.count} budget={budget}"
+        sql_logger.warning(message)
+        if config.get('SQL_QUERY_BUDGET_STRICT'):
+            raise QueryBudgetExceeded(message)
+
+    return response
+
+
+@contextmanager
+def query_budget(max_queries):
+    """
+    Falla si dentro del bloque se ejecutan más de `max_queries` consultas.
+    Devuelve el `QueryStats` del bloque para inspeccionar las huellas.
+    """
+    stats = QueryStats()
+    _budgets.append(stats)
+    try:
+        yield stats
+    finally:
+        _budgets.remove(stats)
+    if stats.count > max_queries:
+        detail = '; '.join(f'{n}x {fp[:120]}' for fp, n in stats.fingerprints.most_common(3))
+        raise QueryBudgetExceeded(f"{stats.count} consultas (máximo {max_queries}): {detail}")
+
+
+def init_query_stats(app):
+    """Registrar los hooks de SQLAlchemy (todos los engines) y de Flask."""
+    if not app.config.get('SQL_STATS_ENABLED', True):
+        return
+    listen_once(Engine, 'before_cursor_execute', _before_cursor_execute)
+    listen_once(Engine, 'after_cursor_execute', _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
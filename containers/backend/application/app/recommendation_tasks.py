@@ -0,0 +1,46 @@
+"""
+Tareas de Celery para el precálculo de recomendaciones de eventos
+"""
+from app import create_app
+from app.recommendations import refresh_recommendations as _refresh_recommendations
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Crear contexto de la app para las tareas
+app = create_app()
+celery = app.celery
+
+
+@celery.task(name='recommendation_tasks.refresh_recommendations')
+def refresh_recommendations():
+    """
+    Recalcular las recomendaciones de los usuarios obsoletos (sin calcular,
+    demasiado antiguas o con actividad nueva)
+    """
+    with app.app_context():
+        try:
+            result = _refresh_recommendations(
+                max_users=app.config.get('RECOMMENDATION_MAX_USERS_PER_RUN')
+            )
+            logger.info(f"Recomendaciones: {result['users']} usuarios, {result['recommendations']} eventos")
+            return result
+
+        except Exception as e:
+            logger.error(f'Error en refresh_recommendations: {str(e)}')
+            return f'Error: {str(e)}'
+
+
+@celery.task(name='recommendation_tasks.refresh_user_recommendations')
+def refresh_user_recommendations(user_id):
+    """
+    Calcular las recomendaciones de un usuario concreto (p.ej. la primera vez
+    que las pide)
+    """
+    with app.app_context():
+        try:
+            return _refresh_recommendations(user_ids=[user_id])
+
+        except Exception as e:
+            logger.error(f'Error en refresh_user_recommendations: {str(e)}')
+            return f'Error: {str(e)}'
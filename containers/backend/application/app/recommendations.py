@@ -0,0 +1,365 @@
+"""
+Recomendación de eventos por usuario (precalculada)
+
+Puntuar en cada petición todos los eventos próximos contra la red de
+contactos del usuario es demasiado caro, así que las recomendaciones se
+calculan en lote en Celery (`recommendation_tasks`) y se guardan como un
+top-K por usuario en `event_recommendation`. `/api/v1/events/recommended`
+solo lee esa tabla.
+
+Señales (cada una normalizada a [0, 1]):
+- Distancia: `haversine_km_sql` entre el usuario y el evento, lineal hasta
+  `RECOMMENDATION_RADIUS_KM`. Los eventos online puntúan un valor fijo.
+- Categoría: el evento es de la categoría de talento del usuario.
+- Contactos: asistentes confirmados que son contactos del usuario
+  (conversaciones y compañeros de proyecto).
+- Popularidad: plazas confirmadas, en escala logarítmica.
+
+Refresco incremental: `recommendation_state` guarda cuándo se calculó cada
+usuario y `stale_user_ids` solo devuelve los que no se han calculado nunca,
+los que tienen recomendaciones más viejas que `RECOMMENDATION_MAX_AGE_HOURS`
+o los que han tenido actividad desde entonces (perfil, RSVPs, proyectos,
+conversaciones nuevas).
+"""
+import heapq
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, delete, exists, or_, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.common import haversine_km_sql
+from app.common.config import config_value
+from app.models import (
+    User,
+    Event,
+    EventRSVP,
+    ProjectMember,
+    Conversation,
+    WaitlistEntry,
+    EventRecommendation,
+    RecommendationState,
+)
+
+# Valores por defecto (sobreescribibles desde Config)
+DEFAULT_TOP_K = 20
+DEFAULT_RADIUS_KM = 50
+DEFAULT_HORIZON_DAYS = 60
+DEFAULT_MAX_AGE_HOURS = 6
+DEFAULT_BATCH_SIZE = 200
+
+# Pesos de cada señal en la puntuación final
+WEIGHT_DISTANCE = 0.35
+WEIGHT_CATEGORY = 0.25
+WEIGHT_CONTACTS = 0.30
+WEIGHT_POPULARITY = 0.10
+
+ONLINE_DISTANCE_SCORE = 0.5     # un evento online está "cerca" de todos
+CONTACTS_SATURATION = 3         # a partir de 3 contactos la señal vale 1
+
+
+def _candidate_filter(now):
+    """Eventos recomendables: públicos, próximos y con plazas."""
+    horizon = now + timedelta(days=config_value('RECOMMENDATION_HORIZON_DAYS', DEFAULT_HORIZON_DAYS))
+    return and_(
+        Event.is_public.is_(True),
+        Event.deletedAt.is_(None),
+        Event.start_date >= now,
+        Event.start_date <= horizon,
+        or_(Event.max_attendees.is_(None), Event.confirmed_count < Event.max_attendees),
+    )
+
+
+def stale_user_ids(limit=None, now=None):
+    """
+    Usuarios cuyas recomendaciones hay que recalcular (los más antiguos primero)
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(hours=config_value('RECOMMENDATION_MAX_AGE_HOURS', DEFAULT_MAX_AGE_HOURS))
+    computed_at = RecommendationState.computed_at
+
+    activity = or_(
+        User.updatedAt > computed_at,
+        exists().where(EventRSVP.user_id == User.id, EventRSVP.updatedAt > computed_at),
+        exists().where(ProjectMember.user_id == User.id, ProjectMember.updatedAt > computed_at),
+        exists().where(
+            or_(Conversation.participant1_id == User.id, Conversation.participant2_id == User.id),
+            Conversation.createdAt > computed_at,
+        ),
+    )
+    stmt = (
+        select(User.id)
+        .outerjoin(RecommendationState, RecommendationState.user_id == User.id)
+        .where(
+            User.is_enabled.is_(True),
+            User.deletedAt.is_(None),
+            or_(computed_at.is_(None), computed_at < cutoff, activity),
+        )
+        .order_by(computed_at.asc().nullsfirst())
+        # Las bajas (RSVP cancelado, miembro que sale) también son actividad
+        .execution_options(include_soft_deleted=True)
+    )
+    if limit:
+        stmt = stmt.limit(limit)
+    return list(db.session.execute(stmt).scalars())
+
+
+def load_candidates(now=None):
+    """
+    Eventos candidatos de esta pasada: {event_id: fila}. Se cargan una vez y
+    se reutilizan para todos los lotes de usuarios.
+    """
+    now = now or datetime.utcnow()
+    rows = db.session.execute(
+        select(
+            Event.id,
+            Event.latitude,
+            Event.longitude,
+            Event.is_online,
+            Event.category,
+            Event.creator_id,
+            Event.confirmed_count,
+        ).where(_candidate_filter(now))
+    ).all()
+    return {row.id: row for row in rows}
+
+
+def _contacts(user_ids):
+    """{user_id: set(contactos)} por conversaciones y proyectos compartidos."""
+    contacts = defaultdict(set)
+
+    rows = db.session.execute(
+        select(Conversation.participant1_id, Conversation.participant2_id).where(
+            Conversation.deletedAt.is_(None),
+            or_(Conversation.participant1_id.in_(user_ids), Conversation.participant2_id.in_(user_ids)),
+        )
+    ).all()
+    for p1, p2 in rows:
+        contacts[p1].add(p2)
+        contacts[p2].add(p1)
+
+    other = aliased(ProjectMember)
+    rows = db.session.execute(
+        select(ProjectMember.user_id, other.user_id)
+        .join(other, and_(
+            other.project_id == ProjectMember.project_id,
+            other.user_id != ProjectMember.user_id,
+            other.status == 'active',
+            other.deletedAt.is_(None),
+        ))
+        .where(
+            ProjectMember.user_id.in_(user_ids),
+            ProjectMember.status == 'active',
+            ProjectMember.deletedAt.is_(None),
+        )
+        .distinct()
+    ).all()
+    for user_id, co_member in rows:
+        contacts[user_id].add(co_member)
+
+    return contacts
+
+
+def _attendees_by_event(user_ids, now):
+    """{event_id: set(asistentes confirmados)} restringido a `user_ids`."""
+    attendees = defaultdict(set)
+    if not user_ids:
+        return attendees
+    rows = db.session.execute(
+        select(EventRSVP.event_id, EventRSVP.user_id)
+        .join(Event, Event.id == EventRSVP.event_id)
+        .where(
+            _candidate_filter(now),
+            EventRSVP.user_id.in_(user_ids),
+            EventRSVP.status == 'confirmed',
+            EventRSVP.deletedAt.is_(None),
+        )
+    ).all()
+    for event_id, user_id in rows:
+        attendees[event_id].add(user_id)
+    return attendees
+
+
+def _excluded(user_ids):
+    """{user_id: set(event_id)} con RSVP o en lista de espera (ya los conoce)."""
+    excluded = defaultdict(set)
+    rows = db.session.execute(
+        select(EventRSVP.user_id, EventRSVP.event_id).where(
+            EventRSVP.user_id.in_(user_ids),
+            EventRSVP.deletedAt.is_(None),
+        ).union_all(
+            select(WaitlistEntry.user_id, WaitlistEntry.event_id).where(
+                WaitlistEntry.user_id.in_(user_ids),
+                WaitlistEntry.event_id.isnot(None),
+                WaitlistEntry.status == 'waiting',
+            )
+        )
+    ).all()
+    for user_id, event_id in rows:
+        excluded[user_id].add(event_id)
+    return excluded
+
+
+def _distances(user_ids, radius_km, now):
+    """{user_id: {event_id: km}} para los eventos dentro del radio, en SQL."""
+    distance = haversine_km_sql(Event.latitude, Event.longitude, User.latitude, User.longitude)
+    rows = db.session.execute(
+        select(User.id, Event.id, distance)
+        .where(
+            User.id.in_(user_ids),
+            User.latitude.isnot(None),
+            User.longitude.isnot(None),
+            Event.latitude.isnot(None),
+            Event.longitude.isnot(None),
+            Event.is_online.is_(False),
+            _candidate_filter(now),
+            distance <= radius_km,
+        )
+    ).all()
+    distances = defaultdict(dict)
+    for user_id, event_id, km in rows:
+        distances[user_id][event_id] = km
+    return distances
+
+
+def score_users(user_ids, candidates, now=None):
+    """
+    Calcula el top-K de cada usuario del lote
+
+    Returns:
+        dict: {user_id: [(score, event_id, reasons), ...]} ordenado por score
+    """
+    now = now or datetime.utcnow()
+    top_k = config_value('RECOMMENDATION_TOP_K', DEFAULT_TOP_K)
+    radius_km = config_value('RECOMMENDATION_RADIUS_KM', DEFAULT_RADIUS_KM)
+
+    users = db.session.execute(
+        select(User.id, User.category, User.latitude, User.longitude).where(User.id.in_(user_ids))
+    ).all()
+
+    contacts = _contacts(user_ids)
+    all_contacts = set().union(*contacts.values()) if contacts else set()
+    attendees = _attendees_by_event(all_contacts, now)
+    excluded = _excluded(user_ids)
+    distances = _distances(user_ids, radius_km, now)
+
+    online_ids = [event_id for event_id, ev in candidates.items() if ev.is_online]
+    max_confirmed = max((ev.confirmed_count for ev in candidates.values()), default=0)
+    popularity_norm = math.log1p(max_confirmed) or 1.0
+
+    results = {}
+    for user in users:
+        user_contacts = contacts.get(user.id, set())
+        user_distances = distances.get(user.id, {})
+        has_location = user.latitude is not None and user.longitude is not None
+
+        # Solo se puntúan eventos cercanos, online o con contactos apuntados;
+        # sin ubicación del usuario no hay forma de descartar por distancia
+        if has_location:
+            pool = set(user_distances) | set(online_ids)
+            pool.update(event_id for event_id, who in attendees.items() if who & user_contacts)
+        else:
+            pool = set(candidates)
+        pool -= excluded.get(user.id, set())
+
+        scored = []
+        for event_id in pool:
+            ev = candidates.get(event_id)
+            if ev is None or ev.creator_id == user.id:
+                continue
+
+            km = user_distances.get(event_id)
+            if km is not None:
+                distance_score = max(0.0, 1.0 - km / radius_km)
+            elif ev.is_online:
+                distance_score = ONLINE_DISTANCE_SCORE
+            else:
+                distance_score = 0.0
+
+            category_match = bool(user.category and ev.category == user.category)
+            contacts_going = len(attendees.get(event_id, set()) & user_contacts)
+            popularity = math.log1p(ev.confirmed_count) / popularity_norm
+
+            score = (
+                WEIGHT_DISTANCE * distance_score
+                + WEIGHT_CATEGORY * category_match
+                + WEIGHT_CONTACTS * min(1.0, contacts_going / CONTACTS_SATURATION)
+                + WEIGHT_POPULARITY * popularity
+            )
+            if score <= 0:
+                continue
+            scored.append((round(score, 4), event_id, {
+                'distance_km': round(km, 1) if km is not None else None,
+                'category_match': category_match,
+                'contacts': contacts_going,
+            }))
+
+        results[user.id] = heapq.nlargest(top_k, scored, key=lambda item: (item[0], -item[1]))
+    return results
+
+
+def store_recommendations(results, now=None):
+    """
+    Sustituye el top-K de los usuarios del lote y marca su `computed_at`
+    (sin commit)
+    """
+    now = now or datetime.utcnow()
+    user_ids = list(results)
+    if not user_ids:
+        return 0
+
+    db.session.execute(delete(EventRecommendation).where(EventRecommendation.user_id.in_(user_ids)))
+
+    rows = [{
+        'user_id': user_id,
+        'event_id': event_id,
+        'rank': rank,
+        'score': score,
+        'reasons': reasons,
+        'computed_at': now,
+    } for user_id, top in results.items() for rank, (score, event_id, reasons) in enumerate(top, start=1)]
+    if rows:
+        db.session.execute(pg_insert(EventRecommendation.__table__).values(rows))
+
+    stmt = pg_insert(RecommendationState.__table__).values([
+        {'user_id': user_id, 'computed_at': now} for user_id in user_ids
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id'],
+        set_={'computed_at': stmt.excluded.computed_at},
+    )
+    db.session.execute(stmt)
+    return len(rows)
+
+
+def refresh_recommendations(user_ids=None, max_users=None):
+    """
+    Recalcula las recomendaciones de `user_ids` (o de los usuarios obsoletos)
+    por lotes, con un commit por lote
+
+    Returns:
+        dict: usuarios y recomendaciones escritas
+    """
+    now = datetime.utcnow()
+    if user_ids is None:
+        user_ids = stale_user_ids(limit=max_users, now=now)
+    if not user_ids:
+        return {'users': 0, 'recommendations': 0}
+
+    candidates = load_candidates(now)
+    batch_size = config_value('RECOMMENDATION_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+    written = 0
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        try:
+            written += store_recommendations(score_users(batch, candidates, now), now)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    return {'users': len(user_ids), 'recommendations': written}
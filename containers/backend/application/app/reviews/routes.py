@@ -10,6 +10,8 @@ from app.cache import (
 )
 from app.models import Review, User, Conversation
 from app.schemas import ReviewCreateSchema, ReviewUpdateSchema, validate_body
+from app.notifications.routes import add_notification
+from app.db_routing import read_replica, reading_from_replica
 from datetime import datetime, timezone
 from sqlalchemy import func
 
@@ -39,8 +41,7 @@ def can_review_user(username):
         # Verificar si ya existe una review
         existing_review = Review.query.filter_by(
             reviewer_id=current_user.id,
-            reviewee_id=reviewee.id,
-            deletedAt=None
+            reviewee_id=reviewee.id
         ).first()
 
         if existing_review:
@@ -95,8 +96,7 @@ def create_review(payload: ReviewCreateSchema):
         # Buscar reviewee
         reviewee = User.query.filter_by(
             id=reviewee_id,
-            is_enabled=True,
-            deletedAt=None
+            is_enabled=True
         ).first()
 
         if not reviewee:
@@ -109,8 +109,7 @@ def create_review(payload: ReviewCreateSchema):
         # Verificar si ya existe una review
         existing_review = Review.query.filter_by(
             reviewer_id=current_user.id,
-            reviewee_id=reviewee_id,
-            deletedAt=None
+            reviewee_id=reviewee_id
         ).first()
 
         if existing_review:
@@ -143,11 +142,22 @@ def create_review(payload: ReviewCreateSchema):
         )
 
         db.session.add(review)
-        db.session.commit()
-        invalidate_user_rating(reviewee_id)
 
         reviewer_username = current_user.display_username
 
+        # Notificar al valorado en la misma transacción
+        add_notification(
+            reviewee_id,
+            'new_review',
+            'Nueva valoración',
+            message=f"{current_user.first_name} {current_user.last_name} te ha valorado con {rating} estrellas",
+            link='/auth/user/profile',
+            data={'reviewer_id': current_user.id, 'reviewer_username': reviewer_username, 'rating': rating},
+            actor_id=current_user.id
+        )
+        db.session.commit()
+        invalidate_user_rating(reviewee_id)
+
         return jsonify({
             'message': 'Valoración creada correctamente',
             'review': {
@@ -168,6 +178,7 @@ def create_review(payload: ReviewCreateSchema):
 
 
 @bp.route('/api/v1/reviews/<username>', methods=['GET'])
+@read_replica
 def get_user_reviews(username):
     """Obtener todas las reviews de un usuario (público)"""
     try:
@@ -183,8 +194,7 @@ def get_user_reviews(username):
 
         # Obtener reviews del usuario
         reviews = Review.query.filter_by(
-            reviewee_id=user.id,
-            deletedAt=None
+            reviewee_id=user.id
         ).order_by(Review.createdAt.desc()).all()
 
         reviews_data = []
@@ -203,8 +213,7 @@ def get_user_reviews(username):
 
         # Calcular promedio de rating
         avg_rating = db.session.query(func.avg(Review.rating)).filter_by(
-            reviewee_id=user.id,
-            deletedAt=None
+            reviewee_id=user.id
         ).scalar()
 
         return jsonify({
@@ -219,6 +228,7 @@ def get_user_reviews(username):
 
 
 @bp.route('/api/v1/reviews/user/<username>/average', methods=['GET'])
+@read_replica
 def get_user_average_rating(username):
     """Obtener el promedio de valoraciones de un usuario"""
     try:
@@ -241,12 +251,13 @@ def get_user_average_rating(username):
                 func.avg(Review.rating).label('average'),
                 func.count(Review.id).label('count')
             ).filter_by(
-                reviewee_id=user.id,
-                deletedAt=None
+                reviewee_id=user.id
             ).first()
             avg_rating = float(result.average) if result.average else 0
             review_count = result.count or 0
-            set_user_rating_cached(user.id, avg_rating, int(review_count))
+            # Una réplica puede no tener aún la última review: no se cachea
+            if not reading_from_replica():
+                set_user_rating_cached(user.id, avg_rating, int(review_count))
 
         return jsonify({
             'username': username,
@@ -267,8 +278,7 @@ def update_review(review_id, payload: ReviewUpdateSchema):
     try:
         review = Review.query.filter_by(
             id=review_id,
-            reviewer_id=current_user.id,
-            deletedAt=None
+            reviewer_id=current_user.id
         ).first()
 
         if not review:
@@ -310,8 +320,7 @@ def delete_review(review_id):
     try:
         review = Review.query.filter_by(
             id=review_id,
-            reviewer_id=current_user.id,
-            deletedAt=None
+            reviewer_id=current_user.id
         ).first()
 
         if not review:
@@ -337,8 +346,7 @@ def get_my_reviews():
     """Obtener las reviews que el usuario autenticado ha creado"""
     try:
         reviews = Review.query.filter_by(
-            reviewer_id=current_user.id,
-            deletedAt=None
+            reviewer_id=current_user.id
         ).order_by(Review.createdAt.desc()).all()
 
         reviews_data = []
@@ -3,13 +3,16 @@ from app.schemas.events import (
     EventCreateSchema,
     EventUpdateSchema,
     RSVPSchema,
+    EventOccurrenceSchema,
     EventInvitationSchema,
+    BulkEventInvitationSchema,
     EventInvitationResponseSchema,
 )
 from app.schemas.projects import (
     ProjectCreateSchema,
     ProjectUpdateSchema,
     ProjectMemberSchema,
+    BulkProjectInvitationSchema,
     ProjectMemberRoleSchema,
     ProjectMemberResponseSchema,
 )
@@ -23,11 +26,14 @@ __all__ = [
     'EventCreateSchema',
     'EventUpdateSchema',
     'RSVPSchema',
+    'EventOccurrenceSchema',
     'EventInvitationSchema',
+    'BulkEventInvitationSchema',
     'EventInvitationResponseSchema',
     'ProjectCreateSchema',
     'ProjectUpdateSchema',
     'ProjectMemberSchema',
+    'BulkProjectInvitationSchema',
     'ProjectMemberRoleSchema',
     'ProjectMemberResponseSchema',
     'ReviewCreateSchema',
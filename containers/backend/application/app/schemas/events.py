@@ -1,10 +1,18 @@
 from datetime import datetime
-from typing import Literal, Optional
+from typing import Annotated, List, Literal, Optional
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 
 EVENT_TYPES = {'workshop', 'meetup', 'conference', 'collaboration', 'networking', 'other'}
 RSVP_STATUSES = {'confirmed', 'declined', 'pending'}
+# Máximo de invitados por petición en las invitaciones en lote
+MAX_BULK_INVITEES = 100
+
+
+def _check_recurrence_rule(v):
+    # Import local: app.events importa estos schemas desde sus rutas
+    from app.events.recurrence import normalize_rule
+    return normalize_rule(v)
 
 
 class EventCreateSchema(BaseModel):
@@ -26,6 +34,8 @@ class EventCreateSchema(BaseModel):
     is_public: bool = True
     category: Optional[str] = Field(default=None, max_length=50)
     image_url: Optional[str] = Field(default=None, max_length=500)
+    # Subconjunto de RRULE, p.ej. "FREQ=WEEKLY;BYDAY=TU;COUNT=20"
+    recurrence_rule: Optional[str] = Field(default=None, max_length=255)
 
     @field_validator('event_type')
     @classmethod
@@ -34,6 +44,11 @@ class EventCreateSchema(BaseModel):
             raise ValueError(f"event_type inválido. Debe ser uno de {sorted(EVENT_TYPES)}")
         return v
 
+    @field_validator('recurrence_rule')
+    @classmethod
+    def check_recurrence_rule(cls, v):
+        return _check_recurrence_rule(v)
+
     @model_validator(mode='after')
     def check_dates(self):
         if self.end_date and self.start_date and self.end_date < self.start_date:
@@ -60,6 +75,8 @@ class EventUpdateSchema(BaseModel):
     is_public: Optional[bool] = None
     category: Optional[str] = Field(default=None, max_length=50)
     image_url: Optional[str] = Field(default=None, max_length=500)
+    # Cadena vacía o null: deja de ser recurrente
+    recurrence_rule: Optional[str] = Field(default=None, max_length=255)
 
     @field_validator('event_type')
     @classmethod
@@ -68,12 +85,36 @@ class EventUpdateSchema(BaseModel):
             raise ValueError(f"event_type inválido. Debe ser uno de {sorted(EVENT_TYPES)}")
         return v
 
+    @field_validator('recurrence_rule')
+    @classmethod
+    def check_recurrence_rule(cls, v):
+        return _check_recurrence_rule(v)
+
 
 class RSVPSchema(BaseModel):
     model_config = ConfigDict(extra='ignore', str_strip_whitespace=True)
 
     status: Literal['confirmed', 'declined', 'pending'] = 'confirmed'
     notes: Optional[str] = Field(default=None, max_length=1000)
+    # Sesión (inicio original) de un evento recurrente; obligatoria en series
+    occurrence_start: Optional[datetime] = None
+
+
+class EventOccurrenceSchema(BaseModel):
+    model_config = ConfigDict(extra='ignore', str_strip_whitespace=True)
+
+    occurrence_start: datetime
+    is_cancelled: Optional[bool] = None
+    title: Optional[str] = Field(default=None, min_length=1, max_length=200)
+    description: Optional[str] = Field(default=None, max_length=5000)
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+    @model_validator(mode='after')
+    def check_dates(self):
+        if self.end_date and self.start_date and self.end_date < self.start_date:
+            raise ValueError("end_date no puede ser anterior a start_date")
+        return self
 
 
 class EventInvitationSchema(BaseModel):
@@ -83,6 +124,19 @@ class EventInvitationSchema(BaseModel):
     message: Optional[str] = Field(default=None, max_length=1000)
 
 
+class BulkEventInvitationSchema(BaseModel):
+    model_config = ConfigDict(extra='ignore', str_strip_whitespace=True)
+
+    invitee_ids: List[Annotated[int, Field(ge=1)]] = Field(min_length=1, max_length=MAX_BULK_INVITEES)
+    message: Optional[str] = Field(default=None, max_length=1000)
+
+    @field_validator('invitee_ids')
+    @classmethod
+    def dedupe(cls, v):
+        # Sin duplicados, conservando el orden
+        return list(dict.fromkeys(v))
+
+
 class EventInvitationResponseSchema(BaseModel):
     model_config = ConfigDict(extra='ignore', str_strip_whitespace=True)
 
@@ -1,6 +1,8 @@
 from datetime import datetime
-from typing import Literal, Optional
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import Annotated, List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+from app.schemas.events import MAX_BULK_INVITEES
 
 
 PROJECT_STATUSES = {'draft', 'active', 'completed', 'cancelled'}
@@ -56,6 +58,21 @@ class ProjectMemberSchema(BaseModel):
     message: Optional[str] = Field(default=None, max_length=1000)
 
 
+class BulkProjectInvitationSchema(BaseModel):
+    """Body para `POST /projects/<id>/members/bulk` (solo owners)."""
+    model_config = ConfigDict(extra='ignore', str_strip_whitespace=True)
+
+    user_ids: List[Annotated[int, Field(ge=1)]] = Field(min_length=1, max_length=MAX_BULK_INVITEES)
+    role: Optional[str] = Field(default=None, max_length=30)
+    message: Optional[str] = Field(default=None, max_length=1000)
+
+    @field_validator('user_ids')
+    @classmethod
+    def dedupe(cls, v):
+        # Sin duplicados, conservando el orden
+        return list(dict.fromkeys(v))
+
+
 class ProjectMemberRoleSchema(BaseModel):
     model_config = ConfigDict(extra='ignore', str_strip_whitespace=True)
 
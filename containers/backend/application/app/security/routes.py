@@ -4,7 +4,9 @@ from app.security import bp
 from app.logger_config import logger
 from app import db
 from app.models import BlockedUser, Report, VerificationRequest, User, Notification
+from app.projects.skill_index import skill_index
 from datetime import datetime, timezone
+from sqlalchemy.orm import contains_eager
 
 
 # ==================== Bloqueo de Usuarios ====================
@@ -28,8 +30,7 @@ def block_user():
         # Verificar que el usuario existe
         blocked_user = User.query.filter_by(
             id=blocked_id,
-            is_enabled=True,
-            deletedAt=None
+            is_enabled=True
         ).first()
 
         if not blocked_user:
@@ -38,8 +39,7 @@ def block_user():
         # Verificar si ya está bloqueado
         existing_block = BlockedUser.query.filter_by(
             blocker_id=current_user.id,
-            blocked_id=blocked_id,
-            deletedAt=None
+            blocked_id=blocked_id
         ).first()
 
         if existing_block:
@@ -76,8 +76,7 @@ def unblock_user(user_id):
     try:
         block = BlockedUser.query.filter_by(
             blocker_id=current_user.id,
-            blocked_id=user_id,
-            deletedAt=None
+            blocked_id=user_id
         ).first()
 
         if not block:
@@ -100,25 +99,29 @@ def unblock_user(user_id):
 def get_blocked_users():
     """Obtener lista de usuarios bloqueados"""
     try:
-        blocks = BlockedUser.query.filter_by(
-            blocker_id=current_user.id,
-            deletedAt=None
-        ).all()
+        # Un solo SELECT con el usuario bloqueado (antes, una consulta por
+        # fila al leer `block.blocked`); el join ya excluye a los borrados
+        blocks = (
+            BlockedUser.query
+            .join(BlockedUser.blocked)
+            .options(contains_eager(BlockedUser.blocked))
+            .filter(BlockedUser.blocker_id == current_user.id)
+            .all()
+        )
 
         blocked_users = []
         for block in blocks:
-            if block.blocked.deletedAt is None:
-                blocked_users.append({
-                    'block_id': block.id,
-                    'user': {
-                        'id': block.blocked.id,
-                        'name': f"{block.blocked.first_name} {block.blocked.last_name}",
-                        'username': block.blocked.username,
-                        'image': block.blocked.profile_image
-                    },
-                    'reason': block.reason,
-                    'blocked_at': block.createdAt.isoformat() if block.createdAt else None
-                })
+            blocked_users.append({
+                'block_id': block.id,
+                'user': {
+                    'id': block.blocked.id,
+                    'name': f"{block.blocked.first_name} {block.blocked.last_name}",
+                    'username': block.blocked.username,
+                    'image': block.blocked.profile_image
+                },
+                'reason': block.reason,
+                'blocked_at': block.createdAt.isoformat() if block.createdAt else None
+            })
 
         return jsonify({
             'blocked_users': blocked_users,
@@ -138,15 +141,13 @@ def check_if_blocked(user_id):
         # Verificar si el usuario actual bloqueó a este usuario
         blocked_by_me = BlockedUser.query.filter_by(
             blocker_id=current_user.id,
-            blocked_id=user_id,
-            deletedAt=None
+            blocked_id=user_id
         ).first()
 
         # Verificar si este usuario bloqueó al usuario actual
         blocked_me = BlockedUser.query.filter_by(
             blocker_id=user_id,
-            blocked_id=current_user.id,
-            deletedAt=None
+            blocked_id=current_user.id
         ).first()
 
         return jsonify({
@@ -183,8 +184,7 @@ def report_user():
         # Verificar que el usuario existe
         reported_user = User.query.filter_by(
             id=reported_id,
-            is_enabled=True,
-            deletedAt=None
+            is_enabled=True
         ).first()
 
         if not reported_user:
@@ -246,8 +246,7 @@ def get_my_reports():
     """Obtener reportes que el usuario ha enviado"""
     try:
         reports = Report.query.filter_by(
-            reporter_id=current_user.id,
-            deletedAt=None
+            reporter_id=current_user.id
         ).order_by(Report.createdAt.desc()).all()
 
         reports_data = []
@@ -291,7 +290,7 @@ def get_all_reports():
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 20))
 
-        query = Report.query.filter_by(deletedAt=None)
+        query = Report.query
 
         if status:
             query = query.filter_by(status=status)
@@ -344,8 +343,7 @@ def review_report(report_id):
             return jsonify({'error': 'Acceso denegado'}), 403
 
         report = Report.query.filter_by(
-            id=report_id,
-            deletedAt=None
+            id=report_id
         ).first()
 
         if not report:
@@ -406,8 +404,7 @@ def request_verification():
         # Verificar si ya tiene una solicitud pendiente
         existing_request = VerificationRequest.query.filter_by(
             user_id=current_user.id,
-            status='pending',
-            deletedAt=None
+            status='pending'
         ).first()
 
         if existing_request:
@@ -466,8 +463,7 @@ def get_my_verification_request():
     """Obtener solicitud de verificación del usuario"""
     try:
         verification_request = VerificationRequest.query.filter_by(
-            user_id=current_user.id,
-            deletedAt=None
+            user_id=current_user.id
         ).order_by(VerificationRequest.createdAt.desc()).first()
 
         if not verification_request:
@@ -508,7 +504,7 @@ def get_all_verifications():
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 20))
 
-        query = VerificationRequest.query.filter_by(deletedAt=None)
+        query = VerificationRequest.query
 
         if status:
             query = query.filter_by(status=status)
@@ -559,8 +555,7 @@ def review_verification(verification_id):
             return jsonify({'error': 'Acceso denegado'}), 403
 
         verification = VerificationRequest.query.filter_by(
-            id=verification_id,
-            deletedAt=None
+            id=verification_id
         ).first()
 
         if not verification:
@@ -648,6 +643,13 @@ def update_privacy_settings():
 
         db.session.commit()
 
+        # Un perfil privado deja de ser candidato al momento en el índice de
+        # habilidades de este proceso (el resto lo recoge en su `sync`)
+        if 'is_profile_public' in data:
+            skill_index.update_user(
+                current_user.id, current_user.skills if current_user.is_profile_public else None
+            )
+
         return jsonify({
             'message': 'Configuración actualizada correctamente',
             'settings': {
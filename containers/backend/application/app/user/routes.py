@@ -3,16 +3,19 @@ from flask_login import current_user, login_required
 from app.user import bp
 from app.logger_config import logger
 from app import db
-from app.models import User, Portfolio, SavedSearch, Review, ProfileView, Notification
+from app.models import User, Portfolio, SavedSearch, Review, ProfileView
+from app.notifications.routes import add_notification
 from app.schemas import ProfileUpdateSchema, UsernameUpdateSchema, validate_body
 from app.rate_limit import limiter
 from app.common import haversine_km_sql
+from app.projects.skill_index import skill_index
 from flask_limiter.util import get_remote_address
 import os
 from werkzeug.utils import secure_filename
 from sqlalchemy import func, or_, and_
 import math
 from app.auth.email import send_delete_account_email
+from app.db_routing import read_replica
 from flask_login import logout_user
 from datetime import datetime, timezone, timedelta
 
@@ -102,6 +105,11 @@ def update_my_profile(payload: ProfileUpdateSchema):
 
         db.session.commit()
 
+        # El índice de habilidades de este proceso se actualiza al momento;
+        # el resto lo recogen en su siguiente `sync`
+        if 'skills' in data:
+            skill_index.update_user(user.id, user.skills if user.is_profile_public else None)
+
         username = user.username
 
         return jsonify({
@@ -130,6 +138,7 @@ def update_my_profile(payload: ProfileUpdateSchema):
 
 
 @bp.route('/api/v1/profile/<username>', methods=['GET'])
+@read_replica
 def get_public_profile(username):
     """Obtener el perfil público de un usuario por su username (vista pública)"""
     try:
@@ -228,6 +237,7 @@ def confirm_deletion():
             logout_user()
 
         db.session.commit()
+        skill_index.update_user(user.id, None)
 
         return jsonify({'message': 'Tu cuenta ha sido eliminada correctamente'}), 200
     except Exception as e:
@@ -289,6 +299,7 @@ def upload_profile_image():
 
 @bp.route('/api/v1/users/map', methods=['GET'])
 @limiter.limit("60/minute", key_func=get_remote_address)
+@read_replica
 def get_users_for_map():
     """Obtener todos los usuarios con ubicación para el mapa global (respetando privacidad)"""
     try:
@@ -415,8 +426,7 @@ def get_my_portfolio():
     """Obtener portfolio del usuario autenticado"""
     try:
         items = Portfolio.query.filter_by(
-            user_id=current_user.id,
-            deletedAt=None
+            user_id=current_user.id
         ).order_by(Portfolio.order, Portfolio.createdAt.desc()).all()
 
         items_data = []
@@ -452,8 +462,7 @@ def get_user_portfolio(username):
             return jsonify({'error': 'Usuario no encontrado'}), 404
 
         items = Portfolio.query.filter_by(
-            user_id=user.id,
-            deletedAt=None
+            user_id=user.id
         ).order_by(Portfolio.order, Portfolio.createdAt.desc()).all()
 
         items_data = []
@@ -554,8 +563,7 @@ def update_portfolio_item(item_id):
     try:
         item = Portfolio.query.filter_by(
             id=item_id,
-            user_id=current_user.id,
-            deletedAt=None
+            user_id=current_user.id
         ).first()
 
         if not item:
@@ -597,8 +605,7 @@ def delete_portfolio_item(item_id):
         from datetime import datetime, timezone
         item = Portfolio.query.filter_by(
             id=item_id,
-            user_id=current_user.id,
-            deletedAt=None
+            user_id=current_user.id
         ).first()
 
         if not item:
@@ -620,6 +627,7 @@ def delete_portfolio_item(item_id):
 
 @bp.route('/api/v1/users/search', methods=['GET'])
 @limiter.limit("60/minute", key_func=get_remote_address)
+@read_replica
 def advanced_search():
     """
     Búsqueda avanzada de usuarios con filtros:
@@ -783,8 +791,7 @@ def get_saved_searches():
     """Obtener las búsquedas guardadas del usuario actual"""
     try:
         searches = SavedSearch.query.filter_by(
-            user_id=current_user.id,
-            deletedAt=None
+            user_id=current_user.id
         ).order_by(SavedSearch.createdAt.desc()).all()
 
         searches_data = []
@@ -858,8 +865,7 @@ def delete_saved_search(search_id):
         from datetime import datetime, timezone
         search = SavedSearch.query.filter_by(
             id=search_id,
-            user_id=current_user.id,
-            deletedAt=None
+            user_id=current_user.id
         ).first()
 
         if not search:
@@ -884,8 +890,7 @@ def update_saved_search(search_id):
     try:
         search = SavedSearch.query.filter_by(
             id=search_id,
-            user_id=current_user.id,
-            deletedAt=None
+            user_id=current_user.id
         ).first()
 
         if not search:
@@ -967,16 +972,17 @@ def register_profile_view(user_id: int):
         if getattr(viewed, 'notify_profile_views', False):
             viewer_name = f"{current_user.first_name} {current_user.last_name}".strip() or current_user.display_username
             link_username = current_user.username or ''
-            notif = Notification(
-                user_id=viewed.id,
-                type='profile_view',
-                title='Alguien vió tu perfil',
+            add_notification(
+                viewed.id,
+                'profile_view',
+                'Alguien vió tu perfil',
                 message=f'{viewer_name} acaba de visitar tu perfil',
                 link=f'/auth/user/{link_username}' if link_username else None,
                 data={'viewer_id': current_user.id, 'viewer_username': link_username or None},
-                is_read=False,
+                subject='profile',
+                actor_id=current_user.id,
+                rollup=lambda count: f'{count} personas han visitado tu perfil'
             )
-            db.session.add(notif)
 
         db.session.commit()
         return jsonify({'counted': True}), 200
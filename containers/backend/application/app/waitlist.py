@@ -0,0 +1,244 @@
+"""
+Lista de espera para eventos y proyectos llenos
+
+Cuando no quedan plazas el usuario entra en una cola FIFO (`waitlist_entry`)
+en lugar de recibir un 400 y reintentar en bucle. Al liberarse una plaza
+(RSVP cancelado o que deja de estar confirmado, miembro que sale, aumento
+del cupo) se promociona la cabeza de la cola en la MISMA transacción que
+libera la plaza:
+
+- Eventos: la plaza se reserva con el UPDATE condicional de
+  `app.events.capacity` (que bloquea la fila del evento hasta el commit) y
+  la entrada se consume con `UPDATE ... WHERE id = (SELECT ... FOR UPDATE
+  SKIP LOCKED) RETURNING user_id`. Los RSVPs de los promocionados se crean
+  con un único INSERT ... ON CONFLICT, que se audita a partir de su
+  RETURNING (`app.audit.record_core_rows`).
+- Proyectos: igual, con el contador `active_member_count` de
+  `app.projects.membership`.
+
+Las funciones no hacen commit. Las notificaciones en BD se añaden en lote a
+la sesión; el push (`push_promoted`) se encola después del commit.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import db
+from app.audit import audited_returning, record_core_rows
+from app.models import WaitlistEntry, EventRSVP, ProjectMember, Notification
+
+
+def _target_filter(event_id=None, project_id=None):
+    if event_id is not None:
+        return WaitlistEntry.event_id == event_id
+    return WaitlistEntry.project_id == project_id
+
+
+def join_waitlist(user_id, event_id=None, project_id=None):
+    """
+    Apuntar a un usuario en la lista de espera (idempotente)
+
+    Returns:
+        int: Posición (1 = siguiente en entrar)
+    """
+    table = WaitlistEntry.__table__
+    stmt = pg_insert(table).values(
+        event_id=event_id,
+        project_id=project_id,
+        user_id=user_id,
+        status='waiting',
+        createdAt=datetime.utcnow()
+    ).on_conflict_do_nothing()
+    db.session.execute(stmt)
+    return waitlist_position(user_id, event_id=event_id, project_id=project_id)
+
+
+def leave_waitlist(user_id, event_id=None, project_id=None):
+    """
+    Sacar a un usuario de la lista de espera
+
+    Returns:
+        bool: True si estaba en espera
+    """
+    stmt = (
+        update(WaitlistEntry)
+        .where(
+            _target_filter(event_id, project_id),
+            WaitlistEntry.user_id == user_id,
+            WaitlistEntry.status == 'waiting',
+        )
+        .values(status='left')
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).rowcount > 0
+
+
+def waitlist_position(user_id, event_id=None, project_id=None):
+    """
+    Posición del usuario en la cola (None si no está en espera)
+    """
+    target = _target_filter(event_id, project_id)
+    own_id = (
+        select(WaitlistEntry.id)
+        .where(target, WaitlistEntry.user_id == user_id, WaitlistEntry.status == 'waiting')
+        .scalar_subquery()
+    )
+    position = db.session.execute(
+        select(func.count(WaitlistEntry.id))
+        .where(target, WaitlistEntry.status == 'waiting', WaitlistEntry.id <= own_id)
+    ).scalar()
+    return position or None
+
+
+def waitlist_size(event_id=None, project_id=None):
+    return db.session.execute(
+        select(func.count(WaitlistEntry.id))
+        .where(_target_filter(event_id, project_id), WaitlistEntry.status == 'waiting')
+    ).scalar()
+
+
+def _pop_next(event_id=None, project_id=None):
+    """Consume la cabeza de la cola. Devuelve el user_id o None si está vacía."""
+    head = (
+        select(WaitlistEntry.id)
+        .where(_target_filter(event_id, project_id), WaitlistEntry.status == 'waiting')
+        .order_by(WaitlistEntry.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(WaitlistEntry)
+        .where(WaitlistEntry.id == head)
+        .values(status='promoted', promoted_at=datetime.utcnow())
+        .returning(WaitlistEntry.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).scalar_one_or_none()
+
+
+def promote_event_waitlist(event_id):
+    """
+    Ocupar las plazas libres del evento con la lista de espera
+
+    Returns:
+        list: IDs de los usuarios promocionados
+    """
+    # Import local: app.events importa este módulo desde sus rutas
+    from app.events.capacity import reserve_seat, release_seat
+
+    promoted = []
+    while reserve_seat(event_id) is not None:
+        user_id = _pop_next(event_id=event_id)
+        if user_id is None:
+            # Cola vacía: devolver la plaza reservada
+            release_seat(event_id)
+            break
+        promoted.append(user_id)
+
+    if promoted:
+        now = datetime.now(timezone.utc)
+        table = EventRSVP.__table__
+        stmt = pg_insert(table).values([{
+            'event_id': event_id,
+            'user_id': user_id,
+            'status': 'confirmed',
+            'response_date': now,
+            'createdAt': now,
+            'updatedAt': now,
+        } for user_id in promoted])
+        # Reactivar RSVPs previos (cancelados o no confirmados) del mismo usuario
+        stmt = stmt.on_conflict_do_update(
+            constraint='unique_rsvp_per_event',
+            set_={
+                'status': 'confirmed',
+                'response_date': stmt.excluded.response_date,
+                'updatedAt': stmt.excluded.updatedAt,
+                'deletedAt': None,
+            }
+        ).returning(*audited_returning(table))
+        record_core_rows(db.session, EventRSVP, db.session.execute(stmt).all())
+    return promoted
+
+
+def promote_project_waitlist(project_id):
+    """
+    Ocupar los huecos libres del proyecto con la lista de espera
+
+    Returns:
+        list: IDs de los usuarios promocionados
+    """
+    # Import local: app.projects importa este módulo desde sus rutas
+    from app.projects.membership import reserve_member_slot, release_member_slot
+
+    promoted = []
+    while reserve_member_slot(project_id) is not None:
+        user_id = _pop_next(project_id=project_id)
+        if user_id is None:
+            # Cola vacía: devolver el hueco reservado
+            release_member_slot(project_id)
+            break
+        promoted.append(user_id)
+
+    if promoted:
+        now = datetime.now(timezone.utc)
+        table = ProjectMember.__table__
+        stmt = pg_insert(table).values([{
+            'project_id': project_id,
+            'user_id': user_id,
+            'role': 'contributor',
+            'status': 'active',
+            'joined_at': now,
+            'createdAt': now,
+            'updatedAt': now,
+        } for user_id in promoted])
+        stmt = stmt.on_conflict_do_update(
+            constraint='unique_member_per_project',
+            set_={
+                'status': 'active',
+                'joined_at': stmt.excluded.joined_at,
+                'left_at': None,
+                'updatedAt': stmt.excluded.updatedAt,
+                'deletedAt': None,
+            }
+        ).returning(*audited_returning(table))
+        record_core_rows(db.session, ProjectMember, db.session.execute(stmt).all())
+    return promoted
+
+
+def notify_promoted(user_ids, title, message, link, data):
+    """
+    Añadir en lote (un solo flush) las notificaciones de promoción
+    """
+    db.session.add_all([
+        Notification(
+            user_id=user_id,
+            type='waitlist_promoted',
+            title=title,
+            message=message,
+            link=link,
+            data=data,
+            is_read=False
+        )
+        for user_id in user_ids
+    ])
+
+
+def push_promoted(user_ids, title, body, url):
+    """
+    Encolar el push de promoción para todos los dispositivos en un solo lote
+    (llamar después del commit)
+    """
+    from app.push_service import send_push_to_users
+
+    return send_push_to_users(user_ids, {
+        'title': title,
+        'body': body,
+        'icon': '/static/icons/event-icon.png',
+        'badge': '/static/icons/badge-icon.png',
+        'data': {
+            'type': 'waitlist_promoted',
+            'url': url
+        }
+    })
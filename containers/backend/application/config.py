@@ -14,6 +14,26 @@ class Config:
     basedir = os.path.abspath(os.path.dirname(__file__))
     SECRET_KEY = os.environ.get('SECRET_KEY')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+    # Réplicas de lectura (app/db_routing.py): un bind `replica_N` por URL
+    DATABASE_REPLICA_URLS = [url for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url]
+    SQLALCHEMY_BINDS = {f'replica_{i}': url for i, url in enumerate(DATABASE_REPLICA_URLS)}
+    # Segundos tras una escritura del usuario en los que sus lecturas van al primario
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
+    ############################################################################################################
+    # Pool de conexiones a PostgreSQL (app/db_pool.py)
+    ############################################################################################################
+
+    # Conexiones por proceso y engine: DB_POOL_SIZE fijas + DB_MAX_OVERFLOW temporales
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    # Segundos esperando una conexión libre antes de fallar
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    # Reabrir conexiones con más de N segundos (cortes de firewall/PgBouncer)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    # PgBouncer en modo transacción delante de PostgreSQL: sin pool propio (NullPool) y sin estado de sesión
+    DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'False').lower() == 'true'
     DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
     ORGS_PER_PAGE = 9
     FRONTEND_BASE_URL = os.environ.get('FRONTEND_BASE_URL')
@@ -82,8 +102,114 @@ class Config:
             'task': 'email_tasks.send_weekly_digests',
             'schedule': crontab(day_of_week=1, hour=9, minute=0),  # Lunes a las 9:00 AM
         },
+        'refresh-event-recommendations': {
+            'task': 'recommendation_tasks.refresh_recommendations',
+            'schedule': timedelta(minutes=30),  # Solo usuarios obsoletos o con actividad
+        },
+        'manage-audit-partitions-daily': {
+            'task': 'audit_tasks.manage_audit_partitions',
+            'schedule': crontab(hour=3, minute=30),  # Crea particiones futuras y retira las antiguas
+        },
     }
     
+    ############################################################################################################
+    # Configuración de Web Push (worker `push_tasks`)
+    ############################################################################################################
+
+    # Conexiones simultáneas máximas contra un mismo push service (FCM, Mozilla...)
+    PUSH_MAX_CONCURRENCY_PER_HOST = int(os.environ.get('PUSH_MAX_CONCURRENCY_PER_HOST', 4))
+    # Hilos totales por lote de envío
+    PUSH_MAX_WORKERS = int(os.environ.get('PUSH_MAX_WORKERS', 16))
+    # Segundos que el push service retiene el mensaje si el navegador no está conectado
+    PUSH_TTL = int(os.environ.get('PUSH_TTL', 24 * 60 * 60))
+    # Validez de la firma VAPID cacheada por audiencia (máximo 24h según RFC 8292)
+    PUSH_VAPID_EXPIRY = int(os.environ.get('PUSH_VAPID_EXPIRY', 12 * 60 * 60))
+    # Fallos consecutivos (distintos de 404/410) tras los que se elimina una suscripción
+    PUSH_MAX_FAILURES = int(os.environ.get('PUSH_MAX_FAILURES', 5))
+
+    ############################################################################################################
+    # Configuración de Notificaciones
+    ############################################################################################################
+
+    # Minutos durante los que eventos del mismo (usuario, tipo, sujeto) se acumulan en una notificación no leída
+    NOTIFICATION_COALESCE_WINDOW_MINUTES = int(os.environ.get('NOTIFICATION_COALESCE_WINDOW_MINUTES', 60))
+
+    ############################################################################################################
+    # Configuración de Recomendaciones de eventos (worker `recommendation_tasks`)
+    ############################################################################################################
+
+    # Eventos guardados por usuario
+    RECOMMENDATION_TOP_K = int(os.environ.get('RECOMMENDATION_TOP_K', 20))
+    # Radio (km) a partir del cual la distancia deja de puntuar
+    RECOMMENDATION_RADIUS_KM = float(os.environ.get('RECOMMENDATION_RADIUS_KM', 50))
+    # Solo se recomiendan eventos de los próximos N días
+    RECOMMENDATION_HORIZON_DAYS = int(os.environ.get('RECOMMENDATION_HORIZON_DAYS', 60))
+    # Horas tras las que se recalcula un usuario aunque no haya tenido actividad
+    RECOMMENDATION_MAX_AGE_HOURS = int(os.environ.get('RECOMMENDATION_MAX_AGE_HOURS', 6))
+    # Usuarios por lote (un commit por lote) y máximo por ejecución de la tarea
+    RECOMMENDATION_BATCH_SIZE = int(os.environ.get('RECOMMENDATION_BATCH_SIZE', 200))
+    RECOMMENDATION_MAX_USERS_PER_RUN = int(os.environ.get('RECOMMENDATION_MAX_USERS_PER_RUN', 5000))
+
+    ############################################################################################################
+    # Configuración del índice de habilidades (candidatos para proyectos)
+    ############################################################################################################
+
+    # Cada cuántos segundos se traen los perfiles modificados en otros procesos
+    SKILL_INDEX_SYNC_SECONDS = int(os.environ.get('SKILL_INDEX_SYNC_SECONDS', 30))
+    # Cada cuántos segundos se reconstruye el índice completo
+    SKILL_INDEX_REBUILD_SECONDS = int(os.environ.get('SKILL_INDEX_REBUILD_SECONDS', 60 * 60))
+
+    ############################################################################################################
+    # Configuración de Auditoría (app/audit.py)
+    ############################################################################################################
+
+    # False: cada transacción escribe su lote de auditoría al hacer commit (tests)
+    AUDIT_ASYNC = os.environ.get('AUDIT_ASYNC', 'True').lower() == 'true'
+    # Filas por INSERT y cada cuántos segundos el hilo de fondo vacía el buffer
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 500))
+    AUDIT_FLUSH_SECONDS = float(os.environ.get('AUDIT_FLUSH_SECONDS', 2))
+    # Cambios pendientes máximos en memoria por proceso (el resto se descarta)
+    AUDIT_MAX_BUFFER = int(os.environ.get('AUDIT_MAX_BUFFER', 50000))
+    # Particiones mensuales creadas por adelantado y meses que se conservan adjuntos
+    AUDIT_PARTITIONS_AHEAD = int(os.environ.get('AUDIT_PARTITIONS_AHEAD', 3))
+    AUDIT_RETENTION_MONTHS = int(os.environ.get('AUDIT_RETENTION_MONTHS', 12))
+    # Directorio donde se archivan (CSV gzip) las particiones retiradas; vacío = solo DETACH
+    AUDIT_ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR')
+
+    ############################################################################################################
+    # Instrumentación de SQL por petición (app/query_stats.py)
+    ############################################################################################################
+
+    SQL_STATS_ENABLED = os.environ.get('SQL_STATS_ENABLED', 'True').lower() == 'true'
+    # Repeticiones de una misma sentencia en una petición a partir de las que se avisa de un posible N+1
+    SQL_NPLUS1_THRESHOLD = int(os.environ.get('SQL_NPLUS1_THRESHOLD', 5))
+    # Consultas máximas por petición (vacío = sin límite); con STRICT se lanza una excepción
+    SQL_QUERY_BUDGET = int(os.environ['SQL_QUERY_BUDGET']) if os.environ.get('SQL_QUERY_BUDGET') else None
+    SQL_QUERY_BUDGET_STRICT = os.environ.get('SQL_QUERY_BUDGET_STRICT', 'False').lower() == 'true'
+
+    ############################################################################################################
+    # Métricas Prometheus (app/metrics.py, GET /metrics)
+    ############################################################################################################
+
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    # Si se define, /metrics exige `Authorization: Bearer <token>`
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    # Directorios multiproceso de otros servicios que se suman a /metrics (el del worker de Celery)
+    METRICS_EXTRA_DIRS = [d for d in os.environ.get('METRICS_EXTRA_DIRS', '').split(',') if d]
+
+    ############################################################################################################
+    # Perfilado estadístico (app/profiling.py)
+    ############################################################################################################
+
+    # Perfilar una fracción de las peticiones y eventos de socket (la cabecera
+    # `X-Profile: 1` de un superadmin funciona aunque esté desactivado)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False').lower() == 'true'
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.01))
+    PROFILING_INTERVAL_MS = int(os.environ.get('PROFILING_INTERVAL_MS', 5))
+    # Endpoints a perfilar (`user.advanced_search`, `socketio.handle_send_message`...); vacío = todos
+    PROFILING_ENDPOINTS = [e for e in os.environ.get('PROFILING_ENDPOINTS', '').split(',') if e]
+    PROFILING_DIR = os.environ.get('PROFILING_DIR', os.path.join(basedir, 'logs', 'profiles'))
+
     ############################################################################################################
     # Configuración de API NVD
     ############################################################################################################
@@ -123,4 +249,5 @@ class TestConfig(Config):  # Hereda de Config
     }
     SQLALCHEMY_SESSION_OPTIONS = {
         "expire_on_commit": False
-    }
\ No newline at end of file
+    }
+    AUDIT_ASYNC = False
\ No newline at end of file
@@ -0,0 +1,32 @@
+# gunicorn.conf.py
+"""
+Hooks de gunicorn:
+- Métricas multiproceso de Prometheus (app/metrics.py). Solo actúan si está
+  definida PROMETHEUS_MULTIPROC_DIR.
+- Índice de habilidades (app/projects/skill_index.py) construido al arrancar
+  el worker, fuera de las peticiones.
+"""
+import glob
+import os
+
+
+def on_starting(server):
+    # Ficheros de una ejecución anterior: ningún proceso vivo los usa
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(multiproc_dir, '*.db')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    # Los gauges `livesum` dejan de contar al worker que ha muerto
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    # `worker.wsgi` es la app de Flask de httpApp.py, ya cargada en el worker
+    from app.projects.skill_index import skill_index
+    skill_index.start(worker.wsgi)
@@ -12,9 +12,9 @@ app = create_app()
 
 
 with app.app_context():
-    from app.models import setup_audit , setup_base, User # 
-    setup_audit()
-    setup_base()
+    # Los listeners de timestamps y auditoría se registran (una sola vez) al
+    # importar app.models
+    from app.models import User
 
 def create_or_update_default_admin(flask_app):
     flask_app.logger.info("[ADMIN_SETUP] Iniciando proceso de verificación/creación de admin por defecto")
@@ -132,6 +132,36 @@ def create_admin_command():
     create_or_update_default_admin(app)
     print("Comando para crear/actualizar administrador por defecto finalizado.")
 
+
+@app.cli.command("recount-member-counts")
+@click.option('--project-id', 'project_ids', type=int, multiple=True,
+              help='Proyecto a recalcular (repetible). Por defecto, todos.')
+def recount_member_counts_command(project_ids):
+    """Recalcula project.active_member_count a partir de project_member."""
+    from app.projects.membership import recount_active_members
+    try:
+        updated = recount_active_members(list(project_ids) or None)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    print(f"Contadores de miembros recalculados en {updated} proyectos.")
+
+
+@app.cli.command("recount-confirmed")
+@click.option('--event-id', 'event_ids', type=int, multiple=True,
+              help='Evento a recalcular (repetible). Por defecto, todos.')
+def recount_confirmed_command(event_ids):
+    """Recalcula event.confirmed_count (y el de sus sesiones) a partir de event_rsvp."""
+    from app.events.capacity import recount_confirmed
+    try:
+        updated = recount_confirmed(list(event_ids) or None)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    print(f"Plazas confirmadas recalculadas en {updated} eventos.")
+
 #Para que funcione el CORS y no haga siempre preflight haciendo un OPTIONS
 #No se si es el mejor sitio para ponerlo, lo dudo
 @app.after_request
@@ -0,0 +1,60 @@
+"""add push_subscription table (una suscripción web push por dispositivo)
+
+Revision ID: 14_push_subscriptions
+Revises: 13_profile_views_username
+Create Date: 2026-10-19 00:00:00.000000
+
+- Nueva tabla `push_subscription` (usuario, hash del endpoint, keys,
+  last_success_at, failure_count) para soportar varios dispositivos por
+  usuario. Antes `user.push_subscription` guardaba una sola suscripción y
+  suscribirse desde el móvil pisaba la del portátil.
+- Se copian las suscripciones existentes de `user.push_subscription`.
+  La columna se mantiene (legacy) pero la aplicación ya no la usa.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '14_push_subscriptions'
+down_revision = '13_profile_views_username'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'push_subscription',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('endpoint_hash', sa.String(length=64), nullable=False),
+        sa.Column('endpoint', sa.Text(), nullable=False),
+        sa.Column('keys', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('createdAt', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('last_success_at', sa.DateTime(), nullable=True),
+        sa.Column('failure_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('endpoint_hash', name='uq_push_subscription_endpoint_hash'),
+    )
+    op.create_index('idx_push_subscription_user', 'push_subscription', ['user_id'])
+
+    # Migrar la suscripción única que tenía cada usuario
+    op.execute("""
+        INSERT INTO push_subscription (user_id, endpoint_hash, endpoint, keys, "createdAt", failure_count)
+        SELECT id,
+               encode(sha256(convert_to(push_subscription->>'endpoint', 'UTF8')), 'hex'),
+               push_subscription->>'endpoint',
+               push_subscription->'keys',
+               CURRENT_TIMESTAMP,
+               0
+        FROM "user"
+        WHERE push_subscription IS NOT NULL
+          AND push_subscription->>'endpoint' IS NOT NULL
+          AND push_subscription->'keys' IS NOT NULL
+        ON CONFLICT (endpoint_hash) DO NOTHING
+    """)
+
+
+def downgrade():
+    op.drop_index('idx_push_subscription_user', table_name='push_subscription')
+    op.drop_table('push_subscription')
@@ -0,0 +1,47 @@
+"""add notification coalescing columns (group_key, actor_count, last_actor_id)
+
+Revision ID: 15_notification_coalescing
+Revises: 14_push_subscriptions
+Create Date: 2026-10-19 00:00:00.000000
+
+- `group_key`: '<tipo>:<sujeto>' de las notificaciones que se agrupan.
+- `actor_count`: número de eventos acumulados en la notificación.
+- `last_actor_id`: último usuario que generó un evento del grupo.
+- Índice parcial para localizar la notificación no leída de un grupo.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '15_notification_coalescing'
+down_revision = '14_push_subscriptions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('notification', sa.Column('group_key', sa.String(length=255), nullable=True))
+    op.add_column(
+        'notification',
+        sa.Column('actor_count', sa.Integer(), nullable=False, server_default='1'),
+    )
+    op.add_column('notification', sa.Column('last_actor_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_notification_last_actor_id_user',
+        'notification', 'user',
+        ['last_actor_id'], ['id'],
+        ondelete='SET NULL',
+    )
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS idx_notification_user_group_unread '
+        'ON notification (user_id, group_key) '
+        'WHERE is_read = false AND "deletedAt" IS NULL AND group_key IS NOT NULL'
+    )
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS idx_notification_user_group_unread')
+    op.drop_constraint('fk_notification_last_actor_id_user', 'notification', type_='foreignkey')
+    op.drop_column('notification', 'last_actor_id')
+    op.drop_column('notification', 'actor_count')
+    op.drop_column('notification', 'group_key')
@@ -0,0 +1,46 @@
+"""add event.confirmed_count (contador atómico de plazas confirmadas)
+
+Revision ID: 16_event_confirmed_count
+Revises: 15_notification_coalescing
+Create Date: 2026-10-19 00:00:00.000000
+
+- Nuevo campo `confirmed_count` en `event`, mantenido con UPDATE
+  condicionales para que RSVPs concurrentes no sobrepasen `max_attendees`.
+- Se rellena con el número actual de RSVPs confirmados.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '16_event_confirmed_count'
+down_revision = '15_notification_coalescing'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'event',
+        sa.Column('confirmed_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.execute("""
+        UPDATE event e
+        SET confirmed_count = sub.total
+        FROM (
+            SELECT event_id, count(*) AS total
+            FROM event_rsvp
+            WHERE status = 'confirmed' AND "deletedAt" IS NULL
+            GROUP BY event_id
+        ) sub
+        WHERE sub.event_id = e.id
+    """)
+    op.create_check_constraint(
+        'event_confirmed_count_non_negative',
+        'event',
+        'confirmed_count >= 0',
+    )
+
+
+def downgrade():
+    op.drop_constraint('event_confirmed_count_non_negative', 'event', type_='check')
+    op.drop_column('event', 'confirmed_count')
@@ -0,0 +1,61 @@
+"""add waitlist_entry (lista de espera de eventos y proyectos)
+
+Revision ID: 17_waitlist
+Revises: 16_event_confirmed_count
+Create Date: 2026-10-19 00:00:00.000000
+
+- Nueva tabla `waitlist_entry`: cola FIFO (por id) de usuarios esperando
+  plaza en un evento o proyecto lleno. Cuando se libera una plaza se
+  promociona la cabeza de la cola en la misma transacción.
+- Índices parciales sobre las entradas en espera: unicidad por usuario y
+  acceso a la cabeza de la cola.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '17_waitlist'
+down_revision = '16_event_confirmed_count'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'waitlist_entry',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('event_id', sa.Integer(), nullable=True),
+        sa.Column('project_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='waiting'),
+        sa.Column('createdAt', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('promoted_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['event_id'], ['event.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['project_id'], ['project.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.CheckConstraint('(event_id IS NULL) <> (project_id IS NULL)', name='waitlist_single_target'),
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_waitlist_event_user_waiting "
+        "ON waitlist_entry (event_id, user_id) WHERE status = 'waiting' AND event_id IS NOT NULL"
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_waitlist_project_user_waiting "
+        "ON waitlist_entry (project_id, user_id) WHERE status = 'waiting' AND project_id IS NOT NULL"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_waitlist_event_queue "
+        "ON waitlist_entry (event_id, id) WHERE status = 'waiting' AND event_id IS NOT NULL"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_waitlist_project_queue "
+        "ON waitlist_entry (project_id, id) WHERE status = 'waiting' AND project_id IS NOT NULL"
+    )
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS idx_waitlist_project_queue')
+    op.execute('DROP INDEX IF EXISTS idx_waitlist_event_queue')
+    op.execute('DROP INDEX IF EXISTS uq_waitlist_project_user_waiting')
+    op.execute('DROP INDEX IF EXISTS uq_waitlist_event_user_waiting')
+    op.drop_table('waitlist_entry')
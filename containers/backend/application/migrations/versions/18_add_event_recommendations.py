@@ -0,0 +1,52 @@
+"""add event_recommendation y recommendation_state (recomendaciones precalculadas)
+
+Revision ID: 18_event_recommendations
+Revises: 17_waitlist
+Create Date: 2026-10-19 00:00:00.000000
+
+- Nueva tabla `event_recommendation`: top-K de eventos recomendados por
+  usuario, recalculado por Celery (`recommendation_tasks`).
+- Nueva tabla `recommendation_state`: cuándo se recalculó cada usuario, para
+  refrescar solo los usuarios con actividad nueva o recomendaciones viejas.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '18_event_recommendations'
+down_revision = '17_waitlist'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'event_recommendation',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.SmallInteger(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('reasons', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('computed_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['event_id'], ['event.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'event_id'),
+    )
+    op.create_index('idx_event_recommendation_user_rank', 'event_recommendation', ['user_id', 'rank'])
+
+    op.create_table(
+        'recommendation_state',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_index('idx_recommendation_state_computed', 'recommendation_state', ['computed_at'])
+
+
+def downgrade():
+    op.drop_index('idx_recommendation_state_computed', table_name='recommendation_state')
+    op.drop_table('recommendation_state')
+    op.drop_index('idx_event_recommendation_user_rank', table_name='event_recommendation')
+    op.drop_table('event_recommendation')
@@ -0,0 +1,25 @@
+"""add idx_user_updated_at (sincronización del índice de habilidades)
+
+Revision ID: 19_user_updated_at_index
+Revises: 18_event_recommendations
+Create Date: 2026-10-19 00:00:00.000000
+
+- Índice sobre `user."updatedAt"`: el índice de habilidades en memoria
+  (`app.projects.skill_index`) trae periódicamente los perfiles modificados
+  desde su última sincronización.
+"""
+from alembic import op
+
+
+revision = '19_user_updated_at_index'
+down_revision = '18_event_recommendations'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE INDEX IF NOT EXISTS idx_user_updated_at ON "user" ("updatedAt")')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS idx_user_updated_at')
@@ -0,0 +1,48 @@
+"""add project.active_member_count (contador atómico de miembros activos)
+
+Revision ID: 20_project_active_member_count
+Revises: 19_user_updated_at_index
+Create Date: 2026-10-19 00:00:00.000000
+
+- Nueva columna `project.active_member_count`: número de miembros activos,
+  mantenido con UPDATE condicional (ver `app.projects.membership`) para que
+  las altas concurrentes no sobrepasen `max_members` y los listados no
+  tengan que agregar `project_member`.
+- Se rellena a partir de las membresías activas existentes.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20_project_active_member_count'
+down_revision = '19_user_updated_at_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'project',
+        sa.Column('active_member_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.execute("""
+        UPDATE project p
+        SET active_member_count = sub.total
+        FROM (
+            SELECT project_id, count(*) AS total
+            FROM project_member
+            WHERE status = 'active' AND "deletedAt" IS NULL
+            GROUP BY project_id
+        ) sub
+        WHERE sub.project_id = p.id
+    """)
+    op.create_check_constraint(
+        'project_active_member_count_non_negative',
+        'project',
+        'active_member_count >= 0',
+    )
+
+
+def downgrade():
+    op.drop_constraint('project_active_member_count_non_negative', 'project', type_='check')
+    op.drop_column('project', 'active_member_count')
@@ -0,0 +1,85 @@
+"""add recurring events (event.recurrence_rule, event_occurrence, RSVP por sesión)
+
+Revision ID: 21_recurring_events
+Revises: 20_project_active_member_count
+Create Date: 2026-10-19 00:00:00.000000
+
+- Nuevas columnas `event.recurrence_rule` (subconjunto de RRULE) y
+  `event.recurrence_end` (inicio de la última sesión, null = sin fin), con
+  un índice parcial para localizar las series que solapan una ventana.
+- Nueva tabla `event_occurrence`: solo las sesiones con cambios (moverla,
+  cancelarla, otro título) o con RSVPs; guarda también su contador de
+  plazas confirmadas.
+- `event_rsvp.occurrence_id`: RSVP a una sesión concreta. La unicidad pasa a
+  `(event_id, user_id, occurrence_id)` con NULLS NOT DISTINCT (PostgreSQL
+  15+), así sigue habiendo un único RSVP por usuario al evento completo.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '21_recurring_events'
+down_revision = '20_project_active_member_count'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('event', sa.Column('recurrence_rule', sa.String(length=255), nullable=True))
+    op.add_column('event', sa.Column('recurrence_end', sa.DateTime(), nullable=True))
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_event_series "
+        "ON event (is_public, recurrence_end) WHERE recurrence_rule IS NOT NULL"
+    )
+
+    op.create_table(
+        'event_occurrence',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('occurrence_start', sa.DateTime(), nullable=False),
+        sa.Column('is_cancelled', sa.Boolean(), nullable=False, server_default=sa.text('false')),
+        sa.Column('title', sa.String(length=255), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('start_date', sa.DateTime(), nullable=True),
+        sa.Column('end_date', sa.DateTime(), nullable=True),
+        sa.Column('confirmed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('createdAt', sa.DateTime(), nullable=True),
+        sa.Column('updatedAt', sa.DateTime(), nullable=True),
+        sa.Column('deletedAt', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['event_id'], ['event.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('event_id', 'occurrence_start', name='unique_occurrence_per_event'),
+        sa.CheckConstraint('confirmed_count >= 0', name='event_occurrence_confirmed_count_non_negative'),
+    )
+    op.create_index('idx_occurrence_event_start', 'event_occurrence', ['event_id', 'start_date'])
+
+    op.add_column('event_rsvp', sa.Column('occurrence_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'event_rsvp_occurrence_id_fkey', 'event_rsvp', 'event_occurrence',
+        ['occurrence_id'], ['id'], ondelete='CASCADE'
+    )
+    op.drop_constraint('unique_rsvp_per_event', 'event_rsvp', type_='unique')
+    op.execute(
+        "ALTER TABLE event_rsvp ADD CONSTRAINT unique_rsvp_per_event "
+        "UNIQUE NULLS NOT DISTINCT (event_id, user_id, occurrence_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_rsvp_occurrence_status "
+        "ON event_rsvp (occurrence_id, status) WHERE occurrence_id IS NOT NULL"
+    )
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS idx_rsvp_occurrence_status')
+    # Los RSVPs por sesión no caben en la constraint antigua
+    op.execute('DELETE FROM event_rsvp WHERE occurrence_id IS NOT NULL')
+    op.drop_constraint('unique_rsvp_per_event', 'event_rsvp', type_='unique')
+    op.create_unique_constraint('unique_rsvp_per_event', 'event_rsvp', ['event_id', 'user_id'])
+    op.drop_constraint('event_rsvp_occurrence_id_fkey', 'event_rsvp', type_='foreignkey')
+    op.drop_column('event_rsvp', 'occurrence_id')
+
+    op.drop_index('idx_occurrence_event_start', table_name='event_occurrence')
+    op.drop_table('event_occurrence')
+
+    op.execute('DROP INDEX IF EXISTS idx_event_series')
+    op.drop_column('event', 'recurrence_end')
+    op.drop_column('event', 'recurrence_rule')
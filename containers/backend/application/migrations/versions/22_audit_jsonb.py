@@ -0,0 +1,35 @@
+"""audit: previous_data/new_data a JSONB (diffs escritos en lote)
+
+Revision ID: 22_audit_jsonb
+Revises: 21_recurring_events
+Create Date: 2026-10-19 00:00:00.000000
+
+- La auditoría ya no se escribe dentro del flush de cada petición: los diffs
+  (solo columnas cambiadas) se acumulan en memoria y un hilo de fondo los
+  inserta por lotes (ver app/audit.py).
+- `previous_data` y `new_data` pasan de texto con JSON a JSONB; los datos
+  existentes ya son JSON válido (`json.dumps`).
+"""
+from alembic import op
+
+
+revision = '22_audit_jsonb'
+down_revision = '21_recurring_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        'ALTER TABLE audit '
+        'ALTER COLUMN previous_data TYPE JSONB USING previous_data::jsonb, '
+        'ALTER COLUMN new_data TYPE JSONB USING new_data::jsonb'
+    )
+
+
+def downgrade():
+    op.execute(
+        'ALTER TABLE audit '
+        'ALTER COLUMN previous_data TYPE TEXT USING previous_data::text, '
+        'ALTER COLUMN new_data TYPE TEXT USING new_data::text'
+    )
@@ -0,0 +1,89 @@
+"""audit particionada por mes (rango de `date`) con índice (affected_table, date)
+
+Revision ID: 23_partition_audit
+Revises: 22_audit_jsonb
+Create Date: 2026-10-19 00:00:00.000000
+
+- La tabla `audit` pasa a estar particionada por `date`. La tabla antigua
+  no se copia: se renombra a `audit_legacy` y se adjunta como partición
+  `[MINVALUE, día 1 del mes siguiente)`. El ATTACH recorre la tabla una vez
+  para validar el rango y crear el índice de la nueva PK `(id, date)`.
+- `audit_default` recoge fechas sin partición (debería quedar vacía).
+- Particiones `audit_pYYYYMM` de los próximos meses; a partir de aquí las
+  crea y las retira la tarea `audit_tasks.manage_audit_partitions` (ver
+  app/audit_partitions.py).
+- Índice `(affected_table, date)` para el panel de administración.
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+
+
+revision = '23_partition_audit'
+down_revision = '22_audit_jsonb'
+branch_labels = None
+depends_on = None
+
+PARTITIONS_AHEAD = 3
+
+
+def _add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def upgrade():
+    now = datetime.now(timezone.utc)
+    next_month = _add_months(datetime(now.year, now.month, 1), 1)
+
+    op.execute('ALTER TABLE audit RENAME TO audit_legacy')
+    op.execute('ALTER TABLE audit_legacy DROP CONSTRAINT audit_pkey')
+    op.execute('ALTER TABLE audit_legacy ALTER COLUMN id DROP DEFAULT')
+
+    op.execute(
+        "CREATE TABLE audit ("
+        "id INTEGER NOT NULL DEFAULT nextval('audit_id_seq'), "
+        "affected_table VARCHAR(255) NOT NULL, "
+        "operation VARCHAR(50) NOT NULL, "
+        "previous_data JSONB, "
+        "new_data JSONB, "
+        "date TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(), "
+        "CONSTRAINT audit_pkey PRIMARY KEY (id, date)"
+        ") PARTITION BY RANGE (date)"
+    )
+    op.execute('ALTER SEQUENCE audit_id_seq OWNED BY audit.id')
+
+    op.execute(
+        'ALTER TABLE audit ATTACH PARTITION audit_legacy '
+        f"FOR VALUES FROM (MINVALUE) TO ('{next_month:%Y-%m-%d}')"
+    )
+    op.execute('CREATE TABLE audit_default PARTITION OF audit DEFAULT')
+    for offset in range(PARTITIONS_AHEAD):
+        month = _add_months(next_month, offset)
+        op.execute(
+            f'CREATE TABLE audit_p{month:%Y%m} PARTITION OF audit '
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_add_months(month, 1):%Y-%m-%d}')"
+        )
+
+    op.execute('CREATE INDEX idx_audit_table_date ON audit (affected_table, date)')
+
+
+def downgrade():
+    # Vuelve a una tabla normal con todas las filas que sigan adjuntas (las
+    # particiones ya retiradas no se recuperan)
+    op.execute('ALTER TABLE audit RENAME TO audit_partitioned')
+    op.execute(
+        'CREATE TABLE audit ('
+        "id INTEGER NOT NULL DEFAULT nextval('audit_id_seq'), "
+        'affected_table VARCHAR(255) NOT NULL, '
+        'operation VARCHAR(50) NOT NULL, '
+        'previous_data JSONB, '
+        'new_data JSONB, '
+        'date TIMESTAMP WITHOUT TIME ZONE NOT NULL, '
+        'CONSTRAINT audit_pkey_plain PRIMARY KEY (id)'
+        ')'
+    )
+    op.execute('INSERT INTO audit SELECT * FROM audit_partitioned')
+    op.execute('ALTER SEQUENCE audit_id_seq OWNED BY audit.id')
+    op.execute('DROP TABLE audit_partitioned CASCADE')
+    op.execute('ALTER TABLE audit RENAME CONSTRAINT audit_pkey_plain TO audit_pkey')
@@ -0,0 +1,56 @@
+"""índices parciales WHERE "deletedAt" IS NULL en las tablas calientes
+
+Revision ID: 24_soft_delete_partial_indexes
+Revises: 23_partition_audit
+Create Date: 2026-10-19 00:00:00.000000
+
+Todas las SELECT ORM llevan `"deletedAt" IS NULL` (criterio global de
+soft-delete en app/db_listeners.py), así que los índices de los listados
+solo necesitan las filas vivas: se recrean como parciales (más pequeños y
+sin entradas muertas) y se añade el del listado de notificaciones.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '24_soft_delete_partial_indexes'
+down_revision = '23_partition_audit'
+branch_labels = None
+depends_on = None
+
+
+# (nombre, tabla, columnas)
+PARTIAL_INDEXES = [
+    ('idx_user_category_public', 'user', ['category', 'is_profile_public']),
+    ('idx_event_public_start', 'event', ['is_public', 'start_date']),
+    ('idx_project_public_status', 'project', ['is_public', 'status']),
+    ('idx_message_conv_created', 'message', ['conversation_id', '"createdAt"']),
+    ('idx_rsvp_event_status', 'event_rsvp', ['event_id', 'status']),
+    ('idx_project_member_project_status', 'project_member', ['project_id', 'status']),
+    ('idx_review_reviewee', 'review', ['reviewee_id']),
+]
+
+NEW_INDEXES = [
+    ('idx_notification_user_created', 'notification', ['user_id', '"createdAt"']),
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    for name, table, columns in PARTIAL_INDEXES:
+        bind.execute(sa.text(f'DROP INDEX IF EXISTS {name}'))
+    for name, table, columns in PARTIAL_INDEXES + NEW_INDEXES:
+        bind.execute(sa.text(
+            f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({", ".join(columns)}) WHERE "deletedAt" IS NULL'
+        ))
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    for name, table, columns in NEW_INDEXES:
+        bind.execute(sa.text(f'DROP INDEX IF EXISTS {name}'))
+    for name, table, columns in PARTIAL_INDEXES:
+        bind.execute(sa.text(f'DROP INDEX IF EXISTS {name}'))
+        bind.execute(sa.text(f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({", ".join(columns)})'))
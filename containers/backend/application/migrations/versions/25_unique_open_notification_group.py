@@ -0,0 +1,63 @@
+"""notificaciones agrupadas: un solo grupo abierto por usuario y actores distintos
+
+Revision ID: 25_unique_open_notification_group
+Revises: 24_soft_delete_partial_indexes
+Create Date: 2026-10-19 00:00:00.000000
+
+- `actor_ids`: usuarios distintos que han generado eventos del grupo;
+  `actor_count` pasa a ser su número (antes sumaba 1 por evento).
+- `idx_notification_user_group_unread` pasa a ser UNIQUE: es el árbitro del
+  `INSERT ... ON CONFLICT` de `add_notification`. Con el índice normal, dos
+  primeros eventos simultáneos no encontraban fila que bloquear y creaban
+  dos notificaciones del mismo grupo.
+- Antes de crearlo, los grupos abiertos duplicados se quedan solo con la
+  notificación más reciente; las demás siguen visibles pero sin `group_key`.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '25_unique_open_notification_group'
+down_revision = '24_soft_delete_partial_indexes'
+branch_labels = None
+depends_on = None
+
+OPEN_GROUP = 'is_read = false AND "deletedAt" IS NULL AND group_key IS NOT NULL'
+
+
+def upgrade():
+    op.add_column(
+        'notification',
+        sa.Column('actor_ids', postgresql.ARRAY(sa.Integer()), nullable=False, server_default='{}'),
+    )
+    op.execute(
+        'UPDATE notification SET actor_ids = ARRAY[last_actor_id] '
+        'WHERE group_key IS NOT NULL AND last_actor_id IS NOT NULL'
+    )
+
+    op.execute(
+        'UPDATE notification SET group_key = NULL WHERE id IN ('
+        '  SELECT id FROM ('
+        '    SELECT id, row_number() OVER ('
+        '      PARTITION BY user_id, group_key ORDER BY "createdAt" DESC, id DESC'
+        '    ) AS rn'
+        f'    FROM notification WHERE {OPEN_GROUP}'
+        '  ) ranked WHERE rn > 1'
+        ')'
+    )
+
+    op.execute('DROP INDEX IF EXISTS idx_notification_user_group_unread')
+    op.execute(
+        'CREATE UNIQUE INDEX idx_notification_user_group_unread '
+        f'ON notification (user_id, group_key) WHERE {OPEN_GROUP}'
+    )
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS idx_notification_user_group_unread')
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS idx_notification_user_group_unread '
+        f'ON notification (user_id, group_key) WHERE {OPEN_GROUP}'
+    )
+    op.drop_column('notification', 'actor_ids')
@@ -0,0 +1,29 @@
+"""versión revocable de la URL del calendario personal
+
+Revision ID: 26_calendar_feed_version
+Revises: 25_unique_open_notification_group
+Create Date: 2026-10-19 00:00:00.000000
+
+- `user.calendar_feed_version`: va en el token de `/my-rsvps.ics`; al subirla
+  (POST /api/v1/events/my-rsvps/feed-url) dejan de valer las URLs emitidas.
+  Los tokens existentes no llevan versión y equivalen a la 0.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '26_calendar_feed_version'
+down_revision = '25_unique_open_notification_group'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'user',
+        sa.Column('calendar_feed_version', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade():
+    op.drop_column('user', 'calendar_feed_version')
@@ -0,0 +1,63 @@
+# tests/benchmarks/bench_email_templates.py
+"""
+Microbenchmark: render de emails con `render_template_string` (parseo en cada
+envío) frente al registro de plantillas precompiladas de `app.email_templates`.
+
+Uso (desde containers/backend/application):
+
+    python -m tests.benchmarks.bench_email_templates [n]
+"""
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from jinja2 import Environment
+
+from app.email_templates import EmailTemplateRegistry, TEMPLATES_DIR
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+STATS = {'profile_views': 4, 'new_messages': 2, 'new_events': 1, 'new_users_in_city': 7}
+
+# Fuente base con `{{ content }}` tal y como estaba en email_service.py
+with open(os.path.join(TEMPLATES_DIR, 'base.html'), encoding='utf-8') as fh:
+    LEGACY_BASE = fh.read().replace('{% block content %}{% endblock %}', '{{ content }}')
+
+
+def legacy_render(i):
+    """Equivalente a `render_template_string(EMAIL_BASE_TEMPLATE, content=...)`."""
+    content = f"""
+        <h2>Tu resumen semanal en LocalTalent 📊</h2>
+        <p>Hola Usuario {i},</p>
+        <p>👁️ <strong>{STATS['profile_views']}</strong> visitas a tu perfil</p>
+        <a href="https://localtalent.es" class="button">Ir a LocalTalent</a>
+    """
+    return Environment(autoescape=True).from_string(LEGACY_BASE).render(content=content)
+
+
+def main():
+    registry = EmailTemplateRegistry()
+    registry.load_all()
+    contexts = [{'user_name': f'Usuario {i}', 'stats': STATS} for i in range(N)]
+
+    legacy = timeit.timeit(lambda: [legacy_render(i) for i in range(N)], number=1)
+    single = timeit.timeit(
+        lambda: [registry.render('weekly_digest', frontend_url='https://localtalent.es', **ctx) for ctx in contexts],
+        number=1,
+    )
+    batch = timeit.timeit(
+        lambda: registry.render_batch('weekly_digest', contexts, frontend_url='https://localtalent.es'),
+        number=1,
+    )
+
+    print(f"Emails renderizados: {N}")
+    print(f"  render_template_string (legacy): {legacy * 1000:9.1f} ms  ({legacy / N * 1e6:7.1f} µs/email)")
+    print(f"  registro compilado (render):     {single * 1000:9.1f} ms  ({single / N * 1e6:7.1f} µs/email)")
+    print(f"  registro compilado (batch):      {batch * 1000:9.1f} ms  ({batch / N * 1e6:7.1f} µs/email)")
+    print(f"  speedup batch vs legacy: x{legacy / batch:.1f}")
+
+
+if __name__ == '__main__':
+    main()
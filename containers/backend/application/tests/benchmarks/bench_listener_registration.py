@@ -0,0 +1,137 @@
+# tests/benchmarks/bench_listener_registration.py
+"""
+Microbenchmark: throughput de escrituras con los listeners duplicados de
+antes (`setup_base()`/`setup_audit()` llamados desde models.py y desde
+httpApp.py, más las lambdas `after_insert`/`after_update` de `setup_base`)
+frente al registro idempotente de `app.event_registry`.
+
+Reproduce los dos montajes sobre modelos propios en SQLite en memoria, para
+no depender de PostgreSQL:
+
+- legacy: timestamps en `before_*` de `Base` + dos veces las lambdas
+  `after_*` por modelo + una auditoría síncrona de fila completa (JSON de
+  todas las columnas y un INSERT por escritura, como el antiguo
+  `record_audit`). SQLAlchemy ya ignora la misma función registrada dos
+  veces en un evento de mapper, así que lo que se duplicaba eran las
+  lambdas (y lo haría cualquier listener de `Session`).
+- registro: `listen_once` de los timestamps y de la auditoría, llamado dos
+  veces igual que antes; solo queda un listener de cada.
+
+Uso (desde containers/backend/application):
+
+    python -m tests.benchmarks.bench_listener_registration [n]
+"""
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import Column, DateTime, Integer, String, Text, create_engine, event
+from sqlalchemy.orm import Session, declarative_base
+
+from app.event_registry import listen_once
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+
+def make_models():
+    Declarative = declarative_base()
+
+    class Base(Declarative):
+        __abstract__ = True
+        createdAt = Column(DateTime)
+        updatedAt = Column(DateTime)
+        deletedAt = Column(DateTime)
+
+    class Item(Base):
+        __tablename__ = 'item'
+        id = Column(Integer, primary_key=True)
+        title = Column(String(255))
+        city = Column(String(100))
+        description = Column(Text)
+
+    class AuditRow(Declarative):
+        __tablename__ = 'audit'
+        id = Column(Integer, primary_key=True)
+        affected_table = Column(String(255))
+        operation = Column(String(50))
+        new_data = Column(Text)
+
+    engine = create_engine('sqlite://')
+    Declarative.metadata.create_all(engine)
+    return engine, Base, Item, AuditRow
+
+
+CALLS = {'stamp': 0}
+
+
+def stamp(mapper, connection, target):
+    CALLS['stamp'] += 1
+    target.updatedAt = datetime.now(timezone.utc)
+
+
+def full_row_audit(mapper, connection, target):
+    data = {attr.key: str(getattr(target, attr.key)) for attr in mapper.column_attrs}
+    connection.execute(
+        mapper.class_.metadata.tables['audit'].insert(),
+        {'affected_table': target.__tablename__, 'operation': 'WRITE', 'new_data': json.dumps(data)}
+    )
+
+
+def setup_legacy(Base, Item):
+    event.listen(Base, 'before_insert', stamp, propagate=True)
+    event.listen(Base, 'before_update', stamp, propagate=True)
+    for _ in range(2):  # models.py + httpApp.py
+        event.listen(Item, 'after_insert', lambda m, c, t: stamp(m, c, t))
+        event.listen(Item, 'after_update', lambda m, c, t: stamp(m, c, t))
+        event.listen(Item, 'after_insert', full_row_audit)
+        event.listen(Item, 'after_update', full_row_audit)
+
+
+def setup_registry(Base, Item):
+    for _ in range(2):
+        listen_once(Base, 'before_insert', stamp, propagate=True)
+        listen_once(Base, 'before_update', stamp, propagate=True)
+        listen_once(Item, 'after_insert', full_row_audit)
+        listen_once(Item, 'after_update', full_row_audit)
+
+
+def run(setup):
+    engine, Base, Item, AuditRow = make_models()
+    setup(Base, Item)
+    CALLS['stamp'] = 0
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(1))
+
+    def writes():
+        with Session(engine) as session:
+            for i in range(N):
+                item = Item(title=f'Item {i}', city='Madrid', description='x' * 200)
+                session.add(item)
+                session.commit()
+                item.city = 'Sevilla'
+                session.commit()
+
+    elapsed = timeit.timeit(writes, number=1)
+    with Session(engine) as session:
+        audits = session.query(AuditRow).count()
+    return elapsed, len(statements), audits, CALLS['stamp']
+
+
+def main():
+    writes = N * 2
+    print(f"Escrituras (INSERT + UPDATE): {writes}")
+    results = {}
+    for name, setup in (('listeners duplicados', setup_legacy), ('registro idempotente', setup_registry)):
+        elapsed, statements, audits, stamps = run(setup)
+        results[name] = elapsed
+        print(f"  {name}: {elapsed * 1000:9.1f} ms  ({writes / elapsed:8.0f} escrituras/s, "
+              f"{stamps / writes:.1f} timestamps/escritura, {statements} sentencias, {audits} filas de auditoría)")
+    print(f"  speedup: x{results['listeners duplicados'] / results['registro idempotente']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
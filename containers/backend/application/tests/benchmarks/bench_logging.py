@@ -0,0 +1,107 @@
+# tests/benchmarks/bench_logging.py
+"""
+Microbenchmark: coste de `logger.info` en el hilo de la petición.
+
+- legacy: el montaje anterior de `setup_logger`, un `FlushRotatingFileHandler`
+  (flush tras cada línea) por fichero y los 11 colgados también del logger
+  raíz. Un hijo sin fichero propio (`events`, `socketio`...) escribía su
+  línea en los 11 ficheros; uno con fichero (`auth`), en uno.
+- cola: `QueueHandler` + un único hilo escritor con flush por lotes
+  (`BatchingQueueListener` y `RoutingHandler` de app/logger_config.py).
+
+Mide la latencia por llamada (p50/p99) vista desde quien registra y el
+tiempo total hasta que todo está en disco. Escribe en un directorio
+temporal.
+
+Uso (desde containers/backend/application):
+
+    python -m tests.benchmarks.bench_logging [n]
+"""
+import logging
+import os
+import queue
+import sys
+import tempfile
+import time
+from logging.handlers import QueueHandler, RotatingFileHandler
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.logger_config import BatchingQueueListener, BufferedRotatingFileHandler, RoutingHandler
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+FILES = ['roles', 'alerts', 'navbar', 'admin', 'celery', 'auth', 'email', 'error', 'main', 'user', 'products']
+FORMAT = '%(asctime)s - [%(process)d] %(levelname)s: %(message)s [%(module)s:%(lineno)d - %(name)s]'
+
+
+class FlushRotatingFileHandler(RotatingFileHandler):
+    def emit(self, record):
+        super().emit(record)
+        self.flush()
+
+
+def legacy_logger(log_dir):
+    root = logging.getLogger('bench-legacy')
+    root.propagate = False
+    root.setLevel(logging.INFO)
+    for name in FILES:
+        handler = FlushRotatingFileHandler(os.path.join(log_dir, f'{name}.log'), encoding='utf-8')
+        handler.setFormatter(logging.Formatter(FORMAT))
+        child = logging.getLogger(f'bench-legacy.{name}')
+        child.addHandler(handler)
+        child.propagate = False
+        root.addHandler(handler)
+    return root, None
+
+
+def queued_logger(log_dir):
+    root = logging.getLogger('bench-queue')
+    root.propagate = False
+    root.setLevel(logging.INFO)
+    handlers = {}
+    for name in FILES:
+        handler = BufferedRotatingFileHandler(os.path.join(log_dir, f'{name}.log'), encoding='utf-8')
+        handler.setFormatter(logging.Formatter(FORMAT))
+        handlers[f'bench-queue.{name}'] = handler
+    queue_handler = QueueHandler(queue.SimpleQueue())
+    root.addHandler(queue_handler)
+    listener = BatchingQueueListener(
+        queue_handler.queue, RoutingHandler(handlers, default=handlers['bench-queue.main'])
+    )
+    listener.start()
+    return root, listener
+
+
+def run(factory, child):
+    with tempfile.TemporaryDirectory() as log_dir:
+        root, listener = factory(log_dir)
+        log = root.getChild(child)
+        latencies = []
+        started = time.perf_counter()
+        for i in range(N):
+            t0 = time.perf_counter()
+            log.info(f"Verificación de sesión: Usuario user{i}@example.com autenticado")
+            latencies.append(time.perf_counter() - t0)
+        if listener is not None:
+            listener.stop()
+        total = time.perf_counter() - started
+        for handler in list(root.handlers):
+            handler.close()
+            root.removeHandler(handler)
+        lines = sum(1 for name in os.listdir(log_dir) for _ in open(os.path.join(log_dir, name)))
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)], total, lines
+
+
+def main():
+    print(f"Llamadas: {N}")
+    for child in ('auth', 'events'):
+        print(f"  logger hijo '{child}':")
+        for name, factory in (('legacy (flush por línea)', legacy_logger), ('cola + escritor único', queued_logger)):
+            p50, p99, total, lines = run(factory, child)
+            print(f"    {name:26s} p50 {p50 * 1e6:7.1f} µs  p99 {p99 * 1e6:7.1f} µs  "
+                  f"total {total * 1000:8.1f} ms  líneas escritas {lines}")
+
+
+if __name__ == '__main__':
+    main()
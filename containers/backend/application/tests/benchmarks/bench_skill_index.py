@@ -0,0 +1,54 @@
+# tests/benchmarks/bench_skill_index.py
+"""
+Microbenchmark: búsqueda de candidatos por habilidades en el índice
+invertido en memoria (`app.projects.skill_index`) con usuarios sintéticos.
+Objetivo: < 50 ms por búsqueda con 100k usuarios.
+
+Uso (desde containers/backend/application):
+
+    python -m tests.benchmarks.bench_skill_index [usuarios] [búsquedas]
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.projects.skill_index import SkillIndex
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+SEARCHES = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+# Distribución sesgada: unas pocas habilidades muy comunes y una cola larga
+SKILLS = [f'skill-{i}' for i in range(2000)]
+SKILL_WEIGHTS = [1 / (i + 1) for i in range(len(SKILLS))]
+
+
+def main():
+    rnd = random.Random(42)
+    rows = [
+        (user_id, rnd.choices(SKILLS, weights=SKILL_WEIGHTS, k=rnd.randint(1, 12)))
+        for user_id in range(1, USERS + 1)
+    ]
+    queries = [rnd.choices(SKILLS, weights=SKILL_WEIGHTS, k=rnd.randint(2, 8)) for _ in range(SEARCHES)]
+    exclude = set(range(1, 50))
+
+    index = SkillIndex()
+    build = timeit.timeit(lambda: index.load(rows), number=1)
+
+    total = timeit.timeit(lambda: [index.top(q, 100, exclude_ids=exclude) for q in queries], number=1)
+
+    updates = timeit.timeit(
+        lambda: [index.update_user(rnd.randint(1, USERS), rnd.sample(SKILLS[:50], 3)) for _ in range(1000)],
+        number=1,
+    )
+
+    print(f"Usuarios indexados: {len(index)}  habilidades distintas: {len(index._postings)}")
+    print(f"  construcción:          {build * 1000:9.1f} ms")
+    print(f"  búsqueda (top 100):    {total / SEARCHES * 1000:9.2f} ms/búsqueda  ({SEARCHES} búsquedas)")
+    print(f"  actualización perfil:  {updates / 1000 * 1e6:9.1f} µs/usuario")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+# tests/benchmarks/bench_soft_delete_criteria.py
+"""
+Microbenchmark: compilación de SELECT con el criterio global de soft-delete.
+
+- legacy: `with_loader_criteria(Base, lambda cls: ...)` creado dentro del
+  listener en cada SELECT, más el `filter_by(deletedAt=None)` repetido en la
+  ruta (predicado duplicado).
+- actual: la opción construida una vez (`SOFT_DELETE_CRITERIA` de
+  app/db_listeners.py, función de módulo sin cierre) y sin filtro en la ruta.
+
+Cuenta los aciertos de la caché de sentencias compiladas del engine
+(`context.cache_hit`) y el tiempo por consulta. Usa modelos propios sobre
+SQLite en memoria para no depender de PostgreSQL.
+
+Uso (desde containers/backend/application):
+
+    python -m tests.benchmarks.bench_soft_delete_criteria [n]
+"""
+import os
+import sys
+import timeit
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, create_engine, event, select
+from sqlalchemy.orm import Session, declarative_base, relationship, with_loader_criteria
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+Declarative = declarative_base()
+
+
+class Base(Declarative):
+    __abstract__ = True
+    deletedAt = Column(DateTime)
+
+
+class User(Base):
+    __tablename__ = 'user'
+    id = Column(Integer, primary_key=True)
+    city = Column(String(100))
+
+
+class Event(Base):
+    __tablename__ = 'event'
+    id = Column(Integer, primary_key=True)
+    creator_id = Column(Integer, ForeignKey('user.id'))
+    city = Column(String(100))
+    creator = relationship(User)
+
+
+def _not_deleted(cls):
+    return cls.deletedAt.is_(None)
+
+
+SOFT_DELETE_CRITERIA = with_loader_criteria(Base, _not_deleted, include_aliases=True, track_closure_variables=False)
+
+
+class LegacySession(Session):
+    pass
+
+
+class CurrentSession(Session):
+    pass
+
+
+@event.listens_for(LegacySession, 'do_orm_execute')
+def _legacy_criteria(execute_state):
+    if execute_state.is_select and not execute_state.is_column_load and not execute_state.is_relationship_load:
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(Base, lambda cls: cls.deletedAt.is_(None), include_aliases=True)
+        )
+
+
+@event.listens_for(CurrentSession, 'do_orm_execute')
+def _current_criteria(execute_state):
+    if execute_state.is_select and not execute_state.is_column_load and not execute_state.is_relationship_load:
+        execute_state.statement = execute_state.statement.options(SOFT_DELETE_CRITERIA)
+
+
+def legacy_queries(session, i):
+    session.execute(select(Event).filter_by(id=i % 50 + 1, deletedAt=None)).first()
+    session.execute(
+        select(Event).join(User, Event.creator_id == User.id)
+        .filter(User.city == 'Madrid', User.deletedAt.is_(None), Event.deletedAt.is_(None))
+        .limit(20)
+    ).all()
+
+
+def current_queries(session, i):
+    session.execute(select(Event).filter_by(id=i % 50 + 1)).first()
+    session.execute(
+        select(Event).join(User, Event.creator_id == User.id)
+        .filter(User.city == 'Madrid')
+        .limit(20)
+    ).all()
+
+
+def run(session_class, queries):
+    engine = create_engine('sqlite://')
+    Declarative.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([User(id=i, city='Madrid') for i in range(1, 11)])
+        session.add_all([Event(id=i, creator_id=i % 10 + 1, city='Madrid') for i in range(1, 51)])
+        session.commit()
+
+    hits = Counter()
+    event.listen(engine, 'after_cursor_execute',
+                 lambda conn, cursor, stmt, params, context, many: hits.update([context.cache_hit.name]))
+
+    with session_class(engine) as session:
+        elapsed = timeit.timeit(lambda: [queries(session, i) for i in range(N)], number=1)
+    return elapsed, hits
+
+
+def main():
+    print(f"Consultas: {N * 2}")
+    results = {}
+    for name, session_class, queries in (
+        ('legacy (lambda + filtro en ruta)', LegacySession, legacy_queries),
+        ('opción precompilada', CurrentSession, current_queries),
+    ):
+        elapsed, hits = run(session_class, queries)
+        results[name] = elapsed
+        total = sum(hits.values())
+        hit_rate = hits.get('CACHE_HIT', 0) / total * 100 if total else 0
+        print(f"  {name:34s} {elapsed * 1000:8.1f} ms  ({elapsed / (N * 2) * 1e6:6.1f} µs/consulta, "
+              f"caché de sentencias: {hit_rate:5.1f}% aciertos, {dict(hits)})")
+    legacy, current = results.values()
+    print(f"  speedup: x{legacy / current:.2f}")
+
+
+if __name__ == '__main__':
+    main()
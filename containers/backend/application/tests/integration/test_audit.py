@@ -0,0 +1,93 @@
+## test_audit.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from datetime import datetime, timezone
+from tests.integration.test_base import BaseTestCase
+from app.models import User, Audit, setup_audit, setup_base
+from app.audit import audit_writer, flush_audit
+from app import db
+
+
+class AuditPipelineTestCase(BaseTestCase):
+    """
+    Auditoría por diffs (app/audit.py):
+    - INSERT guarda las columnas con valor, UPDATE solo las cambiadas
+    - El borrado lógico queda como DELETE con la fila cargada
+    - Lo que se deshace con rollback no se audita
+    - En modo asíncrono el buffer se escribe en un solo lote
+    - Registrar los listeners otra vez no duplica filas
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        self.user = User(
+            email='audit@example.com',
+            first_name='Test',
+            last_name='User',
+            password_hash='x',
+            is_enabled=True,
+            special_roles=[]
+        )
+        db.session.add(self.user)
+        db.session.commit()
+
+    def _audits(self):
+        return Audit.query.filter_by(affected_table='user').order_by(Audit.id).all()
+
+    def test_update_records_changed_columns_only(self):
+        self.user.first_name = 'Nuevo'
+        db.session.commit()
+
+        insert, update = self._audits()
+        self.assertEqual(insert.operation, 'INSERT')
+        self.assertEqual(insert.new_data['email'], 'audit@example.com')
+        self.assertEqual(update.operation, 'UPDATE')
+        self.assertEqual(update.previous_data, {'first_name': 'Test'})
+        self.assertEqual(update.new_data, {'first_name': 'Nuevo', 'id': self.user.id})
+
+    def test_soft_delete_and_rollback(self):
+        self.user.deletedAt = datetime.now(timezone.utc)
+        db.session.commit()
+
+        deleted = self._audits()[-1]
+        self.assertEqual(deleted.operation, 'DELETE')
+        self.assertEqual(deleted.previous_data['email'], 'audit@example.com')
+        self.assertEqual(deleted.previous_data['id'], self.user.id)
+        self.assertIsNone(deleted.new_data)
+
+        self.user.city = 'Madrid'
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(len(self._audits()), 2)
+
+    def test_one_audit_row_per_change(self):
+        # Lo mismo que hacía httpApp.py al arrancar
+        setup_base()
+        setup_audit()
+
+        self.user.city = 'Madrid'
+        db.session.commit()
+        self.user.city = 'Sevilla'
+        db.session.commit()
+
+        audits = self._audits()
+        self.assertEqual([a.operation for a in audits], ['INSERT', 'UPDATE', 'UPDATE'])
+        self.assertEqual([a.new_data.get('city') for a in audits[1:]], ['Madrid', 'Sevilla'])
+
+    def test_async_buffer_flushes_in_batch(self):
+        audit_writer.submit([
+            {'affected_table': 'user', 'operation': 'UPDATE', 'previous_data': {}, 'new_data': {'id': i},
+             'date': datetime.now(timezone.utc)}
+            for i in range(3)
+        ])
+        self.assertEqual(flush_audit(), 3)
+        self.assertEqual(len(audit_writer), 0)
+        self.assertEqual(len(self._audits()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,49 @@
+## test_audit_partitions.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from datetime import datetime
+from sqlalchemy import text
+from tests.integration.test_base import BaseTestCase
+from app.audit_partitions import manage_partitions, list_partitions
+from app import db
+
+
+class AuditPartitionsTestCase(BaseTestCase):
+    """
+    Particiones mensuales de `audit`:
+    - Se crean el mes actual y los siguientes
+    - Las filas caen en la partición de su mes
+    - Las que salen de la retención se desadjuntan
+    """
+
+    def tearDown(self):
+        with db.engine.begin() as conn:
+            for name in ('audit_p203101', 'audit_p203102', 'audit_p203202'):
+                conn.execute(text(f'DROP TABLE IF EXISTS {name}'))
+        super().tearDown()
+
+    def test_create_route_and_detach(self):
+        result = manage_partitions(now=datetime(2031, 1, 15), ahead=1, retention_months=12, archive_dir='')
+        self.assertEqual(result['created'], ['audit_p203101', 'audit_p203102'])
+
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO audit (affected_table, operation, date) VALUES ('user', 'INSERT', '2031-02-03')"
+            ))
+            partition = conn.execute(text('SELECT tableoid::regclass::text FROM audit')).scalar()
+        self.assertEqual(partition, 'audit_p203102')
+
+        # Un año después el primer mes sale de la retención
+        result = manage_partitions(now=datetime(2032, 2, 1), ahead=0, retention_months=12, archive_dir='')
+        self.assertEqual(result['detached'], ['audit_p203101'])
+        with db.engine.connect() as conn:
+            names = [name for name, _ in list_partitions(conn)]
+        self.assertNotIn('audit_p203101', names)
+        self.assertIn('audit_default', names)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
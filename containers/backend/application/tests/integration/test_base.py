@@ -7,6 +7,7 @@ from sqlalchemy_utils import database_exists, create_database
 #Es muy importante asignar primero al valor a True, para que al importar create_app, que importa logger_config, sepa que es un test
 os.environ['INTEGRATION_TESTS'] = 'True'
 from app import create_app, db
+from app.models import User
 from config import TestConfig
 
 # Añadir el directorio raíz al path para imports
@@ -70,6 +71,20 @@ class BaseTestCase(unittest.TestCase):
             db.session.commit()
             db.session.remove()
 
+    def _create_user(self, email, **kwargs):
+        """Crea y guarda un usuario habilitado; `kwargs` sobrescribe los valores por defecto."""
+        fields = dict(
+            first_name='Test',
+            last_name='User',
+            password_hash='x',
+            is_enabled=True,
+            special_roles=[]
+        )
+        fields.update(kwargs)
+        user = User(email=email, **fields)
+        db.session.add(user)
+        db.session.commit()
+        return user
 
 
 if __name__ == '__main__':
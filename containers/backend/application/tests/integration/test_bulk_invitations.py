@@ -0,0 +1,119 @@
+## test_bulk_invitations.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from datetime import datetime, timezone, timedelta
+from tests.integration.test_base import BaseTestCase
+from app.models import Event, EventInvitation, Project, ProjectMember, Notification, Audit
+from app import db
+
+
+class BulkInvitationsTestCase(BaseTestCase):
+    """
+    Invitaciones en lote:
+    - Los usuarios inexistentes o deshabilitados se descartan
+    - Las invitaciones ya existentes se saltan sin error
+    - Una notificación por invitación creada
+    - Los antiguos miembros de un proyecto vuelven como invitación pendiente
+    - Las filas escritas con Core también se auditan
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        self.owner = self._create_user('owner@example.com')
+        self.guests = [self._create_user(f'guest{i}@example.com') for i in range(3)]
+        self.disabled = self._create_user('disabled@example.com', is_enabled=False)
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.owner.id)
+
+    def test_event_bulk_skips_existing_and_invalid(self):
+        event = Event(
+            title='Meetup',
+            creator_id=self.owner.id,
+            start_date=datetime.now(timezone.utc) + timedelta(days=7),
+        )
+        db.session.add(event)
+        db.session.commit()
+        db.session.add(EventInvitation(event_id=event.id, inviter_id=self.owner.id, invitee_id=self.guests[0].id))
+        db.session.commit()
+
+        ids = [guest.id for guest in self.guests] + [self.disabled.id, self.owner.id]
+        response = self.client.post(f'/api/v1/events/{event.id}/invitations/bulk', json={'invitee_ids': ids})
+        self.assertEqual(response.status_code, 201)
+        data = response.get_json()
+        self.assertEqual([i['invitee_id'] for i in data['invitations']], [self.guests[1].id, self.guests[2].id])
+        self.assertEqual(data['already_invited'], [self.guests[0].id])
+        self.assertEqual(data['invalid'], [self.disabled.id, self.owner.id])
+
+        self.assertEqual(EventInvitation.query.filter_by(event_id=event.id).count(), 3)
+        self.assertEqual(Notification.query.filter_by(type='event_invitation').count(), 2)
+
+        # Repetir la petición no crea nada
+        response = self.client.post(f'/api/v1/events/{event.id}/invitations/bulk', json={'invitee_ids': ids})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['invitations'], [])
+
+    def test_project_bulk_revives_former_members(self):
+        project = Project(title='Proyecto', creator_id=self.owner.id, active_member_count=1)
+        db.session.add(project)
+        db.session.commit()
+        db.session.add_all([
+            ProjectMember(project_id=project.id, user_id=self.owner.id, role='owner', status='active'),
+            ProjectMember(project_id=project.id, user_id=self.guests[0].id, status='active'),
+            ProjectMember(
+                project_id=project.id, user_id=self.guests[1].id, status='left',
+                deletedAt=datetime.now(timezone.utc)
+            ),
+        ])
+        db.session.commit()
+
+        ids = [guest.id for guest in self.guests]
+        response = self.client.post(f'/api/v1/projects/{project.id}/members/bulk', json={'user_ids': ids})
+        self.assertEqual(response.status_code, 201)
+        data = response.get_json()
+        self.assertEqual([m['user_id'] for m in data['members']], [self.guests[1].id, self.guests[2].id])
+        self.assertEqual(data['already_members'], [self.guests[0].id])
+
+        db.session.expire_all()
+        revived = ProjectMember.query.filter_by(project_id=project.id, user_id=self.guests[1].id).first()
+        self.assertEqual(revived.status, 'pending')
+        self.assertEqual(Notification.query.filter_by(type='project_invitation').count(), 2)
+
+    def test_bulk_writes_are_audited(self):
+        event = Event(
+            title='Meetup',
+            creator_id=self.owner.id,
+            start_date=datetime.now(timezone.utc) + timedelta(days=7),
+        )
+        project = Project(title='Proyecto', creator_id=self.owner.id, active_member_count=1)
+        db.session.add_all([event, project])
+        db.session.commit()
+        db.session.add(ProjectMember(
+            project_id=project.id, user_id=self.guests[0].id, status='left',
+            deletedAt=datetime.now(timezone.utc)
+        ))
+        db.session.commit()
+
+        ids = [guest.id for guest in self.guests]
+        self.client.post(f'/api/v1/events/{event.id}/invitations/bulk', json={'invitee_ids': ids})
+        self.client.post(f'/api/v1/projects/{project.id}/members/bulk', json={'user_ids': ids})
+
+        invitations = Audit.query.filter_by(affected_table='event_invitation').order_by(Audit.id).all()
+        self.assertEqual([a.operation for a in invitations], ['INSERT'] * 3)
+        self.assertEqual([a.new_data['invitee_id'] for a in invitations], ids)
+        self.assertEqual(invitations[0].new_data['inviter_id'], self.owner.id)
+
+        members = Audit.query.filter_by(affected_table='project_member').order_by(Audit.id).all()
+        # El primero es el INSERT del ORM del setUp; el antiguo miembro vuelve como UPDATE
+        self.assertEqual([a.operation for a in members], ['INSERT', 'UPDATE', 'INSERT', 'INSERT'])
+        self.assertEqual(members[1].new_data['user_id'], self.guests[0].id)
+        self.assertEqual(members[1].new_data['status'], 'pending')
+        self.assertIsNone(members[1].new_data['deletedAt'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
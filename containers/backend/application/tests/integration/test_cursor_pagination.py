@@ -0,0 +1,109 @@
+## test_cursor_pagination.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from datetime import datetime, timezone, timedelta
+from tests.integration.test_base import BaseTestCase
+from app.common.pagination import cursor_paginated_response, decode_cursor, encode_cursor
+from app.models import Event, EventRSVP, Project, ProjectMember
+from app import db
+
+
+class CursorPaginationTestCase(BaseTestCase):
+    """
+    Paginación por cursor (`cursor_paginated_response`, /attendees y /members):
+    - Recorrer páginas hasta `has_more=false` sin repetir ni saltar filas
+    - Última página exactamente llena: sin página vacía al final
+    - Cursor inválido: 400
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.creator = self._create_user('creator@example.com')
+        self.users = [self._create_user(f'user{i}@example.com') for i in range(6)]
+
+        self.event = Event(
+            title='Evento',
+            creator_id=self.creator.id,
+            start_date=datetime.now(timezone.utc) + timedelta(days=7),
+            is_public=True,
+        )
+        self.project = Project(title='Proyecto', creator_id=self.creator.id, is_public=True)
+        db.session.add_all([self.event, self.project])
+        db.session.commit()
+
+        for user in self.users:
+            db.session.add(EventRSVP(event_id=self.event.id, user_id=user.id, status='confirmed'))
+            db.session.add(ProjectMember(project_id=self.project.id, user_id=user.id, role='member', status='active'))
+        self.event.confirmed_count = len(self.users)
+        db.session.commit()
+
+    def _walk(self, url, items_key, limit):
+        pages, cursor = [], None
+        while True:
+            params = {'limit': limit}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get(url, query_string=params)
+            self.assertEqual(response.status_code, 200)
+            body = response.get_json()
+            pages.append(body[items_key])
+            if not body['has_more']:
+                self.assertIsNone(body['next_cursor'])
+                return pages
+            cursor = body['next_cursor']
+
+    def test_helper_walks_all_rows(self):
+        query = EventRSVP.query.filter_by(event_id=self.event.id)
+        expected = [r.id for r in query.order_by(EventRSVP.id)]
+
+        seen, cursor = [], None
+        while True:
+            page = cursor_paginated_response(query, EventRSVP.id, cursor, 4, serializer=lambda r: r.id)
+            seen.extend(page['items'])
+            if not page['has_more']:
+                break
+            cursor = page['next_cursor']
+
+        self.assertEqual(seen, expected)
+
+    def test_helper_exactly_full_last_page(self):
+        query = EventRSVP.query.filter_by(event_id=self.event.id)
+
+        first = cursor_paginated_response(query, EventRSVP.id, None, 3, serializer=lambda r: r.id)
+        second = cursor_paginated_response(query, EventRSVP.id, first['next_cursor'], 3, serializer=lambda r: r.id)
+
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(second['items']), 3)
+        self.assertFalse(second['has_more'])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_cursor_roundtrip_and_invalid(self):
+        self.assertEqual(decode_cursor(encode_cursor(12345)), 12345)
+        self.assertIsNone(decode_cursor(None))
+        for cursor in ('no-es-un-cursor', encode_cursor('abc')):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_attendees_pages(self):
+        pages = self._walk(f'/api/v1/events/{self.event.id}/attendees', 'attendees', limit=4)
+
+        self.assertEqual([len(page) for page in pages], [4, 2])
+        self.assertEqual([a['id'] for page in pages for a in page], [u.id for u in self.users])
+
+    def test_members_exactly_full_last_page(self):
+        pages = self._walk(f'/api/v1/projects/{self.project.id}/members', 'members', limit=3)
+
+        self.assertEqual([len(page) for page in pages], [3, 3])
+        self.assertEqual([m['id'] for page in pages for m in page], [u.id for u in self.users])
+
+    def test_invalid_cursor_is_rejected(self):
+        for url in (f'/api/v1/events/{self.event.id}/attendees', f'/api/v1/projects/{self.project.id}/members'):
+            response = self.client.get(url, query_string={'cursor': 'no-es-un-cursor'})
+            self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,180 @@
+## test_event_capacity.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from tests.integration.test_base import BaseTestCase
+from app.models import Event, EventRSVP, Audit
+from app.events.capacity import apply_status_change, release_seat, reserve_seat, recount_confirmed
+from app.waitlist import join_waitlist, promote_event_waitlist, waitlist_position
+from app import db
+
+
+class EventCapacityTestCase(BaseTestCase):
+    """
+    Contabilidad atómica de plazas (`Event.confirmed_count`):
+    - No hay sobreventa con muchas confirmaciones simultáneas, y el p95 de
+      latencia no se dispara respecto a un RSVP sin contención
+    - Las cancelaciones y cambios de estado liberan plaza
+    - Al liberarse una plaza entra la cabeza de la lista de espera (auditada)
+    """
+
+    PARALLEL_RSVPS = 200
+    MAX_ATTENDEES = 50
+    BASELINE_RSVPS = 5
+    # Con el GIL y el bloqueo de la fila del evento las peticiones en paralelo
+    # acaban casi en serie: el p95 ronda PARALLEL_RSVPS veces un RSVP sin
+    # contención. Por encima de ese margen hay esperas de más (bloqueos
+    # largos, reintentos)
+    MAX_P95_SLOWDOWN = 1.5
+
+    def setUp(self):
+        super().setUp()
+
+        self.creator = self._create_user('creator@example.com')
+        self.event = Event(
+            title='Evento popular',
+            creator_id=self.creator.id,
+            start_date=datetime.now(timezone.utc) + timedelta(days=7),
+            max_attendees=self.MAX_ATTENDEES,
+        )
+        db.session.add(self.event)
+        db.session.commit()
+
+    def _confirm(self, event_id, user_id):
+        """POST /rsvp como `user_id`, con su propio cliente (una petición por hilo).
+
+        Returns:
+            tuple: (código de estado, segundos que ha tardado la petición)
+        """
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+        started = time.perf_counter()
+        response = client.post(f'/api/v1/events/{event_id}/rsvp', json={'status': 'confirmed'})
+        return response.status_code, time.perf_counter() - started
+
+    def test_parallel_rsvps_never_overbook(self):
+        users = [self._create_user(f'attendee{i}@example.com') for i in range(self.PARALLEL_RSVPS)]
+        solo_users = [self._create_user(f'solo{i}@example.com') for i in range(self.BASELINE_RSVPS)]
+        event_id = self.event.id
+
+        # Referencia: RSVPs sin contención, uno detrás de otro y en otro evento
+        # para no gastar plazas; la mediana descarta el primero (en frío)
+        other = Event(
+            title='Evento tranquilo',
+            creator_id=self.creator.id,
+            start_date=datetime.now(timezone.utc) + timedelta(days=7),
+            max_attendees=self.MAX_ATTENDEES,
+        )
+        db.session.add(other)
+        db.session.commit()
+        solo = [self._confirm(other.id, user.id) for user in solo_users]
+        self.assertEqual([status for status, _ in solo], [201] * self.BASELINE_RSVPS)
+        baseline = sorted(elapsed for _, elapsed in solo)[self.BASELINE_RSVPS // 2]
+
+        with ThreadPoolExecutor(max_workers=self.PARALLEL_RSVPS) as executor:
+            results = list(executor.map(lambda u: self._confirm(event_id, u.id), users))
+        statuses = [status for status, _ in results]
+        timings = sorted(elapsed for _, elapsed in results)
+
+        # 201: plaza reservada; 202: evento lleno, a la lista de espera
+        self.assertEqual(statuses.count(201), self.MAX_ATTENDEES)
+        self.assertEqual(statuses.count(202), self.PARALLEL_RSVPS - self.MAX_ATTENDEES)
+
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.assertLess(
+            p95, baseline * self.PARALLEL_RSVPS * self.MAX_P95_SLOWDOWN,
+            f'p95={p95:.3f}s, sin contención={baseline:.3f}s'
+        )
+
+        db.session.expire_all()
+        event = db.session.get(Event, event_id)
+        stored = EventRSVP.query.filter_by(event_id=event_id, status='confirmed', deletedAt=None).count()
+
+        self.assertEqual(stored, self.MAX_ATTENDEES)
+        self.assertEqual(event.confirmed_count, self.MAX_ATTENDEES)
+
+    def test_full_event_rejects_and_release_frees_seat(self):
+        self.event.max_attendees = 1
+        db.session.commit()
+
+        self.assertEqual(reserve_seat(self.event.id), 1)
+        self.assertIsNone(reserve_seat(self.event.id))
+
+        self.assertEqual(release_seat(self.event.id), 0)
+        self.assertEqual(reserve_seat(self.event.id), 1)
+        db.session.commit()
+
+    def test_status_changes_move_counter(self):
+        event_id = self.event.id
+
+        self.assertTrue(apply_status_change(event_id, None, 'confirmed'))
+        self.assertTrue(apply_status_change(event_id, 'confirmed', 'confirmed'))
+        self.assertTrue(apply_status_change(event_id, 'confirmed', 'declined'))
+        self.assertTrue(apply_status_change(event_id, 'pending', 'confirmed'))
+        db.session.commit()
+
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Event, event_id).confirmed_count, 1)
+
+        # Nunca negativo aunque se libere de más
+        release_seat(event_id)
+        release_seat(event_id)
+        db.session.commit()
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Event, event_id).confirmed_count, 0)
+
+    def test_recount_repairs_drift(self):
+        db.session.add(EventRSVP(event_id=self.event.id, user_id=self.creator.id, status='confirmed'))
+        db.session.commit()
+
+        recount_confirmed([self.event.id])
+        db.session.commit()
+
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Event, self.event.id).confirmed_count, 1)
+
+    def test_release_promotes_waitlist_in_order(self):
+        self.event.max_attendees = 1
+        db.session.commit()
+        event_id = self.event.id
+
+        first = self._create_user('first@example.com')
+        second = self._create_user('second@example.com')
+
+        self.assertTrue(apply_status_change(event_id, None, 'confirmed'))
+        db.session.add(EventRSVP(event_id=event_id, user_id=self.creator.id, status='confirmed'))
+        self.assertEqual(join_waitlist(first.id, event_id=event_id), 1)
+        self.assertEqual(join_waitlist(second.id, event_id=event_id), 2)
+        # Idempotente
+        self.assertEqual(join_waitlist(first.id, event_id=event_id), 1)
+        db.session.commit()
+
+        # Sin plaza libre no se promociona a nadie
+        self.assertEqual(promote_event_waitlist(event_id), [])
+
+        release_seat(event_id)
+        self.assertEqual(promote_event_waitlist(event_id), [first.id])
+        db.session.commit()
+
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Event, event_id).confirmed_count, 1)
+        rsvp = EventRSVP.query.filter_by(event_id=event_id, user_id=first.id).first()
+        self.assertEqual(rsvp.status, 'confirmed')
+        self.assertIsNone(waitlist_position(first.id, event_id=event_id))
+        self.assertEqual(waitlist_position(second.id, event_id=event_id), 1)
+
+        # El RSVP del promocionado se inserta con Core, pero queda auditado
+        audit = Audit.query.filter_by(affected_table='event_rsvp').order_by(Audit.id.desc()).first()
+        self.assertEqual(audit.operation, 'INSERT')
+        self.assertEqual(audit.new_data['user_id'], first.id)
+        self.assertEqual(audit.new_data['status'], 'confirmed')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
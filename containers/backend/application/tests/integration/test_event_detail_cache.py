@@ -0,0 +1,110 @@
+## test_event_detail_cache.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+from tests.integration.test_base import BaseTestCase
+from app.cache import cache, invalidate_event_detail
+from app.events import routes as event_routes
+from app.models import Event
+from app import db
+
+
+class EventDetailCacheTestCase(BaseTestCase):
+    """
+    Caché del detalle anónimo de un evento (app/cache.py):
+    - La segunda lectura sale de la caché
+    - Se invalida al editar, al borrar y al cambiar los RSVPs
+    - Una copia construida antes de una invalidación no se sirve después
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.creator = self._create_user('creator@example.com')
+        self.attendee = self._create_user('attendee@example.com')
+        self.event = Event(
+            title='Evento cacheado',
+            creator_id=self.creator.id,
+            start_date=datetime.now(timezone.utc) + timedelta(days=7),
+            is_public=True,
+        )
+        db.session.add(self.event)
+        db.session.commit()
+        self.url = f'/api/v1/events/{self.event.id}'
+
+        patcher = patch.object(event_routes, '_build_event_detail', wraps=event_routes._build_event_detail)
+        self.build = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _login(self, user):
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+
+    def _logout(self):
+        with self.client.session_transaction() as session:
+            session.pop('_user_id', None)
+
+    def test_second_read_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.get_json(), second.get_json())
+        self.assertEqual(self.build.call_count, 1)
+
+    def test_update_invalidates(self):
+        self.client.get(self.url)
+        self._login(self.creator)
+        response = self.client.put(self.url, json={'title': 'Título nuevo'})
+        self.assertEqual(response.status_code, 200)
+        self._logout()
+
+        self.assertEqual(self.client.get(self.url).get_json()['title'], 'Título nuevo')
+        self.assertEqual(self.build.call_count, 2)
+
+    def test_delete_invalidates(self):
+        self.client.get(self.url)
+        self._login(self.creator)
+        self.assertEqual(self.client.delete(self.url).status_code, 200)
+        self._logout()
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_rsvp_changes_invalidate(self):
+        self.assertEqual(self.client.get(self.url).get_json()['stats']['confirmed'], 0)
+
+        self._login(self.attendee)
+        self.assertEqual(self.client.post(f'{self.url}/rsvp', json={'status': 'confirmed'}).status_code, 201)
+        self._logout()
+        self.assertEqual(self.client.get(self.url).get_json()['stats']['confirmed'], 1)
+
+        self._login(self.attendee)
+        self.assertEqual(self.client.delete(f'{self.url}/rsvp').status_code, 200)
+        self._logout()
+        self.assertEqual(self.client.get(self.url).get_json()['stats']['confirmed'], 0)
+        self.assertEqual(self.build.call_count, 3)
+
+    def test_stale_build_is_not_served_after_invalidation(self):
+        stale = event_routes._build_event_detail(self.event.id)
+
+        def build_while_updated(event_id):
+            # Otra petición edita el evento e invalida mientras esta construye
+            self.event.title = 'Título nuevo'
+            db.session.commit()
+            invalidate_event_detail(event_id)
+            return stale
+
+        self.build.side_effect = build_while_updated
+        self.assertEqual(self.client.get(self.url).get_json()['title'], 'Evento cacheado')
+        self.build.side_effect = None
+
+        self.assertEqual(self.client.get(self.url).get_json()['title'], 'Título nuevo')
+        self.assertEqual(self.build.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,101 @@
+## test_ical_feeds.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from datetime import datetime, timezone, timedelta
+from tests.integration.test_base import BaseTestCase
+from app.models import User, Event, EventRSVP
+from app import db
+
+
+class ICalFeedsTestCase(BaseTestCase):
+    """
+    Feeds `.ics` con GET condicional:
+    - El feed personal se autentica con el token de la URL de suscripción
+    - Rotar la URL revoca los tokens anteriores
+    - Con el ETag o Last-Modified vigentes se responde 304
+    - Cualquier cambio en un evento del feed invalida el ETag
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        self.user = User(
+            email='calendar@example.com',
+            first_name='Test',
+            last_name='User',
+            password_hash='x',
+            is_enabled=True,
+            special_roles=[]
+        )
+        db.session.add(self.user)
+        db.session.commit()
+
+        self.event = Event(
+            title='Meetup de Python, edición 1',
+            creator_id=self.user.id,
+            start_date=datetime.now(timezone.utc) + timedelta(days=7),
+            city='Madrid',
+        )
+        db.session.add(self.event)
+        db.session.commit()
+        db.session.add(EventRSVP(event_id=self.event.id, user_id=self.user.id, status='confirmed'))
+        db.session.commit()
+
+        self.url = f'/api/v1/events/my-rsvps.ics?token={self.user.get_calendar_feed_token()}'
+
+    def test_feed_requires_valid_token(self):
+        self.assertEqual(self.client.get('/api/v1/events/my-rsvps.ics').status_code, 401)
+        self.assertEqual(self.client.get('/api/v1/events/my-rsvps.ics?token=x').status_code, 401)
+
+    def test_rotating_feed_url_revokes_old_token(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.user.id)
+        response = self.client.post('/api/v1/events/my-rsvps/feed-url')
+        self.assertEqual(response.status_code, 200)
+        new_url = response.get_json()['url']
+        with self.client.session_transaction() as session:
+            session.pop('_user_id', None)
+
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.assertEqual(self.client.get(new_url).status_code, 200)
+
+    def test_user_feed_conditional_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/calendar')
+        body = response.get_data(as_text=True)
+        self.assertIn(f'UID:event-{self.event.id}@', body)
+        self.assertIn('SUMMARY:Meetup de Python\\, edición 1', body)
+
+        etag = response.headers['ETag']
+        last_modified = response.headers['Last-Modified']
+
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(self.client.get(self.url, headers={'If-Modified-Since': last_modified}).status_code, 304)
+
+        # Editar el evento cambia el feed, aunque sea en el mismo segundo
+        self.event.title = 'Meetup de Python, edición 2'
+        db.session.commit()
+
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_city_feed_conditional_get(self):
+        response = self.client.get('/api/v1/events/city/madrid.ics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'UID:event-{self.event.id}@', response.get_data(as_text=True))
+
+        etag = response.headers['ETag']
+        response = self.client.get('/api/v1/events/city/madrid.ics', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
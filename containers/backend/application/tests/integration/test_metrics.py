@@ -0,0 +1,43 @@
+## test_metrics.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from tests.integration.test_base import BaseTestCase
+from app.metrics import record_cache_lookup
+
+
+class MetricsTestCase(BaseTestCase):
+    """
+    Endpoint /metrics:
+    - Latencia por endpoint de blueprint
+    - Conexiones del pool
+    - Aciertos/fallos de caché por familia
+    - Token opcional
+    """
+
+    def test_request_latency_and_cache(self):
+        self.client.get('/healthcheck')
+        record_cache_lookup('rating', hit=False)
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_data(as_text=True)
+        self.assertIn('http_request_duration_seconds_bucket{endpoint="main.healthcheck"', body)
+        self.assertIn('cache_requests_total{family="rating",result="miss"}', body)
+        # setUp ya ha abierto una conexión del pool
+        self.assertIn('db_pool_connections_open{service="web"}', body)
+
+    def test_token_required_when_configured(self):
+        self.app.config['METRICS_TOKEN'] = 'secreto'
+        try:
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            response = self.client.get('/metrics', headers={'Authorization': 'Bearer secreto'})
+            self.assertEqual(response.status_code, 200)
+        finally:
+            self.app.config['METRICS_TOKEN'] = None
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
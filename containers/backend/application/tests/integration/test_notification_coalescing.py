@@ -0,0 +1,112 @@
+## test_notification_coalescing.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from tests.integration.test_base import BaseTestCase
+from app.models import Notification
+from app.notifications.routes import create_notification
+from app import db
+
+
+class NotificationCoalescingTestCase(BaseTestCase):
+    """
+    Agrupación de notificaciones (`add_notification` con `subject`):
+    - Un solo grupo abierto aunque los primeros eventos lleguen a la vez
+    - El contador es de actores distintos (o de eventos, si se pide)
+    - Fuera de la ventana la notificación abierta se cierra tal cual y se
+      abre otra
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.owner = self._create_user('owner@example.com')
+        self.actors = [self._create_user(f'actor{i}@example.com') for i in range(8)]
+
+    def _notify(self, actor_id):
+        return create_notification(
+            self.owner.id, 'event_rsvp', 'Nueva respuesta a tu evento',
+            message='Alguien ha respondido', subject='event:1', actor_id=actor_id,
+            rollup=lambda count: f'{count} personas han respondido'
+        )
+
+    def _open_groups(self):
+        db.session.expire_all()
+        return Notification.query.filter_by(user_id=self.owner.id, group_key='event_rsvp:event:1').all()
+
+    def test_counts_distinct_actors(self):
+        first, second, third = self.actors[:3]
+        for actor in (first, second, first, third, second):
+            self._notify(actor.id)
+
+        [notification] = self._open_groups()
+        self.assertEqual(notification.actor_count, 3)
+        self.assertEqual(sorted(notification.actor_ids), sorted([first.id, second.id, third.id]))
+        self.assertEqual(notification.last_actor_id, second.id)
+        self.assertEqual(notification.message, '3 personas han respondido')
+        self.assertEqual(notification.data['count'], 3)
+
+    def test_repeated_actor_keeps_single_message(self):
+        self._notify(self.actors[0].id)
+        self._notify(self.actors[0].id)
+
+        [notification] = self._open_groups()
+        self.assertEqual(notification.actor_count, 1)
+        self.assertEqual(notification.message, 'Alguien ha respondido')
+
+    def test_event_counting_for_messages(self):
+        sender = self.actors[0]
+        for _ in range(3):
+            create_notification(
+                self.owner.id, 'message', 'Nuevo mensaje', message='Hola',
+                subject='conversation:1', actor_id=sender.id,
+                rollup=lambda count: f'{count} mensajes nuevos', distinct_actors=False
+            )
+
+        db.session.expire_all()
+        [notification] = Notification.query.filter_by(group_key='message:conversation:1').all()
+        self.assertEqual(notification.actor_count, 3)
+        self.assertEqual(notification.actor_ids, [sender.id])
+        self.assertEqual(notification.message, '3 mensajes nuevos')
+
+    def test_concurrent_first_events_share_one_row(self):
+        def notify(actor_id):
+            with self.app.app_context():
+                self._notify(actor_id)
+                db.session.remove()
+
+        with ThreadPoolExecutor(max_workers=len(self.actors)) as executor:
+            list(executor.map(notify, [actor.id for actor in self.actors]))
+
+        [notification] = self._open_groups()
+        self.assertEqual(notification.actor_count, len(self.actors))
+
+    def test_stale_group_is_closed_and_new_one_opens(self):
+        self._notify(self.actors[0].id)
+        self._notify(self.actors[1].id)
+        window = self.app.config.get('NOTIFICATION_COALESCE_WINDOW_MINUTES', 60)
+        Notification.query.filter_by(user_id=self.owner.id).update(
+            {'createdAt': datetime.now(timezone.utc) - timedelta(minutes=window + 1)},
+            synchronize_session=False
+        )
+        db.session.commit()
+
+        self._notify(self.actors[2].id)
+
+        [notification] = self._open_groups()
+        self.assertEqual(notification.actor_count, 1)
+        self.assertEqual(notification.actor_ids, [self.actors[2].id])
+        self.assertEqual(notification.message, 'Alguien ha respondido')
+
+        # El grupo anterior sigue sin leer con sus actores
+        [closed] = Notification.query.filter_by(user_id=self.owner.id, group_key=None).all()
+        self.assertFalse(closed.is_read)
+        self.assertEqual(closed.actor_count, 2)
+        self.assertEqual(sorted(closed.actor_ids), sorted([self.actors[0].id, self.actors[1].id]))
+        self.assertEqual(closed.message, '2 personas han respondido')
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,64 @@
+## test_notification_emit.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from unittest.mock import patch
+from tests.integration.test_base import BaseTestCase
+from app.notifications.routes import add_notification
+from app import db, socketio
+
+
+class NotificationEmitTestCase(BaseTestCase):
+    """
+    Envío por Socket.IO de las notificaciones (app/db_listeners.py):
+    - Solo después del commit, con el contador de no leídas
+    - Nada si la transacción hace rollback
+    - También las agrupadas (upsert fuera del flush del ORM)
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = self._create_user('notified@example.com')
+        self.actor = self._create_user('actor@example.com')
+
+        patcher = patch.object(socketio, 'emit')
+        self.emit = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_emitted_after_commit(self):
+        notification = add_notification(self.user.id, 'new_user', 'Bienvenido')
+        db.session.flush()
+        self.emit.assert_not_called()
+
+        db.session.commit()
+
+        self.emit.assert_called_once()
+        event, payload = self.emit.call_args.args
+        self.assertEqual(event, 'notification')
+        self.assertEqual(payload['notification']['id'], notification.id)
+        self.assertEqual(payload['unread_count'], 1)
+        self.assertEqual(self.emit.call_args.kwargs['room'], f'user_{self.user.id}')
+
+    def test_discarded_on_rollback(self):
+        add_notification(self.user.id, 'new_user', 'Bienvenido')
+        db.session.flush()
+        db.session.rollback()
+
+        # Un commit posterior sin notificaciones no arrastra la deshecha
+        db.session.commit()
+        self.emit.assert_not_called()
+
+    def test_grouped_notification_is_emitted(self):
+        add_notification(self.user.id, 'profile_view', 'Visita', subject='profile', actor_id=self.actor.id)
+        self.emit.assert_not_called()
+
+        db.session.commit()
+
+        self.emit.assert_called_once()
+        self.assertEqual(self.emit.call_args.args[1]['notification']['count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,52 @@
+## test_profiling.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import glob
+import tempfile
+import time
+import unittest
+from tests.integration.test_base import BaseTestCase
+from app.profiling import Sampler
+
+
+def _busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class ProfilingTestCase(BaseTestCase):
+    """
+    Perfilado muestreado:
+    - El muestreador recoge la pila del hilo que lo arranca
+    - Con PROFILING_SAMPLE_RATE=1 se escribe un fichero collapsed por endpoint
+    """
+
+    def test_sampler_collects_current_stack(self):
+        sampler = Sampler(interval=0.001).start()
+        _busy_loop(0.05)
+        stacks = sampler.stop()
+        self.assertTrue(sampler.samples > 0)
+        self.assertTrue(any('test_profiling:_busy_loop' in stack for stack in stacks))
+
+    def test_sampled_request_writes_folded_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.app.config.update(
+                PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0,
+                PROFILING_INTERVAL_MS=1, PROFILING_DIR=directory
+            )
+            for _ in range(20):
+                self.client.get('/healthcheck')
+            files = glob.glob(os.path.join(directory, 'main.healthcheck.*.folded'))
+            self.app.config['PROFILING_ENABLED'] = False
+
+            self.assertEqual(len(files), 1)
+            with open(files[0], encoding='utf-8') as fh:
+                stack, count = fh.readline().rsplit(' ', 1)
+            self.assertTrue(int(count) > 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,107 @@
+## test_project_candidates.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from tests.integration.test_base import BaseTestCase
+from app.models import User, Project, ProjectMember, WaitlistEntry
+from app.projects.skill_index import skill_index
+from app import db
+
+
+SKILLS = ['Python', 'React', 'SQL']
+
+
+class ProjectCandidatesTestCase(BaseTestCase):
+    """
+    Candidatos para un proyecto (`GET /api/v1/projects/<id>/candidates`):
+    - Solo el creador o los owners: 403 para el resto
+    - Sin miembros activos o pendientes ni usuarios en la lista de espera
+    - Sin perfiles privados o deshabilitados, aunque el índice vaya por detrás
+    - Ordenados por puntuación
+    - `limit` no numérico: 400
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.owner = self._create_user('owner@example.com')
+        self.outsider = self._create_user('outsider@example.com')
+
+        self.best = self._create_user('best@example.com', skills=SKILLS)
+        self.good = self._create_user('good@example.com', skills=['python', 'react'])
+        self.weak = self._create_user('weak@example.com', skills=['python'])
+        self.member = self._create_user('member@example.com', skills=SKILLS)
+        self.pending = self._create_user('pending@example.com', skills=SKILLS)
+        self.waiting = self._create_user('waiting@example.com', skills=SKILLS)
+        self.private = self._create_user('private@example.com', skills=SKILLS, is_profile_public=False)
+        self.disabled = self._create_user('disabled@example.com', skills=SKILLS, is_enabled=False)
+
+        self.project = Project(
+            title='Proyecto', creator_id=self.owner.id, required_skills=SKILLS, is_public=True
+        )
+        db.session.add(self.project)
+        db.session.commit()
+        db.session.add_all([
+            ProjectMember(project_id=self.project.id, user_id=self.owner.id, role='owner', status='active'),
+            ProjectMember(project_id=self.project.id, user_id=self.member.id, status='active'),
+            ProjectMember(project_id=self.project.id, user_id=self.pending.id, status='pending'),
+            WaitlistEntry(project_id=self.project.id, user_id=self.waiting.id),
+        ])
+        db.session.commit()
+
+        skill_index.build()
+        self.url = f'/api/v1/projects/{self.project.id}/candidates'
+
+    def _login(self, user):
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+
+    def _candidate_ids(self, **params):
+        response = self.client.get(self.url, query_string=params)
+        self.assertEqual(response.status_code, 200)
+        return [c['id'] for c in response.get_json()['candidates']]
+
+    def test_only_owners(self):
+        self._login(self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_excludes_members_waitlist_and_ineligible(self):
+        self._login(self.owner)
+        self.assertEqual(self._candidate_ids(), [self.best.id, self.good.id, self.weak.id])
+
+    def test_ordered_by_score(self):
+        self._login(self.owner)
+        candidates = self.client.get(self.url).get_json()['candidates']
+
+        scores = [c['score'] for c in candidates]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(candidates[0]['matched_skills'], sorted(SKILLS))
+        self.assertEqual(self._candidate_ids(limit=2), [self.best.id, self.good.id])
+
+    def test_stale_index_does_not_leak_private_or_disabled(self):
+        # Cambios hechos "desde otro proceso": el índice aún no los conoce
+        User.query.filter_by(id=self.best.id).update({'is_profile_public': False}, synchronize_session=False)
+        User.query.filter_by(id=self.good.id).update({'is_enabled': False}, synchronize_session=False)
+        db.session.commit()
+
+        self._login(self.owner)
+        self.assertEqual(self._candidate_ids(), [self.weak.id])
+
+    def test_privacy_change_updates_index(self):
+        self._login(self.best)
+        response = self.client.put('/api/v1/security/privacy-settings', json={'is_profile_public': False})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(skill_index.skills_of(self.best.id), frozenset())
+
+        response = self.client.put('/api/v1/security/privacy-settings', json={'is_profile_public': True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(skill_index.skills_of(self.best.id), frozenset(s.lower() for s in SKILLS))
+
+    def test_invalid_limit_is_rejected(self):
+        self._login(self.owner)
+        self.assertEqual(self.client.get(self.url, query_string={'limit': 'muchos'}).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
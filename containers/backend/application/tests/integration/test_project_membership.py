@@ -0,0 +1,96 @@
+## test_project_membership.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from tests.integration.test_base import BaseTestCase
+from app.models import Project, ProjectMember
+from app.projects.membership import (
+    apply_member_status_change, release_member_slot, reserve_member_slot, recount_active_members
+)
+from app.waitlist import join_waitlist, promote_project_waitlist, waitlist_position
+from app import db
+
+
+class ProjectMembershipTestCase(BaseTestCase):
+    """
+    Contador desnormalizado de miembros (`Project.active_member_count`):
+    - No se sobrepasa `max_members`
+    - Los cambios de estado mueven el contador y nunca baja de 0
+    - La reparación recalcula desde `project_member`
+    - Al liberarse un hueco entra la cabeza de la lista de espera
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        self.creator = self._create_user('creator@example.com')
+        self.project = Project(title='Proyecto', creator_id=self.creator.id, max_members=2, active_member_count=1)
+        db.session.add(self.project)
+        db.session.commit()
+        db.session.add(ProjectMember(project_id=self.project.id, user_id=self.creator.id, role='owner', status='active'))
+        db.session.commit()
+
+    def _count(self):
+        db.session.expire_all()
+        return db.session.get(Project, self.project.id).active_member_count
+
+    def test_full_project_rejects_and_release_frees_slot(self):
+        self.assertEqual(reserve_member_slot(self.project.id), 2)
+        self.assertIsNone(reserve_member_slot(self.project.id))
+
+        self.assertEqual(release_member_slot(self.project.id), 1)
+        self.assertEqual(reserve_member_slot(self.project.id), 2)
+        db.session.commit()
+
+    def test_status_changes_move_counter(self):
+        project_id = self.project.id
+
+        self.assertTrue(apply_member_status_change(project_id, 'pending', 'active'))
+        self.assertFalse(apply_member_status_change(project_id, 'pending', 'active'))
+        self.assertTrue(apply_member_status_change(project_id, 'active', 'active'))
+        self.assertTrue(apply_member_status_change(project_id, 'active', 'left'))
+        db.session.commit()
+        self.assertEqual(self._count(), 1)
+
+        release_member_slot(project_id)
+        release_member_slot(project_id)
+        db.session.commit()
+        self.assertEqual(self._count(), 0)
+
+    def test_recount_repairs_drift(self):
+        self.project.active_member_count = 0
+        db.session.commit()
+
+        self.assertEqual(recount_active_members([self.project.id]), 1)
+        db.session.commit()
+        self.assertEqual(self._count(), 1)
+
+    def test_release_promotes_waitlist(self):
+        self.project.max_members = 1
+        db.session.commit()
+        project_id = self.project.id
+
+        first = self._create_user('first@example.com')
+        second = self._create_user('second@example.com')
+        join_waitlist(first.id, project_id=project_id)
+        join_waitlist(second.id, project_id=project_id)
+        db.session.commit()
+
+        # Sin hueco libre no se promociona a nadie
+        self.assertEqual(promote_project_waitlist(project_id), [])
+
+        release_member_slot(project_id)
+        self.assertEqual(promote_project_waitlist(project_id), [first.id])
+        db.session.commit()
+
+        self.assertEqual(self._count(), 1)
+        member = ProjectMember.query.filter_by(project_id=project_id, user_id=first.id).first()
+        self.assertEqual(member.status, 'active')
+        self.assertIsNone(waitlist_position(first.id, project_id=project_id))
+        self.assertEqual(waitlist_position(second.id, project_id=project_id), 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,101 @@
+## test_push_delivery.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from tests.integration.test_base import BaseTestCase
+from app.models import PushSubscription
+from app.push_service import deliver_push_batch, record_push_results
+from app import db
+
+
+class FakePusher:
+    """Sustituto de `WebPusher`: responde según el endpoint y apunta los envíos."""
+    statuses = {}
+    sent = []
+
+    def __init__(self, subscription_info, requests_session=None):
+        self.endpoint = subscription_info['endpoint']
+
+    def send(self, data, headers, ttl, **kwargs):
+        FakePusher.sent.append((self.endpoint, ttl))
+        return SimpleNamespace(status_code=FakePusher.statuses[self.endpoint], reason='')
+
+
+class PushDeliveryTestCase(BaseTestCase):
+    """
+    Entrega de pushes por lotes:
+    - Los hilos del lote usan la configuración de la app (PUSH_TTL)
+    - 404/410 borran la suscripción; otros fallos suman `failure_count`
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = self._create_user('push@example.com')
+
+        FakePusher.statuses = {}
+        FakePusher.sent = []
+        patcher = patch.multiple(
+            'app.push_service',
+            WebPusher=FakePusher,
+            VAPID_PUBLIC_KEY='public',
+            VAPID_PRIVATE_KEY='private',
+            _vapid_headers_for=lambda audience, expiry: {'Authorization': 'vapid'},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _subscribe(self, endpoint, status):
+        FakePusher.statuses[endpoint] = status
+        subscription = PushSubscription(
+            user_id=self.user.id,
+            endpoint_hash=PushSubscription.hash_endpoint(endpoint),
+            endpoint=endpoint,
+            keys={'p256dh': 'x', 'auth': 'y'},
+        )
+        db.session.add(subscription)
+        db.session.commit()
+        return subscription
+
+    def _deliveries(self, subscriptions):
+        return [{
+            'subscription_id': s.id,
+            'user_id': s.user_id,
+            'subscription': {'endpoint': s.endpoint, 'keys': s.keys},
+            'notification_data': {'title': 'Hola'},
+        } for s in subscriptions]
+
+    def test_batch_uses_app_config_in_worker_threads(self):
+        self.app.config['PUSH_TTL'] = 60
+        try:
+            subscriptions = [self._subscribe(f'https://push.example.com/{i}', 201) for i in range(5)]
+            results = deliver_push_batch(self._deliveries(subscriptions))
+        finally:
+            self.app.config.pop('PUSH_TTL')
+
+        self.assertEqual([r['status'] for r in results], [201] * 5)
+        self.assertEqual([r['subscription_id'] for r in results], [s.id for s in subscriptions])
+        self.assertEqual(sorted(ttl for _, ttl in FakePusher.sent), [60] * 5)
+
+    def test_dead_subscriptions_are_removed(self):
+        ok = self._subscribe('https://push.example.com/ok', 201)
+        gone = self._subscribe('https://push.example.com/gone', 410)
+        unknown = self._subscribe('https://push.example.com/unknown', 404)
+        flaky = self._subscribe('https://push.example.com/flaky', 500)
+        ids = {s.endpoint: s.id for s in (ok, gone, unknown, flaky)}
+
+        removed = record_push_results(deliver_push_batch(self._deliveries([ok, gone, unknown, flaky])))
+
+        self.assertEqual(removed, 2)
+        db.session.expire_all()
+        self.assertIsNone(db.session.get(PushSubscription, ids['https://push.example.com/gone']))
+        self.assertIsNone(db.session.get(PushSubscription, ids['https://push.example.com/unknown']))
+        self.assertIsNotNone(db.session.get(PushSubscription, ids['https://push.example.com/ok']).last_success_at)
+        self.assertEqual(db.session.get(PushSubscription, ids['https://push.example.com/flaky']).failure_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
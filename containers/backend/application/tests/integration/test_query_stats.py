@@ -0,0 +1,57 @@
+## test_query_stats.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from tests.integration.test_base import BaseTestCase
+from app.models import BlockedUser
+from app.query_stats import fingerprint, query_budget
+from app import db
+
+
+class QueryStatsTestCase(BaseTestCase):
+    """
+    Instrumentación SQL por petición:
+    - Cabecera Server-Timing con el tiempo en BD y el nº de consultas
+    - Las huellas agrupan sentencias que solo cambian en los parámetros
+    - `blocked-users` no hace una consulta por usuario bloqueado
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        self.user = self._create_user('blocker@example.com')
+        for i in range(6):
+            blocked = self._create_user(f'blocked{i}@example.com')
+            db.session.add(BlockedUser(blocker_id=self.user.id, blocked_id=blocked.id))
+        db.session.commit()
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.user.id)
+
+    def test_fingerprint_normalizes_parameters(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "user" WHERE id = %(id_1)s LIMIT 10'),
+            fingerprint('SELECT * FROM "user"\n WHERE id = %(id_2)s LIMIT 20')
+        )
+        self.assertEqual(
+            fingerprint('SELECT 1 WHERE id IN (%(p_1)s, %(p_2)s)'),
+            fingerprint('SELECT 1 WHERE id IN (%(p_1)s)')
+        )
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/v1/security/blocked-users')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=', response.headers.get('Server-Timing', ''))
+
+    def test_blocked_users_without_nplus1(self):
+        # Usuario de la sesión + bloqueos con el usuario bloqueado en un JOIN
+        with query_budget(3) as stats:
+            response = self.client.get('/api/v1/security/blocked-users')
+        self.assertEqual(response.get_json()['total'], 6)
+        self.assertFalse(stats.repeated(3))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
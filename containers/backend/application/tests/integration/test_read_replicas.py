@@ -0,0 +1,83 @@
+## test_read_replicas.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import time
+import unittest
+from flask import g, session
+from sqlalchemy import insert
+from tests.integration.test_base import BaseTestCase
+from app import create_app, db
+from app.cache import get_user_rating_cached, invalidate_user_rating
+from app.db_routing import LAST_WRITE_KEY, read_replica
+from app.models import User
+from config import TestConfig
+
+
+class ReplicaTestConfig(TestConfig):
+    # La "réplica" es la propia BD de tests: basta para comprobar el enrutado
+    DATABASE_REPLICA_URLS = [TestConfig.SQLALCHEMY_DATABASE_URI]
+    SQLALCHEMY_BINDS = {'replica_0': TestConfig.SQLALCHEMY_DATABASE_URI}
+
+
+class ReadReplicaTestCase(BaseTestCase):
+    """
+    Enrutado a réplicas:
+    - Las lecturas de vistas con @read_replica van a la réplica
+    - Las escrituras y lo que venga después en la petición, al primario
+    - Tras escribir, el usuario lee del primario durante REPLICA_STICKY_SECONDS
+    - Lo leído de una réplica no se guarda en cachés compartidas
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app(ReplicaTestConfig)
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+        db.create_all()
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        replica, primary = db.engines['replica_0'], db.engines[None]
+
+        @read_replica
+        def view():
+            read_bind = db.session.get_bind(mapper=User)
+            write_bind = db.session.get_bind(mapper=User, clause=insert(User))
+            after_write_bind = db.session.get_bind(mapper=User)
+            return read_bind, write_bind, after_write_bind
+
+        with self.app.test_request_context('/api/v1/events'):
+            self.assertEqual(view(), (replica, primary, primary))
+            db.session.rollback()
+            self.assertFalse(g.db_replica)
+
+    def test_recent_write_sticks_to_primary(self):
+        @read_replica
+        def view():
+            return g.db_replica
+
+        with self.app.test_request_context('/api/v1/events'):
+            session[LAST_WRITE_KEY] = time.time()
+            self.assertFalse(view())
+            session[LAST_WRITE_KEY] = time.time() - self.app.config['REPLICA_STICKY_SECONDS'] - 1
+            self.assertTrue(view())
+
+    def test_replica_reads_do_not_fill_shared_cache(self):
+        user = self._create_user('rated@example.com')
+        invalidate_user_rating(user.id)
+
+        response = self.client.get('/api/v1/reviews/user/rated/average')
+        self.assertEqual(response.status_code, 200)
+        # Leído de la réplica: otro cliente no debe recibir este valor desde Redis
+        self.assertIsNone(get_user_rating_cached(user.id))
+
+        # Recién escrito (sticky al primario): sí se cachea
+        with self.client.session_transaction() as session:
+            session[LAST_WRITE_KEY] = time.time()
+        self.client.get('/api/v1/reviews/user/rated/average')
+        self.assertEqual(get_user_rating_cached(user.id), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
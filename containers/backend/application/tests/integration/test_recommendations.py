@@ -0,0 +1,80 @@
+## test_recommendations.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from datetime import datetime, timedelta
+from tests.integration.test_base import BaseTestCase
+from app.models import Event, EventRSVP, Conversation, EventRecommendation
+from app.recommendations import refresh_recommendations, stale_user_ids
+from app import db
+
+
+class RecommendationsTestCase(BaseTestCase):
+    """
+    Recomendaciones precalculadas:
+    - Prioriza eventos cercanos, de la categoría del usuario y con contactos
+    - No recomienda eventos con RSVP ni propios
+    - El refresco incremental solo recalcula usuarios obsoletos
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        self.user = self._create_user('reco@example.com', category='tech', latitude=40.4168, longitude=-3.7038)
+        self.friend = self._create_user('friend@example.com')
+        self.creator = self._create_user('creator@example.com')
+
+        db.session.add(Conversation(participant1_id=self.user.id, participant2_id=self.friend.id))
+        start = datetime.utcnow() + timedelta(days=3)
+
+        # Cerca, de su categoría y con un contacto apuntado
+        self.best = self._create_event('Meetup tech', start, category='tech', latitude=40.42, longitude=-3.70)
+        # Cerca pero de otra categoría
+        self.near = self._create_event('Concierto', start, category='music', latitude=40.41, longitude=-3.71)
+        # Lejos (Barcelona)
+        self.far = self._create_event('Lejano', start, category='music', latitude=41.38, longitude=2.17)
+        # Ya tiene RSVP
+        self.going = self._create_event('Ya voy', start, category='tech', latitude=40.42, longitude=-3.70)
+        db.session.commit()
+
+        db.session.add(EventRSVP(event_id=self.best.id, user_id=self.friend.id, status='confirmed'))
+        db.session.add(EventRSVP(event_id=self.going.id, user_id=self.user.id, status='confirmed'))
+        db.session.commit()
+
+    def _create_event(self, title, start, **kwargs):
+        event = Event(title=title, creator_id=self.creator.id, start_date=start, **kwargs)
+        db.session.add(event)
+        return event
+
+    def test_ranking_and_exclusions(self):
+        refresh_recommendations(user_ids=[self.user.id])
+
+        ranked = [
+            r.event_id for r in
+            EventRecommendation.query.filter_by(user_id=self.user.id).order_by(EventRecommendation.rank)
+        ]
+        self.assertEqual(ranked[:2], [self.best.id, self.near.id])
+        self.assertNotIn(self.far.id, ranked)
+        self.assertNotIn(self.going.id, ranked)
+
+        best = EventRecommendation.query.filter_by(user_id=self.user.id, event_id=self.best.id).one()
+        self.assertTrue(best.reasons['category_match'])
+        self.assertEqual(best.reasons['contacts'], 1)
+
+    def test_incremental_refresh_skips_fresh_users(self):
+        self.assertIn(self.user.id, stale_user_ids())
+
+        refresh_recommendations()
+        self.assertNotIn(self.user.id, stale_user_ids())
+
+        # Actividad nueva del usuario: vuelve a estar obsoleto
+        db.session.add(EventRSVP(event_id=self.near.id, user_id=self.user.id, status='confirmed',
+                                 updatedAt=datetime.utcnow() + timedelta(seconds=1)))
+        db.session.commit()
+        self.assertIn(self.user.id, stale_user_ids())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
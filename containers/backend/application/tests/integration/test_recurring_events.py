@@ -0,0 +1,122 @@
+## test_recurring_events.py
+import os
+import sys
+# Añadir el directorio raíz al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import unittest
+from datetime import datetime, timedelta
+from tests.integration.test_base import BaseTestCase
+from app.models import User, Event, EventOccurrence, EventRSVP
+from app.events.capacity import apply_status_change
+from app.events.recurrence import (
+    expand_series, get_or_create_occurrence, iter_occurrences, parse_rule, series_end
+)
+from app import db
+
+
+class RecurringEventsTestCase(BaseTestCase):
+    """
+    Eventos recurrentes:
+    - La expansión salta directamente a la ventana pedida
+    - Una serie es una sola fila; solo las sesiones con cambios o RSVPs tienen fila
+    - Las sesiones movidas o canceladas se reflejan en la expansión
+    - Al cambiar la regla, las sesiones que ya no genera se cancelan
+    - Cada sesión tiene su propio cupo
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        self.creator = User(
+            email='series@example.com',
+            first_name='Test',
+            last_name='User',
+            password_hash='x',
+            is_enabled=True,
+            special_roles=[]
+        )
+        db.session.add(self.creator)
+        db.session.commit()
+
+        # Todos los martes a las 19:00 desde el 6 de enero de 2026
+        self.start = datetime(2026, 1, 6, 19, 0)
+        self.series = Event(
+            title='Meetup semanal',
+            creator_id=self.creator.id,
+            start_date=self.start,
+            end_date=self.start + timedelta(hours=2),
+            max_attendees=1,
+            recurrence_rule='FREQ=WEEKLY;BYDAY=TU',
+        )
+        db.session.add(self.series)
+        db.session.commit()
+
+    def test_expansion_skips_to_window(self):
+        rule = parse_rule('FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH')
+        window_start, window_end = datetime(2030, 3, 1), datetime(2030, 4, 1)
+
+        full = [d for d in iter_occurrences(self.start, rule, window_end=window_end) if d >= window_start]
+        self.assertEqual(list(iter_occurrences(self.start, rule, window_start, window_end)), full)
+        self.assertEqual(series_end(self.start, parse_rule('FREQ=DAILY;COUNT=3')), self.start + timedelta(days=2))
+        self.assertIsNone(series_end(self.start, rule))
+
+    def test_overrides_move_and_cancel_occurrences(self):
+        window_start, window_end = datetime(2026, 2, 1), datetime(2026, 3, 1)
+        self.assertEqual(len(expand_series([self.series], window_start, window_end, 100)), 4)
+        self.assertEqual(EventOccurrence.query.filter_by(event_id=self.series.id).count(), 0)
+
+        cancelled = get_or_create_occurrence(self.series, datetime(2026, 2, 3, 19, 0))
+        cancelled.is_cancelled = True
+        moved = get_or_create_occurrence(self.series, datetime(2026, 2, 10, 19, 0))
+        moved.start_date = datetime(2026, 2, 11, 20, 0)
+        moved.title = 'Edición especial'
+        db.session.commit()
+
+        self.assertIsNone(get_or_create_occurrence(self.series, datetime(2026, 2, 4, 19, 0)))
+
+        occurrences = expand_series([self.series], window_start, window_end, 100)
+        self.assertEqual(len(occurrences), 3)
+        special = occurrences[0]
+        self.assertEqual(special.title, 'Edición especial')
+        self.assertEqual(special.start_date, datetime(2026, 2, 11, 20, 0))
+        self.assertEqual(special.end_date, datetime(2026, 2, 11, 22, 0))
+
+    def test_rule_change_cancels_orphaned_occurrences(self):
+        window_start, window_end = datetime(2026, 2, 1), datetime(2026, 3, 1)
+        tuesday = get_or_create_occurrence(self.series, datetime(2026, 2, 3, 19, 0))
+        self.assertTrue(apply_status_change(self.series.id, None, 'confirmed', occurrence_id=tuesday.id))
+        db.session.add(EventRSVP(
+            event_id=self.series.id, user_id=self.creator.id, occurrence_id=tuesday.id, status='confirmed'
+        ))
+        db.session.commit()
+
+        # De martes a jueves
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.creator.id)
+        response = self.client.put(f'/api/v1/events/{self.series.id}', json={'recurrence_rule': 'FREQ=WEEKLY;BYDAY=TH'})
+        self.assertEqual(response.status_code, 200)
+
+        db.session.expire_all()
+        series = db.session.get(Event, self.series.id)
+        starts = [o.start_date for o in expand_series([series], window_start, window_end, 100)]
+        self.assertEqual(starts, [datetime(2026, 2, d, 19, 0) for d in (5, 12, 19, 26)])
+        self.assertTrue(db.session.get(EventOccurrence, tuesday.id).is_cancelled)
+        # El RSVP se conserva (el asistente ve la sesión cancelada)
+        self.assertEqual(EventRSVP.query.filter_by(occurrence_id=tuesday.id).count(), 1)
+
+    def test_capacity_is_per_occurrence(self):
+        first = get_or_create_occurrence(self.series, datetime(2026, 2, 3, 19, 0))
+        second = get_or_create_occurrence(self.series, datetime(2026, 2, 10, 19, 0))
+
+        self.assertTrue(apply_status_change(self.series.id, None, 'confirmed', occurrence_id=first.id))
+        self.assertFalse(apply_status_change(self.series.id, None, 'confirmed', occurrence_id=first.id))
+        self.assertTrue(apply_status_change(self.series.id, None, 'confirmed', occurrence_id=second.id))
+        db.session.commit()
+
+        db.session.expire_all()
+        self.assertEqual(db.session.get(EventOccurrence, first.id).confirmed_count, 1)
+        self.assertEqual(db.session.get(Event, self.series.id).confirmed_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
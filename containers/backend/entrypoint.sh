@@ -62,7 +62,7 @@ main() {
     echo "Iniciando aplicación con Gunicorn + Eventlet (soporte WebSockets)..."
     
     # Usa Gunicorn con eventlet para soporte de WebSockets/Socket.IO
-    exec gunicorn --workers=1 --worker-class=eventlet --bind=0.0.0.0:5000 "httpApp:app"
+    exec gunicorn --config=gunicorn.conf.py --workers=1 --worker-class=eventlet --bind=0.0.0.0:5000 "httpApp:app"
 }
 
 main "$@"
@@ -7,7 +7,9 @@ import {
   getEventMessages,
   sendEventMessage,
   deleteEvent,
+  getEventAttendees,
   Event,
+  EventAttendee,
   EventMessage as EventMessageType
 } from '@/services/events/eventsApi'
 import { Calendar, MapPin, Users, Video, Clock, User, Send, Edit, Trash2, CheckCircle, XCircle } from 'lucide-react'
@@ -31,6 +33,12 @@ export function EventDetail() {
   const [loading, setLoading] = useState(true)
   const [sendingMessage, setSendingMessage] = useState(false)
   const [processingRSVP, setProcessingRSVP] = useState(false)
+  // Asistentes cargados con "Ver más" (null = solo la vista previa del detalle)
+  const [attendeesPage, setAttendeesPage] = useState<{
+    items: EventAttendee[]
+    cursor: string | null
+    hasMore: boolean
+  } | null>(null)
   const messagesEndRef = useRef<HTMLDivElement>(null)
 
   useEffect(() => {
@@ -43,6 +51,7 @@ export function EventDetail() {
         const eventData = await getEvent(Number(id))
         if (cancelled) return
         setEvent(eventData)
+        setAttendeesPage(null)
 
         if (eventData.user_rsvp?.status === 'confirmed') {
           const messagesData = await getEventMessages(Number(id))
@@ -75,6 +84,7 @@ export function EventDetail() {
       setLoading(true)
   const eventData = await getEvent(Number(id))
       setEvent(eventData)
+      setAttendeesPage(null)
 
       // Cargar mensajes si el usuario confirmó asistencia
       if (eventData.user_rsvp?.status === 'confirmed') {
@@ -89,11 +99,29 @@ export function EventDetail() {
     }
   }
 
+  const loadMoreAttendees = async () => {
+    try {
+      const page = await getEventAttendees(Number(id), { cursor: attendeesPage?.cursor ?? undefined })
+      setAttendeesPage((prev) => ({
+        items: [...(prev?.items ?? []), ...page.attendees],
+        cursor: page.next_cursor,
+        hasMore: page.has_more,
+      }))
+    } catch (error: any) {
+      console.error('Error loading attendees:', error)
+      toast.error(error.response?.data?.error || 'Error al cargar los asistentes')
+    }
+  }
+
   const handleRSVP = async (status: 'confirmed' | 'declined') => {
     try {
       setProcessingRSVP(true)
-  await createRSVP(Number(id), { status })
-      toast.success(status === 'confirmed' ? '¡Asistencia confirmada!' : 'Asistencia declinada')
+  const result = await createRSVP(Number(id), { status })
+      if (result.waitlist) {
+        toast.success(`Evento lleno: estás en la lista de espera (posición ${result.waitlist.position})`)
+      } else {
+        toast.success(status === 'confirmed' ? '¡Asistencia confirmada!' : 'Asistencia declinada')
+      }
       await loadEventData()
     } catch (error: any) {
       console.error('Error processing RSVP:', error)
@@ -181,6 +209,8 @@ export function EventDetail() {
   const isCreator = user?.user_id === event.creator.id
   const hasConfirmed = event.user_rsvp?.status === 'confirmed'
   const hasRSVP = !!event.user_rsvp
+  const attendees = attendeesPage?.items ?? event.attendees
+  const hasMoreAttendees = attendeesPage ? attendeesPage.hasMore : !!event.attendees_has_more
 
   return (
     <div className="container mx-auto py-8 px-4 max-w-6xl">
@@ -387,12 +417,12 @@ export function EventDetail() {
         <div>
           <Card>
             <CardHeader>
-              <CardTitle>Asistentes ({event.attendees?.length || 0})</CardTitle>
+              <CardTitle>Asistentes ({event.stats?.confirmed ?? event.attendees?.length ?? 0})</CardTitle>
             </CardHeader>
             <CardContent>
               <div className="space-y-3">
-                {event.attendees && event.attendees.length > 0 ? (
-                  event.attendees.map((attendee) => (
+                {attendees && attendees.length > 0 ? (
+                  attendees.map((attendee) => (
                     <Link
                       key={attendee.id}
                       to={`/profile/${attendee.username}`}
@@ -411,6 +441,11 @@ export function EventDetail() {
                 ) : (
                   <p className="text-sm text-gray-500 text-center py-4">Aún no hay asistentes confirmados</p>
                 )}
+                {hasMoreAttendees && (
+                  <Button variant="ghost" size="sm" className="w-full" onClick={loadMoreAttendees}>
+                    Ver más
+                  </Button>
+                )}
               </div>
             </CardContent>
           </Card>
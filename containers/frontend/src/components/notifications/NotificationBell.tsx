@@ -69,21 +69,24 @@ export function NotificationBell() {
     }
   }, [open])
 
-  // Escuchar notificaciones en tiempo real
+  // Escuchar notificaciones en tiempo real: el servidor envía la notificación
+  // (nueva o agrupada) junto con el contador de no leídas, sin polling
   useEffect(() => {
     if (connected && socket) {
-      socket.on('message_notification', () => {
-        loadUnreadCount()
-        if (open) {
-          loadNotifications()
-        }
-      })
+      const handleNotification = (payload: { notification: Notification; unread_count: number }) => {
+        setUnreadCount(payload.unread_count)
+        setNotifications((prev) => [
+          payload.notification,
+          ...prev.filter((n) => n.id !== payload.notification.id),
+        ])
+      }
+      socket.on('notification', handleNotification)
 
       return () => {
-        socket.off('message_notification')
+        socket.off('notification', handleNotification)
       }
     }
-  }, [connected, socket, open])
+  }, [connected, socket])
 
   const handleMarkAsRead = async (notificationId: number) => {
     try {
@@ -6,7 +6,9 @@ import {
   removeMember,
   updateMemberRole,
   deleteProject,
+  getProjectMembers,
   Project,
+  ProjectMemberSummary,
 } from '@/services/projects/projectsApi'
 import { Briefcase, Users, Calendar, Edit, Trash2, UserPlus, Crown, Shield, User as UserIcon } from 'lucide-react'
 import { Button } from '@/components/ui/button'
@@ -30,6 +32,12 @@ export function ProjectDetail() {
   const { user } = useAuth()
   const [project, setProject] = useState<Project | null>(null)
   const [loading, setLoading] = useState(true)
+  // Miembros cargados con "Ver más" (null = solo la vista previa del detalle)
+  const [membersPage, setMembersPage] = useState<{
+    items: ProjectMemberSummary[]
+    cursor: string | null
+    hasMore: boolean
+  } | null>(null)
 
   useEffect(() => {
     let cancelled = false
@@ -41,6 +49,7 @@ export function ProjectDetail() {
         const data = await getProject(Number(id))
         if (cancelled) return
         setProject(data)
+        setMembersPage(null)
       } catch (error: any) {
         console.error('Error loading project:', error)
         toast.error(error.response?.data?.error || 'Error al cargar el proyecto')
@@ -59,6 +68,7 @@ export function ProjectDetail() {
       setLoading(true)
   const data = await getProject(Number(id))
       setProject(data)
+      setMembersPage(null)
     } catch (error: any) {
       console.error('Error loading project:', error)
       toast.error(error.response?.data?.error || 'Error al cargar el proyecto')
@@ -67,6 +77,20 @@ export function ProjectDetail() {
     }
   }
 
+  const loadMoreMembers = async () => {
+    try {
+      const page = await getProjectMembers(Number(id), { cursor: membersPage?.cursor ?? undefined })
+      setMembersPage((prev) => ({
+        items: [...(prev?.items ?? []), ...page.members],
+        cursor: page.next_cursor,
+        hasMore: page.has_more,
+      }))
+    } catch (error: any) {
+      console.error('Error loading members:', error)
+      toast.error(error.response?.data?.error || 'Error al cargar los miembros')
+    }
+  }
+
   const handleJoinProject = async () => {
     try {
   await addMember(Number(id))
@@ -177,6 +201,8 @@ export function ProjectDetail() {
   const isMember = !!userMembership && userMembership.status === 'active'
   const isOwner = userMembership?.role === 'owner'
   const canManageMembers = isCreator || isOwner
+  const members = membersPage?.items ?? project.members
+  const hasMoreMembers = membersPage ? membersPage.hasMore : !!project.members_has_more
 
   return (
     <div className="container mx-auto py-8 px-4 max-w-6xl">
@@ -308,12 +334,12 @@ export function ProjectDetail() {
         <div>
           <Card>
             <CardHeader>
-              <CardTitle>Miembros ({project.members?.length || 0})</CardTitle>
+              <CardTitle>Miembros ({project.stats?.active_members ?? project.members?.length ?? 0})</CardTitle>
             </CardHeader>
             <CardContent>
               <div className="space-y-3">
-                {project.members && project.members.length > 0 ? (
-                  project.members.map((member) => (
+                {members && members.length > 0 ? (
+                  members.map((member) => (
                     <div
                       key={member.id}
                       className="flex items-center justify-between p-2 hover:bg-gray-50 rounded-lg transition-colors"
@@ -367,6 +393,11 @@ export function ProjectDetail() {
                 ) : (
                   <p className="text-sm text-gray-500 text-center py-4">Aún no hay miembros en el proyecto</p>
                 )}
+                {hasMoreMembers && (
+                  <Button variant="ghost" size="sm" className="w-full" onClick={loadMoreMembers}>
+                    Ver más
+                  </Button>
+                )}
               </div>
             </CardContent>
           </Card>
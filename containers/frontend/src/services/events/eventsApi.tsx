@@ -34,22 +34,37 @@ export interface Event {
     pending: number
     is_full: boolean
   }
-  attendees?: Array<{
-    id: number
-    name: string
-    username: string
-    image: string
-  }>
+  attendees?: EventAttendee[]
+  attendees_has_more?: boolean
   user_rsvp?: {
     id: number
     status: string
     response_date: string
   }
   distance?: number
+  // Eventos recurrentes: en los listados cada sesión es un item con el id de la serie
+  is_recurring?: boolean
+  recurrence_rule?: string | null
+  occurrence_start?: string
+  is_cancelled?: boolean
   created_at: string
   updated_at?: string
 }
 
+export interface EventAttendee {
+  id: number
+  name: string
+  username: string
+  image: string
+  response_date?: string
+}
+
+export interface CursorPage {
+  next_cursor: string | null
+  has_more: boolean
+  limit: number
+}
+
 export interface EventInvitation {
   id: number
   event: {
@@ -98,6 +113,8 @@ export interface CreateEventData {
   is_public: boolean
   category?: string
   image_url?: string
+  // Subconjunto de RRULE, p.ej. "FREQ=WEEKLY;BYDAY=TU;COUNT=20"
+  recurrence_rule?: string | null
 }
 
 export interface UpdateEventData extends Partial<CreateEventData> {}
@@ -105,6 +122,17 @@ export interface UpdateEventData extends Partial<CreateEventData> {}
 export interface RSVPData {
   status: 'confirmed' | 'declined' | 'pending'
   notes?: string
+  // Obligatorio en eventos recurrentes: inicio original de la sesión
+  occurrence_start?: string
+}
+
+export interface EventOccurrenceData {
+  occurrence_start: string
+  is_cancelled?: boolean
+  title?: string
+  description?: string
+  start_date?: string
+  end_date?: string
 }
 
 export interface InvitationData {
@@ -112,6 +140,11 @@ export interface InvitationData {
   message?: string
 }
 
+export interface BulkInvitationData {
+  invitee_ids: number[]
+  message?: string
+}
+
 // Obtener lista de eventos públicos
 export const getEvents = async (params?: {
   category?: string
@@ -119,6 +152,8 @@ export const getEvents = async (params?: {
   is_online?: boolean
   city?: string
   upcoming_only?: boolean
+  from?: string
+  to?: string
   page?: number
   per_page?: number
 }): Promise<{ events: Event[]; total: number; pages: number; current_page: number }> => {
@@ -133,6 +168,8 @@ export const getEvents = async (params?: {
 export const getNearbyEvents = async (params?: {
   radius?: number
   upcoming_only?: boolean
+  from?: string
+  to?: string
 }): Promise<{ events: Event[]; total: number; radius_km: number }> => {
   const response = await axios.get(`${API_URL}/api/v1/events/nearby`, {
     params,
@@ -141,6 +178,21 @@ export const getNearbyEvents = async (params?: {
   return response.data
 }
 
+// Obtener eventos recomendados (precalculados en el servidor)
+export const getRecommendedEvents = async (params?: {
+  limit?: number
+}): Promise<{
+  events: Array<Event & { recommendation: { score: number; distance_km: number | null; category_match: boolean; contacts: number } }>
+  total: number
+  computed_at: string | null
+}> => {
+  const response = await axios.get(`${API_URL}/api/v1/events/recommended`, {
+    params,
+    withCredentials: true,
+  })
+  return response.data
+}
+
 // Obtener detalles de un evento
 export const getEvent = async (eventId: number): Promise<Event> => {
   const response = await axios.get(`${API_URL}/api/v1/events/${eventId}`, {
@@ -149,6 +201,48 @@ export const getEvent = async (eventId: number): Promise<Event> => {
   return response.data
 }
 
+// Obtener asistentes confirmados (paginado por cursor)
+export const getEventAttendees = async (
+  eventId: number,
+  params?: { cursor?: string; limit?: number; occurrence_start?: string }
+): Promise<CursorPage & { attendees: EventAttendee[]; total: number }> => {
+  const response = await axios.get(`${API_URL}/api/v1/events/${eventId}/attendees`, {
+    params,
+    withCredentials: true,
+  })
+  return response.data
+}
+
+// Sesiones de un evento recurrente en una ventana (por defecto, próximos 90 días)
+export const getEventOccurrences = async (
+  eventId: number,
+  params?: { from?: string; to?: string }
+): Promise<{
+  event_id: number
+  recurrence_rule: string
+  from: string
+  to: string
+  occurrences: Array<Event & { user_rsvp_status: string | null }>
+  total: number
+}> => {
+  const response = await axios.get(`${API_URL}/api/v1/events/${eventId}/occurrences`, {
+    params,
+    withCredentials: true,
+  })
+  return response.data
+}
+
+// Modificar o cancelar una sesión (solo el creador)
+export const updateEventOccurrence = async (
+  eventId: number,
+  data: EventOccurrenceData
+): Promise<{ message: string; occurrence: Event }> => {
+  const response = await axios.put(`${API_URL}/api/v1/events/${eventId}/occurrences`, data, {
+    withCredentials: true,
+  })
+  return response.data
+}
+
 // Crear evento
 export const createEvent = async (data: CreateEventData): Promise<{ message: string; event: Event }> => {
   const response = await axios.post(`${API_URL}/api/v1/events`, data, {
@@ -174,7 +268,11 @@ export const deleteEvent = async (eventId: number): Promise<{ message: string }>
 }
 
 // Confirmar/declinar asistencia (RSVP)
-export const createRSVP = async (eventId: number, data: RSVPData): Promise<{ message: string; rsvp: any }> => {
+// Si el evento está lleno el servidor responde 202 con `waitlist` en lugar de `rsvp`
+export const createRSVP = async (
+  eventId: number,
+  data: RSVPData
+): Promise<{ message: string; rsvp?: any; waitlist?: { event_id: number; position: number } }> => {
   const response = await axios.post(`${API_URL}/api/v1/events/${eventId}/rsvp`, data, {
     withCredentials: true,
   })
@@ -182,8 +280,9 @@ export const createRSVP = async (eventId: number, data: RSVPData): Promise<{ mes
 }
 
 // Cancelar asistencia
-export const cancelRSVP = async (eventId: number): Promise<{ message: string }> => {
+export const cancelRSVP = async (eventId: number, occurrenceStart?: string): Promise<{ message: string }> => {
   const response = await axios.delete(`${API_URL}/api/v1/events/${eventId}/rsvp`, {
+    params: occurrenceStart ? { occurrence_start: occurrenceStart } : undefined,
     withCredentials: true,
   })
   return response.data
@@ -197,6 +296,17 @@ export const sendInvitation = async (eventId: number, data: InvitationData): Pro
   return response.data
 }
 
+// Invitar a varios usuarios a la vez (máximo 100)
+export const sendBulkInvitations = async (
+  eventId: number,
+  data: BulkInvitationData
+): Promise<{ message: string; invitations: any[]; already_invited: number[]; invalid: number[] }> => {
+  const response = await axios.post(`${API_URL}/api/v1/events/${eventId}/invitations/bulk`, data, {
+    withCredentials: true,
+  })
+  return response.data
+}
+
 // Responder invitación
 export const respondInvitation = async (
   invitationId: number,
@@ -258,3 +368,11 @@ export const getMyRSVPs = async (): Promise<{ rsvps: any[]; total: number }> =>
   })
   return response.data
 }
+
+// URL de suscripción al calendario (.ics) con mis eventos
+export const getMyRSVPsFeedUrl = async (): Promise<{ url: string }> => {
+  const response = await axios.get(`${API_URL}/api/v1/events/my-rsvps/feed-url`, {
+    withCredentials: true,
+  })
+  return response.data
+}
@@ -11,6 +11,7 @@ export interface Notification {
   is_read: boolean
   read_at?: string
   data?: any
+  count: number // eventos agrupados en esta notificación
   created_at: string
 }
 
@@ -2,6 +2,15 @@ import axios from 'axios'
 
 const API_URL = import.meta.env.VITE_REACT_APP_API_URL || 'http://localhost:5000'
 
+export interface ProjectMemberSummary {
+  id: number
+  name: string
+  username: string
+  image: string
+  role: string
+  joined_at: string
+}
+
 export interface Project {
   id: number
   title: string
@@ -22,14 +31,8 @@ export interface Project {
   is_public: boolean
   category?: string
   image_url?: string
-  members?: Array<{
-    id: number
-    name: string
-    username: string
-    image: string
-    role: string
-    joined_at: string
-  }>
+  members?: ProjectMemberSummary[]
+  members_has_more?: boolean
   stats?: {
     active_members: number
     is_full: boolean
@@ -106,6 +109,12 @@ export interface AddMemberData {
   role?: string
 }
 
+export interface BulkInviteMembersData {
+  user_ids: number[]
+  role?: string
+  message?: string
+}
+
 // Obtener lista de proyectos públicos
 export const getProjects = async (params?: {
   category?: string
@@ -129,6 +138,45 @@ export const getProject = async (projectId: number): Promise<Project> => {
   return response.data
 }
 
+// Obtener miembros activos (paginado por cursor)
+export const getProjectMembers = async (
+  projectId: number,
+  params?: { cursor?: string; limit?: number }
+): Promise<{ members: ProjectMemberSummary[]; next_cursor: string | null; has_more: boolean; limit: number }> => {
+  const response = await axios.get(`${API_URL}/api/v1/projects/${projectId}/members`, {
+    params,
+    withCredentials: true,
+  })
+  return response.data
+}
+
+// Sugerir candidatos por habilidades (solo creador u owners)
+export const getProjectCandidates = async (
+  projectId: number,
+  params?: { limit?: number }
+): Promise<{
+  candidates: Array<{
+    id: number
+    name: string
+    username: string
+    image: string
+    city?: string
+    matched_skills: string[]
+    skill_score: number
+    distance_km: number | null
+    average_rating: number
+    total_reviews: number
+    score: number
+  }>
+  total: number
+}> => {
+  const response = await axios.get(`${API_URL}/api/v1/projects/${projectId}/candidates`, {
+    params,
+    withCredentials: true,
+  })
+  return response.data
+}
+
 // Crear proyecto
 export const createProject = async (data: CreateProjectData): Promise<{ message: string; project: Project }> => {
   const response = await axios.post(`${API_URL}/api/v1/projects`, data, {
@@ -167,6 +215,17 @@ export const addMember = async (
   return response.data
 }
 
+// Invitar a varios usuarios a la vez (máximo 100)
+export const inviteMembersBulk = async (
+  projectId: number,
+  data: BulkInviteMembersData
+): Promise<{ message: string; members: any[]; already_members: number[]; invalid: number[] }> => {
+  const response = await axios.post(`${API_URL}/api/v1/projects/${projectId}/members/bulk`, data, {
+    withCredentials: true,
+  })
+  return response.data
+}
+
 // Responder invitación a proyecto
 export const respondMembership = async (
   memberId: number,
@@ -163,8 +163,12 @@ export async function unsubscribeFromPushNotifications(): Promise<boolean> {
       console.log('Suscripción local cancelada')
     }
 
-    // Notificar al servidor
-    await axios.post(`${API_URL}/api/v1/notifications/push/unsubscribe`, {}, { withCredentials: true })
+    // Notificar al servidor (sólo se elimina la suscripción de este dispositivo)
+    await axios.post(
+      `${API_URL}/api/v1/notifications/push/unsubscribe`,
+      { endpoint: subscription?.endpoint ?? null },
+      { withCredentials: true }
+    )
 
     console.log('Suscripción cancelada en el servidor')
     return true